@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Airplane, Flight, SeatLayout, SeatType, SeatLayoutPosition, Passenger, FlightHistory, Seat, Reservation, Ticket, UserProfile
+from .models import Airplane, Flight, SeatLayout, SeatType, SeatLayoutPosition, Passenger, FlightHistory, Seat, Reservation, Ticket, UserProfile, FlightSeat, FlightSeatCounter, SyncCheckpoint
 
 admin.site.register(Airplane)
 admin.site.register(Flight)
@@ -12,3 +12,6 @@ admin.site.register(Seat)
 admin.site.register(Reservation)
 admin.site.register(Ticket)
 admin.site.register(UserProfile)
+admin.site.register(FlightSeat)
+admin.site.register(FlightSeatCounter)
+admin.site.register(SyncCheckpoint)
@@ -3,16 +3,20 @@ from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from django.core.exceptions import ValidationError
+from django.http import Http404
 from .models import Airplane, Flight, Passenger, Reservation, SeatLayout, SeatType, SeatLayoutPosition, FlightHistory, Ticket
 from .serializers import AirplaneSerializer, FlightSerializer, PassengerSerializer, ReservationSerializer, SeatLayoutSerializer, SeatTypeSerializer, SeatLayoutPositionSerializer, FlightHistorySerializer, TicketSerializer, SeatSerializer
 from .services import (
-    AirplaneService, FlightService, PassengerService, ReservationService,
+    AirplaneService, FlightService, FlightSearchService, PassengerService, ReservationService,
     SeatLayoutService, SeatTypeService, SeatLayoutPositionService, TicketService, FlightHistoryService
 )
 from .repositories import SeatRepository
-from .mixins import ServiceActionMixin
+from .forms import FlightSearchForm
+from .mixins import NDJSONStreamMixin, QueryPlanMixin, ServiceActionMixin
+from .exceptions import ReservationConflictError
+from .ticket_pdf import TICKET_PDF_RETRY_AFTER, ticket_pdf_response
 
-class AirplaneViewSet(ServiceActionMixin, viewsets.ModelViewSet):
+class AirplaneViewSet(QueryPlanMixin, NDJSONStreamMixin, ServiceActionMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar aviones a través de la API REST.
 
@@ -77,7 +81,7 @@ class AirplaneViewSet(ServiceActionMixin, viewsets.ModelViewSet):
         instance = self.get_object()
         return self.destroy_with_service(instance, 'delete_airplane')
 
-class FlightViewSet(ServiceActionMixin, viewsets.ModelViewSet):
+class FlightViewSet(QueryPlanMixin, NDJSONStreamMixin, ServiceActionMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar vuelos a través de la API REST.
 
@@ -86,15 +90,43 @@ class FlightViewSet(ServiceActionMixin, viewsets.ModelViewSet):
 
     Atributos:
         queryset: Conjunto de consultas para todos los vuelos.
+        ordering: Orden estable (respaldado por un índice) de la paginación por cursor.
         serializer_class: Serializador para vuelos.
         service: Servicio para lógica de negocio de vuelos.
+        search_service: Servicio de búsqueda de vuelos usado por el listado.
         permission_classes: Requiere autenticación de usuario.
     """
     queryset = Flight.objects.all()
+    ordering = ('departure_date', 'id')
     serializer_class = FlightSerializer
     service = FlightService()
+    search_service = FlightSearchService()
     permission_classes = [IsAuthenticated]
 
+    def list(self, request, *args, **kwargs):
+        """
+        Lista los vuelos, filtrados por los parámetros de búsqueda opcionales.
+
+        Acepta `origin`, `destination`, `date_from`, `date_to` (AAAA-MM-DD),
+        `status` y `min_seats`, igual que el buscador web.
+
+        Parámetros:
+            request (Request): Solicitud HTTP.
+
+        Retorna:
+            Response: Página de vuelos, NDJSON con ?stream=ndjson, o 400 si algún filtro no es válido.
+        """
+        form = FlightSearchForm(request.query_params)
+        if not form.is_valid():
+            return Response(form.errors, status=status.HTTP_400_BAD_REQUEST)
+        queryset = self.apply_query_plan(self.search_service.search(**form.cleaned_data))
+        stream = self.get_stream_response(request, queryset)
+        if stream is not None:
+            return stream
+        flights = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(flights, many=True)
+        return self.get_paginated_response(serializer.data)
+
     def create(self, request, *args, **kwargs):
         """
         Crea un nuevo vuelo.
@@ -142,7 +174,7 @@ class FlightViewSet(ServiceActionMixin, viewsets.ModelViewSet):
         instance = self.get_object()
         return self.destroy_with_service(instance, 'delete_flight')
 
-    @action(detail=True, methods=['get'])
+    @action(detail=True, methods=['get'], serializer_class=SeatSerializer)
     def available_seats(self, request, pk=None):
         """
         Acción personalizada para obtener asientos disponibles en un vuelo.
@@ -151,19 +183,50 @@ class FlightViewSet(ServiceActionMixin, viewsets.ModelViewSet):
             request (Request): Solicitud HTTP.
             pk (int): Clave primaria del vuelo.
 
+        La lista serializada se guarda en la caché de instantáneas por versión de
+        inventario y la respuesta admite If-None-Match (304). Cada asiento incluye
+        `price`, la tarifa actual según su tipo (PricingService).
+
         Retorna:
-            Response: Lista de asientos disponibles o error.
+            Response: Lista de asientos disponibles, 304 o error.
         """
+        def _priced_seats():
+            seats = cache.get_or_build(
+                flight, 'available_seats',
+                lambda: list(SeatSerializer(self.service.get_available_seats(pk), many=True).data),
+            )
+            fares = self.service.pricing_service.get_fare_table(flight)
+            return Response([{**seat, 'price': str(fares.for_type_id(seat['seat_type']))} for seat in seats])
+
         try:
-            available_seats = self.service.get_available_seats(pk)
-            serializer = SeatSerializer(available_seats, many=True)
-            return Response(serializer.data)
+            flight = self.get_object()
+            cache = self.service.seat_map_cache
+            return cache.conditional_response(request, flight, _priced_seats)
+        except Http404:
+            raise
         except ValidationError as e:
             return Response({'detail': e.message}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({'detail': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-class PassengerViewSet(ServiceActionMixin, viewsets.ModelViewSet):
+    @action(detail=True, methods=['get'])
+    def seat_availability(self, request, pk=None):
+        """
+        Acción personalizada para obtener el resumen de disponibilidad de un vuelo.
+
+        Parámetros:
+            request (Request): Solicitud HTTP.
+            pk (int): Clave primaria del vuelo.
+
+        Retorna:
+            Response: IDs disponibles, conteos por tipo de asiento y asientos agrupados por fila.
+        """
+        def _seat_availability():
+            availability = self.service.get_seat_availability(pk)
+            return Response(availability.as_dict())
+        return self._handle_service_action(_seat_availability)
+
+class PassengerViewSet(QueryPlanMixin, NDJSONStreamMixin, ServiceActionMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar pasajeros a través de la API REST.
 
@@ -228,7 +291,7 @@ class PassengerViewSet(ServiceActionMixin, viewsets.ModelViewSet):
         instance = self.get_object()
         return self.destroy_with_service(instance, 'delete_passenger')
 
-class ReservationViewSet(ServiceActionMixin, viewsets.ModelViewSet):
+class ReservationViewSet(QueryPlanMixin, NDJSONStreamMixin, ServiceActionMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar reservas a través de la API REST.
 
@@ -237,11 +300,13 @@ class ReservationViewSet(ServiceActionMixin, viewsets.ModelViewSet):
 
     Atributos:
         queryset: Conjunto de consultas para todas las reservas.
+        ordering: Orden estable (respaldado por un índice) de la paginación por cursor.
         serializer_class: Serializador para reservas.
         service: Servicio para lógica de negocio de reservas.
         permission_classes: Requiere autenticación de usuario.
     """
     queryset = Reservation.objects.all()
+    ordering = ('-reservation_date', '-id')
     serializer_class = ReservationSerializer
     service = ReservationService()
     permission_classes = [IsAuthenticated]
@@ -250,19 +315,33 @@ class ReservationViewSet(ServiceActionMixin, viewsets.ModelViewSet):
         """
         Crea una nueva reserva.
 
+        Vuelo, pasajero y asiento se resuelven en una sola pasada y se entregan
+        al servicio como instancias, que no vuelve a consultarlos. Si se omite
+        `price`, la reserva toma la tarifa actual del asiento.
+
         Parámetros:
             request (Request): Solicitud HTTP con datos de la reserva.
 
         Retorna:
-            Response: Respuesta con datos de la reserva creada o error de validación.
+            Response: Respuesta con datos de la reserva creada, o 400 si faltan campos
+            o alguno de los objetos referenciados no existe.
         """
         try:
             flight_id, passenger_id, seat_id, price = self._get_reservation_creation_data(request.data)
         except ValidationError as e:
             return Response({'detail': e.message}, status=status.HTTP_400_BAD_REQUEST)
 
+        # Flight, passenger and seat are fetched here once and handed to the service as instances.
+        resolved = self.get_serializer().resolve_related(request.data, ('flight', 'passenger', 'seat'))
+        errors = {
+            name: [f'Invalid pk "{request.data.get(name)}" - object does not exist.']
+            for name in ('flight', 'passenger', 'seat') if resolved.get(name) is None
+        }
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
         def _create_reservation():
-            reservation = self.service.create_reservation(flight_id, passenger_id, seat_id, price)
+            reservation = self.service.create_reservation(resolved['flight'], resolved['passenger'], resolved['seat'], price)
             return Response(self.get_serializer(reservation).data, status=status.HTTP_201_CREATED)
         return self._handle_service_action(_create_reservation)
 
@@ -274,7 +353,7 @@ class ReservationViewSet(ServiceActionMixin, viewsets.ModelViewSet):
             data (dict): Datos de la solicitud.
 
         Retorna:
-            tuple: flight_id, passenger_id, seat_id, price.
+            tuple: flight_id, passenger_id, seat_id, price (None si se omitió).
 
         Raises:
             ValidationError: Si faltan campos requeridos.
@@ -282,10 +361,10 @@ class ReservationViewSet(ServiceActionMixin, viewsets.ModelViewSet):
         flight_id = data.get('flight')
         passenger_id = data.get('passenger')
         seat_id = data.get('seat')
-        price = data.get('price')
+        price = data.get('price') or None
 
-        if not all([flight_id, passenger_id, seat_id, price]):
-            raise ValidationError('Missing required fields: flight, passenger, seat, price')
+        if not all([flight_id, passenger_id, seat_id]):
+            raise ValidationError('Missing required fields: flight, passenger, seat')
         return flight_id, passenger_id, seat_id, price
 
     def update(self, request, *args, **kwargs):
@@ -355,7 +434,66 @@ class ReservationViewSet(ServiceActionMixin, viewsets.ModelViewSet):
             return Response(self.get_serializer(reservation).data)
         return self._handle_service_action(_cancel)
 
-class SeatLayoutViewSet(ServiceActionMixin, viewsets.ModelViewSet):
+    @action(detail=False, methods=['post'], url_path='batch')
+    def batch(self, request):
+        """
+        Acción para crear varias reservas de un vuelo en una sola solicitud (reservas grupales).
+
+        Espera {'flight': id, 'reservations': [{'passenger': id, 'seat': id, 'price': valor}, ...]};
+        `price` es opcional (por defecto, la tarifa actual del asiento). Las reservas se crean todas o ninguna.
+
+        Parámetros:
+            request (Request): Solicitud HTTP con el vuelo y los elementos a reservar.
+
+        Retorna:
+            Response: Resultado por elemento; 201 si todas se crearon, 409 si algún asiento
+            o pasajero está en conflicto, 400 si algún elemento es inválido.
+        """
+        flight_id = request.data.get('flight')
+        items = request.data.get('reservations')
+        if not flight_id or not isinstance(items, list):
+            return Response({'detail': 'Missing required fields: flight, reservations'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            flight_id = int(flight_id)
+        except (TypeError, ValueError):
+            return Response({'detail': 'flight must be a numeric ID.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            reservations = self.service.create_reservations_bulk(flight_id, items)
+        except ReservationConflictError as e:
+            return self._batch_error_response(items, e, status.HTTP_409_CONFLICT)
+        except ValidationError as e:
+            return self._batch_error_response(items, e, status.HTTP_400_BAD_REQUEST)
+        results = [
+            {'index': index, 'status': 'reserved', 'reservation': data}
+            for index, data in enumerate(self.get_serializer(reservations, many=True).data)
+        ]
+        return Response({'flight': flight_id, 'results': results}, status=status.HTTP_201_CREATED)
+
+    def _batch_error_response(self, items, error, status_code):
+        """
+        Construye la respuesta de una reserva grupal rechazada.
+
+        Parámetros:
+            items (list): Elementos de la solicitud.
+            error (ValidationError): Error con mensajes por índice del elemento o un mensaje general.
+            status_code (int): Código HTTP de la respuesta.
+
+        Retorna:
+            Response: Resultado por elemento, o {'detail': ...} si el error no es por elemento.
+        """
+        if not hasattr(error, 'error_dict'):
+            return Response({'detail': error.message}, status=status_code)
+        errors = error.message_dict
+        if not any(key.isdigit() for key in errors):
+            return Response({'detail': errors}, status=status_code)
+        results = [
+            {'index': index, 'status': 'rejected', 'errors': errors[str(index)]}
+            if str(index) in errors else {'index': index, 'status': 'not_reserved'}
+            for index in range(len(items))
+        ]
+        return Response({'results': results}, status=status_code)
+
+class SeatLayoutViewSet(QueryPlanMixin, NDJSONStreamMixin, ServiceActionMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar layouts de asientos a través de la API REST.
 
@@ -415,6 +553,35 @@ class SeatLayoutViewSet(ServiceActionMixin, viewsets.ModelViewSet):
             raise ValidationError('Missing required fields: layout_name, rows, columns')
         return layout_name, rows, columns, positions_data
 
+    @action(detail=False, methods=['post'], url_path='import-spec')
+    def import_spec(self, request):
+        """
+        Crea un layout de asientos a partir de un spec compacto.
+
+        El cuerpo lleva layout_name, rows, columns y sections: bloques como
+        {"rows": "1-4", "columns": "A-F", "seat_type": "BUS"} o "1-4:A-F=BUS".
+
+        Parámetros:
+            request (Request): Solicitud HTTP con el spec del layout.
+
+        Retorna:
+            Response: Datos del layout creado (201) o los errores del spec (400).
+        """
+        data = request.data
+        layout_name = data.get('layout_name')
+        try:
+            rows, columns = int(data.get('rows')), int(data.get('columns'))
+        except (TypeError, ValueError):
+            rows = columns = None
+        if not layout_name or not rows or not columns:
+            return Response({'detail': 'Missing required fields: layout_name, rows, columns'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            seat_layout = self.service.create_seat_layout_from_spec(layout_name, rows, columns, data.get('sections'))
+        except ValidationError as e:
+            return Response({'detail': e.messages}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(self.get_serializer(seat_layout).data, status=status.HTTP_201_CREATED)
+
     def update(self, request, *args, **kwargs):
         """
         Actualiza un layout de asientos existente.
@@ -448,7 +615,7 @@ class SeatLayoutViewSet(ServiceActionMixin, viewsets.ModelViewSet):
         instance = self.get_object()
         return self.destroy_with_service(instance, 'delete_seat_layout')
 
-class SeatTypeViewSet(ServiceActionMixin, viewsets.ModelViewSet):
+class SeatTypeViewSet(QueryPlanMixin, NDJSONStreamMixin, ServiceActionMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar tipos de asientos a través de la API REST.
 
@@ -513,7 +680,7 @@ class SeatTypeViewSet(ServiceActionMixin, viewsets.ModelViewSet):
         instance = self.get_object()
         return self.destroy_with_service(instance, 'delete_seat_type')
 
-class SeatLayoutPositionViewSet(ServiceActionMixin, viewsets.ModelViewSet):
+class SeatLayoutPositionViewSet(QueryPlanMixin, NDJSONStreamMixin, ServiceActionMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar posiciones de layouts de asientos a través de la API REST.
 
@@ -578,7 +745,7 @@ class SeatLayoutPositionViewSet(ServiceActionMixin, viewsets.ModelViewSet):
         instance = self.get_object()
         return self.destroy_with_service(instance, 'delete_seat_layout_position')
 
-class FlightHistoryViewSet(ServiceActionMixin, viewsets.ModelViewSet):
+class FlightHistoryViewSet(QueryPlanMixin, NDJSONStreamMixin, ServiceActionMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar historial de vuelos a través de la API REST.
 
@@ -587,28 +754,34 @@ class FlightHistoryViewSet(ServiceActionMixin, viewsets.ModelViewSet):
 
     Atributos:
         queryset: Conjunto de consultas para todo el historial de vuelos.
+        ordering: Orden estable (respaldado por un índice) de la paginación por cursor.
         serializer_class: Serializador para historial de vuelos.
         service: Servicio para lógica de negocio de historial de vuelos.
         permission_classes: Requiere autenticación de usuario.
     """
     queryset = FlightHistory.objects.all()
+    ordering = ('-booking_date', '-id')
     serializer_class = FlightHistorySerializer
     service = FlightHistoryService()
     permission_classes = [IsAuthenticated]
 
     def list(self, request, *args, **kwargs):
         """
-        Lista todo el historial de vuelos.
+        Lista el historial de vuelos, paginado por cursor (más recientes primero).
 
         Parámetros:
             request (Request): Solicitud HTTP.
 
         Retorna:
-            Response: Lista de historial de vuelos.
+            Response: Página de historial de vuelos con enlaces next/previous, o NDJSON con ?stream=ndjson.
         """
-        flight_history = self.service.flight_history_repo.get_all()
+        queryset = self.apply_query_plan(self.service.flight_history_repo.get_all())
+        stream = self.get_stream_response(request, queryset)
+        if stream is not None:
+            return stream
+        flight_history = self.paginate_queryset(queryset)
         serializer = self.get_serializer(flight_history, many=True)
-        return Response(serializer.data)
+        return self.get_paginated_response(serializer.data)
 
     def retrieve(self, request, *args, **kwargs):
         """
@@ -631,19 +804,26 @@ class FlightHistoryViewSet(ServiceActionMixin, viewsets.ModelViewSet):
         """
         Acción para obtener historial de vuelos por pasajero.
 
+        Se pagina por cursor como el listado (más recientes primero), sobre el
+        índice (passenger, -booking_date, -id), y admite ?stream=ndjson.
+
         Parámetros:
             request (Request): Solicitud HTTP con query param 'passenger_id'.
 
         Retorna:
-            Response: Lista de historial de vuelos del pasajero o error si falta ID.
+            Response: Página del historial de vuelos del pasajero o error si falta ID.
         """
         passenger_id = request.query_params.get('passenger_id')
         if not passenger_id:
             return Response({'detail': 'Passenger ID is required.'}, status=status.HTTP_400_BAD_REQUEST)
         def _by_passenger():
-            flight_history = self.service.get_flight_history_by_passenger(passenger_id)
+            queryset = self.apply_query_plan(self.service.get_flight_history_by_passenger(passenger_id))
+            stream = self.get_stream_response(request, queryset)
+            if stream is not None:
+                return stream
+            flight_history = self.paginate_queryset(queryset)
             serializer = self.get_serializer(flight_history, many=True)
-            return Response(serializer.data)
+            return self.get_paginated_response(serializer.data)
         return self._handle_service_action(_by_passenger)
 
     @action(detail=False, methods=['get'])
@@ -651,22 +831,29 @@ class FlightHistoryViewSet(ServiceActionMixin, viewsets.ModelViewSet):
         """
         Acción para obtener historial de vuelos por vuelo.
 
+        Se pagina por cursor como el listado (más recientes primero), sobre el
+        índice (flight, -booking_date, -id), y admite ?stream=ndjson.
+
         Parámetros:
             request (Request): Solicitud HTTP con query param 'flight_id'.
 
         Retorna:
-            Response: Lista de historial de vuelos del vuelo o error si falta ID.
+            Response: Página del historial de vuelos del vuelo o error si falta ID.
         """
         flight_id = request.query_params.get('flight_id')
         if not flight_id:
             return Response({'detail': 'Flight ID is required.'}, status=status.HTTP_400_BAD_REQUEST)
         def _by_flight():
-            flight_history = self.service.get_flight_history_by_flight(flight_id)
+            queryset = self.apply_query_plan(self.service.get_flight_history_by_flight(flight_id))
+            stream = self.get_stream_response(request, queryset)
+            if stream is not None:
+                return stream
+            flight_history = self.paginate_queryset(queryset)
             serializer = self.get_serializer(flight_history, many=True)
-            return Response(serializer.data)
+            return self.get_paginated_response(serializer.data)
         return self._handle_service_action(_by_flight)
 
-class TicketViewSet(ServiceActionMixin, viewsets.ModelViewSet):
+class TicketViewSet(QueryPlanMixin, NDJSONStreamMixin, ServiceActionMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar tickets a través de la API REST.
 
@@ -675,28 +862,34 @@ class TicketViewSet(ServiceActionMixin, viewsets.ModelViewSet):
 
     Atributos:
         queryset: Conjunto de consultas para todos los tickets.
+        ordering: Orden estable (respaldado por un índice) de la paginación por cursor.
         serializer_class: Serializador para tickets.
         service: Servicio para lógica de negocio de tickets.
         permission_classes: Requiere autenticación de usuario.
     """
     queryset = Ticket.objects.all()
+    ordering = ('-issue_date', '-id')
     serializer_class = TicketSerializer
     service = TicketService()
     permission_classes = [IsAuthenticated]
 
     def list(self, request, *args, **kwargs):
         """
-        Lista todos los tickets.
+        Lista los tickets, paginados por cursor (más recientes primero).
 
         Parámetros:
             request (Request): Solicitud HTTP.
 
         Retorna:
-            Response: Lista de tickets.
+            Response: Página de tickets con enlaces next/previous, o NDJSON con ?stream=ndjson.
         """
-        tickets = self.service.ticket_repo.get_all()
+        queryset = self.apply_query_plan(self.service.ticket_repo.get_all())
+        stream = self.get_stream_response(request, queryset)
+        if stream is not None:
+            return stream
+        tickets = self.paginate_queryset(queryset)
         serializer = self.get_serializer(tickets, many=True)
-        return Response(serializer.data)
+        return self.get_paginated_response(serializer.data)
 
     def retrieve(self, request, *args, **kwargs):
         """
@@ -746,6 +939,37 @@ class TicketViewSet(ServiceActionMixin, viewsets.ModelViewSet):
             return Response(self.get_serializer(ticket).data, status=status.HTTP_201_CREATED)
         return self._handle_service_action(_issue)
 
+    @action(detail=False, methods=['post'], url_path='issue_for_flight')
+    def issue_for_flight(self, request):
+        """
+        Acción para emitir los tickets de todas las reservas confirmadas o pagadas de un vuelo.
+
+        Los PDFs se encargan al pool de procesos sin esperar; cada uno puede
+        descargarse luego con la acción pdf.
+
+        Parámetros:
+            request (Request): Solicitud HTTP con 'flight_id' en el cuerpo.
+
+        Retorna:
+            Response: {'flight', 'created', 'rendering', 'tickets'} con estado 201,
+            400 si falta el ID o no es válido, o 404 si el vuelo no existe.
+        """
+        flight_id = request.data.get('flight_id')
+        if not flight_id:
+            return Response({'detail': 'Flight ID is required.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            flight_id = int(flight_id)
+        except (TypeError, ValueError):
+            return Response({'detail': 'Flight ID must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        # An unknown flight propagates as Http404 so DRF answers 404.
+        result = self.service.issue_tickets_for_flight(flight_id, wait=False)
+        return Response({
+            'flight': result['flight'].pk,
+            'created': result['created'],
+            'rendering': result['rendered'],
+            'tickets': self.get_serializer(result['tickets'], many=True).data,
+        }, status=status.HTTP_201_CREATED)
+
     @action(detail=True, methods=['post'])
     def cancel(self, request, pk=None): # pk here is ticket_id
         """
@@ -762,3 +986,25 @@ class TicketViewSet(ServiceActionMixin, viewsets.ModelViewSet):
             ticket = self.service.cancel_ticket(pk)
             return Response(self.get_serializer(ticket).data)
         return self._handle_service_action(_cancel)
+
+    @action(detail=True, methods=['get'])
+    def pdf(self, request, pk=None):
+        """
+        Acción para descargar el PDF de un ticket.
+
+        La primera solicitud encarga el renderizado y responde 202 con
+        Retry-After; el cliente repite la solicitud hasta recibir el archivo.
+
+        Parámetros:
+            request (Request): Solicitud HTTP.
+            pk (int): Clave primaria del ticket.
+
+        Retorna:
+            Response: 202 con {'status': 'pending'} o el archivo PDF adjunto.
+        """
+        ticket = self.get_object()
+        path = self.service.get_ticket_pdf(ticket)
+        if path is None:
+            return Response({'status': 'pending'}, status=status.HTTP_202_ACCEPTED,
+                            headers={'Retry-After': str(TICKET_PDF_RETRY_AFTER)})
+        return ticket_pdf_response(ticket, path)
@@ -0,0 +1,154 @@
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class SeatState:
+    """
+    Estado de un asiento dentro de una instantánea de disponibilidad.
+
+    Atributos:
+        seat_id (int): ID del asiento.
+        number (str): Número del asiento (fila + columna).
+        row (int): Fila del asiento.
+        column (str): Columna del asiento.
+        seat_type (str): Código del tipo de asiento, o None si no tiene tipo.
+        status (str): Estado de inventario del asiento en el vuelo.
+    """
+    seat_id: int
+    number: str
+    row: int
+    column: str
+    seat_type: str
+    status: str
+
+    @property
+    def is_available(self):
+        return self.status == 'AVL'
+
+    @property
+    def is_reserved(self):
+        return not self.is_available
+
+    @property
+    def pk(self):
+        return self.seat_id
+
+
+@dataclass(frozen=True)
+class SeatAvailability:
+    """
+    Instantánea inmutable de la disponibilidad de asientos de un vuelo.
+
+    Se construye a partir de una única consulta sobre el inventario del vuelo y
+    expone conjuntos (frozenset) para que las pruebas de pertenencia sean O(1).
+
+    Atributos:
+        flight_id (int): ID del vuelo.
+        seats (tuple): Estados de asiento ordenados por fila y columna.
+        available_ids (frozenset): IDs de asientos disponibles.
+        unavailable_ids (frozenset): IDs de asientos reservados o vendidos.
+    """
+    flight_id: int
+    seats: tuple
+    available_ids: frozenset = field(init=False)
+    unavailable_ids: frozenset = field(init=False)
+
+    def __post_init__(self):
+        available = frozenset(seat.seat_id for seat in self.seats if seat.is_available)
+        object.__setattr__(self, 'available_ids', available)
+        object.__setattr__(self, 'unavailable_ids', frozenset(seat.seat_id for seat in self.seats) - available)
+
+    @classmethod
+    def from_rows(cls, flight_id, rows):
+        """
+        Construye la instantánea desde filas (seat_id, number, row, column, seat_type, status).
+
+        Parámetros:
+            flight_id (int): ID del vuelo.
+            rows (iterable): Tuplas en el orden de los atributos de SeatState.
+
+        Retorna:
+            SeatAvailability: Instantánea de disponibilidad.
+        """
+        return cls(flight_id=flight_id, seats=tuple(SeatState(*row) for row in rows))
+
+    def is_available(self, seat_id):
+        """
+        Indica si un asiento está disponible.
+
+        Parámetros:
+            seat_id (int): ID del asiento.
+
+        Retorna:
+            bool: True si el asiento está disponible.
+        """
+        return seat_id in self.available_ids
+
+    @property
+    def total(self):
+        return len(self.seats)
+
+    @property
+    def available_count(self):
+        return len(self.available_ids)
+
+    @property
+    def load_factor(self):
+        """
+        Proporción de asientos ocupados (reservados o vendidos) del vuelo.
+
+        Retorna:
+            float: Valor entre 0 y 1; 0 si el vuelo no tiene asientos.
+        """
+        return len(self.unavailable_ids) / self.total if self.seats else 0.0
+
+    def counts_by_seat_type(self):
+        """
+        Cuenta asientos totales y disponibles por tipo de asiento.
+
+        Retorna:
+            dict: Mapa {código de tipo: {'total': int, 'available': int}}.
+        """
+        counts = {}
+        for seat in self.seats:
+            entry = counts.setdefault(seat.seat_type, {'total': 0, 'available': 0})
+            entry['total'] += 1
+            if seat.is_available:
+                entry['available'] += 1
+        return counts
+
+    def by_row(self):
+        """
+        Agrupa los asientos por fila manteniendo el orden por columna.
+
+        Retorna:
+            dict: Mapa {fila: [SeatState, ...]} ordenado por fila.
+        """
+        rows = {}
+        for seat in self.seats:
+            rows.setdefault(seat.row, []).append(seat)
+        return rows
+
+    def as_dict(self):
+        """
+        Representación serializable de la instantánea.
+
+        Retorna:
+            dict: Identificadores disponibles, conteos por tipo y asientos por fila.
+        """
+        return {
+            'flight': self.flight_id,
+            'total': self.total,
+            'available': self.available_count,
+            'load_factor': round(self.load_factor, 4),
+            'available_seat_ids': sorted(self.available_ids),
+            'seat_types': self.counts_by_seat_type(),
+            'rows': {
+                row: [
+                    {'id': seat.seat_id, 'number': seat.number, 'column': seat.column,
+                     'seat_type': seat.seat_type, 'available': seat.is_available}
+                    for seat in seats
+                ]
+                for row, seats in self.by_row().items()
+            },
+        }
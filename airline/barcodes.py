@@ -0,0 +1,120 @@
+from functools import lru_cache
+from html import escape
+
+# Bar/space widths (in modules) of each Code 128 symbol value, 0-106.
+CODE128_PATTERNS = (
+    '212222', '222122', '222221', '121223', '121322', '131222', '122213', '122312', '132212', '221213',
+    '221312', '231212', '112232', '122132', '122231', '113222', '123122', '123221', '223211', '221132',
+    '221231', '213212', '223112', '312131', '311222', '321122', '321221', '312212', '322112', '322211',
+    '212123', '212321', '232121', '111323', '131123', '131321', '112313', '132113', '132311', '211313',
+    '231113', '231311', '112133', '112331', '132131', '113123', '113321', '133121', '313121', '211331',
+    '231131', '213113', '213311', '213131', '311123', '311321', '331121', '312113', '312311', '332111',
+    '314111', '221411', '431111', '111224', '111422', '121124', '121421', '141122', '141221', '112214',
+    '112412', '122114', '122411', '142112', '142211', '241211', '221114', '413111', '241112', '134111',
+    '111242', '121142', '121241', '114212', '124112', '124211', '411212', '421112', '421211', '212141',
+    '214121', '412121', '111143', '111341', '131141', '114113', '114311', '411113', '411311', '113141',
+    '114131', '311141', '411131', '211412', '211214', '211232', '2331112',
+)
+CODE_C, CODE_B = 99, 100
+START_B, START_C, STOP = 104, 105, 106
+# Shortest digit run worth switching to code set C for (4 at either end of the data).
+MIN_DIGITS_FOR_C = 6
+# Blank modules required on each side of the symbol.
+QUIET_ZONE = 10
+
+
+def code128_values(data):
+    """
+    Codifica un texto como valores de símbolo Code 128, con inicio, control y parada.
+
+    Usa el juego B (ASCII imprimible) y pasa al juego C, que codifica dos dígitos
+    por símbolo, en las secuencias de dígitos lo bastante largas.
+
+    Parámetros:
+        data (str): Texto a codificar (ASCII 32-126).
+
+    Retorna:
+        list: Valores de símbolo, del inicio a la parada.
+
+    Raises:
+        ValueError: Si el texto está vacío o tiene caracteres fuera del juego B.
+    """
+    if not data:
+        raise ValueError('Code 128 data cannot be empty.')
+    if any(not 32 <= ord(char) <= 126 for char in data):
+        raise ValueError(f'Code 128 data must be printable ASCII: {data!r}.')
+    values = []
+    code_set = None
+    position = 0
+    while position < len(data):
+        digits = _digit_run(data, position)
+        at_edge = position == 0 or position + digits == len(data)
+        if digits >= 2 and (code_set == 'C' or digits >= MIN_DIGITS_FOR_C or (at_edge and digits >= 4)):
+            if code_set != 'C':
+                # An odd run leaves its first digit to set B so the rest pairs up.
+                if digits % 2 and code_set == 'B':
+                    values.append(ord(data[position]) - 32)
+                    position += 1
+                    digits -= 1
+                values.append(START_C if code_set is None else CODE_C)
+                code_set = 'C'
+            for offset in range(position, position + digits - digits % 2, 2):
+                values.append(int(data[offset:offset + 2]))
+            position += digits - digits % 2
+            continue
+        if code_set != 'B':
+            values.append(START_B if code_set is None else CODE_B)
+            code_set = 'B'
+        values.append(ord(data[position]) - 32)
+        position += 1
+    checksum = values[0] + sum(weight * value for weight, value in enumerate(values[1:], start=1))
+    return values + [checksum % 103, STOP]
+
+
+def _digit_run(data, position):
+    end = position
+    while end < len(data) and data[end].isdigit():
+        end += 1
+    return end - position
+
+
+def code128_modules(data):
+    """
+    Anchos alternados de barras y espacios (en módulos) del símbolo, empezando por una barra.
+    """
+    return [int(width) for value in code128_values(data) for width in CODE128_PATTERNS[value]]
+
+
+@lru_cache(maxsize=4096)
+def code128_svg(data, module_width=2, height=60):
+    """
+    Dibuja un código Code 128 como SVG en línea.
+
+    Las barras se dibujan como un único path, con la zona de silencio a ambos
+    lados. El resultado solo depende de los argumentos, por lo que se guarda en
+    una caché LRU por proceso.
+
+    Parámetros:
+        data (str): Texto a codificar.
+        module_width (int): Ancho en píxeles del módulo (la barra más fina).
+        height (int): Alto en píxeles de las barras.
+
+    Retorna:
+        str: Elemento <svg> listo para insertar en HTML.
+
+    Raises:
+        ValueError: Si el texto no se puede codificar en Code 128.
+    """
+    x = QUIET_ZONE
+    bars = []
+    for index, width in enumerate(code128_modules(data)):
+        if index % 2 == 0:
+            bars.append(f'M{x * module_width} 0h{width * module_width}v{height}h-{width * module_width}z')
+        x += width
+    total_width = (x + QUIET_ZONE) * module_width
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{total_width}" height="{height}" '
+        f'viewBox="0 0 {total_width} {height}" role="img" aria-label="{escape(data)}">'
+        f'<rect width="{total_width}" height="{height}" fill="#fff"/>'
+        f'<path d="{"".join(bars)}" fill="#000"/></svg>'
+    )
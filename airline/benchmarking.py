@@ -0,0 +1,108 @@
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@dataclass
+class Measurement:
+    """
+    Resultado de medir una operación.
+
+    Atributos:
+        label (str): Descripción de la operación medida.
+        seconds (float): Mejor tiempo de reloj observado, en segundos.
+        queries (int): Consultas SQL ejecutadas en la última repetición.
+        result: Valor devuelto por la última repetición.
+    """
+    label: str
+    seconds: float
+    queries: int
+    result: object = None
+
+    @property
+    def milliseconds(self):
+        return self.seconds * 1000
+
+
+@contextmanager
+def benchmark_database(verbosity=0, on_disk=False):
+    """
+    Crea una base de datos de prueba aislada mientras dura el bloque.
+
+    Los benchmarks nunca escriben sobre la base de datos configurada; se ejecutan
+    sobre una copia vacía y migrada que se destruye al salir.
+
+    Parámetros:
+        verbosity (int): Nivel de detalle de la creación de la base de datos.
+        on_disk (bool): Con SQLite, usa un archivo temporal en lugar de la base en
+            memoria para que varios hilos puedan abrir sus propias conexiones.
+    """
+    old_name = connection.settings_dict['NAME']
+    test_settings = connection.settings_dict.setdefault('TEST', {})
+    old_test_name = test_settings.get('NAME')
+    tmp_dir = None
+    if on_disk and connection.vendor == 'sqlite':
+        tmp_dir = tempfile.mkdtemp(prefix='airline-bench-')
+        test_settings['NAME'] = os.path.join(tmp_dir, 'bench.sqlite3')
+    connection.creation.create_test_db(verbosity=verbosity, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+        test_settings['NAME'] = old_test_name
+        if tmp_dir:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def measure(label, func, *args, repeat=1, setup=None, **kwargs):
+    """
+    Mide el tiempo de reloj y la cantidad de consultas de una operación.
+
+    Parámetros:
+        label (str): Descripción de la operación.
+        func (callable): Operación a medir.
+        *args: Argumentos posicionales para `func`.
+        repeat (int): Cantidad de repeticiones; se conserva el mejor tiempo.
+        setup (callable): Función opcional ejecutada (sin medir) antes de cada repetición.
+        **kwargs: Argumentos de palabra clave para `func`.
+
+    Retorna:
+        Measurement: Resultado de la medición.
+    """
+    best = None
+    result = None
+    queries = 0
+    for _ in range(max(1, repeat)):
+        if setup:
+            setup()
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            elapsed = time.perf_counter() - start
+        queries = len(ctx.captured_queries)
+        best = elapsed if best is None else min(best, elapsed)
+    return Measurement(label=label, seconds=best, queries=queries, result=result)
+
+
+def format_table(headers, rows):
+    """
+    Formatea filas como una tabla de texto alineada.
+
+    Parámetros:
+        headers (list): Encabezados de columna.
+        rows (list): Filas con el mismo número de columnas que los encabezados.
+
+    Retorna:
+        str: Tabla lista para imprimir.
+    """
+    cells = [[str(value) for value in row] for row in [headers, *rows]]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(headers))]
+    lines = ['  '.join(value.rjust(widths[i]) for i, value in enumerate(row)) for row in cells]
+    lines.insert(1, '  '.join('-' * width for width in widths))
+    return '\n'.join(lines)
@@ -1,8 +1,11 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.utils.translation import gettext_lazy as _
-from .forms import FlightForm, PassengerForm, AirplaneForm, SeatLayoutForm, SeatTypeForm, SeatLayoutPositionForm
+from .forms import FlightForm, FlightSearchForm, PassengerForm, AirplaneForm, SeatLayoutForm, SeatTypeForm, SeatLayoutPositionForm
 from .models import Flight, Passenger, Airplane, SeatLayout, SeatType, SeatLayoutPosition
+from .services import FlightSearchService
+
+flight_search_service = FlightSearchService()
 
 # Generic CRUD functions
 def create_object(request, form_class, redirect_url, template_name, context_name):
@@ -82,10 +85,30 @@ def delete_object(request, pk, model_class, redirect_url, template_name, context
     return render(request, template_name, {context_name: obj})
 
 # Flight CRUD Views
+def search_flights(request):
+    """
+    Aplica los filtros de búsqueda de la query string a la lista de vuelos.
+
+    Si los filtros no son válidos se muestran todos los vuelos junto con los
+    errores del formulario. El resultado se limita a
+    FlightSearchService.web_results_limit vuelos.
+
+    Parámetros:
+        request (HttpRequest): Objeto de solicitud HTTP.
+
+    Retorna:
+        dict: Contexto con 'search_form', 'flights' y 'flights_truncated'.
+    """
+    form = FlightSearchForm(request.GET or None)
+    criteria = form.cleaned_data if form.is_bound and form.is_valid() else {}
+    limit = flight_search_service.web_results_limit
+    flights = list(flight_search_service.search(**criteria)[:limit + 1])
+    return {'search_form': form, 'flights': flights[:limit], 'flights_truncated': len(flights) > limit}
+
 @login_required
 def flight_list(request):
     """
-    Vista para listar todos los vuelos.
+    Vista para listar los vuelos, con filtros de búsqueda opcionales.
 
     Requiere autenticación del usuario.
 
@@ -95,8 +118,7 @@ def flight_list(request):
     Retorna:
         HttpResponse: Respuesta renderizada con la lista de vuelos.
     """
-    flights = Flight.objects.all()
-    return render(request, 'airline/flight_list.html', {'flights': flights})
+    return render(request, 'airline/flight_list.html', search_flights(request))
 
 @login_required
 def flight_create(request):
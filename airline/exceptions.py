@@ -0,0 +1,16 @@
+from django.core.exceptions import ValidationError
+
+
+class ReservationConflictError(ValidationError):
+    """
+    La operación choca con una reserva existente (por ejemplo, por concurrencia).
+
+    Hereda de ValidationError para que los manejadores existentes la sigan
+    tratando como un error de negocio; la API la traduce a 409 Conflict.
+    """
+
+
+class SeatUnavailableError(ReservationConflictError):
+    """
+    El asiento ya no está disponible en el vuelo.
+    """
@@ -2,7 +2,7 @@ from django import forms
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
-from .models import Flight, Airplane, Passenger, Seat, Reservation, Ticket, SeatLayout, SeatType, SeatLayoutPosition
+from .models import Flight, Airplane, Passenger, Seat, Reservation, Ticket, SeatLayout, SeatType, SeatLayoutPosition, FlightSeat
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 import datetime
@@ -191,17 +191,23 @@ class PassengerForm(forms.ModelForm):
 class ReservationForm(forms.ModelForm):
     class Meta:
         model = Reservation
-        fields = ['flight', 'seat', 'status', 'price'] # Removed 'passenger' as it's set by the view
+        fields = ['flight', 'seat', 'status'] # Removed 'passenger' as it's set by the view
+        # 'price' is quoted server-side by PricingService when the reservation is created.
         widgets = {
             'status': forms.HiddenInput(), # Status will be set by the view
-            'price': forms.NumberInput(attrs={'min': '0.01', 'step': '0.01'}), # Price will be calculated by the view, but ensure it's positive if manually set
         }
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         # Optionally, filter seats based on the selected flight if flight is already known
         if 'flight' in self.initial:
-            self.fields['seat'].queryset = Seat.objects.filter(airplane=self.initial['flight'].airplane, status='Available')
+            flight = self.initial['flight']
+            passenger = self.initial.get('passenger')
+            # Availability is per flight: exclude only seats taken in this flight's inventory.
+            # A seat held by the passenger filling in the form stays selectable.
+            claimable = FlightSeat.claimable(timezone.now(), [passenger.pk] if passenger else [])
+            taken_seats = FlightSeat.objects.filter(flight=flight).exclude(claimable).values('seat_id')
+            self.fields['seat'].queryset = Seat.objects.filter(airplane=flight.airplane).exclude(pk__in=taken_seats)
         else:
             self.fields['seat'].queryset = Seat.objects.none() # No seats initially
         add_bootstrap_classes(self)
@@ -210,3 +216,56 @@ class ReservationForm(forms.ModelForm):
         cleaned_data = super().clean()
         # Model-level validation will be handled when the instance is saved in the view.
         return cleaned_data
+
+class FlightSearchForm(forms.Form):
+    """
+    Filtros de búsqueda de vuelos, compartidos por la web y la API.
+
+    Todos los campos son opcionales; los nombres coinciden con los parámetros
+    de FlightSearchService.search.
+    """
+    origin = forms.CharField(label=_("Origin"), max_length=100, required=False)
+    destination = forms.CharField(label=_("Destination"), max_length=100, required=False)
+    date_from = forms.DateField(label=_("From"), required=False, widget=forms.DateInput(attrs={'type': 'date'}))
+    date_to = forms.DateField(label=_("To"), required=False, widget=forms.DateInput(attrs={'type': 'date'}))
+    status = forms.CharField(label=_("Status"), max_length=50, required=False)
+    min_seats = forms.IntegerField(label=_("Seats"), min_value=1, required=False)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        add_bootstrap_classes(self)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        date_from = cleaned_data.get('date_from')
+        date_to = cleaned_data.get('date_to')
+        if date_from and date_to and date_to < date_from:
+            self.add_error('date_to', _("The end date must be on or after the start date."))
+        return cleaned_data
+
+class ManifestExportForm(forms.Form):
+    """
+    Ventana de salidas y formato de la exportación de manifiestos de pasajeros.
+    """
+    FORMAT_CHOICES = [
+        ('csv', 'CSV'),
+        ('excel', _('CSV (Excel)')),
+        ('ndjson', 'NDJSON'),
+    ]
+
+    date_from = forms.DateField(label=_("From"), widget=forms.DateInput(attrs={'type': 'date'}))
+    date_to = forms.DateField(label=_("To"), widget=forms.DateInput(attrs={'type': 'date'}))
+    format = forms.ChoiceField(label=_("Format"), choices=FORMAT_CHOICES, required=False)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        add_bootstrap_classes(self)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        date_from = cleaned_data.get('date_from')
+        date_to = cleaned_data.get('date_to')
+        if date_from and date_to and date_to < date_from:
+            self.add_error('date_to', _("The end date must be on or after the start date."))
+        cleaned_data['format'] = cleaned_data.get('format') or 'csv'
+        return cleaned_data
@@ -0,0 +1,190 @@
+from dataclasses import dataclass
+
+from django.core.exceptions import ValidationError
+
+# Errors reported per spec; the rest are summarised so a typo in a large range
+# does not produce thousands of messages.
+MAX_SPEC_ERRORS = 20
+# Upper bound on the positions of a layout imported from a spec, checked before
+# any range is expanded.
+MAX_LAYOUT_CELLS = 10_000
+
+
+@dataclass(frozen=True)
+class LayoutSection:
+    """
+    Bloque de un layout: un rango de filas por un grupo de columnas, todos con
+    el mismo tipo de asiento.
+
+    Se escribe como diccionario ({'rows': '1-4', 'columns': 'A-F', 'seat_type': 'BUS'})
+    o en forma compacta ('1-4:A-F=BUS'). Las filas admiten números y rangos
+    separados por comas ('1-3,5'); las columnas, letras y rangos ('A-C,E' o 'ABCE').
+
+    Atributos:
+        rows (tuple): Números de fila, en el orden escrito.
+        columns (tuple): Letras de columna, en el orden escrito.
+        seat_type (str): Código del tipo de asiento.
+    """
+    rows: tuple
+    columns: tuple
+    seat_type: str
+
+    @classmethod
+    def parse(cls, section, rows=None, columns=None):
+        """
+        Interpreta un bloque del spec.
+
+        Si se indican las dimensiones del layout, los rangos que se salen de
+        ellas se rechazan antes de expandirse.
+
+        Parámetros:
+            section (dict | str): Bloque como diccionario o en forma compacta 'filas:columnas=CÓDIGO'.
+            rows (int, optional): Filas del layout.
+            columns (int, optional): Columnas del layout.
+
+        Retorna:
+            LayoutSection: Bloque con filas y columnas expandidas.
+
+        Raises:
+            ValidationError: Si el bloque no tiene el formato esperado o se sale del layout.
+        """
+        if isinstance(section, str):
+            ranges, _, seat_type = section.partition('=')
+            row_ranges, _, column_groups = ranges.partition(':')
+        elif isinstance(section, dict):
+            row_ranges, column_groups = section.get('rows'), section.get('columns')
+            seat_type = section.get('seat_type')
+        else:
+            raise ValidationError(f'Invalid layout section: {section!r}.')
+        if not row_ranges or not column_groups or not seat_type:
+            raise ValidationError(f'Layout section needs rows, columns and seat_type: {section!r}.')
+        return cls(
+            _parse_rows(str(row_ranges), rows, columns),
+            _parse_columns(str(column_groups), rows, columns),
+            str(seat_type).strip().upper(),
+        )
+
+
+def _parse_rows(value, rows=None, columns=None):
+    parsed = []
+    for part in value.replace(' ', '').split(','):
+        first, _, last = part.partition('-')
+        try:
+            start, end = int(first), int(last or first)
+        except ValueError:
+            raise ValidationError(f'Invalid row range: {part!r}.')
+        if end < start:
+            raise ValidationError(f'Invalid row range: {part!r}.')
+        if rows is not None and (start < 1 or end > rows):
+            raise ValidationError(f'Row range {part!r} is outside the {rows}x{columns} layout.')
+        if rows is not None and len(parsed) + end - start + 1 > rows:
+            raise ValidationError(f'Row ranges repeat rows of the {rows}x{columns} layout.')
+        parsed.extend(range(start, end + 1))
+    return tuple(parsed)
+
+
+def _parse_columns(value, rows=None, columns=None):
+    valid_columns = None if columns is None else set(layout_columns(columns))
+    parsed = []
+    for part in value.replace(' ', '').upper().split(','):
+        if len(part) == 3 and part[1] == '-':
+            first, last = part[0], part[2]
+            if not (first.isalpha() and last.isalpha()) or last < first:
+                raise ValidationError(f'Invalid column range: {part!r}.')
+            if valid_columns is not None and not {first, last} <= valid_columns:
+                raise ValidationError(f'Column group {part!r} is outside the {rows}x{columns} layout.')
+            parsed.extend(chr(code) for code in range(ord(first), ord(last) + 1))
+        elif part.isalpha():
+            if valid_columns is not None and not set(part) <= valid_columns:
+                raise ValidationError(f'Column group {part!r} is outside the {rows}x{columns} layout.')
+            parsed.extend(part)
+        else:
+            raise ValidationError(f'Invalid column group: {part!r}.')
+        if columns is not None and len(parsed) > columns:
+            raise ValidationError(f'Column groups repeat columns of the {rows}x{columns} layout.')
+    return tuple(parsed)
+
+
+def layout_columns(columns):
+    """
+    Letras de columna de un layout con `columns` columnas ('A', 'B', ...).
+    """
+    return [chr(code) for code in range(ord('A'), ord('A') + columns)]
+
+
+def check_positions(rows, columns, positions):
+    """
+    Valida en memoria que las posiciones estén dentro del layout y no se repitan.
+
+    Parámetros:
+        rows (int): Filas del layout.
+        columns (int): Columnas del layout.
+        positions (iterable): Pares (fila, columna).
+
+    Raises:
+        ValidationError: Con un mensaje por posición fuera de rango o repetida.
+    """
+    valid_columns = set(layout_columns(columns))
+    seen = set()
+    errors = []
+    for row, column in positions:
+        if not 1 <= row <= rows or column not in valid_columns:
+            errors.append(f'Seat {row}{column} is outside the {rows}x{columns} layout.')
+        elif (row, column) in seen:
+            errors.append(f'Seat {row}{column} is defined more than once.')
+        seen.add((row, column))
+    _raise_errors(errors)
+
+
+def _raise_errors(errors):
+    if errors:
+        if len(errors) > MAX_SPEC_ERRORS:
+            errors = errors[:MAX_SPEC_ERRORS] + [f'... and {len(errors) - MAX_SPEC_ERRORS} more errors.']
+        raise ValidationError(errors)
+
+
+def expand_layout_spec(rows, columns, sections):
+    """
+    Expande los bloques de un spec a un tipo de asiento por posición.
+
+    Todo se valida en memoria, antes de consultar la base: tamaño del layout
+    (hasta MAX_LAYOUT_CELLS posiciones), formato y límites de cada bloque, y
+    posiciones definidas por más de un bloque. Los rangos se comprueban antes
+    de expandirse, y los bloques no pueden sumar más de MAX_LAYOUT_CELLS posiciones.
+
+    Parámetros:
+        rows (int): Filas del layout.
+        columns (int): Columnas del layout.
+        sections (list): Bloques como diccionarios o cadenas compactas.
+
+    Retorna:
+        dict: Mapa {(fila, columna): código de tipo de asiento}, en el orden de los bloques.
+
+    Raises:
+        ValidationError: Si el layout es demasiado grande o algún bloque o posición no es válido.
+    """
+    if not isinstance(sections, (list, tuple)) or not sections:
+        raise ValidationError('A layout spec needs at least one section.')
+    if rows < 1 or columns < 1 or rows * columns > MAX_LAYOUT_CELLS:
+        raise ValidationError(f'A layout needs between 1 and {MAX_LAYOUT_CELLS} positions, got {rows}x{columns}.')
+    parsed = []
+    errors = []
+    for section in sections:
+        try:
+            parsed.append(LayoutSection.parse(section, rows, columns))
+        except ValidationError as e:
+            errors.extend(e.messages)
+    defined = sum(len(section.rows) * len(section.columns) for section in parsed)
+    if defined > MAX_LAYOUT_CELLS:
+        errors.append(f'The spec defines {defined} seats; a layout has at most {MAX_LAYOUT_CELLS}.')
+        _raise_errors(errors)
+    cells = [
+        ((row, column), section.seat_type)
+        for section in parsed for row in section.rows for column in section.columns
+    ]
+    try:
+        check_positions(rows, columns, [position for position, _ in cells])
+    except ValidationError as e:
+        errors.extend(e.messages)
+    _raise_errors(errors)
+    return dict(cells)
@@ -0,0 +1,118 @@
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from airline.benchmarking import benchmark_database, format_table, measure
+from airline.models import Airplane, Flight, FlightHistory, Passenger
+from airline.services import PassengerService
+
+
+class Command(BaseCommand):
+    """
+    Mide el historial de vuelos de un pasajero frecuente: el historial completo
+    con un vuelo consultado por entrada frente a la primera página y una página
+    profunda por keyset, con y sin el índice flighthistory_passenger_idx.
+
+    El resto de la tabla pertenece a otros pasajeros, de modo que sin el índice
+    cada página ordena todas las entradas del pasajero.
+    """
+    help = 'Benchmark del historial de vuelos paginado de un pasajero frecuente.'
+
+    history_index = 'flighthistory_passenger_idx'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entries', type=int, nargs='+', default=[1_000, 10_000, 50_000],
+                            help='Entradas del pasajero frecuente (una corrida por valor).')
+        parser.add_argument('--others', type=int, default=100_000, help='Entradas de otros pasajeros.')
+        parser.add_argument('--flights', type=int, default=2_000, help='Vuelos generados.')
+        parser.add_argument('--repeat', type=int, default=5, help='Repeticiones por variante.')
+        parser.add_argument('--seed', type=int, default=42, help='Semilla de generación.')
+
+    def handle(self, *args, **options):
+        rows = []
+        for entries in options['entries']:
+            with benchmark_database(on_disk=True):
+                start = time.perf_counter()
+                passenger = self._build_history(entries, options)
+                self.stdout.write(f'Generated {entries} + {options["others"]} entries '
+                                  f'in {time.perf_counter() - start:.1f}s\n')
+                rows += self._measure_all(passenger, entries, options['repeat'], 'indexed')
+                self._drop_history_index()
+                rows += self._measure_all(passenger, entries, options['repeat'], 'no index')
+        self.stdout.write(format_table(['entries', 'variant', 'indexes', 'rows', 'queries', 'ms'], rows))
+        self.stdout.write('\nQuery counts are capped at the 9000 entries kept by the query log.')
+
+    def _measure_all(self, passenger, entries, repeat, label):
+        service = PassengerService()
+        deep_cursor = self._cursor_at(passenger, entries // 2)
+        variants = [
+            ('full history, per-row flight', self._full_history, passenger),
+            ('first page', self._page, service, passenger, None),
+            ('deep page', self._page, service, passenger, deep_cursor),
+        ]
+        if label != 'indexed':
+            variants = variants[1:]
+        rows = []
+        for name, func, *args in variants:
+            # One query per entry overflows the capped query log; start each variant empty.
+            connection.queries_log.clear()
+            result = measure(name, func, *args, repeat=1 if func == self._full_history else repeat)
+            rows.append([entries, name, label, len(result.result), result.queries, f'{result.milliseconds:.2f}'])
+        return rows
+
+    def _full_history(self, passenger):
+        history = FlightHistory.objects.filter(passenger=passenger).order_by('-booking_date')
+        return [(entry.flight.origin, entry.flight.destination, entry.seat_number) for entry in history]
+
+    def _page(self, service, passenger, cursor):
+        _, entries, _ = service.get_passenger_flight_history_page(passenger.pk, cursor)
+        return [(entry.flight.origin, entry.flight.destination, entry.seat_number) for entry in entries]
+
+    def _cursor_at(self, passenger, offset):
+        entry = FlightHistory.objects.filter(passenger=passenger).order_by('-booking_date', '-id')[offset]
+        return f'{entry.booking_date.isoformat()}~{entry.pk}'
+
+    def _drop_history_index(self):
+        with connection.schema_editor() as editor:
+            for index in FlightHistory._meta.indexes:
+                if index.name == self.history_index:
+                    editor.remove_index(FlightHistory, index)
+
+    def _build_history(self, entries, options):
+        rng = random.Random(options['seed'])
+        airplane = Airplane.objects.create(model_name='Bench', registration_number='BENCH', capacity=180)
+        base = timezone.now().replace(minute=0, second=0, microsecond=0) - timedelta(days=3650)
+        flights = Flight.objects.bulk_create([
+            Flight(
+                airplane=airplane, origin='EZE', destination='MAD', departure_date=base + timedelta(hours=i),
+                arrival_date=base + timedelta(hours=i + 12), duration=timedelta(hours=12),
+                status='Arrived', base_price=Decimal('500.00'),
+            )
+            for i in range(options['flights'])
+        ])
+        passengers = Passenger.objects.bulk_create([
+            Passenger(first_name='Bench', last_name=str(i), document_number=f'BENCH-{i}',
+                      email=f'bench{i}@example.com', date_of_birth=base.date(), document_type='DNI')
+            for i in range(101)
+        ])
+        frequent_flyer, others = passengers[0], passengers[1:]
+        minutes = 3650 * 24 * 60
+        batch = []
+        for i in range(entries + options['others']):
+            passenger = frequent_flyer if i < entries else rng.choice(others)
+            batch.append(FlightHistory(
+                passenger=passenger, flight=rng.choice(flights), seat_number=f'{rng.randint(1, 30)}A',
+                price_paid=Decimal('500.00'), booking_date=base + timedelta(minutes=rng.randrange(minutes)),
+            ))
+            if len(batch) == 10_000:
+                FlightHistory.objects.bulk_create(batch)
+                batch = []
+        FlightHistory.objects.bulk_create(batch)
+        # The query log is capped; a full log would make measure() report 0 queries.
+        connection.queries_log.clear()
+        return frequent_flyer
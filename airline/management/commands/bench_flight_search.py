@@ -0,0 +1,105 @@
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from airline.benchmarking import benchmark_database, format_table, measure
+from airline.models import Airplane, Flight, Seat
+from airline.services import FlightSearchService
+
+AIRPORTS = [
+    'EZE', 'AEP', 'COR', 'MDZ', 'ROS', 'BRC', 'USH', 'IGR', 'SLA', 'TUC',
+    'MAD', 'BCN', 'MIA', 'JFK', 'LAX', 'GRU', 'GIG', 'SCL', 'LIM', 'BOG',
+    'MEX', 'CUN', 'PTY', 'FCO', 'CDG', 'LHR', 'FRA', 'AMS', 'ATL', 'ORD',
+]
+STATUSES = ['Scheduled'] * 8 + ['Delayed', 'Cancelled']
+
+
+class Command(BaseCommand):
+    """
+    Mide la búsqueda de vuelos sobre un conjunto generado (1M de vuelos por
+    defecto), con y sin los índices compuestos de búsqueda.
+
+    Los vuelos se reparten entre 30 aeropuertos y un año de salidas, por lo que
+    cada ruta tiene en promedio ~1/870 de la tabla.
+    """
+    help = 'Benchmark de búsqueda de vuelos por ruta, ventana de fechas, estado y asientos disponibles.'
+
+    search_indexes = ('flight_route_departure_idx', 'flight_status_departure_idx')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--flights', type=int, default=1_000_000, help='Vuelos generados.')
+        parser.add_argument('--days', type=int, default=365, help='Días sobre los que se reparten las salidas.')
+        parser.add_argument('--limit', type=int, default=50, help='Resultados leídos por búsqueda (una página).')
+        parser.add_argument('--repeat', type=int, default=5, help='Repeticiones por búsqueda.')
+        parser.add_argument('--seed', type=int, default=42, help='Semilla de generación.')
+
+    def handle(self, *args, **options):
+        with benchmark_database(on_disk=True):
+            start = time.perf_counter()
+            self._build_flights(options)
+            self.stdout.write(f"Generated {options['flights']} flights in {time.perf_counter() - start:.1f}s\n")
+            searches = self._searches(options['days'])
+            rows = self._measure_all(searches, options, 'indexed')
+            self._drop_search_indexes()
+            rows += self._measure_all(searches, options, 'no index')
+        rows.sort(key=lambda row: (row[0], row[1]))
+        self.stdout.write(format_table(['search', 'indexes', 'results', 'queries', 'ms'], rows))
+
+    def _searches(self, days):
+        first_day = timezone.localdate() + timedelta(days=days // 2)
+        week = {'date_from': first_day, 'date_to': first_day + timedelta(days=6)}
+        return [
+            ('route', {'origin': 'EZE', 'destination': 'MAD'}),
+            ('route + week', {'origin': 'EZE', 'destination': 'MAD', **week}),
+            ('status + week', {'status': 'Delayed', **week}),
+            ('route + week + min seats', {'origin': 'EZE', 'destination': 'MAD', 'min_seats': 10, **week}),
+        ]
+
+    def _measure_all(self, searches, options, label):
+        service = FlightSearchService()
+        rows = []
+        for name, criteria in searches:
+            result = measure(
+                name, lambda: list(service.search(**criteria)[:options['limit']]), repeat=options['repeat'],
+            )
+            rows.append([name, label, len(result.result), result.queries, f'{result.milliseconds:.2f}'])
+        return rows
+
+    def _drop_search_indexes(self):
+        with connection.schema_editor() as editor:
+            for index in Flight._meta.indexes:
+                if index.name in self.search_indexes:
+                    editor.remove_index(Flight, index)
+
+    def _build_flights(self, options):
+        rng = random.Random(options['seed'])
+        airplanes = [
+            Airplane.objects.create(model_name='Bench', registration_number=f'BENCH-{i}', capacity=20)
+            for i in range(10)
+        ]
+        Seat.objects.bulk_create([
+            Seat(airplane=airplane, number=f'{row}A', row=row, column='A', status='Available')
+            for airplane in airplanes for row in range(1, 21)
+        ])
+        base = timezone.now().replace(minute=0, second=0, microsecond=0)
+        minutes = options['days'] * 24 * 60
+        batch = []
+        for _ in range(options['flights']):
+            origin, destination = rng.sample(AIRPORTS, 2)
+            departure = base + timedelta(minutes=rng.randrange(minutes))
+            batch.append(Flight(
+                airplane=rng.choice(airplanes), origin=origin, destination=destination,
+                departure_date=departure, arrival_date=departure + timedelta(hours=3),
+                duration=timedelta(hours=3), status=rng.choice(STATUSES), base_price=Decimal('100.00'),
+            ))
+            if len(batch) == 10_000:
+                Flight.objects.bulk_create(batch)
+                batch = []
+        Flight.objects.bulk_create(batch)
+        # The query log is capped; a full log would make measure() report 0 queries.
+        connection.queries_log.clear()
@@ -0,0 +1,132 @@
+import csv
+import io
+import time
+import tracemalloc
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from airline.benchmarking import benchmark_database, format_table, measure
+from airline.manifest import MANIFEST_COLUMNS, manifest_response
+from airline.models import Airplane, Flight, Passenger, Reservation, Seat, SeatType
+from airline.services import ReservationService
+
+
+class Command(BaseCommand):
+    """
+    Compara la exportación de los manifiestos de los vuelos de una ventana de
+    días armada en memoria a partir de instancias de Reservation (con y sin las
+    relaciones en la misma consulta) con la exportación transmitida fila a fila.
+
+    Además del tiempo y las consultas, informa el pico de memoria de Python
+    (tracemalloc) de cada variante en una corrida aparte.
+    """
+    help = 'Benchmark de exportación de manifiestos (100 vuelos x 400 pasajeros por defecto).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--flights', type=int, default=100, help='Vuelos de la ventana.')
+        parser.add_argument('--passengers', type=int, default=400, help='Pasajeros por vuelo.')
+        parser.add_argument('--repeat', type=int, default=3, help='Repeticiones por variante.')
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            start = time.perf_counter()
+            date_from, date_to = self._build_manifests(options['flights'], options['passengers'])
+            self.stdout.write(f"Generated {options['flights']} flights x {options['passengers']} passengers "
+                              f"in {time.perf_counter() - start:.1f}s\n")
+            service = ReservationService()
+            variants = [
+                ('per flight, in memory', self._per_flight_in_memory, service, date_from, date_to),
+                ('joined, in memory', self._joined_in_memory, service, date_from, date_to),
+                ('joined, streamed', self._streamed, service, date_from, date_to),
+            ]
+            rows = []
+            for name, func, *args in variants:
+                connection.queries_log.clear()
+                # The per-flight variant runs one query per row; a single run is enough.
+                repeat = 1 if func == self._per_flight_in_memory else options['repeat']
+                result = measure(name, func, *args, repeat=repeat)
+                peak = self._peak_memory(func, *args)
+                rows.append([name, result.queries, f'{result.milliseconds:.2f}', f'{peak / 1024 / 1024:.1f}',
+                             result.result])
+        self.stdout.write(format_table(['variant', 'queries', 'ms', 'peak MiB', 'bytes'], rows))
+        self.stdout.write('\nQuery counts are capped at the 9000 entries kept by the query log.')
+
+    def _per_flight_in_memory(self, service, date_from, date_to):
+        # The HTML page's path: one query per flight, relations missing from it load per row.
+        flights = Flight.objects.filter(departure_date__date__range=(date_from, date_to)).order_by('departure_date')
+        reservations = []
+        for flight in flights:
+            reservations += service.get_passengers_by_flight(flight.pk)[1]
+        return self._write_in_memory(reservations)
+
+    def _joined_in_memory(self, service, date_from, date_to):
+        return self._write_in_memory(list(service.get_departures_manifest(date_from, date_to)))
+
+    def _write_in_memory(self, reservations):
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow([title for _, title, _ in MANIFEST_COLUMNS])
+        for reservation in reservations:
+            flight, passenger, seat = reservation.flight, reservation.passenger, reservation.seat
+            writer.writerow([
+                flight.pk, flight.origin, flight.destination, flight.departure_date.isoformat(),
+                reservation.reservation_code, passenger.last_name, passenger.first_name, passenger.document_type,
+                passenger.document_number, passenger.email, seat.number,
+                seat.seat_type.code if seat.seat_type_id else '', reservation.get_status_display(), reservation.price,
+            ])
+        return len(output.getvalue().encode('utf-8'))
+
+    def _streamed(self, service, date_from, date_to):
+        response = manifest_response(
+            service.get_departures_manifest(date_from, date_to), 'csv', 'bench', chunk_size=service.manifest_chunk_size,
+        )
+        return sum(len(chunk) for chunk in response.streaming_content)
+
+    def _peak_memory(self, func, *args):
+        tracemalloc.start()
+        try:
+            func(*args)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+            connection.queries_log.clear()
+
+    def _build_manifests(self, flight_count, passenger_count):
+        seat_types = [
+            SeatType.objects.create(name='Economy', code='ECO', price_multiplier=Decimal('1.00')),
+            SeatType.objects.create(name='Business', code='BUS', price_multiplier=Decimal('1.80')),
+        ]
+        airplane = Airplane.objects.create(model_name='Bench', registration_number='BENCH', capacity=passenger_count)
+        seats = Seat.objects.bulk_create([
+            Seat(airplane=airplane, number=f'{i // 10 + 1}{chr(ord("A") + i % 10)}', row=i // 10 + 1,
+                 column=chr(ord('A') + i % 10), seat_type=seat_types[0 if i >= 40 else 1], status='Available')
+            for i in range(passenger_count)
+        ])
+        passengers = Passenger.objects.bulk_create([
+            Passenger(first_name=f'Bench{i}', last_name=f'Passenger{i:05d}', document_number=f'BENCH-{i}',
+                      email=f'bench{i}@example.com', date_of_birth='1990-01-01', document_type='DNI')
+            for i in range(passenger_count)
+        ])
+        first_departure = (timezone.now() + timedelta(days=1)).replace(hour=6, minute=0, second=0, microsecond=0)
+        flights = Flight.objects.bulk_create([
+            Flight(
+                airplane=airplane, origin='EZE', destination='MAD',
+                departure_date=first_departure + timedelta(minutes=30 * i),
+                arrival_date=first_departure + timedelta(minutes=30 * i, hours=12), duration=timedelta(hours=12),
+                status='Scheduled', base_price=Decimal('500.00'),
+            )
+            for i in range(flight_count)
+        ])
+        for flight in flights:
+            Reservation.objects.bulk_create([
+                Reservation(flight=flight, passenger=passenger, seat=seat, status='PAID', price=Decimal('500.00'),
+                            reservation_code=f'B{flight.pk}-{index}')
+                for index, (passenger, seat) in enumerate(zip(passengers, seats))
+            ])
+        # The query log is capped; a full log would make measure() report 0 queries.
+        connection.queries_log.clear()
+        return timezone.localdate(flights[0].departure_date), timezone.localdate(flights[-1].departure_date)
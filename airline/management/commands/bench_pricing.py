@@ -0,0 +1,95 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from airline.benchmarking import benchmark_database, format_table, measure
+from airline.models import Flight, FlightSeat, SeatLayout, SeatLayoutPosition, SeatType
+from airline.pricing import round_fare
+from airline.services import AirplaneService, FlightService, PricingService, ReservationService
+
+# (code, name, multiplier, rows): first rows go to the most expensive type.
+SEAT_TYPES = [('FIR', 'First', '3.00', 4), ('BUS', 'Business', '1.80', 10), ('ECO', 'Economy', '1.00', None)]
+
+
+class Command(BaseCommand):
+    """
+    Compara la tarificación asiento por asiento (un tipo de asiento consultado
+    por asiento) con la tabla de tarifas por tipo de PricingService, sin caché
+    y desde la caché de instantáneas.
+    """
+    help = 'Micro-benchmark de tarificación de un mapa de asientos (avión de 800 asientos por defecto).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=80, help='Filas del avión.')
+        parser.add_argument('--columns', type=int, default=10, help='Columnas del avión.')
+        parser.add_argument('--load-factor', type=float, default=0.6, help='Proporción de asientos reservados.')
+        parser.add_argument('--repeat', type=int, default=5, help='Repeticiones por variante.')
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            flight = self._build_flight(options['rows'], options['columns'], options['load_factor'])
+            pricing = PricingService()
+            seat_map = ReservationService().get_seat_map(flight)
+            repeat = options['repeat']
+            results = [
+                measure('per-seat pricing', self._price_per_seat, pricing, flight, seat_map, repeat=repeat),
+                measure('fare table (cold)', self._price_cold, pricing, flight, seat_map, repeat=repeat),
+                measure('fare table (cached)', pricing.price_seat_map, flight, seat_map, repeat=repeat),
+            ]
+        self.stdout.write(format_table(
+            ['variant', 'queries', 'ms'],
+            [[result.label, result.queries, f'{result.milliseconds:.2f}'] for result in results],
+        ))
+        fares = sorted({price for seats in results[-1].result.values() for _, price in seats})
+        self.stdout.write(f'\n{sum(map(len, seat_map.values()))} seats, load factor {flight.load_factor:.2f}, '
+                          f'fares {", ".join(str(fare) for fare in fares)}')
+
+    def _price_per_seat(self, pricing, flight, seat_map):
+        demand = pricing.demand_multiplier(flight)
+        return {
+            row: [
+                (seat, round_fare(flight.base_price * demand * SeatType.objects.get(code=seat.seat_type).price_multiplier))
+                for seat in seats
+            ]
+            for row, seats in seat_map.items()
+        }
+
+    def _price_cold(self, pricing, flight, seat_map):
+        pricing.seat_map_cache.cache.clear()
+        return pricing.price_seat_map(flight, seat_map)
+
+    def _build_flight(self, rows, columns, load_factor):
+        seat_types = [
+            SeatType.objects.create(name=name, code=code, price_multiplier=Decimal(multiplier))
+            for code, name, multiplier, _ in SEAT_TYPES
+        ]
+        seat_layout = SeatLayout.objects.create(layout_name='Bench', rows=rows, columns=columns)
+        SeatLayoutPosition.objects.bulk_create([
+            SeatLayoutPosition(seat_layout=seat_layout, seat_type=self._seat_type_for(row, seat_types),
+                               row=row, column=chr(ord('A') + col))
+            for row in range(1, rows + 1) for col in range(columns)
+        ])
+        airplane = AirplaneService().create_airplane_with_seats({
+            'model_name': 'Bench', 'registration_number': 'BENCH', 'capacity': rows * columns,
+            'seat_layout': seat_layout.pk,
+        })
+        departure = timezone.now() + timedelta(days=5)
+        flight = FlightService().create_flight({
+            'airplane': airplane, 'origin': 'EZE', 'destination': 'MAD', 'departure_date': departure,
+            'arrival_date': departure + timedelta(hours=12), 'duration': timedelta(hours=12),
+            'status': 'Scheduled', 'base_price': Decimal('500.00'),
+        })
+        entries = FlightSeat.objects.filter(flight=flight).order_by('-seat__row').values_list('pk', flat=True)
+        FlightSeat.objects.filter(pk__in=list(entries[:int(rows * columns * load_factor)])).update(status='RES')
+        FlightService().inventory_service.rebuild_counters(flight)
+        return Flight.objects.get(pk=flight.pk)
+
+    def _seat_type_for(self, row, seat_types):
+        first_row = 1
+        for seat_type, (_, _, _, type_rows) in zip(seat_types, SEAT_TYPES):
+            if type_rows is None or row < first_row + type_rows:
+                return seat_type
+            first_row += type_rows
+        return seat_types[-1]
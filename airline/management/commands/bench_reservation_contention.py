@@ -0,0 +1,125 @@
+import random
+import threading
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import IntegrityError, OperationalError, connection, transaction
+from django.utils import timezone
+
+from airline.benchmarking import benchmark_database, format_table
+from airline.exceptions import ReservationConflictError
+from airline.models import Airplane, Flight, Passenger, Reservation, Seat
+from airline.services import ReservationService, SeatInventoryService
+
+
+class Command(BaseCommand):
+    """
+    Mide la reserva concurrente de asientos: varios hilos compiten por un
+    conjunto pequeño de asientos del mismo vuelo.
+
+    Compara la comprobación previa anterior (exists() y luego INSERT) con la
+    toma del asiento por compare-and-set sobre el inventario del vuelo, e
+    informa rendimiento, tasa de conflictos limpios (409) y errores (500).
+    """
+    help = 'Benchmark de contención en la reserva de asientos (hilos concurrentes sobre un mismo vuelo).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Hilos compradores concurrentes.')
+        parser.add_argument('--attempts', type=int, default=25, help='Intentos de reserva por hilo.')
+        parser.add_argument('--seats', type=int, default=20, help='Asientos en disputa.')
+        parser.add_argument('--seed', type=int, default=42, help='Semilla para elegir asientos.')
+
+    def handle(self, *args, **options):
+        variants = [
+            ('legacy check-then-insert', self._legacy_reserve),
+            ('compare-and-set', self._service_reserve),
+        ]
+        rows = []
+        with benchmark_database(on_disk=True):
+            for label, reserve in variants:
+                flight, seats, passengers = self._build_flight(options)
+                stats = self._run(reserve, flight, seats, passengers, options)
+                booked = Reservation.objects.filter(flight=flight).exclude(status='CAN').count()
+                total = stats['ok'] + stats['conflict'] + stats['error']
+                rows.append([
+                    label, total, stats['ok'], stats['conflict'], stats['error'], booked,
+                    f"{(stats['conflict'] + stats['error']) / total:.1%}",
+                    f"{total / stats['seconds']:.0f}",
+                ])
+        self.stdout.write(format_table(
+            ['variant', 'attempts', 'booked', '409', '500', 'rows', 'conflict rate', 'attempts/s'], rows,
+        ))
+
+    def _run(self, reserve, flight, seats, passengers, options):
+        stats = {'ok': 0, 'conflict': 0, 'error': 0}
+        lock = threading.Lock()
+        barrier = threading.Barrier(options['threads'])
+        rng = random.Random(options['seed'])
+        plans = [
+            [(passengers.pop(), rng.choice(seats)) for _ in range(options['attempts'])]
+            for _ in range(options['threads'])
+        ]
+
+        def worker(plan):
+            outcome = {'ok': 0, 'conflict': 0, 'error': 0}
+            try:
+                barrier.wait()
+                for passenger_id, seat_id in plan:
+                    try:
+                        reserve(flight.pk, passenger_id, seat_id)
+                        outcome['ok'] += 1
+                    except ReservationConflictError:
+                        outcome['conflict'] += 1
+                    except (IntegrityError, OperationalError):
+                        outcome['error'] += 1
+            finally:
+                connection.close()
+                with lock:
+                    for key, value in outcome.items():
+                        stats[key] += value
+
+        threads = [threading.Thread(target=worker, args=(plan,)) for plan in plans]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats['seconds'] = time.perf_counter() - start
+        return stats
+
+    def _service_reserve(self, flight_id, passenger_id, seat_id):
+        ReservationService().create_reservation(flight_id, passenger_id, seat_id, Decimal('100.00'))
+
+    def _legacy_reserve(self, flight_id, passenger_id, seat_id):
+        # Reproduces the previous create_reservation: the availability check runs
+        # outside the transaction and a lost race surfaces as an IntegrityError.
+        if Reservation.objects.filter(flight_id=flight_id, seat_id=seat_id, status__in=['PEN', 'CON', 'PAID']).exists():
+            raise ReservationConflictError('This seat is already reserved for this flight.')
+        with transaction.atomic():
+            Reservation.objects.create(
+                flight_id=flight_id, passenger_id=passenger_id, seat_id=seat_id, status='PEN',
+                price=Decimal('100.00'), reservation_code=uuid.uuid4().hex[:20],
+            )
+
+    def _build_flight(self, options):
+        tag = uuid.uuid4().hex[:8]
+        airplane = Airplane.objects.create(model_name='Bench', registration_number=f'BENCH-{tag}', capacity=options['seats'])
+        seats = Seat.objects.bulk_create([
+            Seat(airplane=airplane, number=f'{row}A', row=row, column='A', status='Available')
+            for row in range(1, options['seats'] + 1)
+        ])
+        departure = timezone.now() + timedelta(days=7)
+        flight = Flight.objects.create(
+            airplane=airplane, origin='EZE', destination='MAD', departure_date=departure,
+            arrival_date=departure + timedelta(hours=12), duration=timedelta(hours=12),
+            status='Scheduled', base_price=Decimal('100.00'),
+        )
+        SeatInventoryService().create_inventory(flight)
+        passengers = Passenger.objects.bulk_create([
+            Passenger(first_name=f'P{i}', document_number=f'{tag}-{i}', email=f'p{i}-{tag}@bench.test', date_of_birth='1990-01-01')
+            for i in range(options['threads'] * options['attempts'])
+        ])
+        return flight, [seat.pk for seat in seats], [passenger.pk for passenger in passengers]
@@ -0,0 +1,79 @@
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from airline.benchmarking import benchmark_database, format_table, measure
+from airline.models import Flight, Passenger, Reservation, Seat, SeatLayout, SeatLayoutPosition, SeatType
+from airline.services import AirplaneService, SeatInventoryService
+
+
+class Command(BaseCommand):
+    """
+    Compara el cálculo de disponibilidad anterior (búsqueda lineal por asiento)
+    con el motor basado en conjuntos sobre el inventario del vuelo.
+    """
+    help = 'Micro-benchmark de disponibilidad de asientos (avión de 800 asientos, 90% de ocupación por defecto).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=80, help='Filas del avión.')
+        parser.add_argument('--columns', type=int, default=10, help='Columnas del avión.')
+        parser.add_argument('--load-factor', type=float, default=0.9, help='Proporción de asientos reservados.')
+        parser.add_argument('--repeat', type=int, default=5, help='Repeticiones por variante.')
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            flight = self._build_flight(options['rows'], options['columns'], options['load_factor'])
+            inventory = SeatInventoryService()
+            inventory.create_inventory(flight)
+            results = [
+                measure('legacy linear scan', self._legacy_available_seats, flight, repeat=options['repeat']),
+                measure('inventory available seats', inventory.get_available_seats, flight, repeat=options['repeat']),
+                measure('set-based availability', inventory.get_availability, flight, repeat=options['repeat']),
+            ]
+        self.stdout.write(format_table(
+            ['variant', 'queries', 'ms'],
+            [[result.label, result.queries, f'{result.milliseconds:.2f}'] for result in results],
+        ))
+        availability = results[-1].result
+        self.stdout.write(f'\n{availability.total} seats, {availability.available_count} available, '
+                          f'load factor {availability.load_factor:.2f}')
+
+    def _legacy_available_seats(self, flight):
+        all_seats = Seat.objects.filter(airplane=flight.airplane).order_by('row', 'column')
+        reserved_seats_ids = Reservation.objects.filter(
+            flight=flight, status__in=['PEN', 'CON', 'PAID']
+        ).values_list('seat__id', flat=True)
+        return [seat for seat in all_seats if seat.id not in reserved_seats_ids]
+
+    def _build_flight(self, rows, columns, load_factor):
+        seat_type = SeatType.objects.create(name='Economy', code='ECO')
+        seat_layout = SeatLayout.objects.create(layout_name='Bench', rows=rows, columns=columns)
+        SeatLayoutPosition.objects.bulk_create([
+            SeatLayoutPosition(seat_layout=seat_layout, seat_type=seat_type, row=row, column=chr(ord('A') + col))
+            for row in range(1, rows + 1) for col in range(columns)
+        ])
+        airplane = AirplaneService().create_airplane_with_seats({
+            'model_name': 'Bench', 'registration_number': 'BENCH', 'capacity': rows * columns,
+            'seat_layout': seat_layout.pk,
+        })
+        departure = timezone.now() + timedelta(days=7)
+        flight = Flight.objects.create(
+            airplane=airplane, origin='EZE', destination='MAD', departure_date=departure,
+            arrival_date=departure + timedelta(hours=12), duration=timedelta(hours=12),
+            status='Scheduled', base_price=Decimal('500.00'),
+        )
+        seats = list(Seat.objects.filter(airplane=airplane).order_by('row', 'column'))
+        reserved = seats[:int(len(seats) * load_factor)]
+        passengers = Passenger.objects.bulk_create([
+            Passenger(first_name=f'P{i}', document_number=f'B{i}', email=f'p{i}@bench.test', date_of_birth='1990-01-01')
+            for i in range(len(reserved))
+        ])
+        Reservation.objects.bulk_create([
+            Reservation(flight=flight, passenger=passenger, seat=seat, status='CON',
+                        price=Decimal('500.00'), reservation_code=uuid.uuid4().hex[:20])
+            for passenger, seat in zip(passengers, reserved)
+        ])
+        return flight
@@ -0,0 +1,49 @@
+import uuid
+
+from django.core.management.base import BaseCommand
+
+from airline.benchmarking import benchmark_database, format_table, measure
+from airline.models import SeatLayout, SeatLayoutPosition, SeatType
+from airline.services import AirplaneService
+
+
+class Command(BaseCommand):
+    """
+    Mide la materialización de asientos de AirplaneService.create_airplane_with_seats.
+
+    Para cada tamaño de layout (filas x columnas) reporta la cantidad de consultas
+    y el tiempo de reloj necesarios para crear un avión con todos sus asientos.
+    """
+    help = 'Benchmark de generación de asientos por tamaño de layout (consultas y tiempo).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--layouts', nargs='+', default=['10x6', '30x6', '60x10'],
+            help='Tamaños de layout en formato FILASxCOLUMNAS.'
+        )
+        parser.add_argument('--repeat', type=int, default=3, help='Repeticiones por layout.')
+
+    def handle(self, *args, **options):
+        sizes = [tuple(int(part) for part in layout.lower().split('x')) for layout in options['layouts']]
+        with benchmark_database():
+            rows = [self._run(rows, columns, options['repeat']) for rows, columns in sizes]
+        self.stdout.write(format_table(['layout', 'seats', 'queries', 'ms'], rows))
+
+    def _run(self, rows, columns, repeat):
+        seat_type = SeatType.objects.create(name=f'Economy {rows}x{columns}', code=f'E{rows}x{columns}')
+        seat_layout = SeatLayout.objects.create(layout_name=f'Bench {rows}x{columns}', rows=rows, columns=columns)
+        SeatLayoutPosition.objects.bulk_create([
+            SeatLayoutPosition(seat_layout=seat_layout, seat_type=seat_type, row=row, column=chr(ord('A') + col))
+            for row in range(1, rows + 1) for col in range(columns)
+        ])
+        service = AirplaneService()
+        result = measure(
+            f'{rows}x{columns}', lambda: service.create_airplane_with_seats({
+                'model_name': 'Bench',
+                'registration_number': uuid.uuid4().hex[:20],
+                'capacity': rows * columns,
+                'seat_layout': seat_layout.pk,
+            }),
+            repeat=repeat,
+        )
+        return [result.label, rows * columns, result.queries, f'{result.milliseconds:.1f}']
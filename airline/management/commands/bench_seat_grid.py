@@ -0,0 +1,106 @@
+import tracemalloc
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from airline.availability import SeatAvailability
+from airline.benchmarking import benchmark_database, format_table, measure
+from airline.models import Flight, FlightSeat, SeatLayout, SeatLayoutPosition, SeatType
+from airline.seat_grid import SeatGrid, seat_grid_cache
+from airline.services import AirplaneService, FlightService, PricingService, SeatInventoryService
+
+
+class Command(BaseCommand):
+    """
+    Compara el mapa de asientos de un vuelo armado desde el inventario unido a
+    los asientos y sus tipos (como antes de la grilla) con la grilla compacta
+    del avión, sin caché y en caché, con el estado del vuelo superpuesto.
+
+    Informa también el tiempo del mapa con tarifas (la tabla de tarifas en
+    caché) y la memoria de la grilla en caché frente a la de los mismos
+    asientos como SeatState.
+    """
+    help = 'Micro-benchmark del mapa de asientos con la grilla compacta por avión (800 asientos por defecto).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=80, help='Filas del avión.')
+        parser.add_argument('--columns', type=int, default=10, help='Columnas del avión.')
+        parser.add_argument('--load-factor', type=float, default=0.6, help='Proporción de asientos reservados.')
+        parser.add_argument('--repeat', type=int, default=50, help='Repeticiones por variante.')
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        with benchmark_database():
+            flight = self._build_flight(options['rows'], options['columns'], options['load_factor'])
+            inventory = SeatInventoryService()
+            pricing = PricingService()
+            invalidate = lambda: seat_grid_cache.invalidate(flight.airplane_id)
+            variants = [
+                ('joined rows (before)', self._joined_seat_map, inventory, flight, None),
+                ('grid (cold)', inventory.get_seat_map, flight, invalidate),
+                ('grid (cached)', inventory.get_seat_map, flight, None),
+                ('priced, joined rows (before)', self._priced, pricing, flight,
+                 lambda: self._joined_seat_map(inventory, flight), None),
+                ('priced, grid (cached)', self._priced, pricing, flight, lambda: inventory.get_seat_map(flight), None),
+            ]
+            results = []
+            for name, func, *args, setup in variants:
+                connection.queries_log.clear()
+                results.append(measure(name, func, *args, repeat=repeat, setup=setup))
+            grid = inventory.get_seat_grid(flight.airplane_id)
+            rows = list(inventory.flight_seat_repo.get_availability_rows(flight))
+            grid_rows = list(inventory.seat_repo.get_grid_rows(flight.airplane_id))
+            grid_peak = self._peak_memory(lambda: SeatGrid(flight.airplane_id, grid_rows))
+            states_peak = self._peak_memory(lambda: SeatAvailability.from_rows(flight.pk, rows).by_row())
+        self.stdout.write(format_table(
+            ['variant', 'queries', 'ms'],
+            [[result.label, result.queries, f'{result.milliseconds:.3f}'] for result in results],
+        ))
+        self.stdout.write(
+            f'\n{len(grid)} seats in {len(grid.row_numbers)} rows, {len(grid.type_codes)} seat types\n'
+            f'Cached grid: {grid.memory_size()} bytes ({grid.memory_size() / len(grid):.1f} per seat); '
+            f'peak while building {grid_peak} bytes\n'
+            f'Same seats as SeatState rows: peak {states_peak} bytes'
+        )
+
+    def _joined_seat_map(self, inventory, flight):
+        rows = list(inventory.flight_seat_repo.get_availability_rows(flight))
+        return SeatAvailability.from_rows(flight.pk, rows).by_row()
+
+    def _priced(self, pricing, flight, seat_map):
+        return pricing.price_seat_map(flight, seat_map())
+
+    def _peak_memory(self, func):
+        tracemalloc.start()
+        try:
+            func()
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def _build_flight(self, rows, columns, load_factor):
+        business = SeatType.objects.create(name='Business', code='BUS', price_multiplier=Decimal('1.80'))
+        economy = SeatType.objects.create(name='Economy', code='ECO', price_multiplier=Decimal('1.00'))
+        seat_layout = SeatLayout.objects.create(layout_name='Bench', rows=rows, columns=columns)
+        SeatLayoutPosition.objects.bulk_create([
+            SeatLayoutPosition(seat_layout=seat_layout, seat_type=business if row <= rows // 8 else economy,
+                               row=row, column=chr(ord('A') + col))
+            for row in range(1, rows + 1) for col in range(columns)
+        ])
+        airplane = AirplaneService().create_airplane_with_seats({
+            'model_name': 'Bench', 'registration_number': 'BENCH', 'capacity': rows * columns,
+            'seat_layout': seat_layout.pk,
+        })
+        departure = timezone.now() + timedelta(days=5)
+        flight = FlightService().create_flight({
+            'airplane': airplane, 'origin': 'EZE', 'destination': 'MAD', 'departure_date': departure,
+            'arrival_date': departure + timedelta(hours=12), 'duration': timedelta(hours=12),
+            'status': 'Scheduled', 'base_price': Decimal('500.00'),
+        })
+        entries = FlightSeat.objects.filter(flight=flight).order_by('-seat__row').values_list('pk', flat=True)
+        FlightSeat.objects.filter(pk__in=list(entries[:int(rows * columns * load_factor)])).update(status='SLD')
+        FlightService().inventory_service.rebuild_counters(flight)
+        return Flight.objects.get(pk=flight.pk)
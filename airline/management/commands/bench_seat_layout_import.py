@@ -0,0 +1,68 @@
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from airline.benchmarking import benchmark_database, format_table, measure
+from airline.layout_spec import layout_columns
+from airline.models import SeatLayout, SeatLayoutPosition, SeatType
+from airline.services import SeatLayoutService
+
+
+class Command(BaseCommand):
+    """
+    Compara la creación de un layout de asientos posición por posición (una
+    consulta del tipo de asiento y un INSERT por posición, como antes de la
+    importación por spec) con la lista de posiciones en bloque y con el spec
+    compacto de filas x columnas.
+    """
+    help = 'Benchmark de creación de layouts de asientos por tamaño (consultas y tiempo).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--layouts', nargs='+', default=['10x6', '50x6', '60x10'],
+            help='Tamaños de layout en formato FILASxCOLUMNAS.'
+        )
+        parser.add_argument('--repeat', type=int, default=3, help='Repeticiones por variante.')
+
+    def handle(self, *args, **options):
+        sizes = [tuple(int(part) for part in layout.lower().split('x')) for layout in options['layouts']]
+        with benchmark_database():
+            business = SeatType.objects.create(name='Business', code='BUS')
+            economy = SeatType.objects.create(name='Economy', code='ECO')
+            service = SeatLayoutService()
+            table = []
+            for rows, columns in sizes:
+                premium = max(1, rows // 10)
+                positions = [
+                    {'seat_type_id': (business if row <= premium else economy).pk, 'row': row, 'column': column}
+                    for row in range(1, rows + 1) for column in layout_columns(columns)
+                ]
+                last = layout_columns(columns)[-1]
+                sections = [f'1-{premium}:A-{last}=BUS']
+                if rows > premium:
+                    sections.append(f'{premium + 1}-{rows}:A-{last}=ECO')
+                variants = [
+                    ('per position', self._per_position, rows, columns, positions),
+                    ('positions, bulk', lambda: service.create_seat_layout_with_positions(
+                        self._name(), rows, columns, positions)),
+                    ('spec', lambda: service.create_seat_layout_from_spec(self._name(), rows, columns, sections)),
+                ]
+                for name, func, *args in variants:
+                    connection.queries_log.clear()
+                    result = measure(name, func, *args, repeat=options['repeat'])
+                    table.append([f'{rows}x{columns}', result.label, result.queries, f'{result.milliseconds:.1f}'])
+        self.stdout.write(format_table(['layout', 'variant', 'queries', 'ms'], table))
+
+    def _name(self):
+        return f'Bench {uuid.uuid4().hex[:12]}'
+
+    def _per_position(self, rows, columns, positions):
+        with transaction.atomic():
+            seat_layout = SeatLayout.objects.create(layout_name=self._name(), rows=rows, columns=columns)
+            for pos_data in positions:
+                seat_type = SeatType.objects.get(pk=pos_data['seat_type_id'])
+                SeatLayoutPosition.objects.create(
+                    seat_layout=seat_layout, seat_type=seat_type, row=pos_data['row'], column=pos_data['column'],
+                )
+        return seat_layout
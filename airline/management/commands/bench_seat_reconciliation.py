@@ -0,0 +1,66 @@
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from airline.benchmarking import benchmark_database, format_table, measure
+from airline.models import Seat, SeatLayout, SeatLayoutPosition, SeatType
+from airline.services import AirplaneService
+
+
+class Command(BaseCommand):
+    """
+    Compara, tras cambiar el tipo de asiento de una fila de un layout, la
+    reconciliación por diferencias de los asientos de un avión con borrar y
+    volver a crear todos sus asientos. También mide una reconciliación sin
+    cambios pendientes.
+    """
+    help = 'Benchmark de reconciliación de asientos tras editar un layout (consultas y tiempo).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--layouts', nargs='+', default=['30x6', '60x10'],
+            help='Tamaños de layout en formato FILASxCOLUMNAS.'
+        )
+        parser.add_argument('--repeat', type=int, default=3, help='Repeticiones por variante.')
+
+    def handle(self, *args, **options):
+        sizes = [tuple(int(part) for part in layout.lower().split('x')) for layout in options['layouts']]
+        with benchmark_database():
+            economy = SeatType.objects.create(name='Economy', code='ECO')
+            business = SeatType.objects.create(name='Business', code='BUS')
+            service = AirplaneService()
+            table = []
+            for rows, columns in sizes:
+                seat_layout = SeatLayout.objects.create(layout_name=f'Bench {rows}x{columns}', rows=rows, columns=columns)
+                SeatLayoutPosition.objects.bulk_create([
+                    SeatLayoutPosition(seat_layout=seat_layout, seat_type=economy, row=row, column=chr(ord('A') + col))
+                    for row in range(1, rows + 1) for col in range(columns)
+                ])
+                airplane = service.create_airplane_with_seats({
+                    'model_name': 'Bench', 'registration_number': uuid.uuid4().hex[:20],
+                    'capacity': rows * columns, 'seat_layout': seat_layout.pk,
+                })
+                positions = SeatLayoutPosition.objects.filter(seat_layout=seat_layout, row=1)
+                flip = {'toggle': False}
+
+                def edit_layout():
+                    # Alternate the first row's type so every run has changes to apply.
+                    flip['toggle'] = not flip['toggle']
+                    positions.update(seat_type=business if flip['toggle'] else economy)
+
+                variants = [
+                    ('delete and recreate', lambda: self._recreate(service, airplane, seat_layout), edit_layout),
+                    ('reconcile', lambda: service.reconcile_seats(airplane), edit_layout),
+                    ('reconcile, no changes', lambda: service.reconcile_seats(airplane), None),
+                ]
+                for name, func, setup in variants:
+                    connection.queries_log.clear()
+                    result = measure(name, func, repeat=options['repeat'], setup=setup)
+                    table.append([f'{rows}x{columns}', result.label, result.queries, f'{result.milliseconds:.1f}'])
+        self.stdout.write(format_table(['layout', 'variant', 'queries', 'ms'], table))
+
+    def _recreate(self, service, airplane, seat_layout):
+        with transaction.atomic():
+            Seat.objects.filter(airplane=airplane).delete()
+            service._create_seats_for_airplane(airplane, seat_layout)
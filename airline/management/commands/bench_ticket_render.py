@@ -0,0 +1,96 @@
+import os
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from airline.barcodes import code128_svg
+from airline.benchmarking import benchmark_database, format_table, measure
+from airline.models import Airplane, Flight, Passenger, Reservation, Seat, Ticket
+from airline.services import TicketService
+from airline.ticket_pdf import TICKET_STYLESHEET, TicketRenderer, write_ticket_pdfs
+
+
+class Command(BaseCommand):
+    """
+    Mide el renderizado local de un ticket: el código de barras Code 128 sin
+    caché y desde la caché LRU, el HTML del ticket y, si WeasyPrint está
+    disponible, la conversión a PDF. Ninguna variante accede a la red.
+
+    La conversión a PDF se informa en tickets por segundo: un HTML nuevo con
+    los estilos en línea por ticket (como antes de TicketRenderer), el
+    renderizador compartido ticket por ticket, en tandas (write_ticket_pdfs) y
+    como PDF combinado.
+    """
+    help = 'Micro-benchmark del renderizado de tickets con el código de barras generado localmente.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20, help='Repeticiones por variante.')
+        parser.add_argument('--tickets', type=int, default=50, help='Tickets por corrida de PDF.')
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        with benchmark_database():
+            ticket = self._build_ticket()
+            service = TicketService()
+            results = [
+                measure('barcode (cold)', code128_svg, ticket.barcode, repeat=repeat, setup=code128_svg.cache_clear),
+                measure('barcode (cached)', code128_svg, ticket.barcode, repeat=repeat),
+                measure('ticket HTML', service._render_ticket_html, ticket, repeat=repeat),
+            ]
+            html = results[-1].result
+        self.stdout.write(format_table(
+            ['variant', 'queries', 'ms'],
+            [[result.label, result.queries, f'{result.milliseconds:.3f}'] for result in results],
+        ))
+        try:
+            from weasyprint import HTML
+        except (ImportError, OSError) as exc:
+            self.stderr.write(f'Skipping PDF rendering: WeasyPrint is not available ({exc}).')
+        else:
+            self.stdout.write('\n' + self._measure_pdf(HTML, html, options['tickets']))
+        self.stdout.write(f'\nBarcode {ticket.barcode}: {len(code128_svg(ticket.barcode))} bytes of SVG')
+
+    def _measure_pdf(self, html_class, html, count):
+        with open(TICKET_STYLESHEET) as handle:
+            inline_html = html.replace('</head>', f'<style>{handle.read()}</style></head>')
+        renderer = TicketRenderer()
+        renderer.render_pdf(html)
+        with tempfile.TemporaryDirectory() as root:
+            jobs = [(html, os.path.join(root, f'ticket_{i}_EMI.pdf'), os.path.join(root, f'{i}.lock'))
+                    for i in range(count)]
+            variants = [
+                ('fresh HTML, inline CSS', lambda: [html_class(string=inline_html).write_pdf() for _ in range(count)]),
+                ('renderer, one by one', lambda: [renderer.render_pdf(html) for _ in range(count)]),
+                ('renderer, batch', write_ticket_pdfs, jobs),
+                ('renderer, bundle', renderer.render_bundle, [html] * count),
+            ]
+            results = [measure(name, func, *args) for name, func, *args in variants]
+        return format_table(
+            ['PDF variant', 'tickets', 'ms', 'tickets/s'],
+            [[result.label, count, f'{result.milliseconds:.1f}', f'{count / result.seconds:.1f}'] for result in results],
+        )
+
+    def _build_ticket(self):
+        airplane = Airplane.objects.create(model_name='Bench', registration_number='BENCH', capacity=1)
+        seat = Seat.objects.create(airplane=airplane, number='1A', row=1, column='A', status='Available')
+        departure = timezone.now() + timedelta(days=3)
+        flight = Flight.objects.create(
+            airplane=airplane, origin='EZE', destination='MAD', departure_date=departure,
+            arrival_date=departure + timedelta(hours=12), duration=timedelta(hours=12),
+            status='Scheduled', base_price=Decimal('500.00'),
+        )
+        passenger = Passenger.objects.create(
+            first_name='Bench', last_name='Passenger', document_number='BENCH-1', email='bench@example.com',
+            date_of_birth='1990-01-01',
+        )
+        reservation = Reservation.objects.create(
+            flight=flight, passenger=passenger, seat=seat, status='PAID', price=Decimal('500.00'),
+            reservation_code='BENCH1',
+        )
+        ticket = Ticket.objects.create(reservation=reservation, barcode=TicketService._new_barcode(), status='EMI')
+        return Ticket.objects.select_related('reservation__flight', 'reservation__passenger', 'reservation__seat').get(
+            pk=ticket.pk,
+        )
@@ -0,0 +1,61 @@
+import json
+from collections import Counter
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from airline.layout_spec import expand_layout_spec
+from airline.services import SeatLayoutService
+
+
+class Command(BaseCommand):
+    """
+    Crea un layout de asientos a partir de un spec compacto, leído de un
+    archivo JSON ({"layout_name", "rows", "columns", "sections"}) o de las
+    opciones --name/--rows/--columns/--section. Las opciones tienen prioridad
+    sobre el archivo.
+    """
+    help = 'Importa un layout de asientos desde un spec compacto (por ejemplo "1-4:A-F=BUS").'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', help='Archivo JSON con layout_name, rows, columns y sections.')
+        parser.add_argument('--name', help='Nombre del layout.')
+        parser.add_argument('--rows', type=int, help='Filas del layout.')
+        parser.add_argument('--columns', type=int, help='Columnas del layout.')
+        parser.add_argument('--section', action='append', dest='sections',
+                            help='Bloque "filas:columnas=CÓDIGO"; se puede repetir.')
+        parser.add_argument('--dry-run', action='store_true', help='Solo valida el spec, sin crear el layout.')
+
+    def handle(self, *args, **options):
+        spec = self._load_spec(options['file'])
+        layout_name = options['name'] or spec.get('layout_name')
+        rows = options['rows'] or spec.get('rows')
+        columns = options['columns'] or spec.get('columns')
+        sections = options['sections'] or spec.get('sections')
+        if not layout_name or not rows or not columns:
+            raise CommandError('A layout needs a name, rows and columns.')
+        try:
+            if options['dry_run']:
+                cells = expand_layout_spec(rows, columns, sections)
+                counts = ', '.join(f'{code}: {count}' for code, count in sorted(Counter(cells.values()).items()))
+                self.stdout.write(f'Spec is valid: {len(cells)} position(s) ({counts}).')
+                return
+            seat_layout = SeatLayoutService().create_seat_layout_from_spec(layout_name, rows, columns, sections)
+        except ValidationError as e:
+            raise CommandError('Invalid layout spec:\n  ' + '\n  '.join(e.messages))
+        self.stdout.write(
+            f'Layout {seat_layout.pk} "{seat_layout.layout_name}" created with '
+            f'{seat_layout.positions.count()} position(s).'
+        )
+
+    def _load_spec(self, path):
+        if not path:
+            return {}
+        try:
+            with open(path) as handle:
+                spec = json.load(handle)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f'Cannot read layout spec {path}: {exc}')
+        if not isinstance(spec, dict):
+            raise CommandError(f'Layout spec {path} must be a JSON object.')
+        return spec
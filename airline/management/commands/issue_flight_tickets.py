@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.http import Http404
+
+from airline.services import TicketService
+
+
+class Command(BaseCommand):
+    """
+    Emite los tickets de todas las reservas confirmadas o pagadas de un vuelo
+    y genera sus PDFs en paralelo, informando el progreso y el tiempo de cada fase.
+    """
+    help = 'Emite en bloque los tickets de un vuelo y genera sus PDFs (opcionalmente combinados).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('flight_id', type=int, help='ID del vuelo.')
+        parser.add_argument('--bundle', action='store_true', help='Genera además un único PDF con todas las tarjetas de embarque.')
+        parser.add_argument('--no-render', action='store_true', help='Solo emite los tickets, sin generar PDFs.')
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        try:
+            result = TicketService().issue_tickets_for_flight(
+                options['flight_id'], render=not options['no_render'], bundle=options['bundle'],
+                progress=self._report_progress,
+            )
+        except Http404:
+            raise CommandError(f"Flight {options['flight_id']} does not exist.")
+        self.stdout.write(
+            f"Flight {result['flight'].pk}: {result['created']} ticket(s) created, "
+            f"{len(result['tickets'])} issued, {result['rendered']} PDF(s) rendered."
+        )
+        if result['bundle']:
+            self.stdout.write(f"Boarding pass bundle: {result['bundle']}")
+        for phase, seconds in result['timings'].items():
+            self.stdout.write(f'  {phase}: {seconds:.2f}s')
+
+    def _report_progress(self, done, total):
+        if self.verbosity >= 2 or done == total:
+            self.stdout.write(f'Rendered {done}/{total}')
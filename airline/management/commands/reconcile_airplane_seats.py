@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.http import Http404
+
+from airline.services import AirplaneService
+
+
+class Command(BaseCommand):
+    """
+    Reconcilia los asientos de los aviones con su layout (por ejemplo, tras
+    editar las posiciones o las dimensiones de un layout): crea los asientos
+    que faltan, elimina los que sobran y corrige el tipo de los que cambiaron,
+    sin tocar los asientos con reservas.
+    """
+    help = 'Reconcilia los asientos de los aviones con su layout de asientos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--airplane', type=int, nargs='*', dest='airplane_ids', help='IDs de aviones.')
+        parser.add_argument('--layout', type=int, nargs='*', dest='layout_ids',
+                            help='IDs de layouts; se reconcilian todos los aviones que los usan.')
+        parser.add_argument('--dry-run', action='store_true', help='Solo informa los cambios, sin aplicarlos.')
+
+    def handle(self, *args, **options):
+        service = AirplaneService()
+        dry_run = options['dry_run']
+        results = {}
+        try:
+            for airplane_id in options['airplane_ids'] or []:
+                airplane = service.airplane_repo.get_by_id(airplane_id)
+                results[airplane] = service.reconcile_seats(airplane, dry_run=dry_run)
+            for layout_id in options['layout_ids'] or []:
+                results.update(service.reconcile_layout(layout_id, dry_run=dry_run))
+        except Http404 as exc:
+            raise CommandError(str(exc))
+        if options['airplane_ids'] is None and options['layout_ids'] is None:
+            for airplane in service.airplane_repo.get_all().filter(seat_layout__isnull=False).order_by('pk'):
+                results[airplane] = service.reconcile_seats(airplane, dry_run=dry_run)
+        changed = 0
+        for airplane, diff in results.items():
+            if diff.changed or diff.skipped:
+                changed += diff.changed
+                self.stdout.write(f'Airplane {airplane.pk} ({airplane.registration_number}): {diff.summary()}')
+        action = 'need changes' if dry_run else 'changed'
+        self.stdout.write(f'Checked {len(results)} airplane(s); {changed} {action}.')
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from airline.services import SeatInventoryService
+
+
+class Command(BaseCommand):
+    """
+    Recalcula los contadores de asientos de los vuelos desde su inventario y
+    corrige la deriva (por ejemplo, tras cambiar los asientos de un avión o
+    escribir el inventario por fuera de los servicios).
+    """
+    help = 'Reconcilia los contadores de asientos por vuelo (Flight.seats_* y FlightSeatCounter) con el inventario.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--flight', type=int, nargs='*', dest='flight_ids', help='IDs de vuelos; por defecto, todos.')
+        parser.add_argument('--dry-run', action='store_true', help='Solo informa la deriva, sin corregirla.')
+
+    def handle(self, *args, **options):
+        service = SeatInventoryService()
+        flights = service.flight_repo.get_all().order_by('pk')
+        if options['flight_ids']:
+            flights = flights.filter(pk__in=options['flight_ids'])
+        checked = drifted = 0
+        for flight in flights.iterator(chunk_size=500):
+            checked += 1
+            drift = service.reconcile_counters(flight, fix=not options['dry_run'])
+            if drift:
+                drifted += 1
+                details = ', '.join(f'{field}: {saved} -> {actual}' for field, (saved, actual) in sorted(drift.items()))
+                self.stdout.write(f'Flight {flight.pk}: {details}')
+        action = 'found' if options['dry_run'] else 'fixed'
+        self.stdout.write(f'Checked {checked} flight(s); {action} drift in {drifted}.')
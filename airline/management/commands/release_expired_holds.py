@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from airline.services import SeatInventoryService
+
+
+class Command(BaseCommand):
+    """
+    Libera las retenciones de asientos vencidas.
+
+    Puede ejecutarse periódicamente (cron) o como proceso en segundo plano con --interval.
+    """
+    help = 'Libera las retenciones de asientos vencidas (una vez, o en bucle con --interval).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=0, help='Segundos entre barridos; 0 ejecuta un único barrido.')
+
+    def handle(self, *args, **options):
+        service = SeatInventoryService()
+        while True:
+            released = service.release_expired_holds()
+            self.stdout.write(f'Released {released} expired seat hold(s).')
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
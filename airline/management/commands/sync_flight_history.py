@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from airline.services import FlightHistoryService
+
+
+class Command(BaseCommand):
+    """
+    Crea el historial de vuelos desde las reservas pagadas o embarcadas de vuelos que ya salieron.
+
+    Es incremental (marca de agua por fecha de salida) e idempotente. Puede
+    ejecutarse periódicamente (cron) o como proceso en segundo plano con --interval.
+    """
+    help = 'Sincroniza FlightHistory desde las reservas completadas (una vez, o en bucle con --interval).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=0, help='Segundos entre ejecuciones; 0 ejecuta una sola vez.')
+        parser.add_argument('--full', action='store_true', help='Ignora la marca de agua y revisa todos los vuelos.')
+
+    def handle(self, *args, **options):
+        service = FlightHistoryService()
+        full = options['full']
+        while True:
+            result = service.sync_from_reservations(full=full)
+            self.stdout.write(
+                f"Checked {result['flights']} departed flight(s), created {result['created']} history entr"
+                f"{'y' if result['created'] == 1 else 'ies'}; high-water mark {result['high_water_mark'] or '-'}."
+            )
+            if not options['interval']:
+                break
+            full = False
+            time.sleep(options['interval'])
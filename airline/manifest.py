@@ -0,0 +1,141 @@
+import csv
+from json import JSONEncoder
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import Reservation
+
+# (key, header, lookup on Reservation) of each manifest column, in export order.
+MANIFEST_COLUMNS = (
+    ('flight_id', 'Flight', 'flight_id'),
+    ('origin', 'Origin', 'flight__origin'),
+    ('destination', 'Destination', 'flight__destination'),
+    ('departure_date', 'Departure Date', 'flight__departure_date'),
+    ('reservation_code', 'Reservation Code', 'reservation_code'),
+    ('last_name', 'Last Name', 'passenger__last_name'),
+    ('first_name', 'First Name', 'passenger__first_name'),
+    ('document_type', 'Document Type', 'passenger__document_type'),
+    ('document_number', 'Document Number', 'passenger__document_number'),
+    ('email', 'Email', 'passenger__email'),
+    ('seat_number', 'Seat Number', 'seat__number'),
+    ('seat_type', 'Seat Type', 'seat__seat_type__code'),
+    ('status', 'Reservation Status', 'status'),
+    ('price', 'Price', 'price'),
+)
+MANIFEST_KEYS = tuple(key for key, _, _ in MANIFEST_COLUMNS)
+
+# format -> (content type, file extension)
+MANIFEST_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'excel': ('text/csv; charset=utf-8', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+# Excel only detects UTF-8 in a CSV file that starts with a byte order mark.
+UTF8_BOM = '\ufeff'
+
+_DEPARTURE = MANIFEST_KEYS.index('departure_date')
+_SEAT_TYPE = MANIFEST_KEYS.index('seat_type')
+_STATUS = MANIFEST_KEYS.index('status')
+_PRICE = MANIFEST_KEYS.index('price')
+
+
+class _Echo:
+    """
+    Pseudo-archivo cuyo write() devuelve la línea en lugar de guardarla.
+    """
+    def write(self, value):
+        return value
+
+
+def iter_manifest_rows(reservations, excel=False, chunk_size=2000):
+    """
+    Lee las filas del manifiesto, en el orden de MANIFEST_COLUMNS.
+
+    Las columnas del vuelo, el pasajero y el asiento se proyectan con
+    values_list sobre los mismos joins que ReservationRepository.get_manifest,
+    y se leen con iterator(): ni se construye una instancia de modelo por fila
+    ni se retienen las filas ya escritas.
+
+    Parámetros:
+        reservations (QuerySet): Reservas del manifiesto.
+        excel (bool): Si es True, la fecha de salida se escribe en hora local y
+            en un formato que Excel reconoce como fecha.
+        chunk_size (int): Filas leídas de la base por lote.
+
+    Retorna:
+        generator: Listas de valores, una por reserva.
+    """
+    status_labels = {code: str(label) for code, label in Reservation.RESERVATION_STATUS_CHOICES}
+    lookups = [lookup for _, _, lookup in MANIFEST_COLUMNS]
+    for values in reservations.values_list(*lookups).iterator(chunk_size=chunk_size):
+        row = list(values)
+        departure = row[_DEPARTURE]
+        if excel:
+            row[_DEPARTURE] = timezone.localtime(departure).strftime('%Y-%m-%d %H:%M')
+        else:
+            row[_DEPARTURE] = departure.isoformat()
+        row[_SEAT_TYPE] = row[_SEAT_TYPE] or ''
+        row[_STATUS] = status_labels.get(row[_STATUS], row[_STATUS])
+        row[_PRICE] = str(row[_PRICE])
+        yield row
+
+
+def iter_manifest_csv(rows, excel=False):
+    """
+    Genera el manifiesto como líneas CSV, una por fila, tras la cabecera.
+
+    Parámetros:
+        rows (iterable): Filas de iter_manifest_rows.
+        excel (bool): Si es True, antepone el BOM UTF-8.
+
+    Retorna:
+        generator: Líneas CSV terminadas en CRLF.
+    """
+    writer = csv.writer(_Echo())
+    header = writer.writerow([title for _, title, _ in MANIFEST_COLUMNS])
+    yield UTF8_BOM + header if excel else header
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_manifest_ndjson(rows):
+    """
+    Genera el manifiesto como NDJSON: un objeto JSON por fila y por línea.
+    """
+    encoder = JSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(dict(zip(MANIFEST_KEYS, row))) + '\n'
+
+
+def manifest_response(reservations, export_format, filename, chunk_size=2000):
+    """
+    Construye la respuesta de descarga del manifiesto, transmitida fila a fila.
+
+    La memoria usada no depende de cuántas reservas tenga el manifiesto.
+
+    Parámetros:
+        reservations (QuerySet): Reservas del manifiesto, ya ordenadas.
+        export_format (str): 'csv', 'excel' (CSV compatible con Excel) o 'ndjson'.
+        filename (str): Nombre del archivo sin extensión.
+        chunk_size (int): Filas leídas de la base por lote.
+
+    Retorna:
+        StreamingHttpResponse: Respuesta con el manifiesto como adjunto.
+
+    Raises:
+        ValueError: Si el formato no está en MANIFEST_FORMATS.
+    """
+    if export_format not in MANIFEST_FORMATS:
+        raise ValueError(f'Unsupported manifest format: {export_format}.')
+    content_type, extension = MANIFEST_FORMATS[export_format]
+    excel = export_format == 'excel'
+    rows = iter_manifest_rows(reservations, excel=excel, chunk_size=chunk_size)
+    if export_format == 'ndjson':
+        content = iter_manifest_ndjson(rows)
+    else:
+        content = iter_manifest_csv(rows, excel=excel)
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{extension}"'
+    return response
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airline', '0006_alter_airplane_registration_number'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reservation',
+            name='seat',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='airline.seat', verbose_name='seat'),
+        ),
+        migrations.CreateModel(
+            name='FlightSeat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('AVL', 'Available'), ('RES', 'Reserved'), ('SLD', 'Sold')], default='AVL', max_length=3, verbose_name='status')),
+                ('flight', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seat_inventory', to='airline.flight', verbose_name='flight')),
+                ('seat', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='flight_inventory', to='airline.seat', verbose_name='seat')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['flight', 'status'], name='flightseat_flight_status_idx')],
+                'unique_together': {('flight', 'seat')},
+            },
+        ),
+    ]
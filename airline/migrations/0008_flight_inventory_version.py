@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airline', '0007_flightseat_inventory'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='flight',
+            name='inventory_version',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='inventory version'),
+        ),
+    ]
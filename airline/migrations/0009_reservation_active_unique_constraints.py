@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airline', '0008_flight_inventory_version'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='reservation',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='reservation',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'CAN'), _negated=True), fields=('flight', 'seat'), name='unique_active_reservation_per_seat'),
+        ),
+        migrations.AddConstraint(
+            model_name='reservation',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'CAN'), _negated=True), fields=('flight', 'passenger'), name='unique_active_reservation_per_passenger'),
+        ),
+    ]
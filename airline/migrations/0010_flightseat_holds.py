@@ -0,0 +1,27 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airline', '0009_reservation_active_unique_constraints'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='flightseat',
+            name='status',
+            field=models.CharField(choices=[('AVL', 'Available'), ('HLD', 'Held'), ('RES', 'Reserved'), ('SLD', 'Sold')], default='AVL', max_length=3, verbose_name='status'),
+        ),
+        migrations.AddField(
+            model_name='flightseat',
+            name='hold_expires_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='hold expires at'),
+        ),
+        migrations.AddField(
+            model_name='flightseat',
+            name='hold_passenger',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='seat_holds', to='airline.passenger', verbose_name='hold passenger'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airline', '0010_flightseat_holds'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='flight',
+            index=models.Index(fields=['departure_date', 'id'], name='flight_departure_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flighthistory',
+            index=models.Index(fields=['booking_date', 'id'], name='flighthistory_booking_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['reservation_date', 'id'], name='reservation_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['issue_date', 'id'], name='ticket_issue_date_id_idx'),
+        ),
+    ]
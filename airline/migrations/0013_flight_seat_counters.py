@@ -0,0 +1,79 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+STATUS_FIELDS = {'HLD': 'held', 'RES': 'reserved', 'SLD': 'sold'}
+
+
+def populate_counters(apps, schema_editor):
+    # Mirrors SeatInventoryService.count_seats for flights with materialized inventory;
+    # flights without inventory get their counters when it is created.
+    Flight = apps.get_model('airline', 'Flight')
+    FlightSeat = apps.get_model('airline', 'FlightSeat')
+    FlightSeatCounter = apps.get_model('airline', 'FlightSeatCounter')
+    rows = (
+        FlightSeat.objects.values_list('flight_id', 'seat__seat_type_id', 'status')
+        .annotate(count=models.Count('id')).order_by('flight_id')
+    )
+    counters = {}
+    for flight_id, seat_type_id, status, count in rows:
+        counter = counters.setdefault(
+            (flight_id, seat_type_id), FlightSeatCounter(flight_id=flight_id, seat_type_id=seat_type_id)
+        )
+        counter.total += count
+        if status in STATUS_FIELDS:
+            field = STATUS_FIELDS[status]
+            setattr(counter, field, getattr(counter, field) + count)
+    FlightSeatCounter.objects.bulk_create(counters.values(), batch_size=500)
+    totals = {}
+    for (flight_id, _), counter in counters.items():
+        flight_totals = totals.setdefault(flight_id, dict.fromkeys(('total', 'held', 'reserved', 'sold'), 0))
+        for field in flight_totals:
+            flight_totals[field] += getattr(counter, field)
+    for flight_id, flight_totals in totals.items():
+        Flight.objects.filter(pk=flight_id).update(**{f'seats_{field}': value for field, value in flight_totals.items()})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airline', '0012_flight_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='flight',
+            name='seats_total',
+            field=models.IntegerField(default=0, editable=False, verbose_name='total seats'),
+        ),
+        migrations.AddField(
+            model_name='flight',
+            name='seats_held',
+            field=models.IntegerField(default=0, editable=False, verbose_name='held seats'),
+        ),
+        migrations.AddField(
+            model_name='flight',
+            name='seats_reserved',
+            field=models.IntegerField(default=0, editable=False, verbose_name='reserved seats'),
+        ),
+        migrations.AddField(
+            model_name='flight',
+            name='seats_sold',
+            field=models.IntegerField(default=0, editable=False, verbose_name='sold seats'),
+        ),
+        migrations.CreateModel(
+            name='FlightSeatCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.IntegerField(default=0, verbose_name='total')),
+                ('held', models.IntegerField(default=0, verbose_name='held')),
+                ('reserved', models.IntegerField(default=0, verbose_name='reserved')),
+                ('sold', models.IntegerField(default=0, verbose_name='sold')),
+                ('flight', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seat_counters', to='airline.flight', verbose_name='flight')),
+                ('seat_type', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='airline.seattype', verbose_name='seat type')),
+            ],
+            options={
+                'unique_together': {('flight', 'seat_type')},
+            },
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
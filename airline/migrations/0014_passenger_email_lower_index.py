@@ -0,0 +1,16 @@
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airline', '0013_flight_seat_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='passenger',
+            index=models.Index(django.db.models.functions.text.Lower('email'), name='passenger_email_lower_idx'),
+        ),
+    ]
@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airline', '0015_flight_history_sync'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='flighthistory',
+            index=models.Index(fields=['passenger', '-booking_date', '-id'], name='flighthistory_passenger_idx'),
+        ),
+    ]
@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airline', '0016_flight_history_passenger_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='flighthistory',
+            index=models.Index(fields=['flight', '-booking_date', '-id'], name='flighthistory_flight_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airline', '0017_flight_history_flight_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='passenger',
+            name='passenger_email_lower_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='passenger',
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.text.Lower('email'), name='passenger_email_lower_unique',
+                violation_error_message='A passenger with this email already exists.',
+            ),
+        ),
+    ]
@@ -1,6 +1,9 @@
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.utils.encoders import JSONEncoder
 from django.core.exceptions import ValidationError
+from django.http import StreamingHttpResponse
+from .exceptions import ReservationConflictError
 
 class ServiceActionMixin:
     """
@@ -13,6 +16,8 @@ class ServiceActionMixin:
         try:
             result = action_func(*args, **kwargs)
             return result
+        except ReservationConflictError as e:
+            return Response({'detail': e.message}, status=status.HTTP_409_CONFLICT)
         except ValidationError as e:
             return Response({'detail': e.message_dict}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
@@ -37,3 +42,59 @@ class ServiceActionMixin:
                 return Response(status=status.HTTP_404_NOT_FOUND)
             return Response(status=status.HTTP_204_NO_CONTENT)
         return self._handle_service_action(_destroy)
+
+
+class QueryPlanMixin:
+    """
+    Applies the serializer's declared query plan (select_related and
+    prefetch_related, see serializers.EagerLoadingMixin) to every queryset the
+    viewset serializes, so list endpoints run a constant number of queries.
+    """
+
+    def get_queryset(self):
+        return self.apply_query_plan(super().get_queryset())
+
+    def apply_query_plan(self, queryset):
+        setup_eager_loading = getattr(self.get_serializer_class(), 'setup_eager_loading', None)
+        if setup_eager_loading is None:
+            return queryset
+        return setup_eager_loading(queryset)
+
+
+class NDJSONStreamMixin:
+    """
+    An opt-in streaming mode for list endpoints (?stream=ndjson).
+
+    Instead of building the full serialized list, the queryset is read with
+    .iterator(chunk_size=...) and each row is serialized and written as one
+    JSON line, so memory use does not grow with the size of the table.
+    Pagination does not apply to streamed responses.
+    """
+    stream_query_param = 'stream'
+    stream_chunk_size = 1000
+    stream_content_type = 'application/x-ndjson'
+
+    def list(self, request, *args, **kwargs):
+        response = self.get_stream_response(request, self.filter_queryset(self.get_queryset()))
+        if response is not None:
+            return response
+        return super().list(request, *args, **kwargs)
+
+    def get_stream_response(self, request, queryset):
+        """
+        Returns the NDJSON streaming response if the request asks for one, otherwise None.
+        """
+        stream_format = request.query_params.get(self.stream_query_param)
+        if not stream_format:
+            return None
+        if stream_format != 'ndjson':
+            return Response({'detail': f'Unsupported stream format: {stream_format}.'}, status=status.HTTP_400_BAD_REQUEST)
+        ordering = getattr(self, 'ordering', None) or ('pk',)
+        return StreamingHttpResponse(self._iter_ndjson(queryset.order_by(*ordering)), content_type=self.stream_content_type)
+
+    def _iter_ndjson(self, queryset):
+        # One serializer instance is reused for every row.
+        serializer = self.get_serializer()
+        encoder = JSONEncoder(ensure_ascii=False)
+        for instance in queryset.iterator(chunk_size=self.stream_chunk_size):
+            yield encoder.encode(serializer.to_representation(instance)) + '\n'
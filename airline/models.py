@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Lower
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
@@ -98,6 +99,11 @@ class Flight(models.Model):
         duration (timedelta): Duración estimada del vuelo.
         status (str): Estado actual del vuelo.
         base_price (Decimal): Precio base del vuelo.
+        inventory_version (int): Contador que se incrementa con cada cambio en el inventario de asientos.
+        seats_total (int): Asientos del inventario del vuelo (contador desnormalizado).
+        seats_held (int): Asientos retenidos temporalmente.
+        seats_reserved (int): Asientos reservados (reservas pendientes o confirmadas).
+        seats_sold (int): Asientos vendidos (reservas pagadas).
     """
     airplane = models.ForeignKey(Airplane, on_delete=models.CASCADE, verbose_name=_('airplane'))
     origin = models.CharField(_('origin'), max_length=100)
@@ -107,10 +113,63 @@ class Flight(models.Model):
     duration = models.DurationField(_('duration'))
     status = models.CharField(_('status'), max_length=50)
     base_price = models.DecimalField(_('base price'), max_digits=10, decimal_places=2)
+    inventory_version = models.PositiveIntegerField(_('inventory version'), default=0, editable=False)
+    # Maintained with every inventory transition (see record_inventory_change);
+    # reconcile_flight_counters recomputes them from FlightSeat.
+    seats_total = models.IntegerField(_('total seats'), default=0, editable=False)
+    seats_held = models.IntegerField(_('held seats'), default=0, editable=False)
+    seats_reserved = models.IntegerField(_('reserved seats'), default=0, editable=False)
+    seats_sold = models.IntegerField(_('sold seats'), default=0, editable=False)
+
+    class Meta:
+        # departure_date/id backs the keyset ordering of the flights API listing;
+        # the others back FlightSearchService route and status queries.
+        indexes = [
+            models.Index(fields=['departure_date', 'id'], name='flight_departure_id_idx'),
+            models.Index(fields=['origin', 'destination', 'departure_date'], name='flight_route_departure_idx'),
+            models.Index(fields=['status', 'departure_date'], name='flight_status_departure_idx'),
+        ]
 
     def __str__(self):
         return f"Flight {self.origin} to {self.destination} on {self.departure_date.strftime('%Y-%m-%d %H:%M')}"
 
+    @property
+    def seats_available(self):
+        return max(self.seats_total - self.seats_held - self.seats_reserved - self.seats_sold, 0)
+
+    @property
+    def load_factor(self):
+        if not self.seats_total:
+            return 0.0
+        return (self.seats_reserved + self.seats_sold) / self.seats_total
+
+    @classmethod
+    def record_inventory_change(cls, flight_id, transitions=()):
+        """
+        Incrementa la versión del inventario de un vuelo y aplica los cambios de estado a sus contadores.
+
+        Los contadores del vuelo se actualizan con un único UPDATE relativo
+        (F() + delta) junto con la versión, y los de cada tipo de asiento con un
+        UPDATE por tipo afectado, por lo que dos transacciones concurrentes no
+        se pisan. Debe llamarse dentro de la transacción que cambia el inventario.
+
+        Parámetros:
+            flight_id (int): ID del vuelo.
+            transitions (iterable): Tuplas (seat_type_id, estado anterior, estado nuevo) de FlightSeat.
+        """
+        deltas = FlightSeatCounter.deltas_for(transitions)
+        totals = {}
+        for seat_type_id, fields in deltas.items():
+            FlightSeatCounter.objects.filter(flight_id=flight_id, seat_type_id=seat_type_id).update(
+                **{field: models.F(field) + delta for field, delta in fields.items()}
+            )
+            for field, delta in fields.items():
+                totals[f'seats_{field}'] = totals.get(f'seats_{field}', 0) + delta
+        cls.objects.filter(pk=flight_id).update(
+            inventory_version=models.F('inventory_version') + 1,
+            **{field: models.F(field) + delta for field, delta in totals.items() if delta}
+        )
+
     def clean(self):
         errors = {}
         if self.arrival_date and self.departure_date and self.arrival_date <= self.departure_date:
@@ -155,6 +214,16 @@ class Passenger(models.Model):
     date_of_birth = models.DateField(_('date of birth'))
     document_type = models.CharField(_('document type'), max_length=3, choices=DOCUMENT_TYPE_CHOICES, default='DNI')
 
+    class Meta:
+        # Emails are unique regardless of case; the constraint's index also backs
+        # the case-insensitive lookup of PassengerRepository.get_by_email.
+        constraints = [
+            models.UniqueConstraint(
+                Lower('email'), name='passenger_email_lower_unique',
+                violation_error_message=_('A passenger with this email already exists.'),
+            ),
+        ]
+
     def __str__(self):
         return f"{self.first_name} {self.last_name or ''}".strip()
 
@@ -188,13 +257,29 @@ class FlightHistory(models.Model):
         booking_date (datetime): Fecha de reserva (automática).
         seat_number (str): Número de asiento (opcional).
         price_paid (Decimal): Precio pagado (opcional).
+        reservation (Reservation): Reserva de origen, si la entrada la creó la
+            sincronización desde reservas (única, lo que la hace idempotente).
     """
     passenger = models.ForeignKey(Passenger, on_delete=models.CASCADE, related_name='flight_history')
     flight = models.ForeignKey(Flight, on_delete=models.CASCADE)
-    booking_date = models.DateTimeField(auto_now_add=True)
+    # Defaults to the creation time like auto_now_add, but the history sync sets it to the reservation date.
+    booking_date = models.DateTimeField(default=timezone.now, editable=False)
     seat_number = models.CharField(max_length=10, blank=True, null=True)
     price_paid = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
-    
+    reservation = models.OneToOneField(
+        'Reservation', on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='history_entry',
+    )
+
+    class Meta:
+        # booking_date/id backs the keyset ordering of the history API listing;
+        # passenger/booking_date/id and flight/booking_date/id back a passenger's
+        # and a flight's history, newest first.
+        indexes = [
+            models.Index(fields=['booking_date', 'id'], name='flighthistory_booking_id_idx'),
+            models.Index(fields=['passenger', '-booking_date', '-id'], name='flighthistory_passenger_idx'),
+            models.Index(fields=['flight', '-booking_date', '-id'], name='flighthistory_flight_idx'),
+        ]
+
     def __str__(self):
         return f"{self.passenger.first_name}'s flight on {self.flight.departure_date}"
 
@@ -298,7 +383,8 @@ class Seat(models.Model):
         row (int): Fila del asiento.
         column (str): Columna del asiento.
         seat_type (SeatType): Tipo de asiento (opcional).
-        status (str): Estado del asiento (Available, Occupied, Reserved).
+        status (str): Estado físico del asiento (Available, Occupied, Reserved). La
+            disponibilidad por vuelo se guarda en FlightSeat; las reservas no lo modifican.
     """
     airplane = models.ForeignKey(Airplane, on_delete=models.CASCADE)
     number = models.CharField(max_length=10)
@@ -348,14 +434,25 @@ class Reservation(models.Model):
     ]
     flight = models.ForeignKey(Flight, on_delete=models.CASCADE, verbose_name=_('flight'))
     passenger = models.ForeignKey(Passenger, on_delete=models.CASCADE, verbose_name=_('passenger'))
-    seat = models.OneToOneField(Seat, on_delete=models.CASCADE, verbose_name=_('seat'))
+    seat = models.ForeignKey(Seat, on_delete=models.CASCADE, verbose_name=_('seat'))
     status = models.CharField(_('status'), max_length=4, choices=RESERVATION_STATUS_CHOICES, default='PEN')
     reservation_date = models.DateTimeField(_('reservation date'), auto_now_add=True)
     price = models.DecimalField(_('price'), max_digits=10, decimal_places=2)
     reservation_code = models.CharField(_('reservation code'), max_length=20, unique=True)
 
     class Meta:
-        unique_together = (('flight', 'seat'), ('flight', 'passenger'))
+        # Cancelled reservations do not hold the seat, so uniqueness only applies to active ones.
+        constraints = [
+            models.UniqueConstraint(
+                fields=['flight', 'seat'], condition=~models.Q(status='CAN'),
+                name='unique_active_reservation_per_seat',
+            ),
+            models.UniqueConstraint(
+                fields=['flight', 'passenger'], condition=~models.Q(status='CAN'),
+                name='unique_active_reservation_per_passenger',
+            ),
+        ]
+        indexes = [models.Index(fields=['reservation_date', 'id'], name='reservation_date_id_idx')]
 
     def __str__(self):
         return f"Reservation {self.reservation_code} for {self.passenger.first_name} on flight {self.flight.id}"
@@ -369,8 +466,8 @@ class Reservation(models.Model):
         Raises:
             ValidationError: Si hay errores de validación.
         """
-        # Restriction: A seat cannot be reserved more than once per flight (already covered by unique_together)
-        # Restriction: A passenger cannot have more than one reservation per flight (already covered by unique_together)
+        # Restriction: A seat cannot be reserved more than once per flight (covered by unique_active_reservation_per_seat)
+        # Restriction: A passenger cannot have more than one reservation per flight (covered by unique_active_reservation_per_passenger)
 
         self._validate_seat_status_consistency()
 
@@ -384,46 +481,294 @@ class Reservation(models.Model):
 
     def _validate_seat_status_consistency(self):
         """
-        Valida la consistencia entre el estado de la reserva y el estado del asiento.
+        Valida la consistencia entre el estado de la reserva y el inventario del asiento en el vuelo.
+
+        Se compara con la fila FlightSeat de (vuelo, asiento), no con Seat.status,
+        porque un mismo asiento puede estar reservado en otros vuelos del avión.
+        Si el inventario del vuelo aún no fue materializado no se valida.
 
         Raises:
-            ValidationError: Si el estado del asiento no es consistente con la reserva.
+            ValidationError: Si el estado del asiento en el vuelo no es consistente con la reserva.
         """
-        # Restriction: Seat statuses must be consistent with reservations
+        # Restriction: Seat statuses on the flight must be consistent with reservations
+        inventory_status = FlightSeat.objects.filter(
+            flight_id=self.flight_id, seat_id=self.seat_id
+        ).values_list('status', flat=True).first()
+        if inventory_status is None:
+            return
         if self.status == 'CON' or self.status == 'PAID':
-            if self.seat.status not in ['Reserved', 'Occupied']:
-                raise ValidationError(_('The seat must be in "Reserved" or "Occupied" status for a confirmed/paid reservation.'))
+            if inventory_status not in ['RES', 'SLD']:
+                raise ValidationError(_('The seat must be reserved or sold on this flight for a confirmed/paid reservation.'))
         elif self.status == 'CAN':
-            if self.seat.status != 'Available':
-                raise ValidationError(_('The seat must be in "Available" status for a cancelled reservation.'))
+            if inventory_status in ['RES', 'SLD'] and not self._seat_taken_by_other_reservation():
+                raise ValidationError(_('The seat must be available on this flight for a cancelled reservation.'))
 
     def save(self, *args, **kwargs):
         """
-        Guarda la instancia del modelo, actualizando el estado del asiento asociado.
+        Guarda la instancia del modelo, actualizando el inventario del asiento en el vuelo.
 
         Args:
             *args: Argumentos posicionales para el método save.
             **kwargs: Argumentos de palabra clave para el método save.
 
         Efectos secundarios:
-            Actualiza el estado del asiento según el estado de la reserva.
+            Actualiza el estado del asiento en el inventario del vuelo según el estado de la
+            reserva y, si la reserva cambió de vuelo o de asiento, libera el asiento anterior.
         """
-        self._update_associated_seat_status()
+        previous = Reservation.objects.filter(pk=self.pk).values_list(
+            'flight_id', 'seat_id', 'status'
+        ).first() if self.pk else None
         super().save(*args, **kwargs)
+        if previous and previous[:2] != (self.flight_id, self.seat_id):
+            self._release_previous_seat(*previous)
+        self._update_flight_seat_inventory()
 
-    def _update_associated_seat_status(self):
+    def _release_previous_seat(self, flight_id, seat_id, status):
         """
-        Actualiza el estado del asiento asociado basado en el estado de la reserva.
+        Libera en el inventario el asiento que la reserva ocupaba antes de cambiar de vuelo o de asiento.
+
+        Parámetros:
+            flight_id (int): ID del vuelo anterior.
+            seat_id (int): ID del asiento anterior.
+            status (str): Estado anterior de la reserva.
+        """
+        if status == 'CAN' or self._seat_taken_by_other_reservation(flight_id, seat_id):
+            return
+        FlightSeat.set_status(flight_id, seat_id, 'AVL')
+
+    def _update_flight_seat_inventory(self):
+        """
+        Sincroniza el inventario del asiento en el vuelo con el estado de la reserva.
+
+        Si el inventario del vuelo aún no fue materializado no hace nada: al
+        materializarse se construye a partir de las reservas existentes. Una
+        reserva cancelada no libera el asiento si otra reserva activa ya lo tomó.
 
         Efectos secundarios:
-            Modifica y guarda el estado del asiento relacionado.
+            Actualiza el estado de la fila FlightSeat correspondiente y la versión del inventario del vuelo.
         """
-        # Update seat status when saving the reservation
-        if self.status in ['CON', 'PAID']:
-            self.seat.status = 'Reserved'
-        elif self.status == 'CAN':
-            self.seat.status = 'Available'
-        self.seat.save()
+        if self.status == 'CAN' and self._seat_taken_by_other_reservation():
+            return
+        FlightSeat.set_status(self.flight_id, self.seat_id, FlightSeat.status_for_reservation(self.status))
+
+    def _seat_taken_by_other_reservation(self, flight_id=None, seat_id=None):
+        """
+        Indica si otra reserva activa ocupa el mismo asiento en el vuelo.
+
+        Parámetros:
+            flight_id (int, optional): ID del vuelo. Por defecto, el de la reserva.
+            seat_id (int, optional): ID del asiento. Por defecto, el de la reserva.
+
+        Retorna:
+            bool: True si existe otra reserva no cancelada para el asiento.
+        """
+        return Reservation.objects.filter(
+            flight_id=flight_id or self.flight_id, seat_id=seat_id or self.seat_id
+        ).exclude(status='CAN').exclude(pk=self.pk).exists()
+
+class FlightSeat(models.Model):
+    """
+    Modelo que representa el inventario de un asiento en un vuelo concreto.
+
+    Existe una fila por cada par (vuelo, asiento), de modo que la disponibilidad
+    se consulta con un único acceso indexado por vuelo y estado, sin recorrer las
+    reservas. Un mismo asiento físico puede así reservarse en distintos vuelos del
+    mismo avión.
+
+    Atributos:
+        STATUS_CHOICES (list): Opciones de estado del asiento en el vuelo.
+        RESERVATION_STATUS_MAP (dict): Estado de inventario para cada estado de reserva.
+        flight (Flight): Vuelo al que pertenece el inventario.
+        seat (Seat): Asiento del avión del vuelo.
+        status (str): Estado del asiento en el vuelo.
+        hold_passenger (Passenger): Pasajero que retiene temporalmente el asiento (solo en estado 'HLD').
+        hold_expires_at (datetime): Vencimiento de la retención; una retención vencida cuenta como disponible.
+    """
+    STATUS_CHOICES = [
+        ('AVL', _('Available')),
+        ('HLD', _('Held')),
+        ('RES', _('Reserved')),
+        ('SLD', _('Sold')),
+    ]
+    RESERVATION_STATUS_MAP = {
+        'PEN': 'RES',
+        'CON': 'RES',
+        'PAID': 'SLD',
+        'CAN': 'AVL',
+    }
+    flight = models.ForeignKey(Flight, on_delete=models.CASCADE, related_name='seat_inventory', verbose_name=_('flight'))
+    seat = models.ForeignKey(Seat, on_delete=models.CASCADE, related_name='flight_inventory', verbose_name=_('seat'))
+    status = models.CharField(_('status'), max_length=3, choices=STATUS_CHOICES, default='AVL')
+    hold_passenger = models.ForeignKey(
+        Passenger, on_delete=models.SET_NULL, null=True, blank=True, related_name='seat_holds',
+        verbose_name=_('hold passenger')
+    )
+    hold_expires_at = models.DateTimeField(_('hold expires at'), null=True, blank=True, db_index=True)
+
+    class Meta:
+        unique_together = (('flight', 'seat'),)
+        indexes = [
+            models.Index(fields=['flight', 'status'], name='flightseat_flight_status_idx'),
+        ]
+
+    @classmethod
+    def set_status(cls, flight_id, seat_id, status):
+        """
+        Actualiza el estado de un asiento en un vuelo, sus contadores y la versión del inventario.
+
+        Parámetros:
+            flight_id (int): ID del vuelo.
+            seat_id (int): ID del asiento.
+            status (str): Nuevo estado de inventario.
+        """
+        with transaction.atomic():
+            rows = cls.objects.select_for_update(of=('self',)).filter(flight_id=flight_id, seat_id=seat_id)
+            previous = rows.values_list('seat__seat_type_id', 'status').first()
+            rows.update(status=status, hold_passenger=None, hold_expires_at=None)
+            transitions = [(previous[0], previous[1], status)] if previous else []
+            Flight.record_inventory_change(flight_id, transitions)
+
+    @classmethod
+    def status_for_reservation(cls, reservation_status):
+        """
+        Devuelve el estado de inventario correspondiente a un estado de reserva.
+
+        Parámetros:
+            reservation_status (str): Estado de la reserva.
+
+        Retorna:
+            str: Estado de inventario ('AVL', 'RES' o 'SLD').
+        """
+        return cls.RESERVATION_STATUS_MAP.get(reservation_status, 'RES')
+
+    @classmethod
+    def claimable(cls, now, passenger_ids=()):
+        """
+        Condición de las filas que pueden tomarse: disponibles, con retención vencida
+        o retenidas por alguno de los pasajeros indicados.
+
+        Parámetros:
+            now (datetime): Instante de referencia para el vencimiento.
+            passenger_ids (iterable): IDs de pasajeros cuyas retenciones se respetan.
+
+        Retorna:
+            Q: Condición para filtrar FlightSeat.
+        """
+        condition = models.Q(status='AVL') | models.Q(status='HLD', hold_expires_at__lte=now)
+        if passenger_ids:
+            condition |= models.Q(status='HLD', hold_passenger_id__in=list(passenger_ids))
+        return condition
+
+    @classmethod
+    def current_status(cls, now, passenger_ids=()):
+        """
+        Expresión con el estado efectivo de la fila: las filas que se pueden tomar leen 'AVL'.
+
+        Parámetros:
+            now (datetime): Instante de referencia para el vencimiento.
+            passenger_ids (iterable): IDs de pasajeros para los que su propia retención cuenta como disponible.
+
+        Retorna:
+            Case: Expresión para anotar consultas de FlightSeat.
+        """
+        return models.Case(
+            models.When(cls.claimable(now, passenger_ids), then=models.Value('AVL')),
+            default=models.F('status'),
+            output_field=models.CharField(),
+        )
+
+    @property
+    def is_available(self):
+        if self.status == 'HLD':
+            return self.hold_expires_at is not None and self.hold_expires_at <= timezone.now()
+        return self.status == 'AVL'
+
+    def __str__(self):
+        return f"Seat {self.seat.number} on flight {self.flight_id} ({self.status})"
+
+class FlightSeatCounter(models.Model):
+    """
+    Contadores desnormalizados del inventario de un vuelo por tipo de asiento.
+
+    Resume las filas FlightSeat del vuelo para mostrar la disponibilidad sin
+    contarlas en cada lectura. Los totales del vuelo se guardan en los campos
+    seats_* de Flight. Las retenciones vencidas cuentan como retenidas hasta que
+    release_expired_holds las libera.
+
+    Atributos:
+        STATUS_FIELDS (dict): Contador que corresponde a cada estado de inventario ('AVL' no se cuenta).
+        flight (Flight): Vuelo al que pertenecen los contadores.
+        seat_type (SeatType): Tipo de asiento (nulo para asientos sin tipo).
+        total (int): Asientos de este tipo en el vuelo.
+        held (int): Asientos retenidos.
+        reserved (int): Asientos reservados.
+        sold (int): Asientos vendidos.
+    """
+    STATUS_FIELDS = {
+        'HLD': 'held',
+        'RES': 'reserved',
+        'SLD': 'sold',
+    }
+    flight = models.ForeignKey(Flight, on_delete=models.CASCADE, related_name='seat_counters', verbose_name=_('flight'))
+    seat_type = models.ForeignKey(SeatType, on_delete=models.CASCADE, null=True, blank=True, verbose_name=_('seat type'))
+    total = models.IntegerField(_('total'), default=0)
+    held = models.IntegerField(_('held'), default=0)
+    reserved = models.IntegerField(_('reserved'), default=0)
+    sold = models.IntegerField(_('sold'), default=0)
+
+    class Meta:
+        unique_together = (('flight', 'seat_type'),)
+
+    @property
+    def available(self):
+        return max(self.total - self.held - self.reserved - self.sold, 0)
+
+    @classmethod
+    def deltas_for(cls, transitions):
+        """
+        Agrupa cambios de estado de inventario en deltas por tipo de asiento.
+
+        Parámetros:
+            transitions (iterable): Tuplas (seat_type_id, estado anterior, estado nuevo).
+
+        Retorna:
+            dict: Mapa {seat_type_id: {contador: delta}} sin deltas nulos.
+        """
+        deltas = {}
+        for seat_type_id, old_status, new_status in transitions:
+            if old_status == new_status:
+                continue
+            fields = deltas.setdefault(seat_type_id, {})
+            if old_status in cls.STATUS_FIELDS:
+                field = cls.STATUS_FIELDS[old_status]
+                fields[field] = fields.get(field, 0) - 1
+            if new_status in cls.STATUS_FIELDS:
+                field = cls.STATUS_FIELDS[new_status]
+                fields[field] = fields.get(field, 0) + 1
+        return {
+            seat_type_id: {field: delta for field, delta in fields.items() if delta}
+            for seat_type_id, fields in deltas.items()
+            if any(fields.values())
+        }
+
+    def __str__(self):
+        return f"Flight {self.flight_id} - {self.seat_type_id or '-'}: {self.available}/{self.total}"
+
+class SyncCheckpoint(models.Model):
+    """
+    Modelo que guarda la marca de agua (high-water mark) de un proceso por lotes incremental.
+
+    Atributos:
+        name (str): Nombre único del proceso.
+        high_water_mark (datetime): Último instante procesado (vacío si nunca se ejecutó).
+        updated_at (datetime): Fecha de la última actualización (automática).
+    """
+    name = models.CharField(_('name'), max_length=50, unique=True)
+    high_water_mark = models.DateTimeField(_('high-water mark'), null=True, blank=True)
+    updated_at = models.DateTimeField(_('updated at'), auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.high_water_mark or '-'}"
 
 class UserProfile(models.Model):
     """
@@ -498,6 +843,9 @@ class Ticket(models.Model):
     issue_date = models.DateTimeField(_('issue date'), auto_now_add=True)
     status = models.CharField(_('status'), max_length=4, choices=TICKET_STATUS_CHOICES, default='EMI')
 
+    class Meta:
+        indexes = [models.Index(fields=['issue_date', 'id'], name='ticket_issue_date_id_idx')]
+
     @property
     def ticket_number(self):
         """
@@ -0,0 +1,54 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Paginación por cursor (keyset) para los listados de la API.
+
+    Cada página se obtiene con un WHERE sobre la posición del cursor en lugar de
+    un OFFSET, por lo que el costo no crece con el número de página. El orden
+    se toma del atributo `ordering` de la vista (por defecto '-id') y siempre
+    debe terminar en una columna única, respaldada por un índice.
+
+    El total de resultados no se calcula salvo que el cliente lo pida con
+    `?count=true`, ya que un COUNT(*) recorre toda la tabla.
+
+    Atributos:
+        page_size_query_param (str): Parámetro para elegir el tamaño de página.
+        count_query_param (str): Parámetro para incluir el total en la respuesta.
+    """
+    ordering = ('-id',)
+    page_size_query_param = 'page_size'
+    count_query_param = 'count'
+
+    def __init__(self):
+        self.max_page_size = getattr(settings, 'API_MAX_PAGE_SIZE', None)
+        self.count = None
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, 'ordering', None) or self.ordering
+        if isinstance(ordering, str):
+            return (ordering,)
+        return tuple(ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if request.query_params.get(self.count_query_param, '').lower() in ('1', 'true'):
+            self.count = queryset.count()
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        payload = {'next': self.get_next_link(), 'previous': self.get_previous_link()}
+        if self.count is not None:
+            payload['count'] = self.count
+        payload['results'] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count'] = {
+            'type': 'integer',
+            'description': 'Total de resultados (solo con ?count=true).',
+        }
+        return response_schema
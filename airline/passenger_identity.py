@@ -0,0 +1,83 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+def normalize_email(email):
+    """
+    Normaliza un email para compararlo sin distinguir mayúsculas ni espacios.
+    """
+    return (email or '').strip().lower()
+
+
+class PassengerIdentityCache:
+    """
+    Caché del pasajero que corresponde a cada email de usuario.
+
+    Guarda la instancia del pasajero en dos niveles: en el propio objeto del
+    usuario (dura lo que dura la solicitud) y en el backend de caché configurado
+    (entre solicitudes). Las entradas se indexan por email normalizado; las
+    señales de Passenger las invalidan al guardar o eliminar un pasajero, y
+    PASSENGER_IDENTITY_CACHE_TIMEOUT acota la vida de las que cambian por otras vías
+    (por ejemplo, QuerySet.update).
+
+    Atributos:
+        key_prefix (str): Prefijo de las claves almacenadas.
+        request_attribute (str): Atributo del usuario donde se guarda el pasajero de la solicitud.
+    """
+    key_prefix = 'passenger-identity'
+    request_attribute = '_airline_passenger'
+
+    def __init__(self, alias=None, timeout=None):
+        """
+        Inicializa la caché.
+
+        Parámetros:
+            alias (str, optional): Alias del backend en CACHES. Por defecto PASSENGER_IDENTITY_CACHE_ALIAS.
+            timeout (int, optional): Segundos de vida de cada entrada. Por defecto PASSENGER_IDENTITY_CACHE_TIMEOUT.
+        """
+        self.alias = alias or getattr(settings, 'PASSENGER_IDENTITY_CACHE_ALIAS', 'default')
+        self.timeout = timeout if timeout is not None else getattr(settings, 'PASSENGER_IDENTITY_CACHE_TIMEOUT', 300)
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def make_key(self, email):
+        digest = hashlib.md5(normalize_email(email).encode('utf-8'), usedforsecurity=False).hexdigest()
+        return f'{self.key_prefix}:{digest}'
+
+    def get(self, user):
+        """
+        Obtiene el pasajero de un usuario desde la solicitud en curso o desde la caché.
+
+        Parámetros:
+            user (User): Usuario autenticado.
+
+        Retorna:
+            Passenger | None: Pasajero en caché, o None si no hay entrada para el email del usuario.
+        """
+        email = normalize_email(user.email)
+        passenger = getattr(user, self.request_attribute, None)
+        if passenger is not None and normalize_email(passenger.email) == email:
+            return passenger
+        passenger = self.cache.get(self.make_key(email))
+        if passenger is not None:
+            setattr(user, self.request_attribute, passenger)
+        return passenger
+
+    def set(self, user, passenger):
+        """
+        Guarda el pasajero de un usuario en la solicitud en curso y en la caché.
+        """
+        setattr(user, self.request_attribute, passenger)
+        self.cache.set(self.make_key(passenger.email), passenger, self.timeout)
+
+    def invalidate(self, *emails):
+        """
+        Elimina de la caché las entradas de los emails indicados.
+        """
+        keys = {self.make_key(email) for email in emails if email}
+        if keys:
+            self.cache.delete_many(keys)
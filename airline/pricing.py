@@ -0,0 +1,142 @@
+from dataclasses import dataclass, field
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.conf import settings
+
+CENT = Decimal('0.01')
+
+# (threshold, multiplier) steps; the multiplier of the highest threshold not above
+# the value applies. Load factor is the share of reserved or sold seats.
+DEFAULT_LOAD_FACTOR_CURVE = (
+    (0.0, '1.00'),
+    (0.5, '1.10'),
+    (0.7, '1.25'),
+    (0.85, '1.45'),
+    (0.95, '1.70'),
+)
+# Days until departure: fares rise as the departure gets closer.
+DEFAULT_DEPARTURE_CURVE = (
+    (0, '1.60'),
+    (2, '1.40'),
+    (7, '1.20'),
+    (14, '1.10'),
+    (30, '1.00'),
+)
+
+
+@dataclass(frozen=True)
+class StepCurve:
+    """
+    Curva escalonada de multiplicadores de precio.
+
+    Atributos:
+        steps (tuple): Pares (umbral, multiplicador Decimal) ordenados por umbral.
+    """
+    steps: tuple
+
+    @classmethod
+    def from_pairs(cls, pairs):
+        """
+        Construye la curva desde pares (umbral, multiplicador) en cualquier orden.
+
+        Parámetros:
+            pairs (iterable): Pares con el multiplicador como número o cadena.
+
+        Retorna:
+            StepCurve: Curva ordenada por umbral.
+        """
+        return cls(tuple(sorted((float(threshold), Decimal(str(multiplier))) for threshold, multiplier in pairs)))
+
+    def step_for(self, value):
+        """
+        Índice del escalón que corresponde a un valor (-1 si está por debajo del primero).
+        """
+        index = -1
+        for position, (threshold, _) in enumerate(self.steps):
+            if value < threshold:
+                break
+            index = position
+        return index
+
+    def multiplier_for(self, value):
+        """
+        Multiplicador que corresponde a un valor; 1 si está por debajo del primer umbral.
+        """
+        index = self.step_for(value)
+        return self.steps[index][1] if index >= 0 else Decimal('1')
+
+
+@dataclass(frozen=True)
+class FareTable:
+    """
+    Tarifas de un vuelo por tipo de asiento, calculadas en una sola pasada.
+
+    Todos los asientos de un mismo tipo tienen la misma tarifa, por lo que el
+    precio de un mapa de asientos completo se obtiene con una búsqueda en un
+    diccionario por asiento, sin recalcular multiplicadores.
+
+    Atributos:
+        flight_id (int): ID del vuelo.
+        base_fare (Decimal): Tarifa de un asiento sin tipo (precio base por demanda).
+        demand_multiplier (Decimal): Producto de los multiplicadores de ocupación y anticipación.
+        by_type_id (dict): Tarifa por ID de tipo de asiento.
+        by_code (dict): Tarifa por código de tipo de asiento.
+    """
+    flight_id: int
+    base_fare: Decimal
+    demand_multiplier: Decimal
+    by_type_id: dict = field(default_factory=dict)
+    by_code: dict = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, flight_id, base_price, demand_multiplier, seat_types):
+        """
+        Calcula las tarifas de todos los tipos de asiento de un vuelo.
+
+        Parámetros:
+            flight_id (int): ID del vuelo.
+            base_price (Decimal): Precio base del vuelo.
+            demand_multiplier (Decimal): Multiplicador de demanda del vuelo.
+            seat_types (iterable): Tuplas (id, código, price_multiplier).
+
+        Retorna:
+            FareTable: Tarifas redondeadas al centavo.
+        """
+        base = Decimal(str(base_price)) * demand_multiplier
+        by_type_id, by_code = {}, {}
+        for seat_type_id, code, multiplier in seat_types:
+            fare = round_fare(base * Decimal(str(multiplier)))
+            by_type_id[seat_type_id] = fare
+            by_code[code] = fare
+        return cls(flight_id, round_fare(base), demand_multiplier, by_type_id, by_code)
+
+    def for_type_id(self, seat_type_id):
+        return self.by_type_id.get(seat_type_id, self.base_fare)
+
+    def for_code(self, code):
+        return self.by_code.get(code, self.base_fare)
+
+
+def round_fare(amount):
+    return amount.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def load_factor_curve():
+    """
+    Curva de ocupación configurada (PRICING_LOAD_FACTOR_CURVE).
+    """
+    return StepCurve.from_pairs(getattr(settings, 'PRICING_LOAD_FACTOR_CURVE', DEFAULT_LOAD_FACTOR_CURVE))
+
+
+def departure_curve():
+    """
+    Curva de días hasta la salida configurada (PRICING_DEPARTURE_CURVE).
+    """
+    return StepCurve.from_pairs(getattr(settings, 'PRICING_DEPARTURE_CURVE', DEFAULT_DEPARTURE_CURVE))
+
+
+def days_to_departure(departure_date, now):
+    """
+    Días (con fracción) que faltan para la salida; 0 si ya salió.
+    """
+    return max((departure_date - now).total_seconds() / 86400, 0)
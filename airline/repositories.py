@@ -1,5 +1,9 @@
+from django.db.models import Case, Count, Exists, F, IntegerField, OuterRef, Q, Subquery, Value, When
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Coalesce, Lower
+from django.utils import timezone
 from django.shortcuts import get_object_or_404
-from .models import Airplane, Flight, Passenger, Reservation, Seat, SeatLayout, SeatType, SeatLayoutPosition, FlightHistory, Ticket
+from .models import Airplane, Flight, Passenger, Reservation, Seat, SeatLayout, SeatType, SeatLayoutPosition, FlightHistory, Ticket, FlightSeat, FlightSeatCounter, SyncCheckpoint
 
 class BaseRepository:
     """
@@ -43,6 +47,32 @@ class BaseRepository:
         """
         return self.model.objects.create(**data)
 
+    def bulk_create(self, objs, batch_size=None, ignore_conflicts=False):
+        """
+        Inserta múltiples objetos en lotes.
+
+        Parámetros:
+            objs (list): Instancias del modelo aún no guardadas.
+            batch_size (int): Cantidad máxima de filas por INSERT (opcional).
+            ignore_conflicts (bool): Si es True, omite las filas que violen restricciones de unicidad.
+
+        Retorna:
+            list: Instancias creadas.
+        """
+        return self.model.objects.bulk_create(objs, batch_size=batch_size, ignore_conflicts=ignore_conflicts)
+
+    def in_bulk(self, pks):
+        """
+        Obtiene varios objetos por clave primaria en una sola consulta.
+
+        Parámetros:
+            pks (iterable): Claves primarias.
+
+        Retorna:
+            dict: Mapa {pk: instancia}; las claves inexistentes se omiten.
+        """
+        return self.model.objects.in_bulk(list(pks))
+
     def update(self, pk, data):
         """
         Actualiza un objeto existente con los datos proporcionados.
@@ -82,6 +112,18 @@ class AirplaneRepository(BaseRepository):
     """
     model = Airplane
 
+    def filter_by_seat_layout(self, seat_layout):
+        """
+        Filtra los aviones que usan un layout de asientos.
+
+        Parámetros:
+            seat_layout (SeatLayout): Instancia del layout.
+
+        Retorna:
+            QuerySet: Aviones del layout, ordenados por ID.
+        """
+        return self.model.objects.filter(seat_layout=seat_layout).order_by('pk')
+
 class FlightRepository(BaseRepository):
     """
     Repositorio para gestionar operaciones de vuelos.
@@ -90,6 +132,165 @@ class FlightRepository(BaseRepository):
     """
     model = Flight
 
+    def increment_inventory_version(self, flight):
+        """
+        Incrementa la versión del inventario de un vuelo.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+        """
+        self.increment_inventory_versions([flight.pk])
+
+    def increment_inventory_versions(self, flight_ids):
+        """
+        Incrementa la versión del inventario de varios vuelos en una sola sentencia.
+
+        Parámetros:
+            flight_ids (iterable): IDs de los vuelos.
+        """
+        self.model.objects.filter(pk__in=list(flight_ids)).update(inventory_version=F('inventory_version') + 1)
+
+    def record_inventory_change(self, flight, transitions=()):
+        """
+        Incrementa la versión del inventario de un vuelo y actualiza sus contadores.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+            transitions (iterable): Tuplas (seat_type_id, estado anterior, estado nuevo).
+        """
+        self.model.record_inventory_change(flight.pk, transitions)
+
+    def record_inventory_changes(self, transitions_by_flight):
+        """
+        Aplica cambios de inventario de varios vuelos.
+
+        Parámetros:
+            transitions_by_flight (dict): Mapa {flight_id: lista de transiciones}.
+        """
+        for flight_id, transitions in transitions_by_flight.items():
+            self.model.record_inventory_change(flight_id, transitions)
+
+    def filter_with_inventory_by_airplane(self, airplane):
+        """
+        Filtra los vuelos de un avión que ya tienen su inventario de asientos materializado.
+
+        Parámetros:
+            airplane (Airplane): Instancia del avión.
+
+        Retorna:
+            QuerySet: Vuelos del avión con inventario, ordenados por ID.
+        """
+        return self.model.objects.filter(
+            Exists(FlightSeat.objects.filter(flight=OuterRef('pk'))), airplane=airplane,
+        ).order_by('pk')
+
+    def set_seat_counters(self, flight, total, held, reserved, sold):
+        """
+        Reemplaza los contadores de asientos de un vuelo.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+            total (int): Asientos del inventario.
+            held (int): Asientos retenidos.
+            reserved (int): Asientos reservados.
+            sold (int): Asientos vendidos.
+        """
+        self.model.objects.filter(pk=flight.pk).update(
+            seats_total=total, seats_held=held, seats_reserved=reserved, seats_sold=sold
+        )
+
+    def search(self, origin=None, destination=None, departure_from=None, departure_to=None, status=None, min_available=None):
+        """
+        Busca vuelos por ruta, ventana de salida, estado y asientos disponibles.
+
+        Los filtros de ruta y estado son exactos para que las consultas usen los
+        índices compuestos (origin, destination, departure_date) y
+        (status, departure_date).
+
+        Parámetros:
+            origin (str, optional): Origen exacto.
+            destination (str, optional): Destino exacto.
+            departure_from (datetime, optional): Salida a partir de este instante (inclusive).
+            departure_to (datetime, optional): Salida antes de este instante (exclusivo).
+            status (str, optional): Estado exacto del vuelo.
+            min_available (int, optional): Mínimo de asientos disponibles; si se indica,
+                los vuelos se anotan con `available_seats`.
+
+        Retorna:
+            QuerySet: Vuelos ordenados por salida, con el avión relacionado.
+        """
+        filters = {}
+        if origin:
+            filters['origin'] = origin
+        if destination:
+            filters['destination'] = destination
+        if departure_from:
+            filters['departure_date__gte'] = departure_from
+        if departure_to:
+            filters['departure_date__lt'] = departure_to
+        if status:
+            filters['status'] = status
+        queryset = self.model.objects.filter(**filters).select_related('airplane')
+        if min_available:
+            queryset = queryset.annotate(
+                available_seats=self.available_seats_expression(),
+            ).filter(available_seats__gte=min_available)
+        return queryset.order_by('departure_date', 'id')
+
+    def departed_between(self, start, end, after=None, limit=500):
+        """
+        Obtiene por lotes los vuelos que salieron en una ventana, en orden de salida.
+
+        Recorre el índice (departure_date, id) por keyset, de modo que cada lote
+        continúa donde terminó el anterior sin OFFSET.
+
+        Parámetros:
+            start (datetime | None): Salida a partir de este instante (inclusive); None sin límite.
+            end (datetime): Salida hasta este instante (inclusive).
+            after (tuple, optional): (departure_date, id) del último vuelo del lote anterior.
+            limit (int): Tamaño del lote.
+
+        Retorna:
+            list: Tuplas (id, departure_date) ordenadas por salida e ID.
+        """
+        queryset = self.model.objects.filter(departure_date__lte=end)
+        if start is not None:
+            queryset = queryset.filter(departure_date__gte=start)
+        if after is not None:
+            departure_date, flight_id = after
+            queryset = queryset.filter(
+                Q(departure_date__gt=departure_date) | Q(departure_date=departure_date, id__gt=flight_id)
+            )
+        return list(queryset.order_by('departure_date', 'id').values_list('id', 'departure_date')[:limit])
+
+    def available_seats_expression(self):
+        """
+        Expresión con la cantidad de asientos disponibles de cada vuelo.
+
+        Usa los contadores desnormalizados del vuelo (seats_total menos
+        retenidos, reservados y vendidos), sin recorrer el inventario; las
+        retenciones vencidas cuentan como retenidas hasta que
+        release_expired_holds las libera. Para vuelos cuyo inventario aún no se
+        materializó, usa los asientos del avión menos las reservas activas.
+
+        Retorna:
+            Expression: Expresión entera para anotar un queryset de Flight.
+        """
+        def count(queryset, group_by):
+            return Coalesce(Subquery(
+                queryset.order_by().values(group_by).annotate(total=Count('pk')).values('total'),
+                output_field=IntegerField(),
+            ), Value(0))
+
+        return Case(
+            When(seats_total__gt=0, then=F('seats_total') - F('seats_held') - F('seats_reserved') - F('seats_sold')),
+            default=(
+                count(Seat.objects.filter(airplane=OuterRef('airplane')), 'airplane')
+                - count(Reservation.objects.filter(flight=OuterRef('pk')).exclude(status='CAN'), 'flight')
+            ),
+            output_field=IntegerField(),
+        )
+
 class PassengerRepository(BaseRepository):
     """
     Repositorio para gestionar operaciones de pasajeros.
@@ -98,9 +299,27 @@ class PassengerRepository(BaseRepository):
     """
     model = Passenger
 
+    def get_by_email(self, email):
+        """
+        Obtiene un pasajero por email sin distinguir mayúsculas (restricción única sobre LOWER(email)).
+
+        Parámetros:
+            email (str): Email del pasajero.
+
+        Retorna:
+            Passenger | None: Instancia, o None si no existe.
+        """
+        return (
+            self.model.objects.alias(email_lower=Lower('email')).filter(email_lower=email.lower())
+            .order_by('pk').first()
+        )
+
     def get_or_create_passenger(self, email, defaults):
         """
-        Obtiene o crea un pasajero basado en el email.
+        Obtiene o crea un pasajero basado en el email, sin distinguir mayúsculas.
+
+        Si otra solicitud crea el mismo pasajero entre la búsqueda y el INSERT,
+        la violación de unicidad se resuelve releyendo el pasajero existente.
 
         Parámetros:
             email (str): Email del pasajero.
@@ -108,8 +327,21 @@ class PassengerRepository(BaseRepository):
 
         Retorna:
             tuple: (Passenger, bool) - Instancia y si fue creado.
+
+        Raises:
+            IntegrityError: Si la creación viola otra restricción (por ejemplo, el número de documento).
         """
-        return self.model.objects.get_or_create(email=email, defaults=defaults)
+        passenger = self.get_by_email(email)
+        if passenger is not None:
+            return passenger, False
+        try:
+            with transaction.atomic():
+                return self.model.objects.create(email=email, **defaults), True
+        except IntegrityError:
+            passenger = self.get_by_email(email)
+            if passenger is None:
+                raise
+            return passenger, False
 
 class ReservationRepository(BaseRepository):
     """
@@ -145,6 +377,110 @@ class ReservationRepository(BaseRepository):
         """
         return self.model.objects.filter(flight=flight).select_related('passenger', 'seat')
 
+    def get_manifest(self, flight=None, departure_from=None, departure_to=None):
+        """
+        Obtiene las reservas no canceladas que forman el manifiesto de pasajeros.
+
+        El vuelo, el pasajero y el asiento con su tipo se traen en la misma
+        consulta, de modo que la exportación no consulta la base por fila.
+
+        Parámetros:
+            flight (Flight, optional): Vuelo del manifiesto.
+            departure_from (datetime, optional): Salida mínima (inclusive) de los vuelos.
+            departure_to (datetime, optional): Salida máxima (exclusiva) de los vuelos.
+
+        Retorna:
+            QuerySet: Reservas ordenadas por salida del vuelo, vuelo y apellido y nombre del pasajero.
+        """
+        queryset = self.model.objects.exclude(status='CAN')
+        if flight is not None:
+            queryset = queryset.filter(flight=flight)
+        if departure_from is not None:
+            queryset = queryset.filter(flight__departure_date__gte=departure_from)
+        if departure_to is not None:
+            queryset = queryset.filter(flight__departure_date__lt=departure_to)
+        return queryset.select_related('flight', 'passenger', 'seat', 'seat__seat_type').order_by(
+            'flight__departure_date', 'flight_id', 'passenger__last_name', 'passenger__first_name', 'id',
+        )
+
+    def get_active_seat_statuses(self, flight):
+        """
+        Obtiene el estado de las reservas activas de un vuelo por asiento.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+
+        Retorna:
+            dict: Mapa {seat_id: estado de la reserva} de reservas no canceladas.
+        """
+        return dict(
+            self.model.objects.filter(flight=flight, status__in=['PEN', 'CON', 'PAID']).values_list('seat_id', 'status')
+        )
+
+    def get_seat_reservation_states(self, airplane):
+        """
+        Obtiene los asientos de un avión que tienen alguna reserva, en cualquier vuelo.
+
+        Parámetros:
+            airplane (Airplane): Instancia del avión.
+
+        Retorna:
+            dict: Mapa {seat_id: True si alguna de sus reservas no está cancelada}.
+        """
+        rows = (
+            self.model.objects.filter(seat__airplane=airplane).values('seat_id')
+            .annotate(active=Count('id', filter=~Q(status='CAN'))).values_list('seat_id', 'active')
+        )
+        return {seat_id: active > 0 for seat_id, active in rows}
+
+    def get_passenger_ids_with_active_reservation(self, flight, passenger_ids):
+        """
+        Obtiene los pasajeros que ya tienen una reserva activa en un vuelo.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+            passenger_ids (iterable): IDs de pasajeros a comprobar.
+
+        Retorna:
+            set: IDs de pasajeros con una reserva no cancelada en el vuelo.
+        """
+        return set(
+            self.model.objects.filter(flight=flight, passenger_id__in=list(passenger_ids))
+            .exclude(status='CAN').values_list('passenger_id', flat=True)
+        )
+
+    def filter_ticketable_without_ticket(self, flight):
+        """
+        Filtra las reservas confirmadas o pagadas de un vuelo que aún no tienen ticket.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+
+        Retorna:
+            QuerySet: Reservas listas para emitir su ticket.
+        """
+        return self.model.objects.filter(flight=flight, status__in=['CON', 'PAID'], ticket__isnull=True)
+
+    def get_completed_without_history(self, flight_ids):
+        """
+        Obtiene las reservas completadas de unos vuelos que aún no tienen entrada de historial.
+
+        Una reserva está completada si está pagada o si está confirmada y su
+        ticket se usó para embarcar.
+
+        Parámetros:
+            flight_ids (list): IDs de los vuelos.
+
+        Retorna:
+            list: Tuplas (id, passenger_id, flight_id, número de asiento, precio, fecha de reserva).
+        """
+        return list(
+            self.model.objects.filter(flight_id__in=flight_ids, history_entry__isnull=True)
+            .filter(Q(status='PAID') | Q(status='CON', ticket__status='USED'))
+            .order_by('id')
+            .values_list('id', 'passenger_id', 'flight_id', 'seat__number', 'price', 'reservation_date')
+        )
+
 class SeatRepository(BaseRepository):
     """
     Repositorio para gestionar operaciones de asientos.
@@ -165,6 +501,394 @@ class SeatRepository(BaseRepository):
         """
         return self.model.objects.filter(airplane=airplane).order_by('row', 'column')
 
+    def filter_available_for_flight(self, flight):
+        """
+        Filtra los asientos disponibles de un vuelo según su inventario.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+
+        Retorna:
+            QuerySet: Asientos disponibles (incluidas retenciones vencidas) ordenados por fila y columna.
+        """
+        return self.model.objects.filter(
+            Q(flight_inventory__status='AVL')
+            | Q(flight_inventory__status='HLD', flight_inventory__hold_expires_at__lte=timezone.now()),
+            flight_inventory__flight=flight,
+        ).order_by('row', 'column')
+
+    def get_grid_rows(self, airplane_id):
+        """
+        Obtiene la geometría y el tipo de los asientos de un avión en una sola consulta.
+
+        Parámetros:
+            airplane_id (int): ID del avión.
+
+        Retorna:
+            QuerySet: Tuplas (id, number, row, column, código de tipo) ordenadas por fila y columna.
+        """
+        return self.model.objects.filter(airplane_id=airplane_id).order_by('row', 'column').values_list(
+            'id', 'number', 'row', 'column', 'seat_type__code'
+        )
+
+    def get_ids_by_airplane(self, airplane_id):
+        """
+        Obtiene los IDs de los asientos de un avión.
+
+        Parámetros:
+            airplane_id (int): ID del avión.
+
+        Retorna:
+            QuerySet: IDs de los asientos.
+        """
+        return self.model.objects.filter(airplane_id=airplane_id).values_list('id', flat=True)
+
+    def get_positions_by_airplane(self, airplane):
+        """
+        Obtiene la posición y el tipo de los asientos de un avión en una sola consulta.
+
+        Parámetros:
+            airplane (Airplane): Instancia del avión.
+
+        Retorna:
+            list: Tuplas (id, fila, columna, seat_type_id) ordenadas por ID.
+        """
+        return list(
+            self.model.objects.filter(airplane=airplane).order_by('pk').values_list('id', 'row', 'column', 'seat_type_id')
+        )
+
+    def set_seat_types(self, seat_types):
+        """
+        Cambia el tipo de varios asientos con una sentencia por tipo de destino.
+
+        Los asientos que tienen una reserva activa se omiten en la propia
+        sentencia, aunque la reserva se haya creado después de calcular los cambios.
+
+        Parámetros:
+            seat_types (dict): Mapa {seat_id: seat_type_id}.
+
+        Retorna:
+            int: Cantidad de asientos actualizados.
+        """
+        by_type = {}
+        for seat_id, seat_type_id in seat_types.items():
+            by_type.setdefault(seat_type_id, []).append(seat_id)
+        active = Reservation.objects.filter(seat=OuterRef('pk')).exclude(status='CAN')
+        return sum(
+            self.model.objects.filter(~Exists(active), pk__in=seat_ids).update(seat_type_id=seat_type_id)
+            for seat_type_id, seat_ids in by_type.items()
+        )
+
+    def delete_unreserved(self, seat_ids):
+        """
+        Elimina varios asientos que no tienen reservas.
+
+        Los asientos con alguna reserva se omiten en la propia sentencia, para
+        no borrar reservas en cascada.
+
+        Parámetros:
+            seat_ids (iterable): IDs de los asientos.
+
+        Retorna:
+            int: Cantidad de asientos eliminados.
+        """
+        reservations = Reservation.objects.filter(seat=OuterRef('pk'))
+        deleted = self.model.objects.filter(~Exists(reservations), pk__in=list(seat_ids)).delete()[1]
+        return deleted.get(self.model._meta.label, 0)
+
+class FlightSeatRepository(BaseRepository):
+    """
+    Repositorio para gestionar el inventario de asientos por vuelo.
+
+    Hereda operaciones CRUD básicas y añade consultas indexadas por vuelo.
+    """
+    model = FlightSeat
+
+    def filter_by_flight_with_seats(self, flight):
+        """
+        Filtra el inventario de un vuelo junto con sus asientos.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+
+        Retorna:
+            QuerySet: Inventario del vuelo con asiento relacionado, ordenado por fila y columna.
+        """
+        return self.model.objects.filter(flight=flight).select_related('seat').order_by('seat__row', 'seat__column')
+
+    def get_availability_rows(self, flight):
+        """
+        Obtiene en una sola consulta el estado de todos los asientos de un vuelo.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+
+        Retorna:
+            QuerySet: Tuplas (seat_id, number, row, column, código de tipo, estado efectivo) ordenadas
+            por fila y columna; las retenciones vencidas se leen como 'AVL'.
+        """
+        return self.model.objects.filter(flight=flight).annotate(
+            current_status=FlightSeat.current_status(timezone.now())
+        ).order_by('seat__row', 'seat__column').values_list(
+            'seat_id', 'seat__number', 'seat__row', 'seat__column', 'seat__seat_type__code', 'current_status'
+        )
+
+    def get_status_rows(self, flight):
+        """
+        Obtiene el estado efectivo de cada asiento de un vuelo, sin unir otras tablas.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+
+        Retorna:
+            QuerySet: Tuplas (seat_id, estado efectivo); las retenciones vencidas se leen como 'AVL'.
+        """
+        return self.model.objects.filter(flight=flight).annotate(
+            current_status=FlightSeat.current_status(timezone.now())
+        ).values_list('seat_id', 'current_status')
+
+    def exists_for_flight(self, flight):
+        """
+        Indica si el inventario de un vuelo ya fue materializado.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+
+        Retorna:
+            bool: True si el vuelo tiene filas de inventario.
+        """
+        return self.model.objects.filter(flight=flight).exists()
+
+    def get_next_hold_expiry(self, flight, now):
+        """
+        Retorna el vencimiento más próximo de las retenciones vigentes de un vuelo.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+            now (datetime): Instante de referencia.
+
+        Retorna:
+            datetime: Vencimiento más próximo posterior a `now`, o None si no hay retenciones vigentes.
+        """
+        return self.model.objects.filter(
+            flight=flight, status='HLD', hold_expires_at__gt=now
+        ).order_by('hold_expires_at').values_list('hold_expires_at', flat=True).first()
+
+    def get_status(self, flight, seat, passenger=None):
+        """
+        Obtiene el estado efectivo de un asiento en un vuelo con una búsqueda por clave única.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+            seat (Seat): Instancia del asiento.
+            passenger (Passenger, optional): Pasajero cuya propia retención cuenta como disponible.
+
+        Retorna:
+            str: Estado de inventario ('AVL' si puede tomarse), o None si el asiento no tiene fila de inventario.
+        """
+        passenger_ids = [passenger.pk] if passenger else []
+        return self.model.objects.filter(flight=flight, seat=seat).annotate(
+            current_status=FlightSeat.current_status(timezone.now(), passenger_ids)
+        ).values_list('current_status', flat=True).first()
+
+    def claim(self, flight, seat, status, passenger=None):
+        """
+        Marca un asiento disponible con un nuevo estado (compare-and-set).
+
+        El UPDATE solo afecta a la fila si sigue disponible (o retenida por el
+        mismo pasajero), por lo que entre dos compradores concurrentes exactamente
+        uno obtiene la fila. Primero se intenta sobre la fila libre y luego sobre
+        la retenida, para conocer el estado anterior sin leerlo aparte.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+            seat (Seat): Instancia del asiento.
+            status (str): Estado de inventario a asignar.
+            passenger (Passenger, optional): Pasajero cuya retención sobre el asiento se respeta.
+
+        Retorna:
+            str: Estado anterior del asiento ('AVL' o 'HLD'), o None si no estaba disponible.
+        """
+        passenger_ids = [passenger.pk] if passenger else []
+        return self._compare_and_set(
+            FlightSeat.claimable(timezone.now(), passenger_ids), flight, seat,
+            status=status, hold_passenger=None, hold_expires_at=None,
+        )
+
+    def hold(self, flight, seat, passenger, expires_at):
+        """
+        Retiene un asiento para un pasajero hasta `expires_at` si puede tomarse.
+
+        Si el pasajero ya retenía el asiento, la retención se renueva.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+            seat (Seat): Instancia del asiento.
+            passenger (Passenger): Pasajero que retiene el asiento.
+            expires_at (datetime): Vencimiento de la retención.
+
+        Retorna:
+            str: Estado anterior del asiento ('AVL' o 'HLD'), o None si no pudo retenerse.
+        """
+        return self._compare_and_set(
+            FlightSeat.claimable(timezone.now(), [passenger.pk]), flight, seat,
+            status='HLD', hold_passenger=passenger, hold_expires_at=expires_at,
+        )
+
+    def _compare_and_set(self, condition, flight, seat, **values):
+        rows = self.model.objects.filter(flight=flight, seat=seat)
+        if rows.filter(status='AVL').update(**values) == 1:
+            return 'AVL'
+        if rows.filter(condition, status='HLD').update(**values) == 1:
+            return 'HLD'
+        return None
+
+    def release_passenger_holds(self, flight, passenger, keep_seat):
+        """
+        Libera las retenciones de un pasajero en un vuelo, salvo la del asiento indicado.
+
+        Debe llamarse dentro de una transacción.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+            passenger (Passenger): Pasajero que retiene los asientos.
+            keep_seat (Seat): Asiento cuya retención se conserva.
+
+        Retorna:
+            list: Transiciones (seat_type_id, 'HLD', 'AVL') de las filas liberadas, para los contadores.
+        """
+        held = list(
+            self.model.objects.select_for_update(of=('self',))
+            .filter(flight=flight, status='HLD', hold_passenger=passenger).exclude(seat=keep_seat)
+            .values_list('pk', 'seat__seat_type_id')
+        )
+        self.model.objects.filter(pk__in=[pk for pk, _ in held]).update(
+            status='AVL', hold_passenger=None, hold_expires_at=None
+        )
+        return [(seat_type_id, 'HLD', 'AVL') for _, seat_type_id in held]
+
+    def release_expired_holds(self, now):
+        """
+        Libera las retenciones vencidas.
+
+        Las filas se bloquean y leen antes del UPDATE para informar, por vuelo,
+        los cambios de estado que deben aplicarse a sus contadores. Debe
+        llamarse dentro de una transacción.
+
+        Parámetros:
+            now (datetime): Instante de referencia para el vencimiento.
+
+        Retorna:
+            tuple: (int, dict) - Cantidad de filas liberadas y mapa {flight_id: transiciones}.
+        """
+        expired = list(
+            self.model.objects.select_for_update(of=('self',)).filter(status='HLD', hold_expires_at__lte=now)
+            .values_list('pk', 'flight_id', 'seat__seat_type_id')
+        )
+        released = self.model.objects.filter(pk__in=[pk for pk, _, _ in expired]).update(
+            status='AVL', hold_passenger=None, hold_expires_at=None
+        )
+        transitions = {}
+        for _, flight_id, seat_type_id in expired:
+            transitions.setdefault(flight_id, []).append((seat_type_id, 'HLD', 'AVL'))
+        return released, transitions
+
+    def lock_statuses(self, flight, seat_ids, passenger_ids=()):
+        """
+        Bloquea las filas de inventario de varios asientos y retorna su estado efectivo.
+
+        Usa SELECT ... FOR UPDATE (sin efecto en SQLite), por lo que debe
+        llamarse dentro de una transacción.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+            seat_ids (iterable): IDs de los asientos.
+            passenger_ids (iterable): Pasajeros cuyas retenciones cuentan como disponibles.
+
+        Retorna:
+            dict: Mapa {seat_id: estado de inventario}; 'AVL' si el asiento puede tomarse.
+        """
+        return dict(
+            self.model.objects.select_for_update().filter(flight=flight, seat_id__in=list(seat_ids))
+            .annotate(current_status=FlightSeat.current_status(timezone.now(), passenger_ids))
+            .values_list('seat_id', 'current_status')
+        )
+
+    def claim_many(self, flight, seat_ids, status, passenger_ids=()):
+        """
+        Marca como tomados los asientos disponibles indicados en una sola sentencia.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+            seat_ids (iterable): IDs de los asientos.
+            status (str): Estado de inventario a asignar.
+            passenger_ids (iterable): Pasajeros cuyas retenciones se respetan.
+
+        Retorna:
+            tuple: (int, list) - Cantidad de asientos tomados y sus (seat_type_id, estado anterior),
+            leídos de las filas ya bloqueadas por lock_statuses.
+        """
+        claimable = self.model.objects.filter(
+            FlightSeat.claimable(timezone.now(), passenger_ids), flight=flight, seat_id__in=list(seat_ids)
+        )
+        previous = list(claimable.values_list('seat__seat_type_id', 'status'))
+        claimed = claimable.update(status=status, hold_passenger=None, hold_expires_at=None)
+        return claimed, previous
+
+    def count_by_seat_type_and_status(self, flight):
+        """
+        Cuenta las filas de inventario de un vuelo por tipo de asiento y estado.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+
+        Retorna:
+            QuerySet: Tuplas (seat_type_id, estado, cantidad).
+        """
+        return self.model.objects.filter(flight=flight).values_list(
+            'seat__seat_type_id', 'status'
+        ).annotate(count=Count('id')).order_by()
+
+    def delete_for_flight(self, flight):
+        """
+        Elimina todo el inventario de un vuelo.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+        """
+        self.model.objects.filter(flight=flight).delete()
+
+class FlightSeatCounterRepository(BaseRepository):
+    """
+    Repositorio para gestionar los contadores de asientos por vuelo y tipo de asiento.
+
+    Hereda operaciones CRUD básicas de BaseRepository.
+    """
+    model = FlightSeatCounter
+
+    def filter_by_flight(self, flight):
+        """
+        Filtra los contadores de un vuelo.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+
+        Retorna:
+            QuerySet: Contadores del vuelo.
+        """
+        return self.model.objects.filter(flight=flight)
+
+    def replace_for_flight(self, flight, counters):
+        """
+        Reemplaza los contadores de un vuelo.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+            counters (iterable): Nuevas instancias FlightSeatCounter del vuelo.
+        """
+        self.model.objects.filter(flight=flight).delete()
+        self.model.objects.bulk_create(counters)
+
 class SeatLayoutRepository(BaseRepository):
     """
     Repositorio para gestionar operaciones de layouts de asientos.
@@ -181,6 +905,27 @@ class SeatTypeRepository(BaseRepository):
     """
     model = SeatType
 
+    def get_price_multipliers(self):
+        """
+        Obtiene el multiplicador de precio de todos los tipos de asiento en una sola consulta.
+
+        Retorna:
+            list: Tuplas (id, código, price_multiplier).
+        """
+        return list(self.model.objects.values_list('id', 'code', 'price_multiplier'))
+
+    def get_by_codes(self, codes):
+        """
+        Obtiene varios tipos de asiento por código en una sola consulta.
+
+        Parámetros:
+            codes (iterable): Códigos de tipo de asiento.
+
+        Retorna:
+            dict: Mapa {código: SeatType}; los códigos inexistentes se omiten.
+        """
+        return self.model.objects.in_bulk(list(codes), field_name='code')
+
 class SeatLayoutPositionRepository(BaseRepository):
     """
     Repositorio para gestionar operaciones de posiciones de layouts de asientos.
@@ -189,6 +934,19 @@ class SeatLayoutPositionRepository(BaseRepository):
     """
     model = SeatLayoutPosition
 
+    def get_seat_type_map(self, seat_layout):
+        """
+        Obtiene el tipo de asiento de cada posición de un layout en una sola consulta.
+
+        Parámetros:
+            seat_layout (SeatLayout): Instancia del layout.
+
+        Retorna:
+            dict: Mapa {(fila, columna): seat_type_id}.
+        """
+        positions = self.model.objects.filter(seat_layout=seat_layout).values_list('row', 'column', 'seat_type_id')
+        return {(row, column): seat_type_id for row, column, seat_type_id in positions}
+
 class FlightHistoryRepository(BaseRepository):
     """
     Repositorio para gestionar operaciones de historial de vuelos.
@@ -197,17 +955,26 @@ class FlightHistoryRepository(BaseRepository):
     """
     model = FlightHistory
 
-    def filter_by_passenger_ordered(self, passenger):
+    def filter_by_passenger_ordered(self, passenger, before=None):
         """
         Filtra historial de vuelos por pasajero ordenado por fecha descendente.
 
+        El orden (-booking_date, -id) recorre el índice flighthistory_passenger_idx
+        y el vuelo y su avión se traen en la misma consulta.
+
         Parámetros:
             passenger (Passenger): Instancia del pasajero.
+            before (tuple, optional): (booking_date, id) de la última entrada ya mostrada;
+                solo se incluyen las anteriores a ella (paginación por keyset).
 
         Retorna:
-            QuerySet: Historial ordenado por fecha de reserva.
+            QuerySet: Historial ordenado por fecha de reserva, con vuelo y avión relacionados.
         """
-        return self.model.objects.filter(passenger=passenger).order_by('-booking_date')
+        queryset = self.model.objects.filter(passenger=passenger)
+        if before is not None:
+            booking_date, entry_id = before
+            queryset = queryset.filter(Q(booking_date__lt=booking_date) | Q(booking_date=booking_date, id__lt=entry_id))
+        return queryset.select_related('flight', 'flight__airplane').order_by('-booking_date', '-id')
 
     def filter_by_flight(self, flight_id):
         """
@@ -233,6 +1000,36 @@ class FlightHistoryRepository(BaseRepository):
         """
         return self.model.objects.filter(passenger__id=passenger_id)
 
+class SyncCheckpointRepository(BaseRepository):
+    """
+    Repositorio para gestionar las marcas de agua de los procesos por lotes.
+
+    Hereda operaciones CRUD básicas y añade lectura y escritura por nombre.
+    """
+    model = SyncCheckpoint
+
+    def get_high_water_mark(self, name):
+        """
+        Obtiene la marca de agua de un proceso.
+
+        Parámetros:
+            name (str): Nombre del proceso.
+
+        Retorna:
+            datetime | None: Marca de agua, o None si el proceso nunca avanzó.
+        """
+        return self.model.objects.filter(name=name).values_list('high_water_mark', flat=True).first()
+
+    def set_high_water_mark(self, name, value):
+        """
+        Guarda la marca de agua de un proceso, creando el registro si no existe.
+
+        Parámetros:
+            name (str): Nombre del proceso.
+            value (datetime | None): Nueva marca de agua.
+        """
+        self.model.objects.update_or_create(name=name, defaults={'high_water_mark': value})
+
 class TicketRepository(BaseRepository):
     """
     Repositorio para gestionar operaciones de tickets.
@@ -253,3 +1050,22 @@ class TicketRepository(BaseRepository):
             tuple: (Ticket, bool) - Instancia y si fue creado.
         """
         return self.model.objects.get_or_create(reservation=reservation, defaults=defaults)
+
+    def filter_by_flight(self, flight, statuses=None):
+        """
+        Filtra los tickets de un vuelo con los datos que muestra el ticket impreso.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+            statuses (list, optional): Estados de ticket a incluir.
+
+        Retorna:
+            QuerySet: Tickets del vuelo ordenados por asiento, con reserva, vuelo, avión,
+            pasajero y asiento relacionados.
+        """
+        queryset = self.model.objects.filter(reservation__flight=flight).select_related(
+            'reservation__flight__airplane', 'reservation__passenger', 'reservation__seat',
+        )
+        if statuses is not None:
+            queryset = queryset.filter(status__in=statuses)
+        return queryset.order_by('reservation__seat__row', 'reservation__seat__column')
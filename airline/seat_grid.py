@@ -0,0 +1,275 @@
+import sys
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .availability import SeatAvailability, SeatState
+
+
+class StaleSeatGridError(LookupError):
+    """
+    El inventario de un vuelo menciona un asiento que no está en la grilla en caché.
+    """
+
+
+class FlightSeatBits:
+    """
+    Disponibilidad de un vuelo sobre una grilla: bit i = asiento i de la grilla.
+
+    Atributos:
+        present (int): Máscara de los asientos con inventario en el vuelo.
+        available (int): Máscara de los asientos disponibles.
+        statuses (dict): Mapa {índice: estado} de los asientos con inventario no disponibles.
+    """
+    __slots__ = ('present', 'available', 'statuses')
+
+    def __init__(self, present, available, statuses):
+        self.present = present
+        self.available = available
+        self.statuses = statuses
+
+
+class SeatGrid:
+    """
+    Geometría y tipos de asiento de un avión en arreglos compactos.
+
+    Los asientos se guardan en orden de fila y columna. `row_offsets[r]` es el
+    índice del primer asiento de la fila `row_numbers[r]` y `row_offsets[-1]`
+    la cantidad de asientos. Los tipos se guardan como índices sobre
+    `type_codes`. El número de asiento solo se guarda si alguno no es fila +
+    columna, y el índice de cada ID solo si los IDs no son consecutivos.
+
+    Atributos:
+        airplane_id (int): ID del avión.
+        row_numbers (array): Número de cada fila con asientos.
+        row_offsets (array): Índice del primer asiento de cada fila, más el total.
+        seat_ids (array): ID de cada asiento.
+        columns (str | tuple): Columna de cada asiento (una cadena si todas tienen una letra).
+        type_codes (tuple): Códigos de tipo de asiento distintos (None si no tiene tipo).
+        seat_types (array): Índice en `type_codes` del tipo de cada asiento.
+        numbers (tuple): Número de cada asiento, o None si siempre es fila + columna.
+    """
+    __slots__ = (
+        'airplane_id', 'row_numbers', 'row_offsets', 'seat_ids', 'columns', 'type_codes', 'seat_types', 'numbers',
+        '_first_id', '_index',
+    )
+
+    def __init__(self, airplane_id, rows):
+        """
+        Construye la grilla.
+
+        Parámetros:
+            airplane_id (int): ID del avión.
+            rows (iterable): Tuplas (seat_id, number, row, column, código de tipo) ordenadas por fila y columna.
+        """
+        self.airplane_id = airplane_id
+        self.row_numbers = array('i')
+        self.row_offsets = array('I')
+        self.seat_ids = array('q')
+        self.seat_types = array('H')
+        columns, numbers, palette = [], [], {}
+        custom_numbers = False
+        for seat_id, number, row, column, seat_type in rows:
+            if not self.row_numbers or self.row_numbers[-1] != row:
+                self.row_numbers.append(row)
+                self.row_offsets.append(len(self.seat_ids))
+            self.seat_ids.append(seat_id)
+            self.seat_types.append(palette.setdefault(seat_type, len(palette)))
+            columns.append(column)
+            numbers.append(number)
+            custom_numbers = custom_numbers or number != f'{row}{column}'
+        self.row_offsets.append(len(self.seat_ids))
+        self.columns = ''.join(columns) if all(len(column) == 1 for column in columns) else tuple(columns)
+        self.type_codes = tuple(palette)
+        self.numbers = tuple(numbers) if custom_numbers else None
+        first = self.seat_ids[0] if self.seat_ids else 0
+        if all(seat_id == first + index for index, seat_id in enumerate(self.seat_ids)):
+            self._first_id, self._index = first, None
+        else:
+            self._first_id, self._index = None, {seat_id: index for index, seat_id in enumerate(self.seat_ids)}
+
+    def __len__(self):
+        return len(self.seat_ids)
+
+    def index_of(self, seat_id):
+        """
+        Retorna la posición de un asiento en la grilla, o None si no está.
+        """
+        if self._index is not None:
+            return self._index.get(seat_id)
+        index = seat_id - self._first_id
+        return index if 0 <= index < len(self.seat_ids) else None
+
+    def overlay(self, statuses):
+        """
+        Construye la disponibilidad de un vuelo sobre la grilla.
+
+        Parámetros:
+            statuses (iterable): Tuplas (seat_id, estado efectivo) del inventario del vuelo.
+
+        Retorna:
+            FlightSeatBits: Máscaras de presencia y disponibilidad.
+
+        Raises:
+            StaleSeatGridError: Si el inventario tiene un asiento que no está en la grilla.
+        """
+        present = available = 0
+        unavailable = {}
+        for seat_id, status in statuses:
+            index = self.index_of(seat_id)
+            if index is None:
+                raise StaleSeatGridError(seat_id)
+            present |= 1 << index
+            if status == 'AVL':
+                available |= 1 << index
+            else:
+                unavailable[index] = status
+        return FlightSeatBits(present, available, unavailable)
+
+    def by_row(self, bits):
+        """
+        Agrupa por fila los asientos con inventario en el vuelo.
+
+        Parámetros:
+            bits (FlightSeatBits): Resultado de overlay.
+
+        Retorna:
+            dict: Mapa {fila: [SeatState, ...]} ordenado por fila y columna.
+        """
+        # One pass over the mask as text instead of a shift per seat.
+        present = format(bits.present, f'0{len(self.seat_ids)}b')[::-1]
+        seat_ids, columns, numbers, offsets = self.seat_ids, self.columns, self.numbers, self.row_offsets
+        codes = [self.type_codes[index] for index in self.seat_types]
+        statuses = bits.statuses
+        rows = {}
+        for position, row in enumerate(self.row_numbers):
+            seats = [
+                SeatState(
+                    seat_ids[index],
+                    numbers[index] if numbers is not None else f'{row}{columns[index]}',
+                    row,
+                    columns[index],
+                    codes[index],
+                    statuses.get(index, 'AVL'),
+                )
+                for index in range(offsets[position], offsets[position + 1])
+                if present[index] == '1'
+            ]
+            if seats:
+                rows[row] = seats
+        return rows
+
+    def availability(self, flight_id, bits):
+        """
+        Construye la instantánea de disponibilidad de un vuelo.
+
+        Parámetros:
+            flight_id (int): ID del vuelo.
+            bits (FlightSeatBits): Resultado de overlay.
+
+        Retorna:
+            SeatAvailability: Instantánea de disponibilidad.
+        """
+        return SeatAvailability(
+            flight_id=flight_id, seats=tuple(seat for seats in self.by_row(bits).values() for seat in seats),
+        )
+
+    def memory_size(self):
+        """
+        Bytes que ocupa la grilla: los arreglos, las tuplas y sus cadenas.
+        """
+        size = sys.getsizeof(self) + sum(
+            sys.getsizeof(value) for value in (
+                self.row_numbers, self.row_offsets, self.seat_ids, self.columns, self.type_codes, self.seat_types,
+            )
+        )
+        size += sum(sys.getsizeof(code) for code in self.type_codes if code is not None)
+        if isinstance(self.columns, tuple):
+            size += sum(sys.getsizeof(column) for column in self.columns)
+        if self.numbers is not None:
+            size += sys.getsizeof(self.numbers) + sum(sys.getsizeof(number) for number in self.numbers)
+        if self._index is not None:
+            size += sys.getsizeof(self._index)
+        return size
+
+
+class SeatGridCache:
+    """
+    Caché en memoria del proceso de las grillas de asientos por avión.
+
+    Las señales de Airplane, Seat, SeatLayoutPosition y SeatType invalidan las
+    entradas en el proceso que hace el cambio; SEAT_GRID_CACHE_TIMEOUT acota la
+    vida de las que cambian en otro proceso o por otras vías (por ejemplo,
+    QuerySet.update). Guarda como máximo SEAT_GRID_CACHE_SIZE aviones y
+    descarta primero los menos usados.
+    """
+
+    def __init__(self, max_entries=None, timeout=None):
+        """
+        Inicializa la caché.
+
+        Parámetros:
+            max_entries (int, optional): Máximo de aviones. Por defecto SEAT_GRID_CACHE_SIZE.
+            timeout (int, optional): Segundos de vida de cada grilla. Por defecto SEAT_GRID_CACHE_TIMEOUT.
+        """
+        self._max_entries = max_entries
+        self._timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def max_entries(self):
+        return self._max_entries if self._max_entries is not None else getattr(settings, 'SEAT_GRID_CACHE_SIZE', 256)
+
+    @property
+    def timeout(self):
+        return self._timeout if self._timeout is not None else getattr(settings, 'SEAT_GRID_CACHE_TIMEOUT', 300)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, airplane_id, builder):
+        """
+        Obtiene la grilla de un avión o la construye y la guarda.
+
+        Parámetros:
+            airplane_id (int): ID del avión.
+            builder (callable): Función sin argumentos que construye la grilla.
+
+        Retorna:
+            SeatGrid: Grilla del avión.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(airplane_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(airplane_id)
+                return entry[1]
+        grid = builder()
+        with self._lock:
+            self._entries[airplane_id] = (now + self.timeout, grid)
+            self._entries.move_to_end(airplane_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return grid
+
+    def invalidate(self, *airplane_ids):
+        """
+        Elimina de la caché las grillas de los aviones indicados.
+        """
+        with self._lock:
+            for airplane_id in airplane_ids:
+                self._entries.pop(airplane_id, None)
+
+    def clear(self):
+        """
+        Elimina todas las grillas.
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+seat_grid_cache = SeatGridCache()
@@ -0,0 +1,162 @@
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+
+from .pricing import days_to_departure, departure_curve, load_factor_curve
+from .repositories import FlightSeatRepository
+
+
+class SeatMapCache:
+    """
+    Caché de instantáneas del mapa de asientos por vuelo.
+
+    Las entradas se indexan por ID de vuelo y versión de inventario
+    (Flight.inventory_version), por lo que un cambio en las reservas invalida
+    la instantánea sin necesidad de borrarla explícitamente. Una retención que
+    vence no cambia la versión hasta que release_expired_holds la libera, por
+    lo que el vencimiento más próximo también forma parte de la clave. Las
+    instantáneas llevan tarifas, por lo que la clave incluye además una
+    versión de tarifas (que cambia al guardar o eliminar un SeatType), las
+    curvas de precio configuradas y el escalón de días hasta la salida. El
+    backend se configura con CACHES y SEAT_MAP_CACHE_ALIAS.
+
+    Atributos:
+        key_prefix (str): Prefijo de las claves almacenadas.
+    """
+    key_prefix = 'seatmap'
+
+    def __init__(self, alias=None, timeout=None):
+        """
+        Inicializa la caché.
+
+        Parámetros:
+            alias (str, optional): Alias del backend en CACHES. Por defecto SEAT_MAP_CACHE_ALIAS.
+            timeout (int, optional): Segundos de vida de cada instantánea. Por defecto SEAT_MAP_CACHE_TIMEOUT.
+        """
+        self.alias = alias or getattr(settings, 'SEAT_MAP_CACHE_ALIAS', 'default')
+        self.timeout = timeout if timeout is not None else getattr(settings, 'SEAT_MAP_CACHE_TIMEOUT', 300)
+        self.flight_seat_repo = FlightSeatRepository()
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def version_token(self, flight):
+        """
+        Construye el identificador de versión de la instantánea de un vuelo.
+
+        Combina la versión del inventario con un resumen de los campos del vuelo
+        que se muestran junto al mapa, de modo que editar el vuelo también
+        invalida la instantánea, con el vencimiento de la retención vigente más
+        próxima, de modo que la instantánea cambia en cuanto esa retención vence,
+        y con lo que determina las tarifas: la versión de tarifas, las curvas y el
+        escalón de días hasta la salida.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+
+        Retorna:
+            str: Token de versión.
+        """
+        curve = departure_curve()
+        fields = '|'.join(str(value) for value in (
+            flight.origin, flight.destination, flight.departure_date, flight.arrival_date,
+            flight.base_price, flight.status, flight.airplane_id, self._next_hold_expiry(flight),
+            self.pricing_version(), load_factor_curve().steps, curve.steps,
+            curve.step_for(days_to_departure(flight.departure_date, timezone.now())),
+        ))
+        digest = hashlib.md5(fields.encode('utf-8'), usedforsecurity=False).hexdigest()[:12]
+        return f'{flight.pk}-{flight.inventory_version}-{digest}'
+
+    def pricing_version(self):
+        """
+        Retorna la versión de tarifas vigente, creándola si la caché no la tiene.
+
+        Es un valor aleatorio en lugar de un contador, para que una versión
+        perdida por desalojo nunca repita una anterior.
+        """
+        key = f'{self.key_prefix}:pricing_version'
+        version = self.cache.get(key)
+        if version is None:
+            self.cache.add(key, uuid.uuid4().hex[:12], None)
+            version = self.cache.get(key)
+        return version
+
+    def bump_pricing_version(self):
+        """
+        Cambia la versión de tarifas, invalidando todas las instantáneas y tablas de tarifas.
+        """
+        self.cache.set(f'{self.key_prefix}:pricing_version', uuid.uuid4().hex[:12], None)
+
+    def _next_hold_expiry(self, flight):
+        # The held counter is on the flight row, so flights without holds skip the query.
+        if not flight.seats_held:
+            return None
+        return self.flight_seat_repo.get_next_hold_expiry(flight, timezone.now())
+
+    def etag(self, flight, vary=()):
+        """
+        Retorna el ETag (entrecomillado) de la instantánea de un vuelo.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+            vary (iterable, optional): Valores adicionales de los que depende la
+                respuesta (por ejemplo, el usuario de una página HTML).
+
+        Retorna:
+            str: ETag entrecomillado.
+        """
+        token = self.version_token(flight)
+        if vary:
+            values = '|'.join(str(value) for value in vary)
+            token += '-' + hashlib.md5(values.encode('utf-8'), usedforsecurity=False).hexdigest()[:12]
+        return quote_etag(token)
+
+    def make_key(self, flight, kind):
+        return f'{self.key_prefix}:{kind}:{self.version_token(flight)}'
+
+    def get_or_build(self, flight, kind, builder):
+        """
+        Obtiene una instantánea de la caché o la construye y la almacena.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+            kind (str): Tipo de instantánea (por ejemplo 'seat_map').
+            builder (callable): Función sin argumentos que construye la instantánea.
+
+        Retorna:
+            object: Instantánea almacenada o recién construida.
+        """
+        key = self.make_key(flight, kind)
+        snapshot = self.cache.get(key)
+        if snapshot is None:
+            snapshot = builder()
+            self.cache.set(key, snapshot, self.timeout)
+        return snapshot
+
+    def conditional_response(self, request, flight, build_response, vary=()):
+        """
+        Responde 304 si el cliente ya tiene la versión actual; si no, construye la respuesta.
+
+        Parámetros:
+            request (HttpRequest): Solicitud HTTP (se evalúa If-None-Match).
+            flight (Flight): Instancia del vuelo.
+            build_response (callable): Función sin argumentos que construye la respuesta completa.
+            vary (iterable, optional): Valores adicionales que forman parte del ETag (ver etag).
+
+        Retorna:
+            HttpResponse: Respuesta 304 o la respuesta construida, con ETag y Cache-Control.
+        """
+        etag = self.etag(flight, vary)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = build_response()
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
@@ -0,0 +1,87 @@
+from dataclasses import dataclass, field
+
+
+@dataclass
+class SeatDiff:
+    """
+    Diferencia entre los asientos de un avión y los que define su layout.
+
+    Atributos:
+        added (list): Tuplas (fila, columna, seat_type_id) de asientos a crear.
+        removed (list): IDs de asientos a eliminar.
+        retyped (dict): Mapa {seat_id: seat_type_id} de asientos a los que cambia el tipo.
+        skipped (list): IDs de asientos con reservas que se dejan como están.
+    """
+    added: list = field(default_factory=list)
+    removed: list = field(default_factory=list)
+    retyped: dict = field(default_factory=dict)
+    skipped: list = field(default_factory=list)
+
+    @property
+    def changed(self):
+        return bool(self.added or self.removed or self.retyped)
+
+    def summary(self):
+        return (
+            f'{len(self.added)} added, {len(self.removed)} removed, {len(self.retyped)} retyped, '
+            f'{len(self.skipped)} skipped'
+        )
+
+
+def layout_targets(rows, columns, seat_types):
+    """
+    Calcula los asientos que define un layout: uno por celda de la grilla.
+
+    Parámetros:
+        rows (int): Filas del layout.
+        columns (int): Columnas del layout.
+        seat_types (dict): Mapa {(fila, columna): seat_type_id} de las posiciones del layout.
+
+    Retorna:
+        dict: Mapa {(fila, columna): seat_type_id o None}, en orden de fila y columna.
+    """
+    letters = [chr(code) for code in range(ord('A'), ord('A') + columns)]
+    return {
+        (row, column): seat_types.get((row, column))
+        for row in range(1, rows + 1) for column in letters
+    }
+
+
+def diff_seats(current, targets, reservations):
+    """
+    Compara los asientos actuales de un avión con los que define su layout.
+
+    Un asiento con reservas activas nunca se elimina ni cambia de tipo. Tampoco
+    se elimina un asiento con reservas canceladas, porque borrarlo borraría
+    también esas reservas. Si hay dos asientos en la misma posición, se
+    conserva el primero y el resto se elimina.
+
+    Parámetros:
+        current (iterable): Tuplas (id, fila, columna, seat_type_id) de los asientos actuales.
+        targets (dict): Resultado de layout_targets.
+        reservations (dict): Mapa {seat_id: True si tiene reservas activas} de los
+            asientos con alguna reserva.
+
+    Retorna:
+        SeatDiff: Cambios a aplicar.
+    """
+    diff = SeatDiff()
+    matched = set()
+    for seat_id, row, column, seat_type_id in current:
+        position = (row, column)
+        if position in targets and position not in matched:
+            matched.add(position)
+            if seat_type_id != targets[position]:
+                if reservations.get(seat_id):
+                    diff.skipped.append(seat_id)
+                else:
+                    diff.retyped[seat_id] = targets[position]
+        elif seat_id in reservations:
+            diff.skipped.append(seat_id)
+        else:
+            diff.removed.append(seat_id)
+    diff.added = [
+        (row, column, seat_type_id)
+        for (row, column), seat_type_id in targets.items() if (row, column) not in matched
+    ]
+    return diff
@@ -1,7 +1,113 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Prefetch, QuerySet
+from django.db.models.functions import Lower
 from rest_framework import serializers
-from .models import Airplane, Flight, Passenger, Reservation, SeatLayout, SeatType, SeatLayoutPosition, FlightHistory, Ticket, Seat
+from rest_framework.fields import empty
+from .models import Airplane, Flight, Passenger, Reservation, SeatLayout, SeatType, SeatLayoutPosition, FlightHistory, Ticket, Seat, FlightSeatCounter
 
-class SeatTypeSerializer(serializers.ModelSerializer):
+class EagerLoadingMixin:
+    """
+    Plan de consultas declarado por un serializador.
+
+    Cada serializador indica las relaciones que lee al serializar una instancia
+    (campos anidados, campos calculados que recorren FKs, etc.), y los viewsets
+    aplican ese plan a su queryset para que un listado ejecute una cantidad
+    constante de consultas, sin importar cuántas filas devuelva.
+
+    Atributos:
+        select_related_fields (tuple): Relaciones a unir con select_related.
+        prefetch_related_fields (tuple): Relaciones a precargar con prefetch_related.
+    """
+    select_related_fields = ()
+    prefetch_related_fields = ()
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """
+        Aplica el plan de consultas del serializador a un queryset.
+
+        Parámetros:
+            queryset (QuerySet): Queryset a serializar. Otros iterables se devuelven sin cambios.
+
+        Retorna:
+            QuerySet: Queryset con select_related/prefetch_related aplicados.
+        """
+        if not isinstance(queryset, QuerySet):
+            return queryset
+        if cls.select_related_fields:
+            queryset = queryset.select_related(*cls.select_related_fields)
+        if cls.prefetch_related_fields:
+            queryset = queryset.prefetch_related(*cls.prefetch_related_fields)
+        return queryset
+
+
+class ResolvedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField que usa las instancias ya resueltas por su
+    serializador (ver BatchedRelatedFieldsMixin) en lugar de consultar la
+    base de datos una vez por campo.
+    """
+    def to_internal_value(self, data):
+        resolved = getattr(self.parent, '_resolved_related', None) or {}
+        if self.field_name not in resolved:
+            return super().to_internal_value(data)
+        instance = resolved[self.field_name]
+        if instance is None:
+            self.fail('does_not_exist', pk_value=data)
+        return instance
+
+class BatchedRelatedFieldsMixin:
+    """
+    Resuelve todas las claves foráneas de un payload en una sola pasada.
+
+    Antes de validar los campos, los valores de los campos relacionados se
+    agrupan por queryset y se obtienen con un in_bulk por grupo. Las instancias
+    resultantes quedan disponibles para los campos y para el llamador, que puede
+    pasarlas al servicio sin volver a consultarlas.
+    """
+    serializer_related_field = ResolvedPrimaryKeyRelatedField
+
+    def to_internal_value(self, data):
+        self._resolved_related = self.resolve_related(data)
+        return super().to_internal_value(data)
+
+    def resolve_related(self, data, field_names=None):
+        """
+        Obtiene las instancias referenciadas por los campos relacionados de un payload.
+
+        Parámetros:
+            data (dict): Payload de entrada.
+            field_names (iterable, optional): Campos a resolver; por defecto todos los relacionados.
+
+        Retorna:
+            dict: {nombre del campo: instancia, o None si no existe}. Los campos ausentes
+            o con un valor mal formado no se incluyen.
+        """
+        groups = {}
+        for field in self._writable_fields:
+            if not isinstance(field, ResolvedPrimaryKeyRelatedField):
+                continue
+            if field_names is not None and field.field_name not in field_names:
+                continue
+            value = field.get_value(data)
+            if value in (empty, None, ''):
+                continue
+            queryset = field.get_queryset()
+            try:
+                pk = queryset.model._meta.pk.to_python(value)
+            except (DjangoValidationError, TypeError, ValueError):
+                continue
+            # Fields share a query only when their querysets are equivalent.
+            key = (queryset.model, str(queryset.query))
+            groups.setdefault(key, (queryset, {}))[1][field.field_name] = pk
+        resolved = {}
+        for queryset, pks in groups.values():
+            instances = queryset.in_bulk(set(pks.values()))
+            for field_name, pk in pks.items():
+                resolved[field_name] = instances.get(pk)
+        return resolved
+
+class SeatTypeSerializer(BatchedRelatedFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
     """
     Serializador para el modelo SeatType.
 
@@ -11,111 +117,142 @@ class SeatTypeSerializer(serializers.ModelSerializer):
         model = SeatType
         fields = '__all__'
 
-class SeatLayoutPositionSerializer(serializers.ModelSerializer):
+class SeatLayoutPositionSerializer(BatchedRelatedFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
     """
     Serializador para el modelo SeatLayoutPosition.
 
     Incluye campos relacionados y calculados como seat_number.
     """
-    seat_type = serializers.PrimaryKeyRelatedField(queryset=SeatType.objects.all())
+    seat_type = ResolvedPrimaryKeyRelatedField(queryset=SeatType.objects.all())
     seat_number = serializers.CharField(read_only=True)
 
     class Meta:
         model = SeatLayoutPosition
         fields = '__all__'
 
-class SeatLayoutSerializer(serializers.ModelSerializer):
+class SeatLayoutSerializer(BatchedRelatedFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
     """
     Serializador para el modelo SeatLayout.
 
     Incluye posiciones relacionadas de forma anidada.
     """
     positions = SeatLayoutPositionSerializer(many=True, read_only=True)
+    prefetch_related_fields = ('positions',)
 
     class Meta:
         model = SeatLayout
         fields = '__all__'
 
-class AirplaneSerializer(serializers.ModelSerializer):
+class AirplaneSerializer(BatchedRelatedFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
     """
     Serializador para el modelo Airplane.
 
     Maneja relación con SeatLayout opcional.
     """
-    seat_layout = serializers.PrimaryKeyRelatedField(queryset=SeatLayout.objects.all(), allow_null=True, required=False)
+    seat_layout = ResolvedPrimaryKeyRelatedField(queryset=SeatLayout.objects.all(), allow_null=True, required=False)
 
     class Meta:
         model = Airplane
         fields = '__all__'
 
-class FlightSerializer(serializers.ModelSerializer):
+class FlightSeatCounterSerializer(serializers.ModelSerializer):
+    """
+    Serializador de solo lectura para los contadores de asientos de un vuelo por tipo de asiento.
+    """
+    seat_type = serializers.CharField(source='seat_type.code', default=None, read_only=True)
+    available = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = FlightSeatCounter
+        fields = ['seat_type', 'total', 'held', 'reserved', 'sold', 'available']
+
+class FlightSerializer(BatchedRelatedFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
     """
     Serializador para el modelo Flight.
 
-    Requiere relación con Airplane.
+    Requiere relación con Airplane. Incluye los contadores de asientos
+    desnormalizados (seats_*) y su desglose por tipo de asiento, de solo lectura.
     """
-    airplane = serializers.PrimaryKeyRelatedField(queryset=Airplane.objects.all())
+    airplane = ResolvedPrimaryKeyRelatedField(queryset=Airplane.objects.all())
+    seats_available = serializers.IntegerField(read_only=True)
+    seat_counters = FlightSeatCounterSerializer(many=True, read_only=True)
+
+    prefetch_related_fields = (
+        Prefetch('seat_counters', queryset=FlightSeatCounter.objects.select_related('seat_type').order_by('seat_type_id')),
+    )
 
     class Meta:
         model = Flight
-        fields = '__all__'
+        exclude = ['inventory_version']
 
-class PassengerSerializer(serializers.ModelSerializer):
+class PassengerSerializer(BatchedRelatedFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
     """
     Serializador para el modelo Passenger.
 
-    Convierte instancias de Passenger a JSON y viceversa.
+    Convierte instancias de Passenger a JSON y viceversa. El email se valida
+    como único sin distinguir mayúsculas, igual que la restricción del modelo.
     """
     class Meta:
         model = Passenger
         fields = '__all__'
 
-class SeatSerializer(serializers.ModelSerializer):
+    def validate_email(self, value):
+        passengers = Passenger.objects.alias(email_lower=Lower('email')).filter(email_lower=value.lower())
+        if self.instance is not None:
+            passengers = passengers.exclude(pk=self.instance.pk)
+        if passengers.exists():
+            raise serializers.ValidationError('A passenger with this email already exists.')
+        return value
+
+class SeatSerializer(BatchedRelatedFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
     """
     Serializador para el modelo Seat.
 
     Maneja relación opcional con SeatType.
     """
-    seat_type = serializers.PrimaryKeyRelatedField(queryset=SeatType.objects.all(), allow_null=True, required=False)
+    seat_type = ResolvedPrimaryKeyRelatedField(queryset=SeatType.objects.all(), allow_null=True, required=False)
 
     class Meta:
         model = Seat
         fields = '__all__'
 
-class ReservationSerializer(serializers.ModelSerializer):
+class ReservationSerializer(BatchedRelatedFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
     """
     Serializador para el modelo Reservation.
 
     Requiere relaciones con Flight, Passenger y Seat.
     """
-    flight = serializers.PrimaryKeyRelatedField(queryset=Flight.objects.all())
-    passenger = serializers.PrimaryKeyRelatedField(queryset=Passenger.objects.all())
-    seat = serializers.PrimaryKeyRelatedField(queryset=Seat.objects.all())
+    flight = ResolvedPrimaryKeyRelatedField(queryset=Flight.objects.all())
+    passenger = ResolvedPrimaryKeyRelatedField(queryset=Passenger.objects.all())
+    seat = ResolvedPrimaryKeyRelatedField(queryset=Seat.objects.all())
 
     class Meta:
         model = Reservation
         fields = '__all__'
+        # The active-reservation UniqueConstraints are conditional on status; the
+        # database enforces them and the service reports violations as conflicts.
+        validators = []
 
-class FlightHistorySerializer(serializers.ModelSerializer):
+class FlightHistorySerializer(BatchedRelatedFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
     """
     Serializador para el modelo FlightHistory.
 
     Requiere relaciones con Passenger y Flight.
     """
-    passenger = serializers.PrimaryKeyRelatedField(queryset=Passenger.objects.all())
-    flight = serializers.PrimaryKeyRelatedField(queryset=Flight.objects.all())
+    passenger = ResolvedPrimaryKeyRelatedField(queryset=Passenger.objects.all())
+    flight = ResolvedPrimaryKeyRelatedField(queryset=Flight.objects.all())
 
     class Meta:
         model = FlightHistory
         fields = '__all__'
 
-class TicketSerializer(serializers.ModelSerializer):
+class TicketSerializer(BatchedRelatedFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
     """
     Serializador para el modelo Ticket.
 
     Incluye campo calculado ticket_number y relación con Reservation.
     """
-    reservation = serializers.PrimaryKeyRelatedField(queryset=Reservation.objects.all())
+    reservation = ResolvedPrimaryKeyRelatedField(queryset=Reservation.objects.all())
     ticket_number = serializers.CharField(read_only=True)
 
     class Meta:
@@ -1,33 +1,74 @@
-from django.db import transaction
+import os
+import time
+from concurrent.futures import as_completed
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
 import uuid
 from decimal import Decimal
 from django.core.exceptions import ValidationError
-from .models import Airplane, Flight, Passenger, Seat, Reservation, Ticket, FlightHistory, SeatLayout, SeatType, SeatLayoutPosition
+from django.http import Http404
+from .models import Airplane, Flight, Passenger, Seat, Reservation, Ticket, FlightHistory, SeatLayout, SeatType, SeatLayoutPosition, FlightSeat, FlightSeatCounter
+from .availability import SeatAvailability
+from .passenger_identity import PassengerIdentityCache
+from .pricing import FareTable, days_to_departure, departure_curve, load_factor_curve
+from .layout_spec import check_positions, expand_layout_spec
+from .seat_reconciliation import SeatDiff, diff_seats, layout_targets
+from .exceptions import ReservationConflictError, SeatUnavailableError
+from .seat_grid import SeatGrid, StaleSeatGridError, seat_grid_cache
+from .seat_map_cache import SeatMapCache
+from .ticket_pdf import TicketPdfStorage, get_executor, write_ticket_bundle, write_ticket_pdf, write_ticket_pdfs
 from .repositories import (
     AirplaneRepository, FlightRepository, PassengerRepository, SeatRepository, ReservationRepository,
-    TicketRepository, FlightHistoryRepository, SeatLayoutRepository, SeatTypeRepository, SeatLayoutPositionRepository
+    TicketRepository, FlightHistoryRepository, SeatLayoutRepository, SeatTypeRepository, SeatLayoutPositionRepository,
+    FlightSeatRepository, FlightSeatCounterRepository, SyncCheckpointRepository
 )
 
+# Prefix of the document number given to passengers created from a user account.
+PLACEHOLDER_DOCUMENT_PREFIX = 'USER#'
+
+def _resolve_instance(repo, value, model):
+    """
+    Retorna `value` si ya es una instancia de `model` (por ejemplo, resuelta por
+    el serializador); si no, la obtiene por clave primaria con el repositorio.
+    """
+    if isinstance(value, model):
+        return value
+    return repo.get_by_id(value)
+
 class AirplaneService:
     """
     Servicio para gestionar operaciones relacionadas con aviones.
 
     Maneja la creación de aviones con asientos, actualizaciones y eliminaciones.
+
+    Atributos:
+        seat_batch_size (int): Cantidad máxima de asientos por INSERT al materializar un layout.
     """
+    seat_batch_size = 500
+
     def __init__(self):
         """
         Inicializa el servicio con los repositorios necesarios.
         """
         self.airplane_repo = AirplaneRepository()
         self.seat_layout_repo = SeatLayoutRepository()
+        self.seat_layout_position_repo = SeatLayoutPositionRepository()
         self.seat_repo = SeatRepository()
+        self.reservation_repo = ReservationRepository()
+        self.flight_repo = FlightRepository()
+        self.inventory_service = SeatInventoryService()
 
     def create_airplane_with_seats(self, data):
         """
         Crea un avión y genera automáticamente los asientos basados en el layout.
 
+        El avión y sus asientos se crean dentro de una única transacción.
+
         Parámetros:
-            data (dict): Datos del avión, incluyendo opcionalmente 'seat_layout'.
+            data (dict): Datos del avión, incluyendo opcionalmente 'seat_layout' (ID o instancia).
 
         Retorna:
             Airplane: Instancia del avión creado.
@@ -35,49 +76,67 @@ class AirplaneService:
         seat_layout_id = data.pop('seat_layout', None)
         seat_layout = None
         if seat_layout_id:
-            seat_layout = self.seat_layout_repo.get_by_id(seat_layout_id)
+            seat_layout = _resolve_instance(self.seat_layout_repo, seat_layout_id, SeatLayout)
             data['seat_layout'] = seat_layout
-        
-        airplane = self.airplane_repo.create(data)
 
-        if seat_layout:
-            self._create_seats_for_airplane(airplane, seat_layout)
+        with transaction.atomic():
+            airplane = self.airplane_repo.create(data)
+            if seat_layout:
+                self._create_seats_for_airplane(airplane, seat_layout)
         return airplane
 
     def _create_seats_for_airplane(self, airplane, seat_layout):
         """
         Crea asientos para un avión basado en el layout de asientos.
 
+        Las posiciones del layout se cargan una sola vez en un mapa (fila, columna)
+        y los asientos se insertan en lotes de `seat_batch_size`.
+
         Parámetros:
             airplane (Airplane): Instancia del avión.
             seat_layout (SeatLayout): Layout de asientos a usar.
 
+        Retorna:
+            list: Asientos creados.
+
         Efectos secundarios:
             Crea múltiples instancias de Seat en la base de datos.
         """
-        for row_num in range(1, seat_layout.rows + 1):
-            for col_char_code in range(ord('A'), ord('A') + seat_layout.columns):
-                column = chr(col_char_code)
-                seat_number = f"{row_num}{column}"
-                # Find seat type from layout positions
-                seat_layout_position = SeatLayoutPosition.objects.filter(
-                    seat_layout=seat_layout, row=row_num, column=column
-                ).first()
-                seat_type = seat_layout_position.seat_type if seat_layout_position else None
-
-                self.seat_repo.create({
-                    'airplane': airplane,
-                    'number': seat_number,
-                    'row': row_num,
-                    'column': column,
-                    'seat_type': seat_type,
-                    'status': 'Available'
-                })
+        seat_types = self.seat_layout_position_repo.get_seat_type_map(seat_layout)
+        seats = self._build_seats(airplane, seat_layout, seat_types)
+        return self.seat_repo.bulk_create(seats, batch_size=self.seat_batch_size)
+
+    def _build_seats(self, airplane, seat_layout, seat_types):
+        """
+        Construye en memoria los asientos de un avión para un layout dado.
+
+        Parámetros:
+            airplane (Airplane): Instancia del avión.
+            seat_layout (SeatLayout): Layout de asientos a usar.
+            seat_types (dict): Mapa {(fila, columna): seat_type_id}.
+
+        Retorna:
+            list: Instancias de Seat sin guardar.
+        """
+        return [
+            Seat(
+                airplane=airplane,
+                number=f"{row_num}{column}",
+                row=row_num,
+                column=column,
+                seat_type_id=seat_type_id,
+                status='Available'
+            )
+            for (row_num, column), seat_type_id in layout_targets(seat_layout.rows, seat_layout.columns, seat_types).items()
+        ]
 
     def update_airplane(self, pk, data):
         """
         Actualiza un avión existente.
 
+        Si cambia el layout de asientos, los asientos del avión se reconcilian
+        con el nuevo layout en la misma transacción (ver reconcile_seats).
+
         Parámetros:
             pk (int): Clave primaria del avión.
             data (dict): Datos actualizados.
@@ -88,9 +147,100 @@ class AirplaneService:
         seat_layout_id = data.pop('seat_layout', None)
         seat_layout = None
         if seat_layout_id:
-            seat_layout = self.seat_layout_repo.get_by_id(seat_layout_id)
+            seat_layout = _resolve_instance(self.seat_layout_repo, seat_layout_id, SeatLayout)
             data['seat_layout'] = seat_layout
-        return self.airplane_repo.update(pk, data)
+        with transaction.atomic():
+            previous_layout_id = self.airplane_repo.get_by_id(pk).seat_layout_id if seat_layout else None
+            airplane = self.airplane_repo.update(pk, data)
+            if seat_layout and seat_layout.pk != previous_layout_id:
+                self.reconcile_seats(airplane)
+        return airplane
+
+    def reconcile_seats(self, airplane, dry_run=False):
+        """
+        Reconcilia los asientos de un avión con su layout de asientos.
+
+        Calcula los asientos a crear, eliminar y cambiar de tipo y los aplica
+        con un INSERT en lotes, un DELETE y un UPDATE por tipo de asiento. Los
+        asientos con reservas activas no se modifican, y los que tienen
+        cualquier reserva no se eliminan. Un avión sin layout no se modifica.
+
+        Los vuelos del avión con inventario materializado se ponen al día: los
+        que aún no salieron reciben el inventario de los asientos nuevos, y en
+        todos se recalculan los contadores y se invalida el mapa de asientos.
+
+        Parámetros:
+            airplane (Airplane | int): Instancia o ID del avión.
+            dry_run (bool): Si es True solo calcula los cambios, sin escribir.
+
+        Retorna:
+            SeatDiff: Cambios calculados.
+        """
+        airplane = _resolve_instance(self.airplane_repo, airplane, Airplane)
+        if airplane.seat_layout_id is None:
+            return SeatDiff()
+        # Reloaded so a layout edited after the airplane was fetched is not diffed stale.
+        seat_layout = self.seat_layout_repo.get_by_id(airplane.seat_layout_id)
+        targets = layout_targets(
+            seat_layout.rows, seat_layout.columns, self.seat_layout_position_repo.get_seat_type_map(seat_layout),
+        )
+        diff = diff_seats(
+            self.seat_repo.get_positions_by_airplane(airplane), targets,
+            self.reservation_repo.get_seat_reservation_states(airplane),
+        )
+        if dry_run or not diff.changed:
+            return diff
+        with transaction.atomic():
+            self.seat_repo.delete_unreserved(diff.removed)
+            self.seat_repo.set_seat_types(diff.retyped)
+            self.seat_repo.bulk_create([
+                Seat(
+                    airplane=airplane,
+                    number=f"{row_num}{column}",
+                    row=row_num,
+                    column=column,
+                    seat_type_id=seat_type_id,
+                    status='Available'
+                )
+                for row_num, column, seat_type_id in diff.added
+            ], batch_size=self.seat_batch_size)
+            self._refresh_flight_inventories(airplane)
+        seat_grid_cache.invalidate(airplane.pk)
+        return diff
+
+    def reconcile_layout(self, seat_layout, dry_run=False):
+        """
+        Reconcilia los asientos de todos los aviones que usan un layout.
+
+        Parámetros:
+            seat_layout (SeatLayout | int): Instancia o ID del layout modificado.
+            dry_run (bool): Si es True solo calcula los cambios, sin escribir.
+
+        Retorna:
+            dict: Mapa {Airplane: SeatDiff}.
+        """
+        seat_layout = _resolve_instance(self.seat_layout_repo, seat_layout, SeatLayout)
+        return {
+            airplane: self.reconcile_seats(airplane, dry_run=dry_run)
+            for airplane in self.airplane_repo.filter_by_seat_layout(seat_layout)
+        }
+
+    def _refresh_flight_inventories(self, airplane):
+        """
+        Pone al día el inventario y los contadores de los vuelos de un avión tras cambiar sus asientos.
+
+        Parámetros:
+            airplane (Airplane): Instancia del avión.
+        """
+        now = timezone.now()
+        flight_ids = []
+        for flight in self.flight_repo.filter_with_inventory_by_airplane(airplane):
+            if flight.departure_date >= now:
+                self.inventory_service.create_inventory(flight)
+            else:
+                self.inventory_service.rebuild_counters(flight)
+            flight_ids.append(flight.pk)
+        self.flight_repo.increment_inventory_versions(flight_ids)
 
     def delete_airplane(self, pk):
         """
@@ -104,6 +254,537 @@ class AirplaneService:
         """
         return self.airplane_repo.delete(pk)
 
+class FlightSearchService:
+    """
+    Servicio de búsqueda de vuelos por ruta, fechas, estado y disponibilidad.
+
+    Atributos:
+        web_results_limit (int): Máximo de vuelos que muestran las vistas web (FLIGHT_SEARCH_WEB_LIMIT).
+    """
+
+    def __init__(self):
+        """
+        Inicializa el servicio con los repositorios necesarios.
+        """
+        self.flight_repo = FlightRepository()
+
+    @property
+    def web_results_limit(self):
+        return getattr(settings, 'FLIGHT_SEARCH_WEB_LIMIT', 200)
+
+    def search(self, origin=None, destination=None, date_from=None, date_to=None, status=None, min_seats=None):
+        """
+        Busca vuelos.
+
+        Parámetros:
+            origin (str, optional): Origen exacto.
+            destination (str, optional): Destino exacto.
+            date_from (date, optional): Primer día de salida (inclusive).
+            date_to (date, optional): Último día de salida (inclusive).
+            status (str, optional): Estado exacto del vuelo.
+            min_seats (int, optional): Mínimo de asientos disponibles.
+
+        Retorna:
+            QuerySet: Vuelos que cumplen los filtros, ordenados por salida.
+        """
+        return self.flight_repo.search(
+            origin=(origin or '').strip() or None,
+            destination=(destination or '').strip() or None,
+            departure_from=self._start_of_day(date_from),
+            departure_to=self._start_of_day(date_to + timedelta(days=1)) if date_to else None,
+            status=(status or '').strip() or None,
+            min_available=min_seats,
+        )
+
+    def _start_of_day(self, day):
+        if day is None:
+            return None
+        return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+class SeatInventoryService:
+    """
+    Servicio para gestionar el inventario de asientos por vuelo (FlightSeat).
+
+    El inventario se crea en bloque al crear un vuelo o, para vuelos creados por
+    otras vías, de forma perezosa en la primera lectura. También gestiona las
+    retenciones temporales de asientos (estado 'HLD' con vencimiento) y los
+    contadores desnormalizados del vuelo (Flight.seats_* y FlightSeatCounter),
+    que se actualizan en la misma transacción que cada cambio de estado.
+
+    Atributos:
+        inventory_batch_size (int): Cantidad máxima de filas por INSERT al materializar un vuelo.
+    """
+    inventory_batch_size = 500
+
+    def __init__(self):
+        """
+        Inicializa el servicio con los repositorios necesarios.
+        """
+        self.flight_seat_repo = FlightSeatRepository()
+        self.flight_seat_counter_repo = FlightSeatCounterRepository()
+        self.seat_repo = SeatRepository()
+        self.reservation_repo = ReservationRepository()
+        self.flight_repo = FlightRepository()
+
+    @property
+    def hold_ttl(self):
+        return timedelta(seconds=getattr(settings, 'SEAT_HOLD_TTL_SECONDS', 600))
+
+    def create_inventory(self, flight):
+        """
+        Materializa el inventario de un vuelo a partir de los asientos de su avión.
+
+        Los asientos con reservas activas se crean con el estado correspondiente.
+        Las filas ya existentes se ignoran, por lo que la operación es idempotente.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+
+        Efectos secundarios:
+            Crea múltiples instancias de FlightSeat en la base de datos y recalcula
+            los contadores del vuelo.
+        """
+        reserved = self.reservation_repo.get_active_seat_statuses(flight)
+        entries = [
+            FlightSeat(
+                flight=flight,
+                seat_id=seat_id,
+                status=FlightSeat.status_for_reservation(reserved[seat_id]) if seat_id in reserved else 'AVL'
+            )
+            for seat_id in self.seat_repo.get_ids_by_airplane(flight.airplane_id)
+        ]
+        with transaction.atomic():
+            self.flight_seat_repo.bulk_create(entries, batch_size=self.inventory_batch_size, ignore_conflicts=True)
+            self.rebuild_counters(flight)
+
+    def count_seats(self, flight):
+        """
+        Cuenta el inventario materializado de un vuelo por tipo de asiento y estado.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+
+        Retorna:
+            dict: Mapa {seat_type_id: FlightSeatCounter sin guardar}.
+        """
+        counters = {}
+        for seat_type_id, status, count in self.flight_seat_repo.count_by_seat_type_and_status(flight):
+            counter = counters.setdefault(seat_type_id, FlightSeatCounter(flight=flight, seat_type_id=seat_type_id))
+            counter.total += count
+            field = FlightSeatCounter.STATUS_FIELDS.get(status)
+            if field:
+                setattr(counter, field, getattr(counter, field) + count)
+        return counters
+
+    def rebuild_counters(self, flight, counters=None):
+        """
+        Reemplaza los contadores de un vuelo por los calculados desde su inventario.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+            counters (dict, optional): Resultado de count_seats, si ya se calculó.
+        """
+        counters = self.count_seats(flight) if counters is None else counters
+        totals = {
+            field: sum(getattr(counter, field) for counter in counters.values())
+            for field in ('total', 'held', 'reserved', 'sold')
+        }
+        with transaction.atomic():
+            self.flight_seat_counter_repo.replace_for_flight(flight, list(counters.values()))
+            self.flight_repo.set_seat_counters(flight, **totals)
+        for field, value in totals.items():
+            setattr(flight, f'seats_{field}', value)
+
+    def reconcile_counters(self, flight, fix=True):
+        """
+        Compara los contadores guardados de un vuelo con su inventario y corrige la deriva.
+
+        Un vuelo sin inventario materializado se materializa primero.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+            fix (bool): Si es False solo informa la deriva, sin escribir.
+
+        Retorna:
+            dict: Mapa {campo: (guardado, esperado)} de los contadores que difieren; vacío si coinciden.
+        """
+        if fix and not self.flight_seat_repo.exists_for_flight(flight):
+            self.create_inventory(flight)
+        expected = self.count_seats(flight)
+        stored = {counter.seat_type_id: counter for counter in self.flight_seat_counter_repo.filter_by_flight(flight)}
+        drift = {}
+        for field in ('total', 'held', 'reserved', 'sold'):
+            saved = getattr(flight, f'seats_{field}')
+            actual = sum(getattr(counter, field) for counter in expected.values())
+            if saved != actual:
+                drift[f'seats_{field}'] = (saved, actual)
+            for seat_type_id in set(expected) | set(stored):
+                saved = getattr(stored[seat_type_id], field) if seat_type_id in stored else 0
+                actual = getattr(expected[seat_type_id], field) if seat_type_id in expected else 0
+                if saved != actual:
+                    drift[f'{field}[{seat_type_id}]'] = (saved, actual)
+        if drift and fix:
+            self.rebuild_counters(flight, expected)
+        return drift
+
+    def rebuild_inventory(self, flight):
+        """
+        Descarta y vuelve a materializar el inventario de un vuelo.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+        """
+        with transaction.atomic():
+            self.flight_seat_repo.delete_for_flight(flight)
+            self.create_inventory(flight)
+
+    def get_seat_inventory(self, flight):
+        """
+        Obtiene el inventario completo de un vuelo con sus asientos.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+
+        Retorna:
+            list: Filas FlightSeat ordenadas por fila y columna del asiento.
+        """
+        entries = list(self.flight_seat_repo.filter_by_flight_with_seats(flight))
+        if not entries:
+            self.create_inventory(flight)
+            entries = list(self.flight_seat_repo.filter_by_flight_with_seats(flight))
+        return entries
+
+    def get_availability(self, flight):
+        """
+        Calcula la disponibilidad de un vuelo como una instantánea basada en conjuntos.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+
+        Retorna:
+            SeatAvailability: IDs disponibles, conteos por tipo de asiento y asientos por fila.
+        """
+        grid, bits = self._overlay_seat_grid(flight)
+        return grid.availability(flight.pk, bits)
+
+    def get_seat_map(self, flight):
+        """
+        Obtiene los asientos de un vuelo agrupados por fila.
+
+        La geometría y los tipos de asiento salen de la grilla en caché del
+        avión; del inventario del vuelo solo se lee el estado de cada asiento.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+
+        Retorna:
+            dict: Mapa {fila: [SeatState, ...]} ordenado por fila y columna.
+        """
+        grid, bits = self._overlay_seat_grid(flight)
+        return grid.by_row(bits)
+
+    def get_seat_grid(self, airplane_id):
+        """
+        Obtiene la grilla compacta de asientos de un avión desde la caché del proceso.
+
+        Parámetros:
+            airplane_id (int): ID del avión.
+
+        Retorna:
+            SeatGrid: Grilla del avión.
+        """
+        return seat_grid_cache.get(
+            airplane_id, lambda: SeatGrid(airplane_id, self.seat_repo.get_grid_rows(airplane_id)),
+        )
+
+    def _overlay_seat_grid(self, flight):
+        """
+        Lee el estado de los asientos de un vuelo y lo superpone a la grilla de su avión.
+
+        Un vuelo sin inventario se materializa primero, salvo que su avión no
+        tenga asientos. Si el inventario tiene un asiento que la grilla en caché
+        no conoce, la grilla se reconstruye.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+
+        Retorna:
+            tuple: (SeatGrid, FlightSeatBits).
+        """
+        statuses = list(self.flight_seat_repo.get_status_rows(flight))
+        grid = self.get_seat_grid(flight.airplane_id)
+        if not statuses and len(grid):
+            self.create_inventory(flight)
+            statuses = list(self.flight_seat_repo.get_status_rows(flight))
+        try:
+            return grid, grid.overlay(statuses)
+        except StaleSeatGridError:
+            seat_grid_cache.invalidate(flight.airplane_id)
+            grid = self.get_seat_grid(flight.airplane_id)
+            return grid, grid.overlay(statuses)
+
+    def get_available_seats(self, flight):
+        """
+        Obtiene los asientos disponibles de un vuelo con una consulta indexada.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+
+        Retorna:
+            list: Asientos disponibles ordenados por fila y columna.
+        """
+        seats = list(self.seat_repo.filter_available_for_flight(flight))
+        if not seats and not self.flight_seat_repo.exists_for_flight(flight):
+            self.create_inventory(flight)
+            seats = list(self.seat_repo.filter_available_for_flight(flight))
+        return seats
+
+    def claim_seat(self, flight, seat, status='RES', passenger=None):
+        """
+        Toma un asiento disponible del inventario del vuelo de forma atómica.
+
+        Debe llamarse dentro de la transacción que crea la reserva: la fila
+        queda bloqueada por el UPDATE solo hasta el commit. Un asiento retenido
+        solo puede tomarlo el pasajero que lo retiene, salvo que la retención venció.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+            seat (Seat): Instancia del asiento.
+            status (str): Estado de inventario a asignar.
+            passenger (Passenger, optional): Pasajero que reserva.
+
+        Retorna:
+            bool: True si el asiento fue tomado, False si ya no estaba disponible.
+        """
+        previous = self.flight_seat_repo.claim(flight, seat, status, passenger)
+        if previous is None and not self.flight_seat_repo.exists_for_flight(flight):
+            self.create_inventory(flight)
+            previous = self.flight_seat_repo.claim(flight, seat, status, passenger)
+        if previous is None:
+            return False
+        self.flight_repo.record_inventory_change(flight, [(seat.seat_type_id, previous, status)])
+        return True
+
+    def hold_seat(self, flight, seat, passenger):
+        """
+        Retiene un asiento para un pasajero durante SEAT_HOLD_TTL_SECONDS.
+
+        La comprobación y la adquisición son un único UPDATE sobre la fila
+        (vuelo, asiento); no se crea ninguna reserva. Si el pasajero ya retenía el
+        asiento, la retención se renueva. Un pasajero retiene un solo asiento por
+        vuelo: las demás retenciones suyas en el vuelo se liberan.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+            seat (Seat): Instancia del asiento.
+            passenger (Passenger): Pasajero que retiene el asiento.
+
+        Retorna:
+            datetime: Vencimiento de la retención, o None si el asiento no está disponible.
+
+        Raises:
+            ReservationConflictError: Si el pasajero ya tiene una reserva activa en el vuelo.
+        """
+        if self.reservation_repo.get_passenger_ids_with_active_reservation(flight, [passenger.pk]):
+            raise ReservationConflictError('This passenger already has a reservation for this flight.')
+        expires_at = timezone.now() + self.hold_ttl
+        with transaction.atomic():
+            previous = self.flight_seat_repo.hold(flight, seat, passenger, expires_at)
+            if previous is None and not self.flight_seat_repo.exists_for_flight(flight):
+                self.create_inventory(flight)
+                previous = self.flight_seat_repo.hold(flight, seat, passenger, expires_at)
+            if previous is None:
+                return None
+            released = self.flight_seat_repo.release_passenger_holds(flight, passenger, seat)
+            self.flight_repo.record_inventory_change(flight, [(seat.seat_type_id, previous, 'HLD'), *released])
+        return expires_at
+
+    def release_expired_holds(self, now=None):
+        """
+        Libera las retenciones vencidas y actualiza la versión y los contadores de los vuelos afectados.
+
+        Parámetros:
+            now (datetime, optional): Instante de referencia. Por defecto, ahora.
+
+        Retorna:
+            int: Cantidad de retenciones liberadas.
+        """
+        with transaction.atomic():
+            released, transitions = self.flight_seat_repo.release_expired_holds(now or timezone.now())
+            self.flight_repo.record_inventory_changes(transitions)
+        return released
+
+    def claim_seats(self, flight, seat_ids, status='RES', passenger_ids=()):
+        """
+        Toma varios asientos del inventario del vuelo en una sola operación.
+
+        Bloquea y lee las filas en una consulta y, si todas están disponibles,
+        las actualiza con un único UPDATE condicional. Debe llamarse dentro de
+        la transacción que crea las reservas.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+            seat_ids (list): IDs de los asientos.
+            status (str): Estado de inventario a asignar.
+            passenger_ids (iterable): Pasajeros de la reserva cuyas retenciones se respetan.
+
+        Retorna:
+            set: IDs de asientos no disponibles; vacío si todos fueron tomados.
+
+        Raises:
+            SeatUnavailableError: Si otro comprador tomó alguno de los asientos entre la lectura y el UPDATE.
+        """
+        statuses = self.flight_seat_repo.lock_statuses(flight, seat_ids, passenger_ids)
+        if not statuses and not self.flight_seat_repo.exists_for_flight(flight):
+            self.create_inventory(flight)
+            statuses = self.flight_seat_repo.lock_statuses(flight, seat_ids, passenger_ids)
+        unavailable = {seat_id for seat_id in seat_ids if statuses.get(seat_id) != 'AVL'}
+        if unavailable:
+            return unavailable
+        claimed, previous = self.flight_seat_repo.claim_many(flight, seat_ids, status, passenger_ids)
+        if claimed != len(seat_ids):
+            raise SeatUnavailableError('One or more seats were reserved by another booking.')
+        self.flight_repo.record_inventory_change(flight, [
+            (seat_type_id, previous_status, status) for seat_type_id, previous_status in previous
+        ])
+        return set()
+
+    def is_seat_available(self, flight, seat, passenger=None):
+        """
+        Indica si un asiento está disponible en un vuelo.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+            seat (Seat): Instancia del asiento.
+            passenger (Passenger, optional): Pasajero para el que su propia retención cuenta como disponible.
+
+        Retorna:
+            bool: True si el asiento está disponible en el vuelo.
+        """
+        status = self.flight_seat_repo.get_status(flight, seat, passenger)
+        if status is None and not self.flight_seat_repo.exists_for_flight(flight):
+            self.create_inventory(flight)
+            status = self.flight_seat_repo.get_status(flight, seat, passenger)
+        return status == 'AVL'
+
+class PricingService:
+    """
+    Servicio de tarifas dinámicas.
+
+    La tarifa de un asiento es Flight.base_price × SeatType.price_multiplier ×
+    el escalón de ocupación (PRICING_LOAD_FACTOR_CURVE) × el escalón de días
+    hasta la salida (PRICING_DEPARTURE_CURVE). Como todos los asientos de un
+    tipo comparten tarifa, se calcula una tabla por tipo (FareTable) y el mapa
+    de asientos completo se tarifica con una búsqueda por asiento. La tabla se
+    guarda en la caché de instantáneas, cuya clave incluye la versión de
+    inventario, la versión de tarifas (ver SeatMapCache) y el escalón de salida,
+    por lo que se recalcula al cambiar las reservas, los tipos de asiento o las
+    curvas, o al cruzar un umbral.
+
+    La ocupación se lee de los contadores del vuelo (Flight.seats_*), sin contar reservas.
+    """
+
+    def __init__(self):
+        """
+        Inicializa el servicio con los repositorios necesarios.
+        """
+        self.seat_type_repo = SeatTypeRepository()
+        self.seat_map_cache = SeatMapCache()
+
+    @property
+    def load_factor_curve(self):
+        return load_factor_curve()
+
+    @property
+    def departure_curve(self):
+        return departure_curve()
+
+    def days_to_departure(self, flight, now=None):
+        """
+        Días (con fracción) que faltan para la salida del vuelo; 0 si ya salió.
+        """
+        return days_to_departure(flight.departure_date, now or timezone.now())
+
+    def demand_multiplier(self, flight, now=None):
+        """
+        Calcula el multiplicador de demanda de un vuelo.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+            now (datetime, optional): Momento de referencia. Por defecto, ahora.
+
+        Retorna:
+            Decimal: Producto de los escalones de ocupación y de días hasta la salida.
+        """
+        return (
+            self.load_factor_curve.multiplier_for(flight.load_factor)
+            * self.departure_curve.multiplier_for(self.days_to_departure(flight, now))
+        )
+
+    def get_fare_table(self, flight, now=None):
+        """
+        Obtiene las tarifas por tipo de asiento de un vuelo, desde la caché si es posible.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+            now (datetime, optional): Momento de referencia. Por defecto, ahora.
+
+        Retorna:
+            FareTable: Tarifas del vuelo.
+        """
+        departure_step = self.departure_curve.step_for(self.days_to_departure(flight, now))
+        return self.seat_map_cache.get_or_build(
+            flight, f'fares:{departure_step}', lambda: self.build_fare_table(flight, now),
+        )
+
+    def build_fare_table(self, flight, now=None):
+        """
+        Calcula las tarifas por tipo de asiento de un vuelo con una sola consulta.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+            now (datetime, optional): Momento de referencia. Por defecto, ahora.
+
+        Retorna:
+            FareTable: Tarifas del vuelo.
+        """
+        return FareTable.build(
+            flight.pk, flight.base_price, self.demand_multiplier(flight, now),
+            self.seat_type_repo.get_price_multipliers(),
+        )
+
+    def price_seat_map(self, flight, seats_by_row, now=None):
+        """
+        Tarifica un mapa de asientos completo en una pasada.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+            seats_by_row (dict): Mapa {fila: [SeatState, ...]}.
+            now (datetime, optional): Momento de referencia. Por defecto, ahora.
+
+        Retorna:
+            dict: Mapa {fila: [(SeatState, Decimal), ...]} en el mismo orden.
+        """
+        fares = self.get_fare_table(flight, now)
+        return {
+            row: [(seat, fares.for_code(seat.seat_type)) for seat in seats]
+            for row, seats in seats_by_row.items()
+        }
+
+    def quote(self, flight, seat, now=None):
+        """
+        Retorna la tarifa actual de un asiento de un vuelo.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+            seat (Seat): Instancia del asiento.
+            now (datetime, optional): Momento de referencia. Por defecto, ahora.
+
+        Retorna:
+            Decimal: Tarifa redondeada al centavo.
+        """
+        return self.get_fare_table(flight, now).for_type_id(seat.seat_type_id)
+
 class FlightService:
     """
     Servicio para gestionar operaciones relacionadas con vuelos.
@@ -117,10 +798,25 @@ class FlightService:
         self.flight_repo = FlightRepository()
         self.seat_repo = SeatRepository()
         self.reservation_repo = ReservationRepository()
+        self.inventory_service = SeatInventoryService()
+        self.pricing_service = PricingService()
+        self.seat_map_cache = SeatMapCache()
+
+    def get_flight(self, pk):
+        """
+        Obtiene un vuelo por su clave primaria.
+
+        Parámetros:
+            pk (int): Clave primaria del vuelo.
+
+        Retorna:
+            Flight: Instancia del vuelo.
+        """
+        return self.flight_repo.get_by_id(pk)
 
     def create_flight(self, data):
         """
-        Crea un nuevo vuelo.
+        Crea un nuevo vuelo junto con su inventario de asientos.
 
         Parámetros:
             data (dict): Datos del vuelo.
@@ -128,12 +824,17 @@ class FlightService:
         Retorna:
             Flight: Instancia del vuelo creado.
         """
-        return self.flight_repo.create(data)
+        with transaction.atomic():
+            flight = self.flight_repo.create(data)
+            self.inventory_service.create_inventory(flight)
+        return flight
 
     def update_flight(self, pk, data):
         """
         Actualiza un vuelo existente.
 
+        Si cambia el avión asignado, el inventario de asientos se reconstruye.
+
         Parámetros:
             pk (int): Clave primaria del vuelo.
             data (dict): Datos actualizados.
@@ -141,7 +842,12 @@ class FlightService:
         Retorna:
             Flight: Instancia del vuelo actualizado.
         """
-        return self.flight_repo.update(pk, data)
+        with transaction.atomic():
+            previous_airplane_id = self.flight_repo.get_by_id(pk).airplane_id
+            flight = self.flight_repo.update(pk, data)
+            if flight.airplane_id != previous_airplane_id:
+                self.inventory_service.rebuild_inventory(flight)
+        return flight
 
     def delete_flight(self, pk):
         """
@@ -166,11 +872,20 @@ class FlightService:
             list: Lista de asientos disponibles.
         """
         flight = self.flight_repo.get_by_id(flight_pk)
-        all_seats = self.seat_repo.filter_by_airplane_ordered(flight.airplane)
-        reserved_seats_ids = self.reservation_repo.filter_by_flight_seat_status(flight, None, ['PEN', 'CON', 'PAID']).values_list('seat__id', flat=True)
-        
-        available_seats = [seat for seat in all_seats if seat.id not in reserved_seats_ids]
-        return available_seats
+        return self.inventory_service.get_available_seats(flight)
+
+    def get_seat_availability(self, flight_pk):
+        """
+        Obtiene la disponibilidad de asientos de un vuelo.
+
+        Parámetros:
+            flight_pk (int): Clave primaria del vuelo.
+
+        Retorna:
+            SeatAvailability: Instantánea con IDs disponibles, conteos por tipo y asientos por fila.
+        """
+        flight = self.flight_repo.get_by_id(flight_pk)
+        return self.inventory_service.get_availability(flight)
 
 class PassengerService:
     """
@@ -184,6 +899,7 @@ class PassengerService:
         """
         self.passenger_repo = PassengerRepository()
         self.flight_history_repo = FlightHistoryRepository()
+        self.identity_cache = PassengerIdentityCache()
 
     def create_passenger(self, data):
         """
@@ -226,23 +942,70 @@ class PassengerService:
         """
         Obtiene o crea un pasajero basado en un usuario del sistema.
 
+        El pasajero se busca por email sin distinguir mayúsculas y se guarda en
+        la caché de identidades, por lo que las siguientes solicitudes del mismo
+        usuario no consultan la base de datos. Un pasajero nuevo recibe un número
+        de documento provisorio derivado del ID del usuario, que no puede repetirse.
+
         Parámetros:
             user (User): Instancia del usuario.
 
         Retorna:
             Passenger: Instancia del pasajero.
         """
+        passenger = self.identity_cache.get(user)
+        if passenger is not None:
+            return passenger
+        document_number = self.placeholder_document_number(user)
+        try:
+            passenger = self._get_or_create_for_user(user, document_number)
+        except IntegrityError:
+            # An earlier passenger of this user changed its email but kept the placeholder.
+            passenger = self._get_or_create_for_user(user, self.fallback_document_number(document_number))
+        self.identity_cache.set(user, passenger)
+        return passenger
+
+    def _get_or_create_for_user(self, user, document_number):
         passenger, created = self.passenger_repo.get_or_create_passenger(
             email=user.email,
             defaults={
                 'first_name': user.first_name if user.first_name else user.username,
                 'last_name': user.last_name if user.last_name else '',
-                'document_number': str(uuid.uuid4())[:10],
+                'document_number': document_number,
                 'date_of_birth': '2000-01-01'
             }
         )
         return passenger
 
+    def placeholder_document_number(self, user):
+        """
+        Número de documento provisorio de un pasajero creado para un usuario.
+
+        Parámetros:
+            user (User): Instancia del usuario.
+
+        Retorna:
+            str: 'USER#<id>', único por usuario; '#' no aparece en documentos reales.
+        """
+        return f'{PLACEHOLDER_DOCUMENT_PREFIX}{user.pk}'
+
+    def fallback_document_number(self, document_number):
+        """
+        Número de documento provisorio alternativo, si 'USER#<id>' ya está en uso.
+
+        Parámetros:
+            document_number (str): Número provisorio ya tomado.
+
+        Retorna:
+            str: 'USER#<id>-<hex aleatorio>', completando el largo máximo del campo.
+        """
+        max_length = Passenger._meta.get_field('document_number').max_length
+        return f'{document_number}-{uuid.uuid4().hex[:max_length - len(document_number) - 1]}'
+
+    @property
+    def history_page_size(self):
+        return getattr(settings, 'FLIGHT_HISTORY_PAGE_SIZE', 50)
+
     def get_passenger_flight_history(self, passenger_pk):
         """
         Obtiene el historial de vuelos de un pasajero.
@@ -257,6 +1020,44 @@ class PassengerService:
         flight_history = self.flight_history_repo.filter_by_passenger_ordered(passenger)
         return passenger, flight_history
 
+    def get_passenger_flight_history_page(self, passenger_pk, cursor=None):
+        """
+        Obtiene una página del historial de vuelos de un pasajero, paginada por keyset.
+
+        Cada página cuesta dos consultas (pasajero y entradas) sin importar
+        cuántas entradas tenga el pasajero ni qué página se pida.
+
+        Parámetros:
+            passenger_pk (int): Clave primaria del pasajero.
+            cursor (str, optional): Cursor devuelto por la página anterior; uno inválido
+                se trata como la primera página.
+
+        Retorna:
+            tuple: (Passenger, list, str | None) - Pasajero, entradas de la página
+            (más recientes primero) y cursor de la página siguiente.
+        """
+        passenger = self.passenger_repo.get_by_id(passenger_pk)
+        page_size = self.history_page_size
+        entries = list(
+            self.flight_history_repo.filter_by_passenger_ordered(passenger, before=self._decode_history_cursor(cursor))
+            [:page_size + 1]
+        )
+        next_cursor = None
+        if len(entries) > page_size:
+            entries = entries[:page_size]
+            next_cursor = f'{entries[-1].booking_date.isoformat()}~{entries[-1].pk}'
+        return passenger, entries, next_cursor
+
+    def _decode_history_cursor(self, cursor):
+        """
+        Convierte un cursor 'fecha ISO~id' a (booking_date, id), o None si falta o es inválido.
+        """
+        try:
+            booking_date, entry_id = (cursor or '').split('~')
+            return datetime.fromisoformat(booking_date), int(entry_id)
+        except ValueError:
+            return None
+
 class ReservationService:
     """
     Servicio para gestionar operaciones relacionadas con reservas.
@@ -271,67 +1072,239 @@ class ReservationService:
         self.flight_repo = FlightRepository()
         self.passenger_repo = PassengerRepository()
         self.seat_repo = SeatRepository()
+        self.inventory_service = SeatInventoryService()
+        self.pricing_service = PricingService()
+        self.seat_map_cache = SeatMapCache()
 
-    def create_reservation(self, flight_id, passenger_id, seat_id, price):
+    @property
+    def manifest_chunk_size(self):
+        return getattr(settings, 'MANIFEST_EXPORT_CHUNK_SIZE', 2000)
+
+    def create_reservation(self, flight_id, passenger_id, seat_id, price=None):
         """
         Crea una nueva reserva para un vuelo.
 
         Parámetros:
-            flight_id (int): ID del vuelo.
-            passenger_id (int): ID del pasajero.
-            seat_id (int): ID del asiento.
-            price (Decimal): Precio de la reserva.
+            flight_id (int | Flight): ID del vuelo, o la instancia ya resuelta.
+            passenger_id (int | Passenger): ID del pasajero, o la instancia ya resuelta.
+            seat_id (int | Seat): ID del asiento, o la instancia ya resuelta.
+            price (Decimal, optional): Precio de la reserva. Si se omite, se usa la
+                tarifa actual del asiento (PricingService).
 
         Retorna:
             Reservation: Instancia de la reserva creada.
 
+        El asiento se toma con un UPDATE condicional sobre el inventario del vuelo
+        dentro de la misma transacción que inserta la reserva, por lo que dos
+        compras concurrentes del mismo asiento no pueden prosperar ambas.
+
         Raises:
-            ValidationError: Si el asiento ya está reservado.
+            ValidationError: Si el asiento no pertenece al avión del vuelo.
+            SeatUnavailableError: Si el asiento ya está reservado.
+            ReservationConflictError: Si la reserva viola una restricción de unicidad
+                (por ejemplo, el pasajero ya tiene una reserva en el vuelo).
+        """
+        flight = _resolve_instance(self.flight_repo, flight_id, Flight)
+        passenger = _resolve_instance(self.passenger_repo, passenger_id, Passenger)
+        seat = _resolve_instance(self.seat_repo, seat_id, Seat)
+        if seat.airplane_id != flight.airplane_id:
+            raise ValidationError({'seat': ['Seat not found on this flight.']})
+        if price is None:
+            price = self.pricing_service.quote(flight, seat)
+
+        try:
+            with transaction.atomic():
+                if not self.inventory_service.claim_seat(flight, seat, passenger=passenger):
+                    raise SeatUnavailableError('This seat is already reserved for this flight.')
+                reservation = self.reservation_repo.create({
+                    'flight': flight,
+                    'passenger': passenger,
+                    'seat': seat,
+                    'status': 'PEN',
+                    'price': price,
+                    'reservation_code': str(uuid.uuid4()).replace('-', '')[:20]
+                })
+        except IntegrityError:
+            raise ReservationConflictError('This reservation conflicts with an existing reservation for this flight.')
+        return reservation
+
+    def create_reservations_bulk(self, flight_id, items):
         """
-        flight = self.flight_repo.get_by_id(flight_id)
-        passenger = self.passenger_repo.get_by_id(passenger_id)
-        seat = self.seat_repo.get_by_id(seat_id)
+        Crea varias reservas en un vuelo de forma atómica (reservas grupales).
 
-        if self.reservation_repo.filter_by_flight_seat_status(flight, seat, ['PEN', 'CON', 'PAID']).exists():
-            raise ValidationError('This seat is already reserved for this flight.')
+        Resuelve pasajeros y asientos con una consulta por modelo, toma todos los
+        asientos del inventario en una sola operación e inserta las reservas en
+        bloque. Si algún elemento falla no se crea ninguna reserva.
 
-        with transaction.atomic():
-            reservation = self.reservation_repo.create({
-                'flight': flight,
-                'passenger': passenger,
-                'seat': seat,
-                'status': 'PEN',
-                'price': price,
-                'reservation_code': str(uuid.uuid4()).replace('-', '')[:20]
-            })
-            self._update_seat_status_to_reserved(seat)
-            return reservation
+        Parámetros:
+            flight_id (int): ID del vuelo.
+            items (list): Elementos {'passenger': id, 'seat': id, 'price': Decimal}; sin
+                'price', la reserva toma la tarifa actual del asiento.
+
+        Retorna:
+            list: Reservas creadas, en el mismo orden que `items`.
 
-    def _update_seat_status_to_reserved(self, seat):
+        Raises:
+            ValidationError: Si algún elemento es inválido; `message_dict` usa el índice del elemento como clave.
+            SeatUnavailableError: Si algún asiento ya no está disponible; mismo formato de errores.
+            ReservationConflictError: Si algún pasajero ya tiene una reserva activa en el vuelo.
         """
-        Actualiza el estado de un asiento a reservado.
+        flight = self.flight_repo.get_by_id(flight_id)
+        parsed, errors = self._parse_bulk_items(items)
+        if errors:
+            raise ValidationError(errors)
+
+        passengers = self.passenger_repo.in_bulk(passenger_id for passenger_id, _, _ in parsed)
+        seats = self.seat_repo.in_bulk(seat_id for _, seat_id, _ in parsed)
+        errors = self._validate_bulk_items(flight, parsed, passengers, seats)
+        if errors:
+            raise ValidationError(errors)
+
+        already_booked = self.reservation_repo.get_passenger_ids_with_active_reservation(flight, passengers)
+        errors = {
+            str(index): ['This passenger already has a reservation for this flight.']
+            for index, (passenger_id, _, _) in enumerate(parsed) if passenger_id in already_booked
+        }
+        if errors:
+            raise ReservationConflictError(errors)
+
+        if any(price is None for _, _, price in parsed):
+            fares = self.pricing_service.get_fare_table(flight)
+            parsed = [
+                (passenger_id, seat_id, fares.for_type_id(seats[seat_id].seat_type_id) if price is None else price)
+                for passenger_id, seat_id, price in parsed
+            ]
+        seat_ids = [seat_id for _, seat_id, _ in parsed]
+        try:
+            with transaction.atomic():
+                unavailable = self.inventory_service.claim_seats(flight, seat_ids, passenger_ids=list(passengers))
+                if unavailable:
+                    raise SeatUnavailableError({
+                        str(index): ['This seat is already reserved for this flight.']
+                        for index, seat_id in enumerate(seat_ids) if seat_id in unavailable
+                    })
+                reservations = self.reservation_repo.bulk_create([
+                    Reservation(
+                        flight=flight,
+                        passenger=passengers[passenger_id],
+                        seat=seats[seat_id],
+                        status='PEN',
+                        price=price,
+                        reservation_code=str(uuid.uuid4()).replace('-', '')[:20]
+                    )
+                    for passenger_id, seat_id, price in parsed
+                ])
+        except IntegrityError:
+            raise ReservationConflictError('This reservation conflicts with an existing reservation for this flight.')
+        return reservations
+
+    def _parse_bulk_items(self, items):
+        """
+        Convierte los elementos de una reserva grupal a (passenger_id, seat_id, price).
 
         Parámetros:
-            seat (Seat): Instancia del asiento.
+            items (list): Elementos {'passenger', 'seat', 'price'} de la solicitud; 'price' es opcional.
 
-        Efectos secundarios:
-            Modifica y guarda el estado del asiento.
+        Retorna:
+            tuple: (list, dict) - Elementos convertidos (price None si se omitió) y errores por índice (como cadena).
+        """
+        if not items:
+            return [], {'reservations': ['At least one reservation is required.']}
+        parsed, errors = [], {}
+        for index, item in enumerate(items):
+            try:
+                price = item.get('price')
+                parsed.append((
+                    int(item['passenger']), int(item['seat']), None if price is None else Decimal(str(price)),
+                ))
+            except (KeyError, TypeError, ValueError, ArithmeticError, AttributeError):
+                errors[str(index)] = ['Each reservation requires a numeric passenger and seat, and a numeric price if given.']
+        return parsed, errors
+
+    def _validate_bulk_items(self, flight, parsed, passengers, seats):
         """
-        seat.status = 'Reserved'
-        self.seat_repo.update(seat.pk, {'status': 'Reserved'})
+        Valida los elementos de una reserva grupal contra pasajeros y asientos existentes.
+
+        Parámetros:
+            flight (Flight): Vuelo de las reservas.
+            parsed (list): Elementos (passenger_id, seat_id, price).
+            passengers (dict): Pasajeros encontrados por ID.
+            seats (dict): Asientos encontrados por ID.
+
+        Retorna:
+            dict: Errores por índice del elemento (como cadena); vacío si todo es válido.
+        """
+        errors = {}
+        seen_passengers, seen_seats = set(), set()
+        for index, (passenger_id, seat_id, price) in enumerate(parsed):
+            item_errors = []
+            if passenger_id not in passengers:
+                item_errors.append('Passenger not found.')
+            elif passenger_id in seen_passengers:
+                item_errors.append('Passenger appears more than once in the request.')
+            seat = seats.get(seat_id)
+            if seat is None or seat.airplane_id != flight.airplane_id:
+                item_errors.append('Seat not found on this flight.')
+            elif seat_id in seen_seats:
+                item_errors.append('Seat appears more than once in the request.')
+            if price is not None and price <= 0:
+                item_errors.append('price must be a positive number.')
+            seen_passengers.add(passenger_id)
+            seen_seats.add(seat_id)
+            if item_errors:
+                errors[str(index)] = item_errors
+        return errors
 
     def update_reservation(self, pk, data):
         """
         Actualiza una reserva existente.
 
+        Si la reserva cambia de vuelo o de asiento, el asiento nuevo se toma del
+        inventario con la misma operación atómica que al reservar; el anterior se
+        libera al guardar la reserva (ver Reservation.save).
+
         Parámetros:
             pk (int): Clave primaria de la reserva.
             data (dict): Datos actualizados.
 
         Retorna:
             Reservation: Instancia de la reserva actualizada.
+
+        Raises:
+            ValidationError: Si el asiento nuevo no pertenece al avión del vuelo.
+            SeatUnavailableError: Si el asiento nuevo ya no está disponible en el vuelo.
+            ReservationConflictError: Si el cambio viola una restricción de unicidad.
         """
-        return self.reservation_repo.update(pk, data)
+        try:
+            with transaction.atomic():
+                if 'flight' in data or 'seat' in data:
+                    self._claim_moved_seat(self.reservation_repo.get_by_id(pk), data)
+                return self.reservation_repo.update(pk, data)
+        except IntegrityError:
+            raise ReservationConflictError('This reservation conflicts with an existing reservation for this flight.')
+
+    def _claim_moved_seat(self, reservation, data):
+        """
+        Toma del inventario el asiento nuevo de una reserva que cambia de vuelo o de asiento.
+
+        Parámetros:
+            reservation (Reservation): Reserva antes del cambio.
+            data (dict): Datos actualizados.
+
+        Raises:
+            ValidationError: Si el asiento no pertenece al avión del vuelo.
+            SeatUnavailableError: Si el asiento ya no está disponible en el vuelo.
+        """
+        flight = data.get('flight', reservation.flight)
+        seat = data.get('seat', reservation.seat)
+        status = data.get('status', reservation.status)
+        if (flight.pk, seat.pk) == (reservation.flight_id, reservation.seat_id) or status == 'CAN':
+            return
+        if seat.airplane_id != flight.airplane_id:
+            raise ValidationError({'seat': ['Seat not found on this flight.']})
+        inventory_status = FlightSeat.status_for_reservation(status)
+        if not self.inventory_service.claim_seat(flight, seat, inventory_status, passenger=reservation.passenger):
+            raise SeatUnavailableError('This seat is already reserved for this flight.')
 
     def delete_reservation(self, pk):
         """
@@ -344,13 +1317,9 @@ class ReservationService:
             bool: True si la eliminación fue exitosa.
 
         Efectos secundarios:
-            Cambia el estado del asiento asociado a 'Available'.
+            Libera el asiento en el inventario del vuelo (señal post_delete de Reservation).
         """
-        reservation = self.reservation_repo.get_by_id(pk)
-        with transaction.atomic():
-            self.reservation_repo.delete(pk)
-            self.seat_repo.update(reservation.seat.pk, {'status': 'Available'})
-        return True
+        return self.reservation_repo.delete(pk)
 
     def confirm_reservation(self, pk):
         """
@@ -369,7 +1338,8 @@ class ReservationService:
         if reservation.status == 'CAN':
             raise ValidationError('Cannot confirm a cancelled reservation.')
         reservation.status = 'CON'
-        reservation.save()
+        with transaction.atomic():
+            reservation.save()
         return reservation
 
     def cancel_reservation(self, pk):
@@ -389,7 +1359,8 @@ class ReservationService:
         if reservation.status == 'CON' or reservation.status == 'PAID':
             raise ValidationError('Cannot cancel a confirmed or paid reservation directly. Refund process needed.')
         reservation.status = 'CAN'
-        reservation.save()
+        with transaction.atomic():
+            reservation.save()
         return reservation
 
     def get_reservations_list(self):
@@ -415,57 +1386,54 @@ class ReservationService:
         reservation = self.reservation_repo.get_by_id(reservation_pk)
         if new_status in [choice[0] for choice in Reservation.RESERVATION_STATUS_CHOICES]:
             reservation.status = new_status
-            reservation.save()
+            with transaction.atomic():
+                reservation.save()
         return reservation
 
     def get_flight_details_with_seats(self, flight_pk):
         """
         Obtiene detalles de un vuelo incluyendo asientos organizados por fila.
 
+        Los asientos salen de la grilla en caché del avión con el estado del
+        inventario del vuelo superpuesto (ver SeatInventoryService.get_seat_map).
+
         Parámetros:
             flight_pk (int): Clave primaria del vuelo.
 
         Retorna:
-            tuple: (Flight, dict) - Vuelo y asientos organizados por fila.
+            tuple: (Flight, dict) - Vuelo y mapa {fila: [SeatState, ...]} ordenado por fila.
         """
         flight = self.flight_repo.get_by_id(flight_pk)
-        seats = self.seat_repo.filter_by_airplane_ordered(flight.airplane)
-        reserved_seats_ids = self.reservation_repo.filter_by_flight_seat_status(flight, None, ['PEN', 'CON', 'PAID']).values_list('seat__id', flat=True)
-        
-        seats = self._mark_reserved_seats(seats, reserved_seats_ids)
-        seats_by_row = self._organize_seats_by_row(seats)
-        
-        return flight, dict(sorted(seats_by_row.items()))
+        return flight, self.inventory_service.get_seat_map(flight)
 
-    def _mark_reserved_seats(self, seats, reserved_seats_ids):
+    def get_seat_map(self, flight):
         """
-        Marca los asientos reservados en una lista de asientos.
+        Obtiene el mapa de asientos de un vuelo desde la caché de instantáneas.
+
+        La instantánea se indexa por la versión de inventario del vuelo, que se
+        incrementa al crear, confirmar, cancelar o eliminar reservas.
 
         Parámetros:
-            seats (list): Lista de asientos.
-            reserved_seats_ids (list): IDs de asientos reservados.
+            flight (Flight): Instancia del vuelo.
 
         Retorna:
-            list: Lista de asientos con atributo is_reserved.
+            dict: Mapa {fila: [SeatState, ...]} ordenado por fila.
         """
-        for seat in seats:
-            seat.is_reserved = seat.id in reserved_seats_ids
-        return seats
+        return self.seat_map_cache.get_or_build(
+            flight, 'seat_map', lambda: self.inventory_service.get_seat_map(flight)
+        )
 
-    def _organize_seats_by_row(self, seats):
+    def get_priced_seat_map(self, flight):
         """
-        Organiza los asientos por fila.
+        Obtiene el mapa de asientos de un vuelo con la tarifa actual de cada asiento.
 
         Parámetros:
-            seats (list): Lista de asientos.
+            flight (Flight): Instancia del vuelo.
 
         Retorna:
-            dict: Asientos organizados por número de fila.
+            dict: Mapa {fila: [(SeatState, Decimal), ...]} ordenado por fila.
         """
-        seats_by_row = {}
-        for seat in seats:
-            seats_by_row.setdefault(seat.row, []).append(seat)
-        return seats_by_row
+        return self.pricing_service.price_seat_map(flight, self.get_seat_map(flight))
 
     def get_passengers_by_flight(self, flight_pk):
         """
@@ -481,12 +1449,46 @@ class ReservationService:
         reservations = self.reservation_repo.filter_by_flight_and_select_related(flight).order_by('passenger__last_name', 'passenger__first_name')
         return flight, reservations
 
+    def get_flight_manifest(self, flight_pk):
+        """
+        Obtiene el manifiesto de pasajeros de un vuelo para exportarlo.
+
+        Parámetros:
+            flight_pk (int): Clave primaria del vuelo.
+
+        Retorna:
+            tuple: (Flight, QuerySet) - Vuelo y reservas no canceladas con vuelo,
+            pasajero y asiento (con su tipo) relacionados.
+        """
+        flight = self.flight_repo.get_by_id(flight_pk)
+        return flight, self.reservation_repo.get_manifest(flight=flight)
+
+    def get_departures_manifest(self, date_from, date_to):
+        """
+        Obtiene el manifiesto de todos los vuelos que salen en una ventana de días.
+
+        Parámetros:
+            date_from (date): Primer día de salida (inclusive).
+            date_to (date): Último día de salida (inclusive).
+
+        Retorna:
+            QuerySet: Reservas no canceladas de los vuelos de la ventana, agrupadas por vuelo.
+        """
+        start = timezone.make_aware(datetime.combine(date_from, datetime.min.time()))
+        end = timezone.make_aware(datetime.combine(date_to + timedelta(days=1), datetime.min.time()))
+        return self.reservation_repo.get_manifest(departure_from=start, departure_to=end)
+
 class SeatLayoutService:
     """
     Servicio para gestionar operaciones relacionadas con layouts de asientos.
 
     Maneja creación con posiciones, actualizaciones y eliminaciones.
+
+    Atributos:
+        position_batch_size (int): Cantidad máxima de posiciones por INSERT.
     """
+    position_batch_size = 500
+
     def __init__(self):
         """
         Inicializa el servicio con los repositorios necesarios.
@@ -507,7 +1509,12 @@ class SeatLayoutService:
 
         Retorna:
             SeatLayout: Instancia del layout creado.
+
+        Raises:
+            ValidationError: Si hay posiciones fuera del layout o repetidas.
+            Http404: Si algún tipo de asiento no existe.
         """
+        check_positions(rows, columns, [(pos_data['row'], pos_data['column']) for pos_data in positions_data])
         with transaction.atomic():
             seat_layout = self.seat_layout_repo.create({
                 'layout_name': layout_name,
@@ -517,25 +1524,79 @@ class SeatLayoutService:
             self._create_seat_layout_positions(seat_layout, positions_data)
             return seat_layout
 
+    def create_seat_layout_from_spec(self, layout_name, rows, columns, sections):
+        """
+        Crea un layout de asientos a partir de un spec compacto.
+
+        Cada bloque del spec asigna un tipo de asiento a un rango de filas por
+        un grupo de columnas (ver layout_spec.LayoutSection). El spec se valida
+        en memoria antes de tocar la base; los tipos de asiento se resuelven en
+        una sola consulta y las posiciones se insertan en bloque.
+
+        Parámetros:
+            layout_name (str): Nombre del layout.
+            rows (int): Número de filas.
+            columns (int): Número de columnas.
+            sections (list): Bloques del spec.
+
+        Retorna:
+            SeatLayout: Instancia del layout creado.
+
+        Raises:
+            ValidationError: Si el spec no es válido, usa códigos de tipo de asiento
+                inexistentes o ya hay un layout con ese nombre.
+        """
+        cells = expand_layout_spec(rows, columns, sections)
+        seat_types = self.seat_type_repo.get_by_codes(set(cells.values()))
+        unknown = sorted(set(cells.values()) - set(seat_types))
+        if unknown:
+            raise ValidationError(f"Unknown seat type codes: {', '.join(unknown)}.")
+        try:
+            with transaction.atomic():
+                seat_layout = self.seat_layout_repo.create({
+                    'layout_name': layout_name,
+                    'rows': rows,
+                    'columns': columns
+                })
+                self.seat_layout_position_repo.bulk_create([
+                    SeatLayoutPosition(seat_layout=seat_layout, seat_type=seat_types[code], row=row, column=column)
+                    for (row, column), code in cells.items()
+                ], batch_size=self.position_batch_size)
+        except IntegrityError:
+            raise ValidationError(f'A seat layout named {layout_name!r} already exists.')
+        return seat_layout
+
     def _create_seat_layout_positions(self, seat_layout, positions_data):
         """
         Crea posiciones para un layout de asientos.
 
+        Los tipos de asiento se obtienen en una sola consulta y las posiciones
+        se insertan en lotes de `position_batch_size`.
+
         Parámetros:
             seat_layout (SeatLayout): Instancia del layout.
             positions_data (list): Lista de datos de posiciones.
 
+        Raises:
+            Http404: Si algún tipo de asiento no existe.
+
         Efectos secundarios:
             Crea múltiples instancias de SeatLayoutPosition.
         """
-        for pos_data in positions_data:
-            seat_type = self.seat_type_repo.get_by_id(pos_data['seat_type_id'])
-            self.seat_layout_position_repo.create({
-                'seat_layout': seat_layout,
-                'seat_type': seat_type,
-                'row': pos_data['row'],
-                'column': pos_data['column']
-            })
+        seat_type_ids = {pos_data['seat_type_id'] for pos_data in positions_data}
+        seat_types = self.seat_type_repo.in_bulk(seat_type_ids)
+        missing = seat_type_ids - set(seat_types)
+        if missing:
+            raise Http404(f'No SeatType matches the given query: {sorted(missing)}.')
+        self.seat_layout_position_repo.bulk_create([
+            SeatLayoutPosition(
+                seat_layout=seat_layout,
+                seat_type=seat_types[pos_data['seat_type_id']],
+                row=pos_data['row'],
+                column=pos_data['column'],
+            )
+            for pos_data in positions_data
+        ], batch_size=self.position_batch_size)
 
     def update_seat_layout(self, pk, data):
         """
@@ -664,8 +1725,17 @@ class FlightHistoryService:
     """
     Servicio para gestionar consultas de historial de vuelos.
 
-    Permite obtener historial por pasajero o por vuelo.
+    Permite obtener historial por pasajero o por vuelo, y sincroniza el
+    historial desde las reservas completadas de vuelos que ya salieron.
+
+    Atributos:
+        sync_checkpoint_name (str): Nombre de la marca de agua de la sincronización.
+        sync_batch_size (int): Vuelos por lote de sincronización (FLIGHT_HISTORY_SYNC_BATCH_SIZE).
+        sync_lookback (timedelta): Margen que se vuelve a revisar antes de la marca de agua
+            (FLIGHT_HISTORY_SYNC_LOOKBACK_HOURS), para reservas pagadas o embarcadas tras la salida.
     """
+    sync_checkpoint_name = 'flight_history'
+
     def __init__(self):
         """
         Inicializa el servicio con los repositorios necesarios.
@@ -673,6 +1743,75 @@ class FlightHistoryService:
         self.flight_history_repo = FlightHistoryRepository()
         self.passenger_repo = PassengerRepository()
         self.flight_repo = FlightRepository()
+        self.reservation_repo = ReservationRepository()
+        self.checkpoint_repo = SyncCheckpointRepository()
+
+    @property
+    def sync_batch_size(self):
+        return getattr(settings, 'FLIGHT_HISTORY_SYNC_BATCH_SIZE', 500)
+
+    @property
+    def sync_lookback(self):
+        return timedelta(hours=getattr(settings, 'FLIGHT_HISTORY_SYNC_LOOKBACK_HOURS', 24))
+
+    def sync_from_reservations(self, now=None, full=False):
+        """
+        Crea las entradas de historial de las reservas completadas de vuelos que ya salieron.
+
+        Es incremental: solo revisa los vuelos que salieron desde la marca de
+        agua guardada (menos el margen `sync_lookback`) hasta `now`, por lotes
+        de `sync_batch_size` vuelos. Cada lote inserta sus entradas en bloque y
+        avanza la marca de agua en la misma transacción, por lo que una ejecución
+        interrumpida continúa donde quedó. Es idempotente: cada reserva genera a
+        lo sumo una entrada (FlightHistory.reservation es único).
+
+        Parámetros:
+            now (datetime, optional): Límite superior de salida. Por defecto, ahora.
+            full (bool): Si es True, ignora la marca de agua y revisa todos los vuelos.
+
+        Retorna:
+            dict: {'flights': vuelos revisados, 'created': entradas creadas,
+                'high_water_mark': marca de agua resultante}.
+        """
+        now = now or timezone.now()
+        high_water_mark = None if full else self.checkpoint_repo.get_high_water_mark(self.sync_checkpoint_name)
+        start = high_water_mark - self.sync_lookback if high_water_mark else None
+        flights = created = 0
+        after = None
+        while True:
+            batch = self.flight_repo.departed_between(start, now, after=after, limit=self.sync_batch_size)
+            if not batch:
+                break
+            last_id, last_departure = batch[-1]
+            # The lookback window re-reads flights below the mark; never move it backwards.
+            if high_water_mark is None or last_departure > high_water_mark:
+                high_water_mark = last_departure
+            with transaction.atomic():
+                created += self._create_history_entries([flight_id for flight_id, _ in batch])
+                self.checkpoint_repo.set_high_water_mark(self.sync_checkpoint_name, high_water_mark)
+            flights += len(batch)
+            after = (last_departure, last_id)
+        return {'flights': flights, 'created': created, 'high_water_mark': high_water_mark}
+
+    def _create_history_entries(self, flight_ids):
+        """
+        Inserta en bloque las entradas de historial de las reservas completadas de unos vuelos.
+
+        Parámetros:
+            flight_ids (list): IDs de los vuelos.
+
+        Retorna:
+            int: Entradas creadas.
+        """
+        rows = self.reservation_repo.get_completed_without_history(flight_ids)
+        self.flight_history_repo.bulk_create([
+            FlightHistory(
+                reservation_id=reservation_id, passenger_id=passenger_id, flight_id=flight_id,
+                seat_number=seat_number, price_paid=price, booking_date=reservation_date,
+            )
+            for reservation_id, passenger_id, flight_id, seat_number, price, reservation_date in rows
+        ], batch_size=self.sync_batch_size, ignore_conflicts=True)
+        return len(rows)
 
     def get_flight_history_by_passenger(self, passenger_id):
         """
@@ -712,6 +1851,16 @@ class TicketService:
         """
         self.ticket_repo = TicketRepository()
         self.reservation_repo = ReservationRepository()
+        self.flight_repo = FlightRepository()
+        self.pdf_storage = TicketPdfStorage()
+
+    @property
+    def pdf_batch_size(self):
+        return getattr(settings, 'TICKET_PDF_BATCH_SIZE', 20)
+
+    @staticmethod
+    def _new_barcode():
+        return str(uuid.uuid4()).replace('-', '')[:20]
 
     def issue_ticket(self, reservation_pk):
         """
@@ -733,12 +1882,203 @@ class TicketService:
         ticket, created = self.ticket_repo.get_or_create_ticket(
             reservation=reservation,
             defaults={
-                'barcode': str(uuid.uuid4()).replace('-', '')[:20],
+                'barcode': self._new_barcode(),
                 'status': 'EMI'
             }
         )
         return ticket
 
+    def issue_tickets_for_flight(self, flight_id, render=True, wait=True, bundle=False, progress=None):
+        """
+        Emite los tickets de todas las reservas confirmadas o pagadas de un vuelo.
+
+        Los tickets faltantes se crean con un único INSERT masivo; los ya
+        emitidos se conservan. Luego los PDFs se renderizan en paralelo en el
+        pool de procesos y, opcionalmente, se combinan en un único PDF de
+        tarjetas de embarque.
+
+        Parámetros:
+            flight_id (int): ID del vuelo.
+            render (bool): Si es True, encarga los PDFs que aún no existen.
+            wait (bool): Si es True, espera a que terminen los renderizados.
+            bundle (bool): Si es True, genera el PDF combinado del vuelo (siempre espera).
+            progress (callable, optional): Función (completados, total) llamada al terminar cada PDF.
+
+        Retorna:
+            dict: {'flight', 'created', 'tickets', 'rendered', 'bundle', 'timings'}, donde
+            'tickets' son los tickets emitidos del vuelo y 'timings' los segundos por fase.
+
+        Efectos secundarios:
+            Crea tickets y escribe archivos PDF en TICKET_PDF_ROOT.
+        """
+        timings = {}
+        started = time.perf_counter()
+        flight = self.flight_repo.get_by_id(flight_id)
+        with transaction.atomic():
+            reservations = self.reservation_repo.filter_ticketable_without_ticket(flight)
+            # A concurrent issue_ticket may win the OneToOne race; those rows are skipped,
+            # and bulk_create still returns them, so new tickets are counted by barcode.
+            barcodes = {reservation.pk: self._new_barcode() for reservation in reservations}
+            self.ticket_repo.bulk_create([
+                Ticket(reservation=reservation, barcode=barcodes[reservation.pk], status='EMI')
+                for reservation in reservations
+            ], ignore_conflicts=True)
+        tickets = list(self.ticket_repo.filter_by_flight(flight, statuses=['EMI']))
+        created = sum(barcodes.get(ticket.reservation_id) == ticket.barcode for ticket in tickets)
+        timings['issue'] = time.perf_counter() - started
+
+        rendered = 0
+        if render:
+            started = time.perf_counter()
+            rendered = self.render_ticket_pdfs(tickets, wait=wait, progress=progress)
+            timings['render'] = time.perf_counter() - started
+
+        bundle_path = None
+        if bundle and tickets:
+            started = time.perf_counter()
+            bundle_path = self.build_boarding_bundle(flight, tickets)
+            timings['bundle'] = time.perf_counter() - started
+
+        return {
+            'flight': flight, 'created': created, 'tickets': tickets,
+            'rendered': rendered, 'bundle': bundle_path, 'timings': timings,
+        }
+
+    def render_ticket_pdfs(self, tickets, wait=True, progress=None):
+        """
+        Encarga el PDF de cada ticket que aún no lo tenga.
+
+        Con el pool de procesos, los tickets se envían en tandas de
+        TICKET_PDF_BATCH_SIZE por tarea, que el renderizador del proceso
+        convierte una tras otra sin volver a preparar estilos ni fuentes.
+
+        Parámetros:
+            tickets (iterable): Tickets con reserva, vuelo, pasajero y asiento precargados.
+            wait (bool): Si es True, espera a que terminen los renderizados.
+            progress (callable, optional): Función (completados, total) llamada al terminar
+                cada PDF renderizado en línea o cada tanda del pool.
+
+        Retorna:
+            int: Cantidad de PDFs encargados por esta llamada (los ya existentes o en curso
+            en otro proceso no se cuentan).
+        """
+        pending = [ticket for ticket in tickets if not self.pdf_storage.is_ready(ticket)]
+        futures = {}
+        batch = []
+        rendered_inline = 0
+        done = 0
+        for ticket in pending:
+            job = self._claim_ticket_pdf(ticket)
+            if job is not None and settings.TICKET_PDF_WORKERS:
+                batch.append(job)
+                if len(batch) == self.pdf_batch_size:
+                    futures[self._submit_ticket_pdfs(batch)] = len(batch)
+                    batch = []
+                continue
+            # Rendered inline, or already being rendered by another request.
+            if job is not None:
+                write_ticket_pdf(*job)
+                rendered_inline += 1
+            done += 1
+            if progress:
+                progress(done, len(pending))
+        if batch:
+            futures[self._submit_ticket_pdfs(batch)] = len(batch)
+        if wait:
+            for future in as_completed(futures):
+                future.result()
+                done += futures[future]
+                if progress:
+                    progress(done, len(pending))
+        return rendered_inline + sum(futures.values())
+
+    def build_boarding_bundle(self, flight, tickets):
+        """
+        Genera el PDF combinado con las tarjetas de embarque de un vuelo.
+
+        Parámetros:
+            flight (Flight): Instancia del vuelo.
+            tickets (list): Tickets a incluir, en orden de asiento.
+
+        Retorna:
+            str: Ruta del PDF combinado.
+        """
+        os.makedirs(self.pdf_storage.root, exist_ok=True)
+        args = ([self._render_ticket_html(ticket) for ticket in tickets], self.pdf_storage.bundle_path(flight))
+        if settings.TICKET_PDF_WORKERS:
+            return get_executor().submit(write_ticket_bundle, *args).result()
+        return write_ticket_bundle(*args)
+
+    def get_ticket_pdf(self, ticket):
+        """
+        Obtiene el PDF de un ticket, encargando su renderizado si aún no existe.
+
+        El PDF se genera una sola vez por código de barras y estado. Si no está
+        listo, el HTML se renderiza aquí y la conversión a PDF se envía al pool de
+        procesos (o se hace en línea si TICKET_PDF_WORKERS es 0).
+
+        Parámetros:
+            ticket (Ticket): Instancia del ticket.
+
+        Retorna:
+            str: Ruta del PDF, o None si el renderizado sigue en curso.
+        """
+        storage = self.pdf_storage
+        if not storage.is_ready(ticket):
+            self._schedule_ticket_pdf(ticket)
+        return storage.path(ticket) if storage.is_ready(ticket) else None
+
+    def _render_ticket_html(self, ticket):
+        return render_to_string('airline/ticket_template.html', {
+            'ticket': ticket, 'reservation': ticket.reservation,
+        })
+
+    def _schedule_ticket_pdf(self, ticket):
+        """
+        Encarga el renderizado del PDF de un ticket si nadie más lo está haciendo.
+
+        Retorna:
+            Future | None | bool: El Future del pool, None si se renderizó en línea
+            (TICKET_PDF_WORKERS = 0), o False si otro proceso ya lo está renderizando.
+        """
+        job = self._claim_ticket_pdf(ticket)
+        if job is None:
+            return False
+        try:
+            if settings.TICKET_PDF_WORKERS:
+                return get_executor().submit(write_ticket_pdf, *job)
+            write_ticket_pdf(*job)
+            return None
+        except Exception:
+            self.pdf_storage.release_lock(ticket)
+            raise
+
+    def _claim_ticket_pdf(self, ticket):
+        """
+        Toma el bloqueo de renderizado de un ticket y prepara su trabajo.
+
+        Retorna:
+            tuple | None: (html, ruta del PDF, ruta del bloqueo), o None si otro
+            proceso ya lo está renderizando.
+        """
+        storage = self.pdf_storage
+        if not storage.acquire_lock(ticket):
+            return None
+        try:
+            return self._render_ticket_html(ticket), storage.path(ticket), storage.lock_path(ticket)
+        except Exception:
+            storage.release_lock(ticket)
+            raise
+
+    def _submit_ticket_pdfs(self, jobs):
+        try:
+            return get_executor().submit(write_ticket_pdfs, jobs)
+        except Exception:
+            for _, _, lock_path in jobs:
+                if os.path.exists(lock_path):
+                    os.remove(lock_path)
+            raise
+
     def cancel_ticket(self, pk):
         """
         Cancela un ticket.
@@ -0,0 +1,115 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Airplane, FlightSeat, Passenger, Reservation, Seat, SeatLayoutPosition, SeatType
+from .passenger_identity import PassengerIdentityCache
+from .seat_grid import seat_grid_cache
+from .seat_map_cache import SeatMapCache
+
+passenger_identity_cache = PassengerIdentityCache()
+
+
+@receiver(post_delete, sender=Reservation)
+def release_flight_seat_on_reservation_delete(sender, instance, **kwargs):
+    """
+    Libera el asiento en el inventario del vuelo cuando se elimina una reserva.
+
+    Se usa una señal en lugar de sobrescribir Reservation.delete() para cubrir
+    también los borrados en cascada (por ejemplo, al eliminar un pasajero).
+
+    Parámetros:
+        sender (type): Modelo que emite la señal.
+        instance (Reservation): Reserva eliminada.
+    """
+    if instance._seat_taken_by_other_reservation():
+        # A cancelled reservation may be deleted after the seat was sold again.
+        return
+    FlightSeat.set_status(instance.flight_id, instance.seat_id, 'AVL')
+
+
+@receiver(pre_save, sender=Passenger)
+def remember_previous_passenger_email(sender, instance, **kwargs):
+    """
+    Guarda el email almacenado de un pasajero existente antes de modificarlo,
+    para invalidar también la entrada de la caché de identidades del email anterior.
+
+    Parámetros:
+        sender (type): Modelo que emite la señal.
+        instance (Passenger): Pasajero a guardar.
+    """
+    instance._previous_email = (
+        sender.objects.filter(pk=instance.pk).values_list('email', flat=True).first() if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Passenger)
+@receiver(post_delete, sender=Passenger)
+def invalidate_passenger_identity(sender, instance, **kwargs):
+    """
+    Invalida la caché de identidades (PassengerIdentityCache) al guardar o eliminar un pasajero.
+
+    Parámetros:
+        sender (type): Modelo que emite la señal.
+        instance (Passenger): Pasajero guardado o eliminado.
+    """
+    passenger_identity_cache.invalidate(instance.email, getattr(instance, '_previous_email', None))
+
+
+@receiver(post_save, sender=Airplane)
+@receiver(post_delete, sender=Airplane)
+def invalidate_airplane_seat_grid(sender, instance, **kwargs):
+    """
+    Invalida la grilla de asientos en caché (SeatGridCache) de un avión guardado o eliminado.
+
+    Parámetros:
+        sender (type): Modelo que emite la señal.
+        instance (Airplane): Avión guardado o eliminado.
+    """
+    seat_grid_cache.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=Seat)
+@receiver(post_delete, sender=Seat)
+def invalidate_seat_grid(sender, instance, **kwargs):
+    """
+    Invalida la grilla de asientos en caché del avión de un asiento guardado o eliminado.
+
+    Parámetros:
+        sender (type): Modelo que emite la señal.
+        instance (Seat): Asiento guardado o eliminado.
+    """
+    seat_grid_cache.invalidate(instance.airplane_id)
+
+
+@receiver(post_save, sender=SeatLayoutPosition)
+@receiver(post_delete, sender=SeatLayoutPosition)
+@receiver(post_save, sender=SeatType)
+@receiver(post_delete, sender=SeatType)
+def clear_seat_grids(sender, instance, **kwargs):
+    """
+    Vacía la caché de grillas de asientos al cambiar una posición de layout o un tipo de asiento.
+
+    Un código de tipo de asiento puede estar en la grilla de cualquier avión, y
+    las posiciones cambian rara vez, por lo que se vacía la caché completa.
+
+    Parámetros:
+        sender (type): Modelo que emite la señal.
+        instance (SeatLayoutPosition | SeatType): Instancia guardada o eliminada.
+    """
+    seat_grid_cache.clear()
+
+
+@receiver(post_save, sender=SeatType)
+@receiver(post_delete, sender=SeatType)
+def bump_seat_map_pricing_version(sender, instance, **kwargs):
+    """
+    Cambia la versión de tarifas de la caché de instantáneas al guardar o eliminar un tipo de asiento.
+
+    Las tarifas de todos los vuelos dependen de SeatType.price_multiplier, por lo
+    que cambia la clave y el ETag de todas las instantáneas y tablas de tarifas.
+
+    Parámetros:
+        sender (type): Modelo que emite la señal.
+        instance (SeatType): Tipo de asiento guardado o eliminado.
+    """
+    SeatMapCache().bump_pricing_version()
@@ -0,0 +1,24 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from airline.barcodes import code128_svg as render_code128_svg
+
+register = template.Library()
+
+
+@register.simple_tag
+def code128_svg(value, module_width=2, height=60):
+    """
+    Inserta el código de barras Code 128 de un valor como SVG en línea.
+
+    Uso: {% load airline_barcodes %}{% code128_svg ticket.barcode %}
+
+    Parámetros:
+        value (str): Texto a codificar (por ejemplo Ticket.barcode).
+        module_width (int): Ancho en píxeles de la barra más fina.
+        height (int): Alto en píxeles de las barras.
+
+    Retorna:
+        SafeString: Elemento <svg> del código de barras.
+    """
+    return mark_safe(render_code128_svg(str(value), module_width, height))
@@ -1,11 +1,20 @@
 from django.urls import reverse
+from django.core.cache import cache
 from rest_framework import status
 from rest_framework.test import APITestCase
 from unittest.mock import patch, MagicMock
+import json
+import tempfile
 import uuid
-from airline.models import Airplane, Flight, Passenger, Reservation, SeatLayout, SeatType, SeatLayoutPosition, FlightHistory, Ticket, Seat
+from decimal import Decimal
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from airline.models import Airplane, Flight, Passenger, Reservation, SeatLayout, SeatType, SeatLayoutPosition, FlightHistory, Ticket, Seat, FlightSeat, FlightSeatCounter
 from airline.serializers import SeatSerializer
+from airline.services import PricingService, SeatInventoryService
 from datetime import datetime, timedelta
+from django.utils import timezone
 from django.contrib.auth.models import User
 from rest_framework.authtoken.models import Token
 from rest_framework.test import APIClient
@@ -17,6 +26,29 @@ class AuthenticatedAPITestCase(APITestCase):
         self.client = APIClient()
         self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
 
+class ListQueryCountMixin:
+    """
+    Checks that a list endpoint runs the same number of queries whatever its page size.
+    """
+    def assertConstantListQueries(self, url, add_row, sizes=(1, 5), params=None):
+        """
+        Grows the table with add_row(index) until each size in `sizes` fits a full
+        page, requests a page of that size (plus any extra query `params`) and
+        compares the query counts.
+        """
+        counts = []
+        created = 0
+        for size in sizes:
+            while created < size:
+                add_row(created)
+                created += 1
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, {**(params or {}), 'page_size': size})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(response.data['results']), size)
+            counts.append(len(queries))
+        self.assertEqual(len(set(counts)), 1, f'Query count depends on page size {sizes}: {counts}')
+
 class AirplaneViewSetTests(AuthenticatedAPITestCase):
     def setUp(self):
         super().setUp()
@@ -52,9 +84,10 @@ class AirplaneViewSetTests(AuthenticatedAPITestCase):
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         mock_delete_airplane.assert_called_once()
 
-class FlightViewSetTests(AuthenticatedAPITestCase):
+class FlightViewSetTests(ListQueryCountMixin, AuthenticatedAPITestCase):
     def setUp(self):
         super().setUp()
+        cache.clear()
         self.airplane = Airplane.objects.create(registration_number='N12345', manufacturer='Boeing', model_name='747', capacity=100)
         self.flight_data = {
             'origin': 'JFK',
@@ -79,6 +112,49 @@ class FlightViewSetTests(AuthenticatedAPITestCase):
         self.list_url = reverse('flight-list')
         self.detail_url = reverse('flight-detail', kwargs={'pk': self.flight.pk})
 
+    def test_list_flights_filters_by_search_parameters(self):
+        departure = timezone.now() + timedelta(days=5)
+        other = Flight.objects.create(
+            origin='JFK', destination='SFO', departure_date=departure, arrival_date=departure + timedelta(hours=6),
+            duration=timedelta(hours=6), status='Delayed', base_price=100.00, airplane=self.airplane
+        )
+        response = self.client.get(self.list_url, {
+            'origin': 'JFK', 'destination': 'SFO', 'status': 'Delayed',
+            'date_from': departure.date().isoformat(), 'date_to': departure.date().isoformat(),
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['id'] for item in response.data['results']], [other.pk])
+
+    def test_list_flights_includes_seat_counters(self):
+        seat_type = SeatType.objects.create(name='Economy', code='ECO')
+        Flight.objects.filter(pk=self.flight.pk).update(seats_total=100, seats_reserved=30, seats_sold=10)
+        FlightSeatCounter.objects.create(flight=self.flight, seat_type=seat_type, total=100, reserved=30, sold=10)
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        flight = response.data['results'][0]
+        self.assertEqual((flight['seats_total'], flight['seats_available']), (100, 60))
+        self.assertEqual(flight['seat_counters'], [
+            {'seat_type': 'ECO', 'total': 100, 'held': 0, 'reserved': 30, 'sold': 10, 'available': 60},
+        ])
+
+    def test_list_flights_query_count_is_constant(self):
+        seat_type = SeatType.objects.create(name='Economy', code='ECO')
+
+        def add_flight(index):
+            flight = Flight.objects.create(
+                origin='JFK', destination=f'D{index}', departure_date=datetime.now(), arrival_date=datetime.now() + timedelta(hours=3),
+                duration=timedelta(hours=3), status='Scheduled', base_price=100.00, airplane=self.airplane
+            )
+            FlightSeatCounter.objects.create(flight=flight, seat_type=seat_type, total=10)
+
+        self.assertConstantListQueries(self.list_url, add_flight)
+
+    def test_list_flights_invalid_search_parameters(self):
+        response = self.client.get(self.list_url, {'min_seats': '0', 'date_from': 'tomorrow'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('min_seats', response.data)
+        self.assertIn('date_from', response.data)
+
     @patch('airline.services.FlightService.create_flight')
     def test_create_flight(self, mock_create_flight):
         mock_create_flight.return_value = self.flight
@@ -119,8 +195,72 @@ class FlightViewSetTests(AuthenticatedAPITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 1)
         self.assertEqual(response.data[0]['number'], '1A') # Changed from 'seat_number' to 'number' as per Seat model field
+        self.assertEqual(response.data[0]['price'], str(PricingService().quote(Flight.objects.get(pk=self.flight.pk), seat_1A)))
         mock_get_available_seats.assert_called_once_with(str(self.flight.pk))
 
+    def test_seat_availability(self):
+        seat_type_economy = SeatType.objects.create(name='Economy', code='ECO', price_multiplier=1.0)
+        seat_1A = Seat.objects.create(airplane=self.airplane, number='1A', row=1, column='A', seat_type=seat_type_economy, status='Available')
+        seat_1B = Seat.objects.create(airplane=self.airplane, number='1B', row=1, column='B', seat_type=seat_type_economy, status='Available')
+        passenger = Passenger.objects.create(first_name='Avail', email='avail@example.com', date_of_birth='1990-01-01', document_number='AVAIL1')
+        Reservation.objects.create(flight=self.flight, passenger=passenger, seat=seat_1B, status='CON', price=100.00, reservation_code='AVAILRES1')
+
+        response = self.client.get(reverse('flight-seat-availability', kwargs={'pk': self.flight.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['available_seat_ids'], [seat_1A.pk])
+        self.assertEqual(response.data['seat_types'], {'ECO': {'total': 2, 'available': 1}})
+        self.assertEqual([seat['available'] for seat in response.data['rows'][1]], [True, False])
+
+    def test_available_seats_served_from_snapshot_with_etag(self):
+        seat_type_economy = SeatType.objects.create(name='Economy', code='ECO', price_multiplier=1.0)
+        seat_1A = Seat.objects.create(airplane=self.airplane, number='1A', row=1, column='A', seat_type=seat_type_economy, status='Available')
+        url = reverse('flight-available-seats', kwargs={'pk': self.flight.pk})
+
+        first = self.client.get(url)
+        self.assertEqual([seat['id'] for seat in first.data], [seat_1A.pk])
+        with self.assertNumQueries(2):
+            # Token lookup and flight lookup; the seat list comes from the snapshot cache.
+            self.assertEqual(self.client.get(url).data, first.data)
+
+        not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        passenger = Passenger.objects.create(first_name='Etag', email='etag@example.com', date_of_birth='1990-01-01', document_number='ETAG1')
+        Reservation.objects.create(flight=self.flight, passenger=passenger, seat=seat_1A, status='PEN', price=100.00, reservation_code='ETAGRES1')
+        refreshed = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(refreshed.status_code, status.HTTP_200_OK)
+        self.assertEqual(refreshed.data, [])
+
+    def test_available_seats_reprice_when_a_seat_type_multiplier_changes(self):
+        seat_type = SeatType.objects.create(name='Economy', code='ECO', price_multiplier=1.0)
+        Seat.objects.create(airplane=self.airplane, number='1A', row=1, column='A', seat_type=seat_type, status='Available')
+        url = reverse('flight-available-seats', kwargs={'pk': self.flight.pk})
+        first = self.client.get(url)
+        fare = Decimal(first.data[0]['price'])
+
+        seat_type.price_multiplier = 3.0
+        seat_type.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], first['ETag'])
+        self.assertEqual(Decimal(response.data[0]['price']), fare * 3)
+
+    def test_available_seats_snapshot_changes_when_a_hold_expires(self):
+        seat_1A = Seat.objects.create(airplane=self.airplane, number='1A', row=1, column='A', status='Available')
+        passenger = Passenger.objects.create(first_name='Hold', email='hold@example.com', date_of_birth='1990-01-01', document_number='HOLD1')
+        SeatInventoryService().hold_seat(self.flight, seat_1A, passenger)
+        url = reverse('flight-available-seats', kwargs={'pk': self.flight.pk})
+
+        held = self.client.get(url)
+        self.assertEqual(held.data, [])
+        # The hold lapses without release_expired_holds running, so the inventory version is unchanged.
+        FlightSeat.objects.filter(flight=self.flight, seat=seat_1A).update(hold_expires_at=timezone.now() - timedelta(seconds=1))
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=held['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([seat['id'] for seat in response.data], [seat_1A.pk])
+
 class PassengerViewSetTests(AuthenticatedAPITestCase):
     def setUp(self):
         super().setUp()
@@ -144,6 +284,15 @@ class PassengerViewSetTests(AuthenticatedAPITestCase):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         mock_create_passenger.assert_called_once()
 
+    def test_create_passenger_rejects_email_differing_only_in_case(self):
+        data = {
+            'first_name': 'Case', 'email': 'SETUP@example.com', 'date_of_birth': '1990-01-01',
+            'document_number': 'CASE98765', 'document_type': 'DNI',
+        }
+        response = self.client.post(self.list_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('email', response.data)
+
     @patch('airline.services.PassengerService.update_passenger')
     def test_update_passenger(self, mock_update_passenger):
         updated_data = {'first_name': 'Jane'}
@@ -159,7 +308,7 @@ class PassengerViewSetTests(AuthenticatedAPITestCase):
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         mock_delete_passenger.assert_called_once()
 
-class ReservationViewSetTests(AuthenticatedAPITestCase):
+class ReservationViewSetTests(ListQueryCountMixin, AuthenticatedAPITestCase):
     def setUp(self):
         super().setUp()
         self.airplane = Airplane.objects.create(registration_number='N12345', manufacturer='Boeing', model_name='747', capacity=100)
@@ -213,13 +362,104 @@ class ReservationViewSetTests(AuthenticatedAPITestCase):
         mock_create_reservation.return_value = self.reservation
         response = self.client.post(self.list_url, self.reservation_data, format='json')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        mock_create_reservation.assert_called_once()
+        # The viewset resolves the related objects and passes instances, not IDs.
+        mock_create_reservation.assert_called_once_with(self.flight, self.passenger, self.seat, 150.00)
+
+    def test_create_reservation_unknown_seat(self):
+        data = dict(self.reservation_data, seat=99999)
+        response = self.client.post(self.list_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('seat', response.data)
+        self.assertNotIn('flight', response.data)
+
+    def test_create_reservation_with_seat_of_another_airplane(self):
+        other_airplane = Airplane.objects.create(model_name='Other', capacity=1, registration_number='OTHER1')
+        foreign_seat = Seat.objects.create(airplane=other_airplane, number='1A', row=1, column='A', status='Available')
+        other = Passenger.objects.create(first_name='Foreign', email='foreign@example.com', date_of_birth='1990-01-01', document_number='FOREIGN1')
+        response = self.client.post(self.list_url, {
+            'flight': self.flight.pk, 'passenger': other.pk, 'seat': foreign_seat.pk,
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['detail'], {'seat': ['Seat not found on this flight.']})
+
+    def test_update_reservation_into_taken_seat_returns_conflict(self):
+        other_seat = Seat.objects.create(airplane=self.airplane, number='1B', row=1, column='B', status='Available')
+        other_passenger = Passenger.objects.create(first_name='Jane', email='jane.doe@example.com', date_of_birth='1990-01-01', document_number='987654321')
+        other = Reservation.objects.create(
+            flight=self.flight, passenger=other_passenger, seat=other_seat, price=150.00, status='PEN', reservation_code='RES456'
+        )
+        response = self.client.patch(reverse('reservation-detail', kwargs={'pk': other.pk}), {'seat': self.seat.pk}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_list_reservations_query_count_is_constant(self):
+        def add_reservation(index):
+            passenger = Passenger.objects.create(
+                first_name=f'P{index}', email=f'p{index}@example.com', date_of_birth='1990-01-01', document_number=f'QC{index}'
+            )
+            seat = Seat.objects.create(airplane=self.airplane, number=f'{index + 2}A', row=index + 2, column='A', status='Available')
+            Reservation.objects.create(
+                flight=self.flight, passenger=passenger, seat=seat, price=150.00, status='PEN', reservation_code=f'QC{index}'
+            )
+
+        self.assertConstantListQueries(self.list_url, add_reservation)
+
+    def test_list_reservations_ndjson_stream(self):
+        response = self.client.get(self.list_url, {'stream': 'ndjson'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([row['reservation_code'] for row in rows], ['RES123'])
+
+    def test_create_reservation_seat_taken_returns_conflict(self):
+        other = Passenger.objects.create(first_name='Jane', email='jane.doe@example.com', date_of_birth='1990-01-01', document_number='987654321')
+        data = dict(self.reservation_data, passenger=other.pk)
+        response = self.client.post(self.list_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['detail'], 'This seat is already reserved for this flight.')
+
+    def test_batch_reservations(self):
+        other = Passenger.objects.create(first_name='Jane', email='jane.doe@example.com', date_of_birth='1990-01-01', document_number='987654321')
+        third = Passenger.objects.create(first_name='Jim', email='jim.doe@example.com', date_of_birth='1990-01-01', document_number='555555555')
+        seat_1b = Seat.objects.create(airplane=self.airplane, number='1B', row=1, column='B', seat_type=self.seat_type, status='Available')
+        url = reverse('reservation-batch')
+
+        conflict = self.client.post(url, {'flight': self.flight.pk, 'reservations': [
+            {'passenger': other.pk, 'seat': seat_1b.pk, 'price': 150},
+            {'passenger': third.pk, 'seat': self.seat.pk, 'price': 150},
+        ]}, format='json')
+        self.assertEqual(conflict.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual([r['status'] for r in conflict.data['results']], ['not_reserved', 'rejected'])
+
+        response = self.client.post(url, {'flight': self.flight.pk, 'reservations': [
+            {'passenger': other.pk, 'seat': seat_1b.pk, 'price': 150},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['results'][0]['reservation']['seat'], seat_1b.pk)
+
+    def test_batch_reservations_missing_fields(self):
+        response = self.client.post(reverse('reservation-batch'), {'flight': self.flight.pk}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batch_reservations_non_numeric_flight(self):
+        response = self.client.post(reverse('reservation-batch'), {
+            'flight': 'abc', 'reservations': [{'passenger': self.passenger.pk, 'seat': self.seat.pk}],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['detail'], 'flight must be a numeric ID.')
 
     def test_create_reservation_missing_fields(self):
         response = self.client.post(self.list_url, {}, format='json')
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('Missing required fields', response.data['detail'])
 
+    def test_create_reservation_without_price_uses_current_fare(self):
+        other = Passenger.objects.create(first_name='Fare', email='fare@example.com', date_of_birth='1990-01-01', document_number='FARE1')
+        seat = Seat.objects.create(airplane=self.flight.airplane, number='9A', row=9, column='A', status='Available')
+        fare = PricingService().quote(Flight.objects.get(pk=self.flight.pk), seat)
+        response = self.client.post(self.list_url, {'flight': self.flight.pk, 'passenger': other.pk, 'seat': seat.pk}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Decimal(response.data['price']), fare)
+
     @patch('airline.services.ReservationService.update_reservation')
     def test_update_reservation(self, mock_update_reservation):
         updated_data = {
@@ -261,7 +501,7 @@ class ReservationViewSetTests(AuthenticatedAPITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         mock_cancel_reservation.assert_called_once_with(str(self.reservation.pk))
 
-class SeatLayoutViewSetTests(AuthenticatedAPITestCase):
+class SeatLayoutViewSetTests(ListQueryCountMixin, AuthenticatedAPITestCase):
     def setUp(self):
         super().setUp()
         self.seat_layout_data = {'layout_name': 'Test Layout', 'rows': 5, 'columns': 5}
@@ -276,11 +516,46 @@ class SeatLayoutViewSetTests(AuthenticatedAPITestCase):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         mock_create_seat_layout_with_positions.assert_called_once()
 
+    def test_list_seat_layouts_query_count_is_constant(self):
+        seat_type = SeatType.objects.create(name='Economy', price_multiplier=1.0, code='ECO')
+
+        def add_layout(index):
+            layout = SeatLayout.objects.create(layout_name=f'Layout {index}', rows=2, columns=2)
+            for column in 'AB':
+                SeatLayoutPosition.objects.create(seat_layout=layout, row=1, column=column, seat_type=seat_type)
+
+        self.assertConstantListQueries(self.list_url, add_layout)
+
     def test_create_seat_layout_missing_fields(self):
         response = self.client.post(self.list_url, {'layout_name': 'Incomplete'}, format='json')
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('Missing required fields', response.data['detail'])
 
+    def test_import_seat_layout_spec(self):
+        SeatType.objects.create(name='Business', price_multiplier=1.8, code='BUS')
+        SeatType.objects.create(name='Economy', price_multiplier=1.0, code='ECO')
+        data = {'layout_name': 'A320', 'rows': 10, 'columns': 6,
+                'sections': ['1-2:A-F=BUS', {'rows': '3-10', 'columns': 'A-F', 'seat_type': 'ECO'}]}
+        response = self.client.post(reverse('seatlayout-import-spec'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(SeatLayoutPosition.objects.filter(seat_layout_id=response.data['id']).count(), 60)
+
+    def test_import_seat_layout_spec_reports_errors(self):
+        SeatType.objects.create(name='Economy', price_multiplier=1.0, code='ECO')
+        data = {'layout_name': 'Bad', 'rows': 2, 'columns': 2, 'sections': ['1-2:A-B=ECO', '2-3:B=ECO']}
+        response = self.client.post(reverse('seatlayout-import-spec'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['detail'], ["Row range '2-3' is outside the 2x2 layout."])
+        self.assertFalse(SeatLayout.objects.filter(layout_name='Bad').exists())
+
+    def test_import_seat_layout_spec_rejects_huge_ranges(self):
+        SeatType.objects.create(name='Economy', price_multiplier=1.0, code='ECO')
+        data = {'layout_name': 'Huge', 'rows': 10, 'columns': 6, 'sections': ['1-1000000000:A-Z=ECO']}
+        response = self.client.post(reverse('seatlayout-import-spec'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['detail'], ["Row range '1-1000000000' is outside the 10x6 layout."])
+        self.assertFalse(SeatLayout.objects.filter(layout_name='Huge').exists())
+
     @patch('airline.services.SeatLayoutService.update_seat_layout')
     def test_update_seat_layout(self, mock_update_seat_layout):
         updated_data = {'layout_name': 'Updated Layout'}
@@ -376,7 +651,7 @@ class SeatLayoutPositionViewSetTests(AuthenticatedAPITestCase):
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertEqual(SeatLayoutPosition.objects.count(), 0)
 
-class FlightHistoryViewSetTests(AuthenticatedAPITestCase):
+class FlightHistoryViewSetTests(ListQueryCountMixin, AuthenticatedAPITestCase):
     def setUp(self):
         super().setUp()
         self.airplane = Airplane.objects.create(registration_number='N12345', manufacturer='Boeing', model_name='747', capacity=100)
@@ -411,40 +686,101 @@ class FlightHistoryViewSetTests(AuthenticatedAPITestCase):
     def test_list_flight_history(self):
         response = self.client.get(self.list_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertNotIn('count', response.data)
+
+    def test_list_flight_history_query_count_is_constant(self):
+        self.assertConstantListQueries(self.list_url, lambda index: FlightHistory.objects.create(
+            flight=self.flight, passenger=self.passenger, seat_number=f'{index + 2}A', price_paid=150.00
+        ))
+
+    def test_list_flight_history_ndjson_stream(self):
+        FlightHistory.objects.create(flight=self.flight, passenger=self.passenger, seat_number='2B', price_paid=90.00)
+        response = self.client.get(self.list_url, {'stream': 'ndjson'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)['seat_number'] for line in lines], ['2B', '1A'])
+
+    def test_list_unsupported_stream_format(self):
+        response = self.client.get(self.list_url, {'stream': 'csv'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
     def test_retrieve_flight_history(self):
         response = self.client.get(self.detail_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['seat_number'], '1A')
 
-    @patch('airline.services.FlightHistoryService.get_flight_history_by_passenger')
-    def test_by_passenger(self, mock_get_flight_history_by_passenger):
-        mock_get_flight_history_by_passenger.return_value = [self.flight_history]
+    def test_by_passenger(self):
+        other = Passenger.objects.create(first_name='Other', email='other.history@example.com', date_of_birth='1990-01-01', document_number='HIST-OTHER')
+        FlightHistory.objects.create(flight=self.flight, passenger=other, seat_number='9Z', price_paid=80.00)
         response = self.client.get(reverse('flighthistory-by-passenger'), {'passenger_id': self.passenger.pk})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        mock_get_flight_history_by_passenger.assert_called_once_with(str(self.passenger.pk))
+        self.assertEqual([entry['seat_number'] for entry in response.data['results']], ['1A'])
+        self.assertIn('next', response.data)
+
+    def test_by_passenger_pages_by_cursor_with_constant_queries(self):
+        url = reverse('flighthistory-by-passenger')
+
+        def add_entry(index):
+            FlightHistory.objects.create(
+                flight=self.flight, passenger=self.passenger, seat_number=f'{index + 2}A', price_paid=150.00,
+                booking_date=timezone.now() - timedelta(days=index + 1),
+            )
+
+        self.assertConstantListQueries(url, add_entry, params={'passenger_id': self.passenger.pk})
+        first = self.client.get(url, {'passenger_id': self.passenger.pk, 'page_size': 2})
+        second = self.client.get(first.data['next'])
+        self.assertEqual([entry['seat_number'] for entry in first.data['results']], ['1A', '2A'])
+        self.assertEqual([entry['seat_number'] for entry in second.data['results']], ['3A', '4A'])
 
     def test_by_passenger_missing_id(self):
         response = self.client.get(reverse('flighthistory-by-passenger'))
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('Passenger ID is required', response.data['detail'])
 
-    @patch('airline.services.FlightHistoryService.get_flight_history_by_flight')
-    def test_by_flight(self, mock_get_flight_history_by_flight):
-        mock_get_flight_history_by_flight.return_value = [self.flight_history]
+    def test_by_flight(self):
+        other = Flight.objects.create(
+            origin='LAX', destination='JFK', departure_date=datetime.now(), arrival_date=datetime.now() + timedelta(hours=3),
+            duration=timedelta(hours=3), status='Scheduled', base_price=100.00, airplane=self.airplane,
+        )
+        FlightHistory.objects.create(flight=other, passenger=self.passenger, seat_number='9Z', price_paid=80.00)
         response = self.client.get(reverse('flighthistory-by-flight'), {'flight_id': self.flight.pk})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        mock_get_flight_history_by_flight.assert_called_once_with(str(self.flight.pk))
+        self.assertEqual([entry['seat_number'] for entry in response.data['results']], ['1A'])
+        self.assertIn('next', response.data)
+
+    def test_by_flight_pages_by_cursor_with_constant_queries(self):
+        url = reverse('flighthistory-by-flight')
+
+        def add_entry(index):
+            passenger = Passenger.objects.create(
+                first_name='Guest', email=f'guest{index}.history@example.com', date_of_birth='1990-01-01',
+                document_number=f'HIST-{index}',
+            )
+            FlightHistory.objects.create(
+                flight=self.flight, passenger=passenger, seat_number=f'{index + 2}A', price_paid=150.00,
+                booking_date=timezone.now() - timedelta(days=index + 1),
+            )
+
+        self.assertConstantListQueries(url, add_entry, params={'flight_id': self.flight.pk})
+        first = self.client.get(url, {'flight_id': self.flight.pk, 'page_size': 2})
+        second = self.client.get(first.data['next'])
+        self.assertEqual([entry['seat_number'] for entry in first.data['results']], ['1A', '2A'])
+        self.assertEqual([entry['seat_number'] for entry in second.data['results']], ['3A', '4A'])
+
+    def test_by_flight_streams_ndjson(self):
+        response = self.client.get(reverse('flighthistory-by-flight'), {'flight_id': self.flight.pk, 'stream': 'ndjson'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)['seat_number'] for line in lines], ['1A'])
 
     def test_by_flight_missing_id(self):
         response = self.client.get(reverse('flighthistory-by-flight'))
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('Flight ID is required', response.data['detail'])
 
-class TicketViewSetTests(AuthenticatedAPITestCase):
+class TicketViewSetTests(ListQueryCountMixin, AuthenticatedAPITestCase):
     def setUp(self):
         super().setUp()
         self.airplane = Airplane.objects.create(registration_number='N12345', manufacturer='Boeing', model_name='747', capacity=100)
@@ -495,7 +831,37 @@ class TicketViewSetTests(AuthenticatedAPITestCase):
     def test_list_tickets(self):
         response = self.client.get(self.list_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_list_tickets_query_count_is_constant(self):
+        def add_ticket(index):
+            reservation = Reservation.objects.create(
+                flight=self.flight, passenger=self.passenger, seat=self.seat, price=150.00, status='CAN', reservation_code=f'QC{index}'
+            )
+            Ticket.objects.create(reservation=reservation, barcode=f'QC{index}', status='EMI')
+
+        self.assertConstantListQueries(self.list_url, add_ticket)
+
+    def test_list_tickets_keyset_pages(self):
+        reservation = self.reservation
+        tickets = [self.ticket]
+        for index in range(4):
+            reservation.pk = None
+            reservation.reservation_code = f'PAGE{index}'
+            reservation.status = 'CAN'
+            reservation.save()
+            tickets.append(Ticket.objects.create(reservation=reservation, barcode=f'PAGE{index}', status='EMI'))
+        expected = [t.barcode for t in sorted(tickets, key=lambda t: (t.issue_date, t.pk), reverse=True)]
+
+        seen = []
+        response = self.client.get(self.list_url, {'page_size': 2, 'count': 'true'})
+        self.assertEqual(response.data['count'], 5)
+        while True:
+            seen.extend(t['ticket_number'] for t in response.data['results'])
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+        self.assertEqual(seen, expected)
 
     def test_retrieve_ticket(self):
         response = self.client.get(self.detail_url)
@@ -516,6 +882,41 @@ class TicketViewSetTests(AuthenticatedAPITestCase):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         mock_issue_ticket.assert_called_once_with(str(self.reservation.pk))
 
+    def test_ticket_pdf(self):
+        url = reverse('ticket-pdf', kwargs={'pk': self.ticket.pk})
+        with tempfile.TemporaryDirectory() as root, override_settings(TICKET_PDF_WORKERS=0, TICKET_PDF_ROOT=root):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response['Content-Type'], 'application/pdf')
+            self.assertIn('ticket_TKT12345.pdf', response['Content-Disposition'])
+            response.close()
+
+    @patch('airline.services.get_executor')
+    def test_ticket_pdf_pending(self, mock_get_executor):
+        url = reverse('ticket-pdf', kwargs={'pk': self.ticket.pk})
+        with tempfile.TemporaryDirectory() as root, override_settings(TICKET_PDF_WORKERS=2, TICKET_PDF_ROOT=root):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data, {'status': 'pending'})
+        self.assertIn('Retry-After', response)
+        mock_get_executor.return_value.submit.assert_called_once()
+
+    @patch('airline.services.get_executor')
+    def test_issue_tickets_for_flight(self, mock_get_executor):
+        url = reverse('ticket-issue-for-flight')
+        with tempfile.TemporaryDirectory() as root, override_settings(TICKET_PDF_WORKERS=2, TICKET_PDF_ROOT=root):
+            response = self.client.post(url, {'flight_id': self.flight.pk}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 0)
+        self.assertEqual(response.data['rendering'], 1)
+        self.assertEqual([t['ticket_number'] for t in response.data['tickets']], ['TKT12345'])
+        mock_get_executor.return_value.submit.assert_called_once()
+
+    def test_issue_tickets_for_flight_errors(self):
+        url = reverse('ticket-issue-for-flight')
+        self.assertEqual(self.client.post(url, {}, format='json').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.post(url, {'flight_id': 99999}, format='json').status_code, status.HTTP_404_NOT_FOUND)
+
     @patch('airline.services.TicketService.cancel_ticket')
     def test_cancel_ticket(self, mock_cancel_ticket):
         mock_cancel_ticket.return_value = self.ticket
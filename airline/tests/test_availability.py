@@ -0,0 +1,41 @@
+from django.test import SimpleTestCase
+
+from airline.availability import SeatAvailability
+
+
+class SeatAvailabilityTest(SimpleTestCase):
+    def setUp(self):
+        self.availability = SeatAvailability.from_rows(7, [
+            (1, '1A', 1, 'A', 'BUS', 'SLD'),
+            (2, '1B', 1, 'B', 'BUS', 'AVL'),
+            (3, '2A', 2, 'A', 'ECO', 'RES'),
+            (4, '2B', 2, 'B', 'ECO', 'AVL'),
+            (5, '2C', 2, 'C', None, 'AVL'),
+        ])
+
+    def test_id_sets(self):
+        self.assertEqual(self.availability.available_ids, frozenset({2, 4, 5}))
+        self.assertEqual(self.availability.unavailable_ids, frozenset({1, 3}))
+        self.assertTrue(self.availability.is_available(4))
+        self.assertFalse(self.availability.is_available(3))
+        self.assertFalse(self.availability.is_available(99))
+
+    def test_counts_and_load_factor(self):
+        self.assertEqual(self.availability.total, 5)
+        self.assertEqual(self.availability.available_count, 3)
+        self.assertAlmostEqual(self.availability.load_factor, 0.4)
+        self.assertEqual(self.availability.counts_by_seat_type(), {
+            'BUS': {'total': 2, 'available': 1},
+            'ECO': {'total': 2, 'available': 1},
+            None: {'total': 1, 'available': 1},
+        })
+
+    def test_by_row(self):
+        rows = self.availability.by_row()
+        self.assertEqual(list(rows), [1, 2])
+        self.assertEqual([seat.number for seat in rows[2]], ['2A', '2B', '2C'])
+
+    def test_empty_flight(self):
+        availability = SeatAvailability.from_rows(1, [])
+        self.assertEqual(availability.load_factor, 0.0)
+        self.assertEqual(availability.as_dict()['rows'], {})
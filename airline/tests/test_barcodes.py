@@ -0,0 +1,57 @@
+from django.template import Context, Template
+from django.test import SimpleTestCase
+
+from airline.barcodes import CODE128_PATTERNS, QUIET_ZONE, code128_modules, code128_svg, code128_values
+
+
+class Code128Test(SimpleTestCase):
+    def test_patterns_are_unique_and_eleven_modules_wide(self):
+        self.assertEqual(len(set(CODE128_PATTERNS)), 107)
+        self.assertTrue(all(sum(map(int, pattern)) == 11 for pattern in CODE128_PATTERNS[:106]))
+        self.assertEqual(sum(map(int, CODE128_PATTERNS[106])), 13)
+
+    def test_code_set_b_with_checksum(self):
+        # Start B, P, J, J, 1, 2, 3, C, checksum, stop.
+        self.assertEqual(code128_values('PJJ123C'), [104, 48, 42, 42, 17, 18, 19, 35, 55, 106])
+
+    def test_digit_runs_use_code_set_c(self):
+        self.assertEqual(code128_values('1234'), [105, 12, 34, 82, 106])
+        self.assertEqual(code128_values('A123456')[:6], [104, 33, 99, 12, 34, 56])
+        # An odd run keeps its first digit in set B and pairs the rest.
+        self.assertEqual(code128_values('AB1234567')[:7], [104, 33, 34, 17, 99, 23, 45])
+        # Back to set B when the digits run out.
+        self.assertEqual(code128_values('12345A')[:6], [105, 12, 34, 100, 21, 33])
+
+    def test_short_digit_runs_stay_in_code_set_b(self):
+        self.assertEqual(code128_values('a12b')[:5], [104, 65, 17, 18, 66])
+
+    def test_rejects_empty_and_non_printable_data(self):
+        with self.assertRaises(ValueError):
+            code128_values('')
+        with self.assertRaises(ValueError):
+            code128_values('ñ')
+
+    def test_modules_decode_back_to_values(self):
+        data = '9f86d081884c7d659a2f'
+        values = code128_values(data)
+        modules = ''.join(map(str, code128_modules(data)))
+        symbols = [modules[i:i + 6] for i in range(0, len(modules) - 7, 6)] + [modules[-7:]]
+        self.assertEqual([CODE128_PATTERNS.index(symbol) for symbol in symbols], values)
+
+    def test_svg_draws_one_bar_per_odd_module_run(self):
+        svg = code128_svg('TICKET42', module_width=3, height=50)
+        modules = code128_modules('TICKET42')
+        width = (sum(modules) + 2 * QUIET_ZONE) * 3
+        self.assertTrue(svg.startswith(f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="50"'))
+        self.assertEqual(svg.count('z'), (len(modules) + 1) // 2)
+        self.assertIn(f'M{QUIET_ZONE * 3} 0h{modules[0] * 3}v50', svg)
+
+    def test_svg_is_cached(self):
+        code128_svg.cache_clear()
+        code128_svg('CACHED')
+        code128_svg('CACHED')
+        self.assertEqual(code128_svg.cache_info().hits, 1)
+
+    def test_template_tag(self):
+        rendered = Template('{% load airline_barcodes %}{% code128_svg code %}').render(Context({'code': 'AB12'}))
+        self.assertEqual(rendered, code128_svg('AB12'))
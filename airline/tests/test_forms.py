@@ -1,7 +1,7 @@
 from django.test import TestCase
 from django.contrib.auth.models import User
 from airline.forms import CustomUserCreationForm, ReservationForm
-from airline.models import Flight, Passenger, Seat, Reservation, Airplane, SeatLayout, SeatType, SeatLayoutPosition
+from airline.models import Flight, Passenger, Seat, Reservation, Airplane, SeatLayout, SeatType, SeatLayoutPosition, FlightSeat
 from django.utils import timezone
 from datetime import timedelta
 
@@ -97,3 +97,19 @@ class ReservationFormTest(TestCase):
     def test_reservation_form_initial_queryset(self):
         form = ReservationForm(initial={'flight': self.flight})
         self.assertQuerySetEqual(form.fields['seat'].queryset, Seat.objects.filter(airplane=self.airplane, status='Available'), transform=lambda x: x)
+
+    def test_reservation_form_queryset_is_per_flight(self):
+        other_flight = Flight.objects.create(
+            airplane=self.airplane,
+            origin="MIA",
+            destination="EZE",
+            departure_date=timezone.now() + timedelta(days=3),
+            arrival_date=timezone.now() + timedelta(days=3, hours=3),
+            duration=timedelta(hours=3),
+            status="Scheduled",
+            base_price=500.00
+        )
+        FlightSeat.objects.create(flight=self.flight, seat=self.seat, status='RES')
+        FlightSeat.objects.create(flight=other_flight, seat=self.seat, status='AVL')
+        self.assertNotIn(self.seat, ReservationForm(initial={'flight': self.flight}).fields['seat'].queryset)
+        self.assertIn(self.seat, ReservationForm(initial={'flight': other_flight}).fields['seat'].queryset)
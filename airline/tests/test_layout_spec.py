@@ -0,0 +1,63 @@
+from django.core.exceptions import ValidationError
+from django.test import SimpleTestCase
+
+from airline.layout_spec import MAX_LAYOUT_CELLS, MAX_SPEC_ERRORS, LayoutSection, check_positions, expand_layout_spec
+
+
+class LayoutSpecTest(SimpleTestCase):
+    def test_parses_dict_and_compact_sections(self):
+        expected = LayoutSection((1, 2, 3, 5), ('A', 'B', 'C', 'F'), 'BUS')
+        self.assertEqual(LayoutSection.parse({'rows': '1-3,5', 'columns': 'A-C,F', 'seat_type': 'bus'}), expected)
+        self.assertEqual(LayoutSection.parse('1-3,5:ABCF=BUS'), expected)
+        self.assertEqual(LayoutSection.parse({'rows': 7, 'columns': 'a', 'seat_type': 'ECO'}).rows, (7,))
+        self.assertEqual(LayoutSection.parse('1-3,5:ABCF=BUS', rows=5, columns=6), expected)
+
+    def test_rejects_malformed_sections(self):
+        for section in ['1-3:A-C', '3-1:A=ECO', 'x:A=ECO', '1:C-A=ECO', '1:A1=ECO', {'rows': '1'}, 42]:
+            with self.subTest(section=section), self.assertRaises(ValidationError):
+                LayoutSection.parse(section)
+
+    def test_expands_sections_to_positions(self):
+        cells = expand_layout_spec(3, 4, ['1:A-D=BUS', {'rows': '2-3', 'columns': 'A-D', 'seat_type': 'ECO'}])
+        self.assertEqual(len(cells), 12)
+        self.assertEqual(cells[(1, 'D')], 'BUS')
+        self.assertEqual(cells[(3, 'A')], 'ECO')
+
+    def test_reports_out_of_bounds_and_duplicate_positions(self):
+        with self.assertRaises(ValidationError) as ctx:
+            expand_layout_spec(2, 2, ['1-2:A-B=ECO', '2:B=BUS', '2:B-C=BUS', '3:A=ECO'])
+        self.assertEqual(ctx.exception.messages, [
+            "Column group 'B-C' is outside the 2x2 layout.",
+            "Row range '3' is outside the 2x2 layout.",
+            'Seat 2B is defined more than once.',
+        ])
+
+    def test_rejects_ranges_outside_the_layout_before_expanding(self):
+        with self.assertRaises(ValidationError) as ctx:
+            expand_layout_spec(10, 6, ['1-1000000000:A-Z=ECO'])
+        self.assertEqual(ctx.exception.messages, ["Row range '1-1000000000' is outside the 10x6 layout."])
+        with self.assertRaises(ValidationError) as ctx:
+            expand_layout_spec(10, 6, ['1-10,1-10:A=ECO', '1:A,A,A,A,A,A,A=ECO'])
+        self.assertEqual(ctx.exception.messages, [
+            'Row ranges repeat rows of the 10x6 layout.',
+            'Column groups repeat columns of the 10x6 layout.',
+        ])
+
+    def test_caps_layout_and_spec_size(self):
+        with self.assertRaises(ValidationError):
+            expand_layout_spec(MAX_LAYOUT_CELLS + 1, 1, ['1:A=ECO'])
+        with self.assertRaises(ValidationError) as ctx:
+            expand_layout_spec(MAX_LAYOUT_CELLS, 1, ['1-10000:A=ECO'] * 2)
+        self.assertEqual(ctx.exception.messages, [
+            f'The spec defines {2 * MAX_LAYOUT_CELLS} seats; a layout has at most {MAX_LAYOUT_CELLS}.',
+        ])
+
+    def test_caps_reported_errors(self):
+        with self.assertRaises(ValidationError) as ctx:
+            check_positions(1, 1, [(row, 'A') for row in range(2, 100)])
+        self.assertEqual(len(ctx.exception.messages), MAX_SPEC_ERRORS + 1)
+
+    def test_requires_sections(self):
+        for sections in [None, [], '1:A=ECO']:
+            with self.subTest(sections=sections), self.assertRaises(ValidationError):
+                expand_layout_spec(1, 1, sections)
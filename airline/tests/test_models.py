@@ -2,7 +2,8 @@ from django.test import TestCase
 from django.utils import timezone
 from datetime import timedelta
 from django.core.exceptions import ValidationError
-from airline.models import Airplane, Flight, Passenger, Seat, Reservation, UserProfile, Ticket, FlightHistory, SeatLayout, SeatType, SeatLayoutPosition
+from airline.models import Airplane, Flight, Passenger, Seat, Reservation, UserProfile, Ticket, FlightHistory, SeatLayout, SeatType, SeatLayoutPosition, FlightSeat
+from airline.services import SeatInventoryService
 
 class AirplaneModelTest(TestCase):
     def setUp(self):
@@ -193,7 +194,25 @@ class ReservationModelTest(TestCase):
         self.assertEqual(reservation.price, 120.00)
         self.assertEqual(str(reservation), f"Reservation RES12345 for Alice on flight {self.flight.id}")
 
-    def test_reservation_seat_status_update_confirmed(self):
+    def _inventory_status(self, flight=None):
+        return FlightSeat.objects.get(flight=flight or self.flight, seat=self.seat).status
+
+    def _create_flight_with_inventory(self):
+        flight = Flight.objects.create(
+            airplane=self.airplane,
+            origin="COR",
+            destination="MDZ",
+            departure_date=timezone.now() + timedelta(days=5),
+            arrival_date=timezone.now() + timedelta(days=5, hours=1),
+            duration=timedelta(hours=1),
+            status="Scheduled",
+            base_price=100.00
+        )
+        SeatInventoryService().create_inventory(flight)
+        return flight
+
+    def test_reservation_status_update_confirmed(self):
+        SeatInventoryService().create_inventory(self.flight)
         reservation = Reservation.objects.create(
             flight=self.flight,
             passenger=self.passenger,
@@ -204,12 +223,12 @@ class ReservationModelTest(TestCase):
         )
         reservation.status = "CON"
         reservation.save()
+        self.assertEqual(self._inventory_status(), "RES")
         self.seat.refresh_from_db()
-        self.assertEqual(self.seat.status, "Reserved")
+        self.assertEqual(self.seat.status, "Available")
 
-    def test_reservation_seat_status_update_cancelled(self):
-        self.seat.status = "Reserved"
-        self.seat.save()
+    def test_reservation_status_update_cancelled(self):
+        SeatInventoryService().create_inventory(self.flight)
         reservation = Reservation.objects.create(
             flight=self.flight,
             passenger=self.passenger,
@@ -220,12 +239,28 @@ class ReservationModelTest(TestCase):
         )
         reservation.status = "CAN"
         reservation.save()
-        self.seat.refresh_from_db()
-        self.assertEqual(self.seat.status, "Available")
+        self.assertEqual(self._inventory_status(), "AVL")
+
+    def test_reservation_changes_bump_inventory_version(self):
+        reservation = Reservation.objects.create(
+            flight=self.flight,
+            passenger=self.passenger,
+            seat=self.seat,
+            status="PEN",
+            price=120.00,
+            reservation_code="RES12350"
+        )
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.inventory_version, 1)
+
+        reservation.status = "CAN"
+        reservation.save()
+        reservation.delete()
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.inventory_version, 3)
 
     def test_reservation_clean_confirmed_invalid_seat_status(self):
-        self.seat.status = "Available"
-        self.seat.save()
+        SeatInventoryService().create_inventory(self.flight)
         reservation = Reservation(
             flight=self.flight,
             passenger=self.passenger,
@@ -234,12 +269,12 @@ class ReservationModelTest(TestCase):
             price=120.00,
             reservation_code="RES12348"
         )
-        with self.assertRaisesMessage(ValidationError, 'The seat must be in "Reserved" or "Occupied" status for a confirmed/paid reservation.'):
+        with self.assertRaisesMessage(ValidationError, 'The seat must be reserved or sold on this flight for a confirmed/paid reservation.'):
             reservation.full_clean()
 
     def test_reservation_clean_cancelled_invalid_seat_status(self):
-        self.seat.status = "Reserved"
-        self.seat.save()
+        SeatInventoryService().create_inventory(self.flight)
+        FlightSeat.objects.filter(flight=self.flight, seat=self.seat).update(status='RES')
         reservation = Reservation(
             flight=self.flight,
             passenger=self.passenger,
@@ -248,9 +283,32 @@ class ReservationModelTest(TestCase):
             price=120.00,
             reservation_code="RES12349"
         )
-        with self.assertRaisesMessage(ValidationError, 'The seat must be in "Available" status for a cancelled reservation.'):
+        with self.assertRaisesMessage(ValidationError, 'The seat must be available on this flight for a cancelled reservation.'):
             reservation.full_clean()
 
+    def test_reservation_clean_uses_the_flight_inventory(self):
+        SeatInventoryService().create_inventory(self.flight)
+        confirmed = Reservation.objects.create(
+            flight=self.flight, passenger=self.passenger, seat=self.seat, status="CON", price=120.00,
+            reservation_code="RES12351"
+        )
+        other_flight = self._create_flight_with_inventory()
+        other_passenger = Passenger.objects.create(
+            first_name="Bob", document_number="11223344", email="bob@example.com", date_of_birth="1990-01-01",
+            document_type="DNI"
+        )
+        cancelled = Reservation.objects.create(
+            flight=other_flight, passenger=other_passenger, seat=self.seat, status="CON", price=120.00,
+            reservation_code="RES12352"
+        )
+        cancelled.status = "CAN"
+        cancelled.save()
+
+        self.assertEqual(self._inventory_status(), "RES")
+        self.assertEqual(self._inventory_status(other_flight), "AVL")
+        confirmed.full_clean()
+        cancelled.full_clean()
+
 class UserProfileModelTest(TestCase):
     def test_create_user_profile(self):
         user_profile = UserProfile.objects.create(
@@ -0,0 +1,42 @@
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+
+from airline.pricing import FareTable, StepCurve
+
+
+class StepCurveTest(SimpleTestCase):
+    def setUp(self):
+        self.curve = StepCurve.from_pairs([(0.8, '1.25'), (0.0, 1), (0.5, '1.10')])
+
+    def test_steps_are_sorted(self):
+        self.assertEqual([threshold for threshold, _ in self.curve.steps], [0.0, 0.5, 0.8])
+
+    def test_multiplier_for_uses_highest_threshold_not_above_value(self):
+        self.assertEqual(self.curve.multiplier_for(0.0), Decimal('1'))
+        self.assertEqual(self.curve.multiplier_for(0.49), Decimal('1'))
+        self.assertEqual(self.curve.multiplier_for(0.5), Decimal('1.10'))
+        self.assertEqual(self.curve.multiplier_for(0.99), Decimal('1.25'))
+
+    def test_value_below_first_threshold(self):
+        curve = StepCurve.from_pairs([(2, '1.40')])
+        self.assertEqual(curve.step_for(1), -1)
+        self.assertEqual(curve.multiplier_for(1), Decimal('1'))
+
+
+class FareTableTest(SimpleTestCase):
+    def test_build_prices_each_seat_type(self):
+        table = FareTable.build(7, Decimal('100.00'), Decimal('1.10'), [
+            (1, 'ECO', Decimal('1.00')),
+            (2, 'BUS', Decimal('1.55')),
+        ])
+        self.assertEqual(table.for_type_id(1), Decimal('110.00'))
+        self.assertEqual(table.for_code('BUS'), Decimal('170.50'))
+        self.assertEqual(table.for_type_id(None), Decimal('110.00'))
+        self.assertEqual(table.for_code('UNKNOWN'), table.base_fare)
+
+    def test_fares_are_rounded_half_up_to_cents(self):
+        table = FareTable.build(7, Decimal('99.99'), Decimal('1.25'), [(1, 'ECO', Decimal('1.00'))])
+        self.assertEqual(table.for_type_id(1), Decimal('124.99'))
+        table = FareTable.build(7, Decimal('0.10'), Decimal('1.05'), [(1, 'ECO', Decimal('1.00'))])
+        self.assertEqual(table.for_type_id(1), Decimal('0.11'))
@@ -1,3 +1,7 @@
+import csv
+import io
+import json
+
 from django.test import TestCase, Client
 from django.urls import reverse
 from django.contrib.auth import get_user_model
@@ -5,7 +9,7 @@ from airline.models import (
     Airplane, Flight, Passenger, Reservation, FlightHistory,
     SeatLayout, SeatType, SeatLayoutPosition, Seat
 )
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from decimal import Decimal
 import uuid
 
@@ -158,3 +162,81 @@ class ReportViewTests(TestCase):
         self.assertContains(response, self.passenger2.first_name)
         self.assertContains(response, self.seat1A.number)
         self.assertContains(response, self.seat1B.number)
+
+    def _streamed_text(self, response):
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_export_flight_manifest_csv(self):
+        response = self.client.get(reverse('export_flight_manifest', args=[self.flight.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(response['Content-Disposition'], f'attachment; filename="manifest_flight_{self.flight.pk}.csv"')
+        with self.assertNumQueries(1):
+            rows = list(csv.DictReader(io.StringIO(self._streamed_text(response))))
+        self.assertEqual([row['Last Name'] for row in rows], ['Doe', 'Smith'])
+        self.assertEqual([row['Seat Number'] for row in rows], ['1A', '1B'])
+        self.assertEqual([row['Seat Type'] for row in rows], ['ECO', 'PRE'])
+        self.assertEqual(rows[0]['Reservation Code'], self.reservation1.reservation_code)
+        self.assertEqual(rows[1]['Price'], '300.00')
+
+    def test_export_flight_manifest_skips_cancelled_reservations(self):
+        self.reservation2.status = 'CAN'
+        self.reservation2.save()
+        response = self.client.get(reverse('export_flight_manifest', args=[self.flight.pk]), {'format': 'ndjson'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = [json.loads(line) for line in self._streamed_text(response).splitlines()]
+        self.assertEqual([line['email'] for line in lines], [self.passenger1.email])
+        self.assertEqual(lines[0]['flight_id'], self.flight.pk)
+        self.assertEqual(lines[0]['status'], 'Confirmed')
+
+    def test_export_flight_manifest_excel_starts_with_bom(self):
+        response = self.client.get(reverse('export_flight_manifest', args=[self.flight.pk]), {'format': 'excel'})
+        content = self._streamed_text(response)
+        self.assertTrue(content.startswith('\ufeffFlight,'))
+        self.assertIn(self.flight.departure_date.strftime('%Y-%m-%d %H:%M'), content)
+
+    def test_export_flight_manifest_rejects_unknown_format(self):
+        response = self.client.get(reverse('export_flight_manifest', args=[self.flight.pk]), {'format': 'xml'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_export_manifests_by_departure_window(self):
+        later_flight = Flight.objects.create(
+            airplane=self.airplane, origin='LAX', destination='JFK',
+            departure_date=self.flight.departure_date + timedelta(days=10),
+            arrival_date=self.flight.departure_date + timedelta(days=10, hours=5),
+            duration=timedelta(hours=5), status='Scheduled', base_price=Decimal('200.00'),
+        )
+        Reservation.objects.create(
+            flight=later_flight, passenger=self.passenger1, seat=self.seat1A, status='PAID',
+            price=Decimal('200.00'), reservation_code='LATERFLIGHT',
+        )
+        departure_day = self.flight.departure_date.date()
+        response = self.client.get(reverse('export_manifests'), {
+            'date_from': departure_day.isoformat(), 'date_to': departure_day.isoformat(),
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response['Content-Disposition'],
+            f'attachment; filename="manifest_{departure_day.isoformat()}_{departure_day.isoformat()}.csv"',
+        )
+        rows = list(csv.DictReader(io.StringIO(self._streamed_text(response))))
+        self.assertEqual({row['Flight'] for row in rows}, {str(self.flight.pk)})
+
+        response = self.client.get(reverse('export_manifests'), {
+            'date_from': departure_day.isoformat(), 'date_to': (departure_day + timedelta(days=10)).isoformat(),
+        })
+        rows = list(csv.DictReader(io.StringIO(self._streamed_text(response))))
+        self.assertEqual([row['Reservation Code'] for row in rows][-1], 'LATERFLIGHT')
+        self.assertEqual(len(rows), 3)
+
+    def test_export_manifests_form(self):
+        response = self.client.get(reverse('export_manifests'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'airline/manifest_export.html')
+
+        response = self.client.get(reverse('export_manifests'), {
+            'date_from': date(2025, 5, 2).isoformat(), 'date_to': date(2025, 5, 1).isoformat(),
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('date_to', response.context['form'].errors)
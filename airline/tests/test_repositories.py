@@ -1,4 +1,5 @@
 from django.test import TestCase
+from django.db import IntegrityError, transaction
 from django.db.models import Model
 from django.shortcuts import get_object_or_404
 from unittest.mock import patch, MagicMock
@@ -127,16 +128,32 @@ class PassengerRepositoryTests(TestCase):
     def test_model_is_passenger(self):
         self.assertEqual(self.repository.model, Passenger)
 
-    @patch.object(Passenger.objects, 'get_or_create')
-    def test_get_or_create_passenger(self, mock_get_or_create):
-        mock_passenger = MagicMock(email='test@example.com')
-        mock_get_or_create.return_value = (mock_passenger, True)
-        email = 'test@example.com'
-        defaults = {'first_name': 'Test', 'last_name': 'User'}
-        result, created = self.repository.get_or_create_passenger(email, defaults)
-        mock_get_or_create.assert_called_once_with(email=email, defaults=defaults)
-        self.assertEqual(result, mock_passenger)
+    def test_get_or_create_passenger(self):
+        defaults = {'first_name': 'Test', 'last_name': 'User', 'document_number': 'REPO-1', 'date_of_birth': '2000-01-01'}
+        result, created = self.repository.get_or_create_passenger('test@example.com', defaults)
         self.assertTrue(created)
+        self.assertEqual(result.email, 'test@example.com')
+
+        again, created = self.repository.get_or_create_passenger('TEST@example.com', defaults)
+        self.assertFalse(created)
+        self.assertEqual(again.pk, result.pk)
+
+    def test_email_is_unique_regardless_of_case(self):
+        Passenger.objects.create(first_name='Case', document_number='REPO-4', email='case@example.com', date_of_birth='2000-01-01')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Passenger.objects.create(first_name='Case', document_number='REPO-5', email='CASE@example.com', date_of_birth='2000-01-01')
+        self.assertEqual(self.repository.get_by_email('Case@Example.com').document_number, 'REPO-4')
+
+    def test_get_or_create_passenger_recovers_from_concurrent_insert(self):
+        existing = Passenger.objects.create(
+            first_name='Race', document_number='REPO-2', email='race@example.com', date_of_birth='2000-01-01'
+        )
+        defaults = {'first_name': 'Race', 'document_number': 'REPO-3', 'date_of_birth': '2000-01-01'}
+        # The first lookup misses as if the other request had not committed yet.
+        with patch.object(self.repository, 'get_by_email', side_effect=[None, existing]):
+            result, created = self.repository.get_or_create_passenger('race@example.com', defaults)
+        self.assertFalse(created)
+        self.assertEqual(result, existing)
 
 class ReservationRepositoryTests(TestCase):
     def setUp(self):
@@ -188,7 +205,8 @@ class FlightHistoryRepositoryTests(TestCase):
         mock_passenger = MagicMock(id=1)
         self.repository.filter_by_passenger_ordered(mock_passenger)
         mock_filter.assert_called_once_with(passenger=mock_passenger)
-        mock_filter.return_value.order_by.assert_called_once_with('-booking_date')
+        mock_filter.return_value.select_related.assert_called_once_with('flight', 'flight__airplane')
+        mock_filter.return_value.select_related.return_value.order_by.assert_called_once_with('-booking_date', '-id')
 
     @patch.object(FlightHistory.objects, 'filter')
     def test_filter_by_flight(self, mock_filter):
@@ -245,3 +263,12 @@ class SeatLayoutPositionRepositoryTests(TestCase):
 
     def test_model_is_seatlayoutposition(self):
         self.assertEqual(self.repository.model, SeatLayoutPosition)
+
+    @patch.object(SeatLayoutPosition.objects, 'filter')
+    def test_get_seat_type_map(self, mock_filter):
+        mock_layout = MagicMock(id=1)
+        mock_filter.return_value.values_list.return_value = [(1, 'A', 3), (1, 'B', 4)]
+        result = self.repository.get_seat_type_map(mock_layout)
+        mock_filter.assert_called_once_with(seat_layout=mock_layout)
+        mock_filter.return_value.values_list.assert_called_once_with('row', 'column', 'seat_type_id')
+        self.assertEqual(result, {(1, 'A'): 3, (1, 'B'): 4})
@@ -0,0 +1,78 @@
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from airline.seat_grid import SeatGrid, SeatGridCache, StaleSeatGridError
+
+ROWS = [
+    (10, '1A', 1, 'A', 'BUS'), (11, '1B', 1, 'B', 'BUS'),
+    (12, '2A', 2, 'A', 'ECO'), (13, '2B', 2, 'B', None),
+]
+
+
+class SeatGridTest(SimpleTestCase):
+    def test_compact_layout(self):
+        grid = SeatGrid(1, ROWS)
+        self.assertEqual(len(grid), 4)
+        self.assertEqual(list(grid.row_numbers), [1, 2])
+        self.assertEqual(list(grid.row_offsets), [0, 2, 4])
+        self.assertEqual(grid.columns, 'ABAB')
+        self.assertEqual(grid.type_codes, ('BUS', 'ECO', None))
+        self.assertEqual(list(grid.seat_types), [0, 0, 1, 2])
+        self.assertIsNone(grid.numbers)
+        self.assertEqual((grid.index_of(12), grid.index_of(9), grid.index_of(14)), (2, None, None))
+        self.assertGreater(grid.memory_size(), 0)
+
+    def test_non_consecutive_ids_and_custom_numbers(self):
+        grid = SeatGrid(1, [(5, '1A', 1, 'A', 'ECO'), (9, 'EXIT', 1, 'B', 'ECO')])
+        self.assertEqual((grid.index_of(9), grid.index_of(6)), (1, None))
+        self.assertEqual(grid.numbers, ('1A', 'EXIT'))
+
+    def test_overlay_by_row(self):
+        grid = SeatGrid(1, ROWS)
+        bits = grid.overlay([(10, 'AVL'), (11, 'SLD'), (13, 'AVL')])
+        seat_map = grid.by_row(bits)
+        self.assertEqual(list(seat_map), [1, 2])
+        self.assertEqual([(seat.number, seat.status) for seat in seat_map[1]], [('1A', 'AVL'), ('1B', 'SLD')])
+        # 2A has no inventory row in this flight.
+        self.assertEqual([(seat.seat_id, seat.seat_type) for seat in seat_map[2]], [(13, None)])
+        availability = grid.availability(7, bits)
+        self.assertEqual(availability.available_ids, frozenset({10, 13}))
+        self.assertEqual(availability.unavailable_ids, frozenset({11}))
+
+    def test_overlay_rejects_unknown_seats(self):
+        with self.assertRaises(StaleSeatGridError):
+            SeatGrid(1, ROWS).overlay([(99, 'AVL')])
+
+
+class SeatGridCacheTest(SimpleTestCase):
+    def test_builds_once_and_invalidates(self):
+        cache = SeatGridCache(max_entries=2, timeout=60)
+        builds = []
+
+        def builder(airplane_id):
+            return lambda: builds.append(airplane_id) or SeatGrid(airplane_id, ROWS)
+
+        first = cache.get(1, builder(1))
+        self.assertIs(cache.get(1, builder(1)), first)
+        cache.invalidate(1)
+        cache.get(1, builder(1))
+        self.assertEqual(builds, [1, 1])
+
+    def test_evicts_least_recently_used(self):
+        cache = SeatGridCache(max_entries=2, timeout=60)
+        for airplane_id in (1, 2, 1, 3):
+            cache.get(airplane_id, lambda: SeatGrid(airplane_id, ROWS))
+        self.assertEqual(len(cache), 2)
+        rebuilt = []
+        cache.get(2, lambda: rebuilt.append(2) or SeatGrid(2, ROWS))
+        self.assertEqual(rebuilt, [2])
+
+    def test_entries_expire(self):
+        cache = SeatGridCache(max_entries=2, timeout=60)
+        with patch('airline.seat_grid.time.monotonic', return_value=100):
+            cache.get(1, lambda: SeatGrid(1, ROWS))
+        rebuilt = []
+        with patch('airline.seat_grid.time.monotonic', return_value=161):
+            cache.get(1, lambda: rebuilt.append(1) or SeatGrid(1, ROWS))
+        self.assertEqual(rebuilt, [1])
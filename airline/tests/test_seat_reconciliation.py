@@ -0,0 +1,34 @@
+from django.test import SimpleTestCase
+
+from airline.seat_reconciliation import SeatDiff, diff_seats, layout_targets
+
+
+class SeatDiffTest(SimpleTestCase):
+    def test_layout_targets_cover_the_grid(self):
+        targets = layout_targets(2, 3, {(1, 'A'): 7})
+        self.assertEqual(list(targets), [(1, 'A'), (1, 'B'), (1, 'C'), (2, 'A'), (2, 'B'), (2, 'C')])
+        self.assertEqual(targets[(1, 'A')], 7)
+        self.assertIsNone(targets[(2, 'C')])
+
+    def test_added_removed_and_retyped(self):
+        current = [(1, 1, 'A', 7), (2, 1, 'B', 7), (3, 3, 'A', 7), (4, 1, 'A', 7)]
+        diff = diff_seats(current, layout_targets(2, 2, {(1, 'A'): 7, (1, 'B'): 8}), {})
+        self.assertEqual(diff.added, [(2, 'A', None), (2, 'B', None)])
+        # Seat 3 is outside the layout and seat 4 duplicates 1A.
+        self.assertEqual(diff.removed, [3, 4])
+        self.assertEqual(diff.retyped, {2: 8})
+        self.assertEqual(diff.skipped, [])
+        self.assertTrue(diff.changed)
+
+    def test_reserved_seats_are_left_alone(self):
+        current = [(1, 1, 'A', 7), (2, 5, 'A', 7), (3, 6, 'A', 7), (4, 1, 'B', 7)]
+        # Seat 1 has an active reservation, seat 3 only cancelled ones.
+        diff = diff_seats(current, layout_targets(1, 2, {(1, 'A'): 8, (1, 'B'): 8}), {1: True, 2: True, 3: False})
+        self.assertEqual(diff.retyped, {4: 8})
+        self.assertEqual(diff.removed, [])
+        self.assertEqual(diff.skipped, [1, 2, 3])
+
+    def test_matching_seats_need_no_changes(self):
+        diff = diff_seats([(1, 1, 'A', 7)], layout_targets(1, 1, {(1, 'A'): 7}), {})
+        self.assertEqual(diff, SeatDiff())
+        self.assertFalse(diff.changed)
@@ -5,7 +5,9 @@ from airline.models import (
     Airplane, Flight, Passenger, Reservation, SeatLayout, SeatType,
     SeatLayoutPosition, FlightHistory, Ticket, Seat
 )
+from rest_framework import serializers
 from airline.serializers import (
+    BatchedRelatedFieldsMixin, ResolvedPrimaryKeyRelatedField,
     SeatTypeSerializer, SeatLayoutPositionSerializer, SeatLayoutSerializer,
     AirplaneSerializer, FlightSerializer, PassengerSerializer,
     SeatSerializer, ReservationSerializer, FlightHistorySerializer,
@@ -209,7 +211,10 @@ class FlightSerializerTest(TestCase):
 
     def test_contains_expected_fields(self):
         data = self.serializer.data
-        self.assertCountEqual(data.keys(), ['id', 'origin', 'destination', 'departure_date', 'arrival_date', 'duration', 'status', 'base_price', 'airplane'])
+        self.assertCountEqual(data.keys(), [
+            'id', 'origin', 'destination', 'departure_date', 'arrival_date', 'duration', 'status', 'base_price', 'airplane',
+            'seats_total', 'seats_held', 'seats_reserved', 'seats_sold', 'seats_available', 'seat_counters',
+        ])
 
     def test_flight_number_field_content(self):
         data = self.serializer.data
@@ -418,6 +423,32 @@ class ReservationSerializerTest(TestCase):
         self.assertEqual(reservation.status, new_reservation_data['status'])
         self.assertEqual(reservation.flight, new_flight)
 
+    def test_related_fields_resolved_in_one_pass(self):
+        serializer = ReservationSerializer(instance=self.reservation, data={
+            'flight': self.flight.pk, 'passenger': str(self.passenger.pk), 'seat': self.seat.pk,
+        }, partial=True)
+        # One in_bulk per related model, none from the fields themselves.
+        with self.assertNumQueries(3):
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(serializer.validated_data['passenger'], self.passenger)
+        self.assertEqual(serializer.validated_data['seat'], self.seat)
+
+    def test_related_field_missing_object(self):
+        serializer = ReservationSerializer(instance=self.reservation, data={'seat': 99999}, partial=True)
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('does not exist', str(serializer.errors['seat'][0]))
+
+    def test_related_fields_on_same_queryset_share_a_query(self):
+        class SeatSwapSerializer(BatchedRelatedFieldsMixin, serializers.Serializer):
+            current = ResolvedPrimaryKeyRelatedField(queryset=Seat.objects.all())
+            requested = ResolvedPrimaryKeyRelatedField(queryset=Seat.objects.all())
+
+        other_seat = Seat.objects.create(airplane=self.airplane, number='2A', row=2, column='A', status='Available')
+        serializer = SeatSwapSerializer(data={'current': self.seat.pk, 'requested': other_seat.pk})
+        with self.assertNumQueries(1):
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(serializer.validated_data['requested'], other_seat)
+
     def test_update_reservation(self):
         updated_data = {'status': 'CAN'}
         serializer = ReservationSerializer(instance=self.reservation, data=updated_data, partial=True)
@@ -450,7 +481,7 @@ class FlightHistorySerializerTest(TestCase):
 
     def test_contains_expected_fields(self):
         data = self.serializer.data
-        self.assertCountEqual(data.keys(), ['id', 'passenger', 'flight', 'booking_date', 'seat_number', 'price_paid'])
+        self.assertCountEqual(data.keys(), ['id', 'passenger', 'flight', 'booking_date', 'seat_number', 'price_paid', 'reservation'])
 
     def test_seat_number_field_content(self):
         data = self.serializer.data
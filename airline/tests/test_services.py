@@ -1,23 +1,157 @@
-from django.test import TestCase
+import os
+import tempfile
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from unittest.mock import MagicMock, patch
 from django.core.exceptions import ValidationError
 from decimal import Decimal
 import uuid
+from datetime import datetime, timedelta
+from django.utils import timezone
+from django.db.models import F
+
+from airline.barcodes import code128_svg
+from airline.exceptions import ReservationConflictError, SeatUnavailableError
+from airline.ticket_pdf import TicketPdfStorage, get_renderer, write_ticket_pdf, write_ticket_pdfs
 
 from airline.services import (
     AirplaneService, FlightService, PassengerService, ReservationService,
     SeatLayoutService, SeatTypeService, SeatLayoutPositionService,
-    FlightHistoryService, TicketService
+    FlightHistoryService, TicketService, SeatInventoryService, FlightSearchService, PricingService
 )
 from airline.models import (
     Airplane, Flight, Passenger, Seat, Reservation, Ticket, FlightHistory,
-    SeatLayout, SeatType, SeatLayoutPosition
+    SeatLayout, SeatType, SeatLayoutPosition, FlightSeat, FlightSeatCounter, SyncCheckpoint
 )
 
 class BaseServiceTest(TestCase):
     def setUp(self):
         self.mock_repo = MagicMock()
 
+class ReservationServiceConflictTest(TestCase):
+    def setUp(self):
+        self.service = ReservationService()
+        airplane = Airplane.objects.create(model_name="A320", capacity=2, registration_number="CAS001")
+        self.seat = Seat.objects.create(airplane=airplane, number="1A", row=1, column="A", status='Available')
+        self.other_seat = Seat.objects.create(airplane=airplane, number="1B", row=1, column="B", status='Available')
+        departure = timezone.now() + timedelta(days=2)
+        self.flight = Flight.objects.create(
+            airplane=airplane, origin="EZE", destination="COR", departure_date=departure,
+            arrival_date=departure + timedelta(hours=2), duration=timedelta(hours=2),
+            status="Scheduled", base_price=Decimal('100.00')
+        )
+        self.first, self.second = [
+            Passenger.objects.create(first_name=name, document_number=f"CAS-{name}", email=f"{name}@example.com", date_of_birth="1990-01-01")
+            for name in ('first', 'second')
+        ]
+
+    def test_second_buyer_gets_seat_unavailable(self):
+        self.service.create_reservation(self.flight.pk, self.first.pk, self.seat.pk, Decimal('100.00'))
+        with self.assertRaises(SeatUnavailableError):
+            self.service.create_reservation(self.flight.pk, self.second.pk, self.seat.pk, Decimal('100.00'))
+        self.assertEqual(Reservation.objects.filter(flight=self.flight, seat=self.seat).count(), 1)
+
+    def test_seat_from_another_airplane_is_rejected_without_touching_inventory(self):
+        other_airplane = Airplane.objects.create(model_name="A321", capacity=1, registration_number="CAS002")
+        foreign_seat = Seat.objects.create(airplane=other_airplane, number="1A", row=1, column="A", status='Available')
+        with self.assertRaisesMessage(ValidationError, 'Seat not found on this flight.'):
+            self.service.create_reservation(self.flight.pk, self.first.pk, foreign_seat.pk, Decimal('100.00'))
+
+        inventory = self.service.inventory_service
+        inventory.create_inventory(self.flight)
+        with self.assertNumQueries(2):
+            # Status lookup and the materialized-inventory check; nothing is written.
+            self.assertFalse(inventory.is_seat_available(self.flight, foreign_seat))
+
+    def test_seat_map_of_an_airplane_without_seats_does_not_materialize(self):
+        airplane = Airplane.objects.create(model_name="Empty", capacity=0, registration_number="CAS003")
+        flight = Flight.objects.create(
+            airplane=airplane, origin="EZE", destination="COR", departure_date=self.flight.departure_date,
+            arrival_date=self.flight.arrival_date, duration=timedelta(hours=2), status="Scheduled",
+            base_price=Decimal('100.00')
+        )
+        inventory = self.service.inventory_service
+        with patch.object(inventory, 'create_inventory') as create_inventory:
+            self.assertEqual(inventory.get_seat_map(flight), {})
+        create_inventory.assert_not_called()
+
+    def test_changing_the_seat_releases_the_previous_one(self):
+        reservation = self.service.create_reservation(self.flight.pk, self.first.pk, self.seat.pk, Decimal('100.00'))
+        self.service.update_reservation(reservation.pk, {'seat': self.other_seat})
+        self.assertEqual(FlightSeat.objects.get(flight=self.flight, seat=self.seat).status, 'AVL')
+        self.assertEqual(FlightSeat.objects.get(flight=self.flight, seat=self.other_seat).status, 'RES')
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.seats_reserved, 1)
+
+        self.service.create_reservation(self.flight.pk, self.second.pk, self.seat.pk, Decimal('100.00'))
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.seats_reserved, 2)
+
+    def test_changing_to_a_taken_seat_is_unavailable(self):
+        reservation = self.service.create_reservation(self.flight.pk, self.first.pk, self.seat.pk, Decimal('100.00'))
+        self.service.create_reservation(self.flight.pk, self.second.pk, self.other_seat.pk, Decimal('100.00'))
+        with self.assertRaises(SeatUnavailableError):
+            self.service.update_reservation(reservation.pk, {'seat': self.other_seat})
+        self.assertEqual(Reservation.objects.get(pk=reservation.pk).seat_id, self.seat.pk)
+        self.assertEqual(FlightSeat.objects.get(flight=self.flight, seat=self.seat).status, 'RES')
+
+    def test_cancelled_seat_can_be_reserved_again(self):
+        reservation = self.service.create_reservation(self.flight.pk, self.first.pk, self.seat.pk, Decimal('100.00'))
+        self.service.cancel_reservation(reservation.pk)
+        self.service.create_reservation(self.flight.pk, self.second.pk, self.seat.pk, Decimal('100.00'))
+        reservation.delete()
+        self.assertEqual(FlightSeat.objects.get(flight=self.flight, seat=self.seat).status, 'RES')
+
+    def test_duplicate_passenger_is_conflict_and_releases_seat(self):
+        self.service.create_reservation(self.flight.pk, self.first.pk, self.seat.pk, Decimal('100.00'))
+        with self.assertRaises(ReservationConflictError):
+            self.service.create_reservation(self.flight.pk, self.first.pk, self.other_seat.pk, Decimal('100.00'))
+        self.assertEqual(FlightSeat.objects.get(flight=self.flight, seat=self.other_seat).status, 'AVL')
+
+    def test_create_reservations_bulk(self):
+        items = [
+            {'passenger': self.first.pk, 'seat': self.seat.pk, 'price': '100.00'},
+            {'passenger': self.second.pk, 'seat': self.other_seat.pk, 'price': '100.00'},
+        ]
+        self.service.inventory_service.create_inventory(self.flight)
+        # Flight, passengers, seats, active bookings, lock, read and claim, insert,
+        # per-type and flight counter updates, plus the savepoint pair.
+        with self.assertNumQueries(12):
+            reservations = self.service.create_reservations_bulk(self.flight.pk, items)
+        self.assertEqual([r.seat_id for r in reservations], [self.seat.pk, self.other_seat.pk])
+        self.assertEqual(set(FlightSeat.objects.filter(flight=self.flight).values_list('status', flat=True)), {'RES'})
+        self.assertEqual(set(Seat.objects.filter(pk__in=[self.seat.pk, self.other_seat.pk]).values_list('status', flat=True)), {'Available'})
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.inventory_version, 1)
+        self.assertEqual((self.flight.seats_total, self.flight.seats_reserved), (2, 2))
+
+    def test_create_reservations_bulk_is_all_or_nothing(self):
+        self.service.create_reservation(self.flight.pk, self.first.pk, self.seat.pk, Decimal('100.00'))
+        third = Passenger.objects.create(first_name="third", document_number="CAS-third", email="third@example.com", date_of_birth="1990-01-01")
+        items = [
+            {'passenger': self.second.pk, 'seat': self.other_seat.pk, 'price': '100.00'},
+            {'passenger': third.pk, 'seat': self.seat.pk, 'price': '100.00'},
+        ]
+        with self.assertRaises(SeatUnavailableError) as ctx:
+            self.service.create_reservations_bulk(self.flight.pk, items)
+        self.assertEqual(list(ctx.exception.message_dict), ['1'])
+        self.assertEqual(Reservation.objects.filter(flight=self.flight).count(), 1)
+        self.assertEqual(FlightSeat.objects.get(flight=self.flight, seat=self.other_seat).status, 'AVL')
+
+    def test_create_reservations_bulk_validates_items(self):
+        items = [
+            {'passenger': self.first.pk, 'seat': self.seat.pk, 'price': '100.00'},
+            {'passenger': self.second.pk, 'seat': self.seat.pk, 'price': '-1'},
+            {'passenger': 'x', 'seat': self.seat.pk},
+        ]
+        with self.assertRaises(ValidationError) as ctx:
+            self.service.create_reservations_bulk(self.flight.pk, items)
+        self.assertEqual(list(ctx.exception.message_dict), ['2'])
+        with self.assertRaises(ValidationError) as ctx:
+            self.service.create_reservations_bulk(self.flight.pk, items[:2])
+        self.assertEqual(ctx.exception.message_dict['1'], ['Seat appears more than once in the request.', 'price must be a positive number.'])
+
 class AirplaneServiceTest(BaseServiceTest):
     def setUp(self):
         super().setUp()
@@ -25,6 +159,7 @@ class AirplaneServiceTest(BaseServiceTest):
         self.service.airplane_repo = self.mock_repo
         self.service.seat_layout_repo = MagicMock()
         self.service.seat_repo = MagicMock()
+        self.service.seat_layout_position_repo = MagicMock()
 
     def test_create_airplane_with_seats(self):
         mock_seat_layout = MagicMock(spec=SeatLayout)
@@ -33,23 +168,33 @@ class AirplaneServiceTest(BaseServiceTest):
         mock_seat_layout.columns = 2
         self.service.seat_layout_repo.get_by_id.return_value = mock_seat_layout
 
-        mock_airplane = MagicMock(spec=Airplane)
+        mock_airplane = Airplane(pk=10)
         self.mock_repo.create.return_value = mock_airplane
+        self.service.seat_layout_position_repo.get_seat_type_map.return_value = {(1, 'A'): 7}
 
-        mock_seat_layout_position = MagicMock(spec=SeatLayoutPosition)
-        mock_seat_layout_position.seat_type = MagicMock(spec=SeatType)
-        with patch('airline.services.SeatLayoutPosition.objects.filter') as mock_filter:
-            mock_filter.return_value.first.return_value = mock_seat_layout_position
-            
-            data = {'registration_number': 'N123', 'seat_layout': 1}
-            airplane = self.service.create_airplane_with_seats(data)
-
-            self.mock_repo.create.assert_called_once_with({
-                'registration_number': 'N123',
-                'seat_layout': mock_seat_layout
-            })
-            self.assertEqual(airplane, mock_airplane)
-            self.assertEqual(self.service.seat_repo.create.call_count, 4) # 2 rows * 2 columns
+        data = {'registration_number': 'N123', 'seat_layout': 1}
+        airplane = self.service.create_airplane_with_seats(data)
+
+        self.mock_repo.create.assert_called_once_with({
+            'registration_number': 'N123',
+            'seat_layout': mock_seat_layout
+        })
+        self.assertEqual(airplane, mock_airplane)
+        self.service.seat_layout_position_repo.get_seat_type_map.assert_called_once_with(mock_seat_layout)
+        self.service.seat_repo.create.assert_not_called()
+        self.service.seat_repo.bulk_create.assert_called_once()
+        seats = self.service.seat_repo.bulk_create.call_args[0][0]
+        self.assertEqual([seat.number for seat in seats], ['1A', '1B', '2A', '2B']) # 2 rows * 2 columns
+        self.assertEqual([seat.seat_type_id for seat in seats], [7, None, None, None])
+        self.assertEqual(self.service.seat_repo.bulk_create.call_args[1], {'batch_size': self.service.seat_batch_size})
+
+    def test_create_airplane_with_resolved_seat_layout(self):
+        seat_layout = SeatLayout(pk=3, rows=0, columns=0)
+        self.mock_repo.create.return_value = Airplane(pk=10)
+        with patch.object(self.service, '_create_seats_for_airplane') as mock_create_seats:
+            self.service.create_airplane_with_seats({'registration_number': 'N1', 'seat_layout': seat_layout})
+        self.service.seat_layout_repo.get_by_id.assert_not_called()
+        mock_create_seats.assert_called_once_with(self.mock_repo.create.return_value, seat_layout)
 
     def test_create_airplane_without_seat_layout(self):
         mock_airplane = MagicMock(spec=Airplane)
@@ -61,28 +206,122 @@ class AirplaneServiceTest(BaseServiceTest):
         self.mock_repo.create.assert_called_once_with(data)
         self.assertEqual(airplane, mock_airplane)
         self.service.seat_repo.create.assert_not_called()
+        self.service.seat_repo.bulk_create.assert_not_called()
 
     def test_update_airplane(self):
         mock_seat_layout = MagicMock(spec=SeatLayout)
+        mock_seat_layout.pk = 2
         self.service.seat_layout_repo.get_by_id.return_value = mock_seat_layout
+        self.mock_repo.get_by_id.return_value = Airplane(pk=1, seat_layout_id=1)
         self.mock_repo.update.return_value = True
 
         data = {'registration_number': 'N123', 'seat_layout': 1}
-        result = self.service.update_airplane(1, data)
+        with patch.object(self.service, 'reconcile_seats') as mock_reconcile:
+            result = self.service.update_airplane(1, data)
 
         self.service.seat_layout_repo.get_by_id.assert_called_once_with(1)
         self.mock_repo.update.assert_called_once_with(1, {
             'registration_number': 'N123',
             'seat_layout': mock_seat_layout
         })
+        mock_reconcile.assert_called_once_with(True)
         self.assertTrue(result)
 
+    def test_update_airplane_keeps_seats_when_layout_is_unchanged(self):
+        self.service.seat_layout_repo.get_by_id.return_value = SeatLayout(pk=1)
+        self.mock_repo.get_by_id.return_value = Airplane(pk=1, seat_layout_id=1)
+        with patch.object(self.service, 'reconcile_seats') as mock_reconcile:
+            self.service.update_airplane(1, {'registration_number': 'N123', 'seat_layout': 1})
+            self.service.update_airplane(1, {'registration_number': 'N124'})
+        mock_reconcile.assert_not_called()
+
     def test_delete_airplane(self):
         self.mock_repo.delete.return_value = True
         result = self.service.delete_airplane(1)
         self.mock_repo.delete.assert_called_once_with(1)
         self.assertTrue(result)
 
+class AirplaneSeatReconciliationTest(TestCase):
+    def setUp(self):
+        self.economy = SeatType.objects.create(name='Economy', code='ECO', price_multiplier=Decimal('1.00'))
+        self.business = SeatType.objects.create(name='Business', code='BUS', price_multiplier=Decimal('1.80'))
+        self.layout = SeatLayout.objects.create(layout_name='Small', rows=2, columns=2)
+        for row, column in [(1, 'A'), (1, 'B'), (2, 'A'), (2, 'B')]:
+            SeatLayoutPosition.objects.create(seat_layout=self.layout, row=row, column=column, seat_type=self.economy)
+        self.service = AirplaneService()
+        self.airplane = self.service.create_airplane_with_seats(
+            {'model_name': 'A1', 'registration_number': 'LV-REC', 'capacity': 4, 'seat_layout': self.layout.pk}
+        )
+        departure = timezone.now() + timedelta(days=5)
+        self.flight = FlightService().create_flight({
+            'airplane': self.airplane, 'origin': 'EZE', 'destination': 'COR', 'departure_date': departure,
+            'arrival_date': departure + timedelta(hours=2), 'duration': timedelta(hours=2),
+            'status': 'Scheduled', 'base_price': Decimal('100.00'),
+        })
+        self.passenger = Passenger.objects.create(
+            first_name='Ana', last_name='Paz', document_number='REC-1', email='rec@example.com', date_of_birth='1990-01-01',
+        )
+
+    def seat(self, number):
+        return Seat.objects.get(airplane=self.airplane, number=number)
+
+    def test_reconcile_applies_layout_changes(self):
+        self.layout.rows = 3
+        self.layout.save()
+        SeatLayoutPosition.objects.filter(seat_layout=self.layout, row=1).update(seat_type=self.business)
+        Seat.objects.create(airplane=self.airplane, number='9A', row=9, column='A', status='Available')
+        version = self.flight.inventory_version
+
+        diff = self.service.reconcile_seats(self.airplane.pk)
+
+        self.assertEqual(diff.summary(), '2 added, 1 removed, 2 retyped, 0 skipped')
+        seats = Seat.objects.filter(airplane=self.airplane).order_by('row', 'column')
+        self.assertEqual([seat.number for seat in seats], ['1A', '1B', '2A', '2B', '3A', '3B'])
+        self.assertEqual(self.seat('1B').seat_type, self.business)
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.seats_total, 6)
+        self.assertEqual(FlightSeat.objects.filter(flight=self.flight).count(), 6)
+        self.assertGreater(self.flight.inventory_version, version)
+        self.assertFalse(self.service.reconcile_seats(self.airplane).changed)
+
+    def test_reconcile_leaves_reserved_seats_alone(self):
+        Reservation.objects.create(flight=self.flight, passenger=self.passenger, seat=self.seat('1A'),
+                                   status='CON', price=Decimal('100.00'), reservation_code='REC1')
+        Reservation.objects.create(flight=self.flight, passenger=self.passenger, seat=self.seat('2A'),
+                                   status='CAN', price=Decimal('100.00'), reservation_code='REC2')
+        self.layout.rows = 1
+        self.layout.save()
+        SeatLayoutPosition.objects.filter(seat_layout=self.layout).update(seat_type=self.business)
+
+        diff = self.service.reconcile_seats(self.airplane)
+
+        self.assertEqual(diff.summary(), '0 added, 1 removed, 1 retyped, 2 skipped')
+        self.assertEqual(self.seat('1A').seat_type, self.economy)
+        self.assertEqual(self.seat('1B').seat_type, self.business)
+        self.assertTrue(Seat.objects.filter(airplane=self.airplane, number='2A').exists())
+        self.assertFalse(Seat.objects.filter(airplane=self.airplane, number='2B').exists())
+        self.assertEqual(Reservation.objects.count(), 2)
+
+    def test_dry_run_and_reconcile_layout(self):
+        SeatLayoutPosition.objects.filter(seat_layout=self.layout, row=2).update(seat_type=self.business)
+        other = self.service.create_airplane_with_seats(
+            {'model_name': 'A1', 'registration_number': 'LV-RE2', 'capacity': 4, 'seat_layout': self.layout.pk}
+        )
+        self.assertEqual(len(self.service.reconcile_seats(self.airplane, dry_run=True).retyped), 2)
+        self.assertEqual(self.seat('2A').seat_type, self.economy)
+
+        results = self.service.reconcile_layout(self.layout.pk)
+
+        self.assertEqual([airplane.pk for airplane in results], [self.airplane.pk, other.pk])
+        self.assertEqual(Seat.objects.filter(seat_type=self.business).count(), 4)
+
+    def test_update_airplane_reconciles_new_layout(self):
+        wide = SeatLayout.objects.create(layout_name='Wide', rows=1, columns=3)
+        self.service.update_airplane(self.airplane.pk, {'seat_layout': wide.pk})
+        self.assertEqual(
+            sorted(Seat.objects.filter(airplane=self.airplane).values_list('number', flat=True)), ['1A', '1B', '1C'],
+        )
+
 class FlightServiceTest(BaseServiceTest):
     def setUp(self):
         super().setUp()
@@ -90,6 +329,7 @@ class FlightServiceTest(BaseServiceTest):
         self.service.flight_repo = self.mock_repo
         self.service.seat_repo = MagicMock()
         self.service.reservation_repo = MagicMock()
+        self.service.inventory_service = MagicMock()
 
     def test_create_flight(self):
         mock_flight = MagicMock(spec=Flight)
@@ -97,14 +337,25 @@ class FlightServiceTest(BaseServiceTest):
         data = {'flight_number': 'FL123'}
         flight = self.service.create_flight(data)
         self.mock_repo.create.assert_called_once_with(data)
+        self.service.inventory_service.create_inventory.assert_called_once_with(mock_flight)
         self.assertEqual(flight, mock_flight)
 
     def test_update_flight(self):
-        self.mock_repo.update.return_value = True
+        self.mock_repo.get_by_id.return_value = MagicMock(airplane_id=1)
+        mock_flight = MagicMock(airplane_id=1)
+        self.mock_repo.update.return_value = mock_flight
         data = {'flight_number': 'FL123'}
         result = self.service.update_flight(1, data)
         self.mock_repo.update.assert_called_once_with(1, data)
-        self.assertTrue(result)
+        self.service.inventory_service.rebuild_inventory.assert_not_called()
+        self.assertEqual(result, mock_flight)
+
+    def test_update_flight_rebuilds_inventory_when_airplane_changes(self):
+        self.mock_repo.get_by_id.return_value = MagicMock(airplane_id=1)
+        mock_flight = MagicMock(airplane_id=2)
+        self.mock_repo.update.return_value = mock_flight
+        self.service.update_flight(1, {'airplane': 2})
+        self.service.inventory_service.rebuild_inventory.assert_called_once_with(mock_flight)
 
     def test_delete_flight(self):
         self.mock_repo.delete.return_value = True
@@ -114,29 +365,415 @@ class FlightServiceTest(BaseServiceTest):
 
     def test_get_available_seats(self):
         mock_flight = MagicMock(spec=Flight)
-        mock_flight.airplane = MagicMock(spec=Airplane)
         self.mock_repo.get_by_id.return_value = mock_flight
-
         mock_seat1 = MagicMock(spec=Seat, id=1)
-        mock_seat2 = MagicMock(spec=Seat, id=2)
         mock_seat3 = MagicMock(spec=Seat, id=3)
-        self.service.seat_repo.filter_by_airplane_ordered.return_value = [mock_seat1, mock_seat2, mock_seat3]
-
-        self.service.reservation_repo.filter_by_flight_seat_status.return_value.values_list.return_value = [2]
+        self.service.inventory_service.get_available_seats.return_value = [mock_seat1, mock_seat3]
 
         available_seats = self.service.get_available_seats(1)
 
         self.service.flight_repo.get_by_id.assert_called_once_with(1)
-        self.service.seat_repo.filter_by_airplane_ordered.assert_called_once_with(mock_flight.airplane)
-        self.service.reservation_repo.filter_by_flight_seat_status.assert_called_once_with(mock_flight, None, ['PEN', 'CON', 'PAID'])
+        self.service.inventory_service.get_available_seats.assert_called_once_with(mock_flight)
         self.assertEqual(available_seats, [mock_seat1, mock_seat3])
 
+class FlightSearchServiceTest(TestCase):
+    def setUp(self):
+        self.service = FlightSearchService()
+        self.airplane = Airplane.objects.create(model_name="A320", capacity=2, registration_number="SRCH001")
+        self.seats = [
+            Seat.objects.create(airplane=self.airplane, number=f"1{column}", row=1, column=column, status='Available')
+            for column in 'AB'
+        ]
+        self.passenger = Passenger.objects.create(
+            first_name="Ana", document_number="SRCH-P1", email="search@example.com", date_of_birth="1990-01-01"
+        )
+        self.day = timezone.localdate() + timedelta(days=10)
+        self.eze_mad = self._create_flight("EZE", "MAD", days=0)
+        self.eze_mad_later = self._create_flight("EZE", "MAD", days=3)
+        self.eze_cor = self._create_flight("EZE", "COR", days=0, status="Delayed")
+
+    def _create_flight(self, origin, destination, days, status="Scheduled"):
+        departure = timezone.make_aware(datetime.combine(self.day + timedelta(days=days), datetime.min.time())) + timedelta(hours=9)
+        return Flight.objects.create(
+            airplane=self.airplane, origin=origin, destination=destination, departure_date=departure,
+            arrival_date=departure + timedelta(hours=2), duration=timedelta(hours=2),
+            status=status, base_price=Decimal('100.00')
+        )
+
+    def test_search_by_route_orders_by_departure(self):
+        self.assertEqual(
+            list(self.service.search(origin=" EZE ", destination="MAD")),
+            [self.eze_mad, self.eze_mad_later],
+        )
+
+    def test_search_date_window_includes_whole_last_day(self):
+        results = self.service.search(origin="EZE", date_from=self.day, date_to=self.day)
+        self.assertEqual(list(results), [self.eze_mad, self.eze_cor])
+
+    def test_search_by_status(self):
+        self.assertEqual(list(self.service.search(status="Delayed")), [self.eze_cor])
+
+    def test_search_min_seats_uses_inventory_when_materialized(self):
+        SeatInventoryService().create_inventory(self.eze_mad)
+        SeatInventoryService().hold_seat(self.eze_mad, self.seats[0], self.passenger)
+        results = list(self.service.search(destination="MAD", min_seats=2))
+        self.assertEqual(results, [self.eze_mad_later])
+
+    def test_search_min_seats_counts_reservations_without_inventory(self):
+        Reservation.objects.create(
+            flight=self.eze_cor, passenger=self.passenger, seat=self.seats[0], status='CON',
+            price=Decimal('100.00'), reservation_code=uuid.uuid4().hex[:20]
+        )
+        results = list(self.service.search(origin="EZE", date_to=self.day, min_seats=2))
+        self.assertEqual(results, [self.eze_mad])
+        self.assertEqual(results[0].available_seats, 2)
+
+    def test_search_min_seats_filters_on_flight_counters(self):
+        SeatInventoryService().create_inventory(self.eze_mad)
+        Flight.objects.filter(pk=self.eze_mad.pk).update(seats_sold=F('seats_total') - 1)
+        results = list(self.service.search(destination="MAD", min_seats=2))
+        self.assertEqual(results, [self.eze_mad_later])
+        self.assertNotIn('airline_flightseat', str(self.service.search(min_seats=1).query))
+
+    def test_search_runs_a_single_query(self):
+        with self.assertNumQueries(1):
+            flights = list(self.service.search(origin="EZE", min_seats=1))
+            [flight.airplane.model_name for flight in flights]
+
+class SeatInventoryServiceTest(TestCase):
+    def setUp(self):
+        self.service = SeatInventoryService()
+        self.airplane = Airplane.objects.create(model_name="A320", capacity=3, registration_number="INV001")
+        self.seats = [
+            Seat.objects.create(airplane=self.airplane, number=f"1{column}", row=1, column=column, status='Available')
+            for column in 'ABC'
+        ]
+        self.flight = self._create_flight()
+        self.passenger = Passenger.objects.create(
+            first_name="Ana", document_number="INV-P1", email="ana@example.com", date_of_birth="1990-01-01"
+        )
+
+    def _create_flight(self):
+        departure = timezone.now() + timedelta(days=2)
+        return Flight.objects.create(
+            airplane=self.airplane, origin="EZE", destination="COR", departure_date=departure,
+            arrival_date=departure + timedelta(hours=2), duration=timedelta(hours=2),
+            status="Scheduled", base_price=Decimal('100.00')
+        )
+
+    def _reserve(self, flight, seat, status='CON'):
+        return Reservation.objects.create(
+            flight=flight, passenger=self.passenger, seat=seat, status=status,
+            price=Decimal('100.00'), reservation_code=uuid.uuid4().hex[:20]
+        )
+
+    def test_create_inventory_reflects_existing_reservations(self):
+        self._reserve(self.flight, self.seats[0], status='PAID')
+        self.service.create_inventory(self.flight)
+        statuses = dict(FlightSeat.objects.filter(flight=self.flight).values_list('seat_id', 'status'))
+        self.assertEqual(statuses, {self.seats[0].id: 'SLD', self.seats[1].id: 'AVL', self.seats[2].id: 'AVL'})
+
+    def test_get_available_seats_materializes_lazily(self):
+        self._reserve(self.flight, self.seats[1])
+        self.assertFalse(FlightSeat.objects.filter(flight=self.flight).exists())
+        available = self.service.get_available_seats(self.flight)
+        self.assertEqual(available, [self.seats[0], self.seats[2]])
+        with self.assertNumQueries(1):
+            self.service.get_available_seats(self.flight)
+
+    def test_seat_reserved_on_one_flight_is_available_on_another(self):
+        other_flight = self._create_flight()
+        self.service.create_inventory(self.flight)
+        self.service.create_inventory(other_flight)
+        self._reserve(self.flight, self.seats[0])
+        self.assertFalse(self.service.is_seat_available(self.flight, self.seats[0]))
+        self.assertTrue(self.service.is_seat_available(other_flight, self.seats[0]))
+        self._reserve(other_flight, self.seats[0])
+        self.assertFalse(self.service.is_seat_available(other_flight, self.seats[0]))
+
+    def test_reservation_transitions_update_inventory(self):
+        self.service.create_inventory(self.flight)
+        reservation = self._reserve(self.flight, self.seats[0], status='PEN')
+        self.assertEqual(FlightSeat.objects.get(flight=self.flight, seat=self.seats[0]).status, 'RES')
+        reservation.status = 'PAID'
+        reservation.save()
+        self.assertEqual(FlightSeat.objects.get(flight=self.flight, seat=self.seats[0]).status, 'SLD')
+        reservation.delete()
+        self.assertEqual(FlightSeat.objects.get(flight=self.flight, seat=self.seats[0]).status, 'AVL')
+
+    def test_cascade_delete_releases_inventory(self):
+        self.service.create_inventory(self.flight)
+        self._reserve(self.flight, self.seats[2])
+        self.passenger.delete()
+        self.assertEqual(FlightSeat.objects.get(flight=self.flight, seat=self.seats[2]).status, 'AVL')
+
+    def test_claim_seat_is_compare_and_set(self):
+        self.assertTrue(self.service.claim_seat(self.flight, self.seats[0]))
+        self.assertFalse(self.service.claim_seat(self.flight, self.seats[0]))
+        self.assertEqual(FlightSeat.objects.get(flight=self.flight, seat=self.seats[0]).status, 'RES')
+
+    def test_claim_seat_materializes_inventory(self):
+        self._reserve(self.flight, self.seats[1])
+        self.assertFalse(self.service.claim_seat(self.flight, self.seats[1]))
+        self.assertTrue(self.service.claim_seat(self.flight, self.seats[2]))
+
+    def test_hold_blocks_other_passengers_until_expiry(self):
+        other = Passenger.objects.create(first_name="Bea", document_number="INV-P2", email="bea@example.com", date_of_birth="1990-01-01")
+        self.assertIsNotNone(self.service.hold_seat(self.flight, self.seats[0], self.passenger))
+        self.assertIsNone(self.service.hold_seat(self.flight, self.seats[0], other))
+        self.assertFalse(self.service.is_seat_available(self.flight, self.seats[0], other))
+        self.assertTrue(self.service.is_seat_available(self.flight, self.seats[0], self.passenger))
+        self.assertNotIn(self.seats[0], self.service.get_available_seats(self.flight))
+        self.assertFalse(self.service.claim_seat(self.flight, self.seats[0], passenger=other))
+        self.assertTrue(self.service.claim_seat(self.flight, self.seats[0], passenger=self.passenger))
+        entry = FlightSeat.objects.get(flight=self.flight, seat=self.seats[0])
+        self.assertEqual((entry.status, entry.hold_passenger, entry.hold_expires_at), ('RES', None, None))
+
+    def test_new_hold_releases_the_passengers_other_holds(self):
+        self.service.hold_seat(self.flight, self.seats[0], self.passenger)
+        self.assertIsNotNone(self.service.hold_seat(self.flight, self.seats[1], self.passenger))
+        statuses = dict(FlightSeat.objects.filter(flight=self.flight).values_list('seat_id', 'status'))
+        self.assertEqual(statuses, {self.seats[0].id: 'AVL', self.seats[1].id: 'HLD', self.seats[2].id: 'AVL'})
+        self.assertEqual(Flight.objects.get(pk=self.flight.pk).seats_held, 1)
+
+    def test_no_hold_for_a_passenger_with_an_active_reservation(self):
+        self._reserve(self.flight, self.seats[0])
+        with self.assertRaisesMessage(ReservationConflictError, 'This passenger already has a reservation for this flight.'):
+            self.service.hold_seat(self.flight, self.seats[1], self.passenger)
+        self.assertFalse(FlightSeat.objects.filter(flight=self.flight, status='HLD').exists())
+
+    def test_expired_hold_counts_as_available_and_is_released(self):
+        other = Passenger.objects.create(first_name="Bea", document_number="INV-P2", email="bea@example.com", date_of_birth="1990-01-01")
+        self.service.hold_seat(self.flight, self.seats[1], self.passenger)
+        FlightSeat.objects.filter(flight=self.flight, seat=self.seats[1]).update(hold_expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertTrue(self.service.is_seat_available(self.flight, self.seats[1], other))
+        self.assertTrue(self.service.get_availability(self.flight).is_available(self.seats[1].id))
+
+        version = Flight.objects.get(pk=self.flight.pk).inventory_version
+        self.assertEqual(self.service.release_expired_holds(), 1)
+        self.assertEqual(FlightSeat.objects.get(flight=self.flight, seat=self.seats[1]).status, 'AVL')
+        self.assertEqual(Flight.objects.get(pk=self.flight.pk).inventory_version, version + 1)
+
+    def test_get_availability(self):
+        self._reserve(self.flight, self.seats[0])
+        availability = self.service.get_availability(self.flight)
+        self.assertEqual(availability.available_ids, frozenset({self.seats[1].id, self.seats[2].id}))
+        with self.assertNumQueries(1):
+            self.service.get_availability(self.flight)
+
+    def test_seat_map_reuses_the_airplane_grid(self):
+        self._reserve(self.flight, self.seats[1], status='PAID')
+        other_flight = self._create_flight()
+        self.service.create_inventory(other_flight)
+        seat_map = self.service.get_seat_map(self.flight)
+        self.assertEqual([(seat.number, seat.status) for seat in seat_map[1]], [('1A', 'AVL'), ('1B', 'SLD'), ('1C', 'AVL')])
+        # Only the flight's statuses are read once the grid is cached.
+        with self.assertNumQueries(1):
+            self.service.get_seat_map(self.flight)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(self.service.get_seat_map(other_flight)[1]), 3)
+
+    def test_seat_grid_is_invalidated_by_seat_changes(self):
+        self.service.get_seat_map(self.flight)
+        seat_type = SeatType.objects.create(name="Business", code="BUS")
+        self.seats[0].seat_type = seat_type
+        self.seats[0].save()
+        self.assertEqual(self.service.get_seat_map(self.flight)[1][0].seat_type, 'BUS')
+        # Seats added without signals are picked up when the inventory mentions them.
+        Seat.objects.bulk_create([Seat(airplane=self.airplane, number='2A', row=2, column='A', status='Available')])
+        self.service.create_inventory(self.flight)
+        self.assertEqual([seat.number for seat in self.service.get_seat_map(self.flight)[2]], ['2A'])
+
+    def test_get_seat_inventory_single_query(self):
+        self.service.create_inventory(self.flight)
+        with self.assertNumQueries(1):
+            entries = self.service.get_seat_inventory(self.flight)
+            self.assertEqual([entry.seat.number for entry in entries], ['1A', '1B', '1C'])
+
+class FlightSeatCounterTest(TestCase):
+    def setUp(self):
+        self.inventory = SeatInventoryService()
+        self.reservations = ReservationService()
+        self.economy = SeatType.objects.create(name="Economy", code="ECO")
+        self.business = SeatType.objects.create(name="Business", code="BUS")
+        self.airplane = Airplane.objects.create(model_name="A320", capacity=3, registration_number="CNT001")
+        self.seats = [
+            Seat.objects.create(airplane=self.airplane, number=f"1{column}", row=1, column=column, status='Available',
+                                seat_type=self.business if column == 'A' else self.economy)
+            for column in 'ABC'
+        ]
+        departure = timezone.now() + timedelta(days=2)
+        self.flight = FlightService().create_flight({
+            'airplane': self.airplane, 'origin': "EZE", 'destination': "COR", 'departure_date': departure,
+            'arrival_date': departure + timedelta(hours=2), 'duration': timedelta(hours=2),
+            'status': "Scheduled", 'base_price': Decimal('100.00'),
+        })
+        self.passenger = Passenger.objects.create(
+            first_name="Ana", document_number="CNT-P1", email="counter@example.com", date_of_birth="1990-01-01"
+        )
+
+    def assertCounters(self, total, held, reserved, sold):
+        flight = Flight.objects.get(pk=self.flight.pk)
+        self.assertEqual(
+            (flight.seats_total, flight.seats_held, flight.seats_reserved, flight.seats_sold), (total, held, reserved, sold)
+        )
+        self.assertEqual(self.inventory.reconcile_counters(flight, fix=False), {})
+
+    def economy_counter(self):
+        return FlightSeatCounter.objects.get(flight=self.flight, seat_type=self.economy)
+
+    def test_create_flight_counts_seats_by_type(self):
+        self.assertCounters(3, 0, 0, 0)
+        self.assertEqual(self.flight.seats_available, 3)
+        self.assertEqual(self.economy_counter().total, 2)
+        self.assertEqual(FlightSeatCounter.objects.get(flight=self.flight, seat_type=self.business).total, 1)
+
+    def test_reservation_transitions_update_counters(self):
+        reservation = self.reservations.create_reservation(self.flight.pk, self.passenger.pk, self.seats[1].pk, Decimal('100.00'))
+        self.assertCounters(3, 0, 1, 0)
+        self.reservations.confirm_reservation(reservation.pk)
+        self.assertCounters(3, 0, 1, 0)
+        self.reservations.update_reservation_status(reservation.pk, 'PAID')
+        self.assertCounters(3, 0, 0, 1)
+        self.assertEqual((self.economy_counter().sold, self.economy_counter().available), (1, 1))
+        self.reservations.delete_reservation(reservation.pk)
+        self.assertCounters(3, 0, 0, 0)
+
+    def test_cancel_releases_reserved_seat(self):
+        reservation = self.reservations.create_reservation(self.flight.pk, self.passenger.pk, self.seats[0].pk, Decimal('100.00'))
+        self.reservations.cancel_reservation(reservation.pk)
+        self.assertCounters(3, 0, 0, 0)
+
+    def test_holds_update_counters(self):
+        self.inventory.hold_seat(self.flight, self.seats[1], self.passenger)
+        self.inventory.hold_seat(self.flight, self.seats[1], self.passenger)
+        self.assertCounters(3, 1, 0, 0)
+        self.reservations.create_reservation(self.flight.pk, self.passenger.pk, self.seats[1].pk, Decimal('100.00'))
+        self.assertCounters(3, 0, 1, 0)
+
+        second = Passenger.objects.create(first_name="Bea", document_number="CNT-P2", email="bea@example.com", date_of_birth="1990-01-01")
+        self.inventory.hold_seat(self.flight, self.seats[2], second)
+        FlightSeat.objects.filter(flight=self.flight, seat=self.seats[2]).update(hold_expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.inventory.release_expired_holds(), 1)
+        self.assertCounters(3, 0, 1, 0)
+
+    def test_bulk_reservations_update_counters(self):
+        second = Passenger.objects.create(first_name="Bea", document_number="CNT-P2", email="bea@example.com", date_of_birth="1990-01-01")
+        self.inventory.hold_seat(self.flight, self.seats[0], self.passenger)
+        self.reservations.create_reservations_bulk(self.flight.pk, [
+            {'passenger': self.passenger.pk, 'seat': self.seats[0].pk, 'price': '100.00'},
+            {'passenger': second.pk, 'seat': self.seats[2].pk, 'price': '100.00'},
+        ])
+        self.assertCounters(3, 0, 2, 0)
+
+    def test_reconcile_counters_fixes_drift(self):
+        Flight.objects.filter(pk=self.flight.pk).update(seats_reserved=5)
+        FlightSeatCounter.objects.filter(flight=self.flight, seat_type=self.economy).update(total=7)
+        flight = Flight.objects.get(pk=self.flight.pk)
+        drift = self.inventory.reconcile_counters(flight)
+        self.assertEqual(drift, {'seats_reserved': (5, 0), f'total[{self.economy.pk}]': (7, 2)})
+        self.assertCounters(3, 0, 0, 0)
+
+    def test_reconcile_counters_materializes_inventory(self):
+        departure = timezone.now() + timedelta(days=3)
+        flight = Flight.objects.create(
+            airplane=self.airplane, origin="EZE", destination="MDZ", departure_date=departure,
+            arrival_date=departure + timedelta(hours=2), duration=timedelta(hours=2),
+            status="Scheduled", base_price=Decimal('100.00')
+        )
+        self.assertEqual(self.inventory.reconcile_counters(flight), {})
+        flight.refresh_from_db()
+        self.assertEqual(flight.seats_total, 3)
+
+@override_settings(
+    PRICING_LOAD_FACTOR_CURVE=[(0.0, '1.00'), (0.5, '1.20')],
+    PRICING_DEPARTURE_CURVE=[(0, '1.50'), (7, '1.00')],
+)
+class PricingServiceTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.service = PricingService()
+        self.economy = SeatType.objects.create(name="Economy", code="ECO", price_multiplier=Decimal('1.00'))
+        self.business = SeatType.objects.create(name="Business", code="BUS", price_multiplier=Decimal('2.50'))
+        self.airplane = Airplane.objects.create(model_name="A320", capacity=4, registration_number="PRC001")
+        self.seats = [
+            Seat.objects.create(airplane=self.airplane, number=f"1{column}", row=1, column=column, status='Available',
+                                seat_type=self.business if column == 'A' else self.economy)
+            for column in 'ABCD'
+        ]
+        self.now = timezone.now()
+        departure = self.now + timedelta(days=10)
+        self.flight = FlightService().create_flight({
+            'airplane': self.airplane, 'origin': "EZE", 'destination': "COR", 'departure_date': departure,
+            'arrival_date': departure + timedelta(hours=2), 'duration': timedelta(hours=2),
+            'status': "Scheduled", 'base_price': Decimal('100.00'),
+        })
+        self.passengers = [
+            Passenger.objects.create(first_name=f"P{index}", document_number=f"PRC-{index}",
+                                     email=f"pricing{index}@example.com", date_of_birth="1990-01-01")
+            for index in range(2)
+        ]
+
+    def test_fare_is_base_price_times_seat_type_multiplier(self):
+        fares = self.service.get_fare_table(self.flight, now=self.now)
+        self.assertEqual(fares.for_type_id(self.economy.pk), Decimal('100.00'))
+        self.assertEqual(fares.for_type_id(self.business.pk), Decimal('250.00'))
+        self.assertEqual(self.service.quote(self.flight, self.seats[0], now=self.now), Decimal('250.00'))
+
+    def test_fare_rises_close_to_departure(self):
+        fares = self.service.get_fare_table(self.flight, now=self.flight.departure_date - timedelta(days=3))
+        self.assertEqual(fares.for_type_id(self.economy.pk), Decimal('150.00'))
+
+    def test_fare_rises_with_load_factor_and_inventory_version(self):
+        reservations = ReservationService()
+        for passenger, seat in zip(self.passengers, self.seats[1:]):
+            reservations.create_reservation(self.flight.pk, passenger.pk, seat.pk, Decimal('100.00'))
+        flight = Flight.objects.get(pk=self.flight.pk)
+        self.assertEqual(flight.load_factor, 0.5)
+        self.assertEqual(self.service.quote(flight, self.seats[3], now=self.now), Decimal('120.00'))
+
+    def test_fare_table_is_cached_per_inventory_version(self):
+        self.service.get_fare_table(self.flight, now=self.now)
+        with self.assertNumQueries(0):
+            self.service.get_fare_table(self.flight, now=self.now)
+
+    def test_snapshot_token_changes_with_departure_step_and_curves(self):
+        snapshots = self.service.seat_map_cache
+        token = snapshots.version_token(self.flight)
+        with patch('airline.seat_map_cache.timezone.now', return_value=self.flight.departure_date - timedelta(days=3)):
+            self.assertNotEqual(snapshots.version_token(self.flight), token)
+        with override_settings(PRICING_DEPARTURE_CURVE=[(0, '1.00')]):
+            self.assertNotEqual(snapshots.version_token(self.flight), token)
+        self.assertEqual(snapshots.version_token(self.flight), token)
+
+    def test_price_seat_map_prices_every_seat_with_one_query(self):
+        seat_map = ReservationService().get_seat_map(self.flight)
+        with self.assertNumQueries(1):
+            priced = self.service.price_seat_map(self.flight, seat_map, now=self.now)
+        self.assertEqual(
+            [(seat.number, price) for seat, price in priced[1]],
+            [('1A', Decimal('250.00')), ('1B', Decimal('100.00')), ('1C', Decimal('100.00')), ('1D', Decimal('100.00'))],
+        )
+
+    def test_create_reservation_without_price_uses_quote(self):
+        reservation = ReservationService().create_reservation(self.flight.pk, self.passengers[0].pk, self.seats[0].pk)
+        self.assertEqual(reservation.price, Decimal('250.00'))
+
+    def test_bulk_reservation_items_without_price_use_quote(self):
+        reservations = ReservationService().create_reservations_bulk(self.flight.pk, [
+            {'passenger': self.passengers[0].pk, 'seat': self.seats[0].pk},
+            {'passenger': self.passengers[1].pk, 'seat': self.seats[1].pk, 'price': '80.00'},
+        ])
+        self.assertEqual([reservation.price for reservation in reservations], [Decimal('250.00'), Decimal('80.00')])
+
 class PassengerServiceTest(BaseServiceTest):
     def setUp(self):
         super().setUp()
         self.service = PassengerService()
         self.service.passenger_repo = self.mock_repo
         self.service.flight_history_repo = MagicMock()
+        self.service.identity_cache = MagicMock()
+        self.service.identity_cache.get.return_value = None
 
     def test_create_passenger(self):
         mock_passenger = MagicMock(spec=Passenger)
@@ -172,8 +809,21 @@ class PassengerServiceTest(BaseServiceTest):
         passenger = self.service.get_or_create_passenger_for_user(mock_user)
 
         self.service.passenger_repo.get_or_create_passenger.assert_called_once()
+        self.assertEqual(
+            self.service.passenger_repo.get_or_create_passenger.call_args.kwargs['defaults']['document_number'],
+            f'USER#{mock_user.pk}',
+        )
+        self.service.identity_cache.set.assert_called_once_with(mock_user, mock_passenger)
         self.assertEqual(passenger, mock_passenger)
 
+    def test_get_or_create_passenger_for_user_cached(self):
+        mock_user = MagicMock()
+        mock_passenger = MagicMock(spec=Passenger)
+        self.service.identity_cache.get.return_value = mock_passenger
+
+        self.assertEqual(self.service.get_or_create_passenger_for_user(mock_user), mock_passenger)
+        self.service.passenger_repo.get_or_create_passenger.assert_not_called()
+
     def test_get_or_create_passenger_for_user_existing(self):
         mock_user = MagicMock()
         mock_user.email = 'test@example.com'
@@ -202,6 +852,56 @@ class PassengerServiceTest(BaseServiceTest):
         self.assertEqual(passenger, mock_passenger)
         self.assertEqual(flight_history, mock_flight_history)
 
+class PassengerIdentityTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.service = PassengerService()
+        self.user = User.objects.create_user(username='identity', email='Identity@Example.com', password='pw')
+
+    def test_lookup_is_case_insensitive(self):
+        existing = Passenger.objects.create(
+            first_name="Ana", document_number="ID-1", email="identity@example.com", date_of_birth="1990-01-01"
+        )
+        self.assertEqual(self.service.get_or_create_passenger_for_user(self.user), existing)
+        self.assertEqual(Passenger.objects.count(), 1)
+
+    def test_placeholder_document_is_unique_per_user(self):
+        other = User.objects.create_user(username='other', email='other@example.com', password='pw')
+        first = self.service.get_or_create_passenger_for_user(self.user)
+        second = self.service.get_or_create_passenger_for_user(other)
+        self.assertEqual(first.document_number, f'USER#{self.user.pk}')
+        self.assertEqual(second.document_number, f'USER#{other.pk}')
+
+    def test_cached_across_requests(self):
+        passenger = self.service.get_or_create_passenger_for_user(self.user)
+        fresh_user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.service.get_or_create_passenger_for_user(fresh_user).pk, passenger.pk)
+
+    def test_passenger_changes_invalidate_cache(self):
+        passenger = self.service.get_or_create_passenger_for_user(self.user)
+        passenger.email = 'renamed@example.com'
+        passenger.save()
+        fresh_user = User.objects.get(pk=self.user.pk)
+        replacement = self.service.get_or_create_passenger_for_user(fresh_user)
+        self.assertNotEqual(replacement.pk, passenger.pk)
+        self.assertRegex(replacement.document_number, rf'^USER#{self.user.pk}-[0-9a-f]+$')
+
+        replacement.delete()
+        self.assertIsNone(self.service.identity_cache.get(User.objects.get(pk=self.user.pk)))
+
+    def test_placeholder_fallback_skips_taken_documents(self):
+        prefix = f'USER#{self.user.pk}'
+        for index, document_number in enumerate([prefix, f'{prefix}-2', f'{prefix}0']):
+            Passenger.objects.create(
+                first_name="Old", document_number=document_number, email=f"old{index}@example.com",
+                date_of_birth="1990-01-01"
+            )
+        passenger = self.service.get_or_create_passenger_for_user(self.user)
+        self.assertEqual(passenger.email, self.user.email)
+        self.assertRegex(passenger.document_number, rf'^{prefix}-[0-9a-f]+$')
+        self.assertLessEqual(len(passenger.document_number), 20)
+
 class ReservationServiceTest(BaseServiceTest):
     def setUp(self):
         super().setUp()
@@ -210,18 +910,19 @@ class ReservationServiceTest(BaseServiceTest):
         self.service.flight_repo = MagicMock()
         self.service.passenger_repo = MagicMock()
         self.service.seat_repo = MagicMock()
+        self.service.inventory_service = MagicMock()
 
     @patch('airline.services.transaction.atomic')
     def test_create_reservation_success(self, mock_atomic):
-        mock_flight = MagicMock(spec=Flight)
+        mock_flight = MagicMock(spec=Flight, airplane_id=1)
         mock_passenger = MagicMock(spec=Passenger)
-        mock_seat = MagicMock(spec=Seat, pk=1)
+        mock_seat = MagicMock(spec=Seat, pk=1, airplane_id=1)
         mock_reservation = MagicMock(spec=Reservation)
 
         self.service.flight_repo.get_by_id.return_value = mock_flight
         self.service.passenger_repo.get_by_id.return_value = mock_passenger
         self.service.seat_repo.get_by_id.return_value = mock_seat
-        self.service.reservation_repo.filter_by_flight_seat_status.return_value.exists.return_value = False
+        self.service.inventory_service.claim_seat.return_value = True
         self.service.reservation_repo.create.return_value = mock_reservation
 
         reservation = self.service.create_reservation(1, 1, 1, Decimal('100.00'))
@@ -229,24 +930,24 @@ class ReservationServiceTest(BaseServiceTest):
         self.service.flight_repo.get_by_id.assert_called_once_with(1)
         self.service.passenger_repo.get_by_id.assert_called_once_with(1)
         self.service.seat_repo.get_by_id.assert_called_once_with(1)
-        self.service.reservation_repo.filter_by_flight_seat_status.assert_called_once_with(mock_flight, mock_seat, ['PEN', 'CON', 'PAID'])
+        self.service.inventory_service.claim_seat.assert_called_once_with(mock_flight, mock_seat, passenger=mock_passenger)
+        self.service.reservation_repo.filter_by_flight_seat_status.assert_not_called()
         self.service.reservation_repo.create.assert_called_once()
-        self.service.seat_repo.update.assert_called_once_with(mock_seat.pk, {'status': 'Reserved'})
+        self.service.seat_repo.update.assert_not_called()
         self.assertEqual(reservation, mock_reservation)
-        self.assertEqual(mock_seat.status, 'Reserved')
 
     @patch('airline.services.transaction.atomic')
     def test_create_reservation_seat_already_reserved(self, mock_atomic):
-        mock_flight = MagicMock(spec=Flight)
+        mock_flight = MagicMock(spec=Flight, airplane_id=1)
         mock_passenger = MagicMock(spec=Passenger)
-        mock_seat = MagicMock(spec=Seat)
+        mock_seat = MagicMock(spec=Seat, airplane_id=1)
 
         self.service.flight_repo.get_by_id.return_value = mock_flight
         self.service.passenger_repo.get_by_id.return_value = mock_passenger
         self.service.seat_repo.get_by_id.return_value = mock_seat
-        self.service.reservation_repo.filter_by_flight_seat_status.return_value.exists.return_value = True
+        self.service.inventory_service.claim_seat.return_value = False
 
-        with self.assertRaises(ValidationError):
+        with self.assertRaises(SeatUnavailableError):
             self.service.create_reservation(1, 1, 1, Decimal('100.00'))
 
         self.service.reservation_repo.create.assert_not_called()
@@ -259,19 +960,13 @@ class ReservationServiceTest(BaseServiceTest):
         self.mock_repo.update.assert_called_once_with(1, data)
         self.assertTrue(result)
 
-    @patch('airline.services.transaction.atomic')
-    def test_delete_reservation(self, mock_atomic):
-        mock_reservation = MagicMock(spec=Reservation)
-        mock_reservation.seat.pk = 1
-        self.mock_repo.get_by_id.return_value = mock_reservation
+    def test_delete_reservation(self):
         self.mock_repo.delete.return_value = True
-        self.service.seat_repo.update.return_value = True
 
         result = self.service.delete_reservation(1)
 
-        self.mock_repo.get_by_id.assert_called_once_with(1)
         self.mock_repo.delete.assert_called_once_with(1)
-        self.service.seat_repo.update.assert_called_once_with(mock_reservation.seat.pk, {'status': 'Available'})
+        self.service.seat_repo.update.assert_not_called()
         self.assertTrue(result)
 
     def test_confirm_reservation_success(self):
@@ -345,29 +1040,18 @@ class ReservationServiceTest(BaseServiceTest):
 
     def test_get_flight_details_with_seats(self):
         mock_flight = MagicMock(spec=Flight)
-        mock_flight.airplane = MagicMock(spec=Airplane)
         self.service.flight_repo.get_by_id.return_value = mock_flight
-
-        mock_seat1 = MagicMock(spec=Seat, id=1, row=1, column='A')
-        mock_seat2 = MagicMock(spec=Seat, id=2, row=1, column='B')
-        mock_seat3 = MagicMock(spec=Seat, id=3, row=2, column='A')
-        self.service.seat_repo.filter_by_airplane_ordered.return_value = [mock_seat1, mock_seat2, mock_seat3]
-
-        self.service.reservation_repo.filter_by_flight_seat_status.return_value.values_list.return_value = [2]
+        seat_map = {1: [MagicMock(), MagicMock()], 2: [MagicMock()]}
+        self.service.inventory_service = MagicMock()
+        self.service.inventory_service.get_seat_map.return_value = seat_map
 
         flight, seats_by_row = self.service.get_flight_details_with_seats(1)
 
         self.service.flight_repo.get_by_id.assert_called_once_with(1)
-        self.service.seat_repo.filter_by_airplane_ordered.assert_called_once_with(mock_flight.airplane)
-        self.service.reservation_repo.filter_by_flight_seat_status.assert_called_once_with(mock_flight, None, ['PEN', 'CON', 'PAID'])
-        
+        self.service.inventory_service.get_seat_map.assert_called_once_with(mock_flight)
+        self.service.reservation_repo.filter_by_flight_seat_status.assert_not_called()
         self.assertEqual(flight, mock_flight)
-        self.assertTrue(mock_seat1.is_reserved == False)
-        self.assertTrue(mock_seat2.is_reserved == True)
-        self.assertTrue(mock_seat3.is_reserved == False)
-        self.assertEqual(len(seats_by_row), 2)
-        self.assertEqual(seats_by_row[1], [mock_seat1, mock_seat2])
-        self.assertEqual(seats_by_row[2], [mock_seat3])
+        self.assertEqual(seats_by_row, seat_map)
 
     def test_get_passengers_by_flight(self):
         mock_flight = MagicMock(spec=Flight)
@@ -398,22 +1082,35 @@ class SeatLayoutServiceTest(BaseServiceTest):
         mock_seat_layout = MagicMock(spec=SeatLayout)
         self.mock_repo.create.return_value = mock_seat_layout
         mock_seat_type = MagicMock(spec=SeatType)
-        self.service.seat_type_repo.get_by_id.return_value = mock_seat_type
+        self.service.seat_type_repo.in_bulk.return_value = {1: mock_seat_type}
 
         positions_data = [
             {'seat_type_id': 1, 'row': 1, 'column': 'A'},
             {'seat_type_id': 1, 'row': 1, 'column': 'B'}
         ]
-        seat_layout = self.service.create_seat_layout_with_positions('Layout 1', 1, 2, positions_data)
+        with patch('airline.services.SeatLayoutPosition') as mock_position:
+            seat_layout = self.service.create_seat_layout_with_positions('Layout 1', 1, 2, positions_data)
 
         self.mock_repo.create.assert_called_once_with({
             'layout_name': 'Layout 1',
             'rows': 1,
             'columns': 2
         })
-        self.assertEqual(self.service.seat_layout_position_repo.create.call_count, 2)
+        self.service.seat_type_repo.in_bulk.assert_called_once_with({1})
+        self.assertEqual(mock_position.call_count, 2)
+        self.service.seat_layout_position_repo.bulk_create.assert_called_once()
+        self.service.seat_layout_position_repo.create.assert_not_called()
         self.assertEqual(seat_layout, mock_seat_layout)
 
+    def test_create_seat_layout_with_positions_rejects_duplicates(self):
+        positions_data = [
+            {'seat_type_id': 1, 'row': 1, 'column': 'A'},
+            {'seat_type_id': 1, 'row': 1, 'column': 'A'}
+        ]
+        with self.assertRaises(ValidationError):
+            self.service.create_seat_layout_with_positions('Layout 1', 1, 2, positions_data)
+        self.mock_repo.create.assert_not_called()
+
     def test_update_seat_layout(self):
         self.mock_repo.update.return_value = True
         data = {'layout_name': 'Layout 2'}
@@ -427,6 +1124,27 @@ class SeatLayoutServiceTest(BaseServiceTest):
         self.mock_repo.delete.assert_called_once_with(1)
         self.assertTrue(result)
 
+class SeatLayoutSpecImportTest(TestCase):
+    def setUp(self):
+        self.business = SeatType.objects.create(name='Business', code='BUS', price_multiplier=Decimal('1.80'))
+        self.economy = SeatType.objects.create(name='Economy', code='ECO', price_multiplier=Decimal('1.00'))
+        self.service = SeatLayoutService()
+
+    def test_create_seat_layout_from_spec(self):
+        with self.assertNumQueries(5):  # seat types, savepoint, layout, positions, release
+            seat_layout = self.service.create_seat_layout_from_spec(
+                'A320', 30, 6, ['1-4:A-F=BUS', {'rows': '5-30', 'columns': 'A-F', 'seat_type': 'ECO'}],
+            )
+        positions = SeatLayoutPosition.objects.filter(seat_layout=seat_layout)
+        self.assertEqual(positions.count(), 180)
+        self.assertEqual(positions.filter(seat_type=self.business).count(), 24)
+        self.assertEqual(positions.get(row=30, column='F').seat_type, self.economy)
+
+    def test_create_seat_layout_from_spec_rejects_unknown_codes(self):
+        with self.assertRaisesMessage(ValidationError, 'Unknown seat type codes: FST.'):
+            self.service.create_seat_layout_from_spec('A320', 2, 2, ['1:A-B=FST', '2:A-B=ECO'])
+        self.assertFalse(SeatLayout.objects.exists())
+
 class SeatTypeServiceTest(BaseServiceTest):
     def setUp(self):
         super().setUp()
@@ -513,6 +1231,82 @@ class FlightHistoryServiceTest(BaseServiceTest):
         self.mock_repo.filter_by_flight.assert_called_once_with(mock_flight.pk)
         self.assertEqual(history, mock_history)
 
+@override_settings(FLIGHT_HISTORY_SYNC_BATCH_SIZE=1, FLIGHT_HISTORY_SYNC_LOOKBACK_HOURS=24)
+class FlightHistorySyncTest(TestCase):
+    def setUp(self):
+        self.service = FlightHistoryService()
+        self.now = timezone.now()
+        self.airplane = Airplane.objects.create(model_name="A320", capacity=4, registration_number="HST001")
+        self.seats = [
+            Seat.objects.create(airplane=self.airplane, number=f"1{column}", row=1, column=column, status='Available')
+            for column in 'ABCD'
+        ]
+        self.departed = self.create_flight(self.now - timedelta(hours=5))
+        self.earlier = self.create_flight(self.now - timedelta(days=3))
+        self.upcoming = self.create_flight(self.now + timedelta(days=3))
+        self.passengers = [
+            Passenger.objects.create(first_name=f"H{index}", document_number=f"HST-{index}",
+                                     email=f"history{index}@example.com", date_of_birth="1990-01-01")
+            for index in range(4)
+        ]
+
+    def create_flight(self, departure):
+        return Flight.objects.create(
+            airplane=self.airplane, origin="EZE", destination="COR", departure_date=departure,
+            arrival_date=departure + timedelta(hours=2), duration=timedelta(hours=2),
+            status="Scheduled", base_price=Decimal('100.00'),
+        )
+
+    def reserve(self, flight, passenger, seat, status, ticket_status=None):
+        reservation = Reservation.objects.create(
+            flight=flight, passenger=passenger, seat=seat, status=status, price=Decimal('120.00'),
+            reservation_code=uuid.uuid4().hex[:20],
+        )
+        if ticket_status:
+            Ticket.objects.create(reservation=reservation, barcode=uuid.uuid4().hex, status=ticket_status)
+        return reservation
+
+    def test_sync_creates_entries_for_completed_reservations_of_departed_flights(self):
+        paid = self.reserve(self.departed, self.passengers[0], self.seats[0], 'PAID')
+        boarded = self.reserve(self.earlier, self.passengers[1], self.seats[1], 'CON', ticket_status='USED')
+        self.reserve(self.departed, self.passengers[2], self.seats[2], 'CON', ticket_status='EMI')
+        self.reserve(self.departed, self.passengers[3], self.seats[3], 'PEN')
+        self.reserve(self.upcoming, self.passengers[0], self.seats[0], 'PAID')
+
+        result = self.service.sync_from_reservations(now=self.now)
+
+        self.assertEqual(result['created'], 2)
+        self.assertEqual(result['flights'], 2)
+        self.assertEqual(result['high_water_mark'], self.departed.departure_date)
+        entry = FlightHistory.objects.get(reservation=paid)
+        self.assertEqual(
+            (entry.passenger, entry.flight, entry.seat_number, entry.price_paid, entry.booking_date),
+            (paid.passenger, self.departed, '1A', Decimal('120.00'), paid.reservation_date),
+        )
+        self.assertTrue(FlightHistory.objects.filter(reservation=boarded).exists())
+
+    def test_sync_is_idempotent_and_incremental(self):
+        self.reserve(self.departed, self.passengers[0], self.seats[0], 'PAID')
+        self.service.sync_from_reservations(now=self.now)
+
+        again = self.service.sync_from_reservations(now=self.now)
+        self.assertEqual(again['created'], 0)
+        # Only the lookback window before the mark is re-read, not the older flight.
+        self.assertEqual(again['flights'], 1)
+        self.assertEqual(FlightHistory.objects.count(), 1)
+
+        # Paid after departure, within the lookback window.
+        self.reserve(self.departed, self.passengers[1], self.seats[1], 'PAID')
+        self.assertEqual(self.service.sync_from_reservations(now=self.now)['created'], 1)
+        self.assertEqual(self.service.sync_from_reservations(now=self.now, full=True)['created'], 0)
+
+    def test_checkpoint_is_saved(self):
+        self.service.sync_from_reservations(now=self.now)
+        self.assertEqual(
+            SyncCheckpoint.objects.get(name=FlightHistoryService.sync_checkpoint_name).high_water_mark,
+            self.departed.departure_date,
+        )
+
 class TicketServiceTest(BaseServiceTest):
     def setUp(self):
         super().setUp()
@@ -578,3 +1372,134 @@ class TicketServiceTest(BaseServiceTest):
 
         self.mock_repo.get_by_id.assert_called_once_with(1)
         self.assertEqual(ticket, mock_ticket)
+
+    @patch('airline.services.render_to_string', return_value='<html></html>')
+    def test_get_ticket_pdf_renders_once_per_status(self, mock_render):
+        ticket = MagicMock(spec=Ticket)
+        ticket.barcode = 'ABC123'
+        ticket.status = 'EMI'
+        with tempfile.TemporaryDirectory() as root, override_settings(TICKET_PDF_WORKERS=0), \
+                patch('airline.services.write_ticket_pdf', wraps=write_ticket_pdf) as mock_write:
+            self.service.pdf_storage = TicketPdfStorage(root=root)
+
+            path = self.service.get_ticket_pdf(ticket)
+            self.assertEqual(self.service.get_ticket_pdf(ticket), path)
+            self.assertEqual(mock_write.call_count, 1)
+
+            ticket.status = 'CAN'
+            cancelled_path = self.service.get_ticket_pdf(ticket)
+            self.assertEqual(mock_write.call_count, 2)
+            self.assertTrue(os.path.exists(cancelled_path))
+            self.assertFalse(os.path.exists(path))
+            self.assertFalse(os.path.exists(f'{cancelled_path}.lock'))
+
+
+class TicketServiceBulkIssueTest(TestCase):
+    def setUp(self):
+        self.service = TicketService()
+        airplane = Airplane.objects.create(model_name="A320", capacity=4, registration_number="TKB001")
+        departure = timezone.now() + timedelta(days=2)
+        self.flight = Flight.objects.create(
+            airplane=airplane, origin="EZE", destination="COR", departure_date=departure,
+            arrival_date=departure + timedelta(hours=2), duration=timedelta(hours=2),
+            status="Scheduled", base_price=Decimal('100.00')
+        )
+        self.reservations = {}
+        for row, status in enumerate(['CON', 'PAID', 'PEN', 'CON'], start=1):
+            seat = Seat.objects.create(airplane=airplane, number=f"{row}A", row=row, column="A", status='Available')
+            passenger = Passenger.objects.create(
+                first_name=f"P{row}", document_number=f"TKB-{row}", email=f"p{row}@example.com", date_of_birth="1990-01-01"
+            )
+            self.reservations[row] = Reservation.objects.create(
+                flight=self.flight, passenger=passenger, seat=seat, status=status,
+                price=Decimal('100.00'), reservation_code=f"TKB{row}"
+            )
+        self.existing = Ticket.objects.create(reservation=self.reservations[4], barcode='EXISTING', status='EMI')
+
+    def test_issue_tickets_for_flight_creates_missing_tickets_in_bulk(self):
+        # Flight, savepoint pair, pending reservations, insert and issued tickets.
+        with self.assertNumQueries(6):
+            result = self.service.issue_tickets_for_flight(self.flight.pk, render=False)
+        self.assertEqual(result['created'], 2)
+        self.assertEqual(result['rendered'], 0)
+        self.assertEqual(
+            [ticket.reservation_id for ticket in result['tickets']],
+            [self.reservations[1].pk, self.reservations[2].pk, self.reservations[4].pk],
+        )
+        self.assertFalse(Ticket.objects.filter(reservation=self.reservations[3]).exists())
+        self.assertEqual(Ticket.objects.get(pk=self.existing.pk).barcode, 'EXISTING')
+
+        self.assertEqual(self.service.issue_tickets_for_flight(self.flight.pk, render=False)['created'], 0)
+
+    def test_issue_tickets_for_flight_does_not_count_tickets_issued_concurrently(self):
+        # A ticket issued between the read and the insert is skipped by the INSERT.
+        ticketable = [self.reservations[1], self.reservations[2], self.reservations[4]]
+        with patch.object(self.service.reservation_repo, 'filter_ticketable_without_ticket', return_value=ticketable):
+            result = self.service.issue_tickets_for_flight(self.flight.pk, render=False)
+        self.assertEqual(result['created'], 2)
+        self.assertEqual(Ticket.objects.get(pk=self.existing.pk).barcode, 'EXISTING')
+
+    def test_issue_tickets_for_flight_renders_missing_pdfs(self):
+        progress = []
+        with tempfile.TemporaryDirectory() as root, override_settings(TICKET_PDF_WORKERS=0, TICKET_PDF_ROOT=root):
+            result = self.service.issue_tickets_for_flight(self.flight.pk, progress=lambda *args: progress.append(args))
+            self.assertEqual(result['rendered'], 3)
+            self.assertTrue(all(self.service.pdf_storage.is_ready(ticket) for ticket in result['tickets']))
+            self.assertEqual(progress, [(1, 3), (2, 3), (3, 3)])
+            self.assertIn('render', result['timings'])
+
+            self.assertEqual(self.service.issue_tickets_for_flight(self.flight.pk)['rendered'], 0)
+
+    @patch('airline.services.get_executor')
+    def test_issue_tickets_for_flight_sends_batches_to_the_pool(self, mock_get_executor):
+        submit = mock_get_executor.return_value.submit
+        submit.side_effect = lambda *args: MagicMock()
+        with tempfile.TemporaryDirectory() as root, \
+                override_settings(TICKET_PDF_WORKERS=2, TICKET_PDF_BATCH_SIZE=2, TICKET_PDF_ROOT=root):
+            result = self.service.issue_tickets_for_flight(self.flight.pk, wait=False)
+            self.assertEqual(result['rendered'], 3)
+            self.assertEqual([call.args[0] for call in submit.call_args_list], [write_ticket_pdfs, write_ticket_pdfs])
+            batches = [call.args[1] for call in submit.call_args_list]
+            self.assertEqual([len(batch) for batch in batches], [2, 1])
+            self.assertTrue(all(os.path.exists(lock_path) for batch in batches for _, _, lock_path in batch))
+
+    def test_write_ticket_pdfs_renders_each_job_with_the_shared_renderer(self):
+        self.assertIs(get_renderer(), get_renderer())
+        with tempfile.TemporaryDirectory() as root:
+            jobs = []
+            for name in ('one', 'two'):
+                path = os.path.join(root, f'ticket_{name}_EMI.pdf')
+                open(f'{path}.lock', 'w').close()
+                jobs.append((f'<p>{name}</p>', path, f'{path}.lock'))
+            self.assertEqual(write_ticket_pdfs(jobs), [path for _, path, _ in jobs])
+            self.assertTrue(all(os.path.exists(path) and not os.path.exists(lock) for _, path, lock in jobs))
+
+    def test_write_ticket_pdfs_releases_remaining_locks_when_a_job_fails(self):
+        with tempfile.TemporaryDirectory() as root:
+            jobs = []
+            for name in ('one', 'two', 'three'):
+                path = os.path.join(root, f'ticket_{name}_EMI.pdf')
+                open(f'{path}.lock', 'w').close()
+                jobs.append((f'<p>{name}</p>', path, f'{path}.lock'))
+            renderer = MagicMock()
+            renderer.render_pdf.side_effect = [b'%PDF-1', RuntimeError('render failed'), b'%PDF-3']
+            with patch('airline.ticket_pdf.get_renderer', return_value=renderer), self.assertRaises(RuntimeError):
+                write_ticket_pdfs(jobs)
+            self.assertFalse(any(os.path.exists(lock) for _, _, lock in jobs))
+            self.assertEqual([os.path.exists(path) for _, path, _ in jobs], [True, False, False])
+
+    @patch('airline.services.write_ticket_bundle', side_effect=lambda html_strings, path: path)
+    def test_issue_tickets_for_flight_bundle(self, mock_bundle):
+        with tempfile.TemporaryDirectory() as root, override_settings(TICKET_PDF_WORKERS=0, TICKET_PDF_ROOT=root):
+            result = self.service.issue_tickets_for_flight(self.flight.pk, render=False, bundle=True)
+        html_strings, path = mock_bundle.call_args.args
+        self.assertEqual(len(html_strings), 3)
+        self.assertIn('EXISTING', html_strings[2])
+        self.assertEqual(result['bundle'], path)
+        self.assertTrue(path.endswith(f'flight_{self.flight.pk}_boarding_passes.pdf'))
+
+    def test_ticket_html_embeds_barcode_without_remote_resources(self):
+        html = self.service._render_ticket_html(self.existing)
+        self.assertIn(code128_svg('EXISTING'), html)
+        self.assertNotIn('http://', html.replace('http://www.w3.org/2000/svg', ''))
+        self.assertNotIn('https://', html)
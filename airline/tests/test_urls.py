@@ -93,6 +93,14 @@ class URLTests(SimpleTestCase):
         url = reverse('passenger_list_by_flight', args=[1])
         self.assertEqual(resolve(url).func, views.passenger_list_by_flight)
 
+    def test_export_flight_manifest_url_resolves(self):
+        url = reverse('export_flight_manifest', args=[1])
+        self.assertEqual(resolve(url).func, views.export_flight_manifest)
+
+    def test_export_manifests_url_resolves(self):
+        url = reverse('export_manifests')
+        self.assertEqual(resolve(url).func, views.export_manifests)
+
     # Airplane URLs
     def test_airplane_list_url_resolves(self):
         url = reverse('airplane_list')
@@ -1,9 +1,14 @@
-from django.test import TestCase, Client
+import tempfile
+from decimal import Decimal
+from unittest.mock import patch
+from django.test import TestCase, Client, override_settings
+from django.core.cache import cache
 from django.urls import reverse
 from django.utils import timezone
 from datetime import timedelta
 from django.contrib.auth.models import User
-from airline.models import Airplane, Flight, Passenger, FlightHistory, Seat, Reservation, Ticket, SeatLayout, SeatType, SeatLayoutPosition
+from airline.models import Airplane, Flight, Passenger, FlightHistory, Seat, Reservation, Ticket, SeatLayout, SeatType, SeatLayoutPosition, FlightSeat
+from airline.services import SeatInventoryService
 
 class RegistrationViewTest(TestCase):
     def test_registration_page_loads(self):
@@ -92,6 +97,36 @@ class FlightManagementViewsTest(TestCase):
         self.assertTemplateUsed(response, 'airline/flight_list.html')
         self.assertContains(response, self.flight.origin)
 
+    def test_flight_list_view_shows_seats_left(self):
+        Flight.objects.filter(pk=self.flight.pk).update(seats_total=180, seats_held=2, seats_reserved=8)
+        response = self.client.get(reverse('flight_list'))
+        self.assertContains(response, '170/180 seats left')
+
+    def test_flight_list_view_filters_by_route(self):
+        other = Flight.objects.create(
+            airplane=self.airplane, origin="COR", destination="MDZ", departure_date=self.departure_date,
+            arrival_date=self.arrival_date, duration=timedelta(hours=3), status="Scheduled", base_price=500.00
+        )
+        response = self.client.get(reverse('flight_list'), {'origin': 'COR', 'destination': 'MDZ'})
+        self.assertEqual(list(response.context['flights']), [other])
+        self.assertFalse(response.context['flights_truncated'])
+
+    def test_flight_list_view_invalid_search_shows_errors(self):
+        response = self.client.get(reverse('flight_list'), {'date_from': '2030-01-02', 'date_to': '2030-01-01'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('date_to', response.context['search_form'].errors)
+        self.assertEqual(list(response.context['flights']), [self.flight])
+
+    @override_settings(FLIGHT_SEARCH_WEB_LIMIT=1)
+    def test_home_search_is_limited(self):
+        Flight.objects.create(
+            airplane=self.airplane, origin="EZE", destination="MIA", departure_date=self.departure_date + timedelta(days=1),
+            arrival_date=self.arrival_date + timedelta(days=1), duration=timedelta(hours=3), status="Scheduled", base_price=500.00
+        )
+        response = self.client.get(reverse('home'), {'origin': 'EZE'})
+        self.assertEqual(list(response.context['flights']), [self.flight])
+        self.assertTrue(response.context['flights_truncated'])
+
     def test_flight_create_view_get(self):
         response = self.client.get(reverse('flight_create'))
         self.assertEqual(response.status_code, 200)
@@ -316,10 +351,40 @@ class PassengerManagementViewsTest(TestCase):
         self.assertTemplateUsed(response, 'airline/passenger_flight_history.html')
         self.assertContains(response, self.passenger.first_name)
         self.assertContains(response, self.flight.origin)
+
+    @override_settings(FLIGHT_HISTORY_PAGE_SIZE=2)
+    def test_passenger_flight_history_view_pages_by_cursor(self):
+        now = timezone.now()
+        for days in range(1, 5):
+            FlightHistory.objects.create(
+                passenger=self.passenger, flight=self.flight, booking_date=now - timedelta(days=days),
+                seat_number=f"{days}B", price_paid=500.00
+            )
+        url = reverse('passenger_flight_history', args=[self.passenger.pk])
+
+        response = self.client.get(url)
+        self.assertEqual([entry.seat_number for entry in response.context['flight_history']], ["10A", "1B"])
+        self.assertTrue(response.context['is_first_page'])
+        next_cursor = response.context['next_cursor']
+        self.assertIsNotNone(next_cursor)
+
+        response = self.client.get(url, {'cursor': next_cursor})
+        self.assertEqual([entry.seat_number for entry in response.context['flight_history']], ["2B", "3B"])
+        self.assertFalse(response.context['is_first_page'])
+
+        response = self.client.get(url, {'cursor': response.context['next_cursor']})
+        self.assertEqual([entry.seat_number for entry in response.context['flight_history']], ["4B"])
+        self.assertIsNone(response.context['next_cursor'])
+
+    def test_passenger_flight_history_view_ignores_invalid_cursor(self):
+        response = self.client.get(reverse('passenger_flight_history', args=[self.passenger.pk]), {'cursor': 'bogus'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['flight_history']), [self.flight_history])
         self.assertContains(response, self.flight.destination)
 
 class ReservationViewsTest(TestCase):
     def setUp(self):
+        cache.clear()
         self.client = Client()
         self.user = User.objects.create_user(username='testuser', email='test@example.com', password='testpassword')
         self.client.login(username='testuser', password='testpassword')
@@ -392,14 +457,88 @@ class ReservationViewsTest(TestCase):
         self.assertContains(response, self.seat_available.number)
         self.assertContains(response, self.seat_reserved.number)
         self.assertContains(response, 'Reserved') # Check if reserved seat is marked
+        self.assertIn('ETag', response)
+
+    def test_flight_detail_with_seats_not_modified(self):
+        url = reverse('flight_detail_with_seats', args=[self.flight.pk])
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_flight_detail_with_seats_etag_varies_by_user(self):
+        url = reverse('flight_detail_with_seats', args=[self.flight.pk])
+        etag = self.client.get(url)['ETag']
+        other_user = User.objects.create_user(username='switched', email='switched@example.com', password='testpassword')
+        self.client.force_login(other_user)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertContains(response, 'switched')
+
+    def test_flight_detail_with_seats_snapshot_invalidated_on_cancel(self):
+        url = reverse('flight_detail_with_seats', args=[self.flight.pk])
+        etag = self.client.get(url)['ETag']
+        self.reservation.status = 'CAN'
+        self.reservation.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertContains(response, reverse('reserve_seat', args=[self.flight.pk, self.seat_reserved.pk]))
+
+    def _cancel_setup_reservation(self):
+        self.reservation.status = 'CAN'
+        self.reservation.save()
 
     def test_reserve_seat_view_get(self):
+        self._cancel_setup_reservation()
         response = self.client.get(reverse('reserve_seat', args=[self.flight.pk, self.seat_available.pk]))
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'airline/reserve_seat.html')
         self.assertContains(response, self.flight.origin)
         self.assertContains(response, self.seat_available.number)
 
+    @override_settings(PRICING_LOAD_FACTOR_CURVE=[(0.0, '1.00')], PRICING_DEPARTURE_CURVE=[(0, '1.20'), (7, '1.00')])
+    def test_reserve_seat_prices_server_side(self):
+        self._cancel_setup_reservation()
+        url = reverse('reserve_seat', args=[self.flight.pk, self.seat_available.pk])
+        response = self.client.get(url)
+        self.assertEqual(response.context['price'], Decimal('600.00'))
+        self.assertContains(response, '$600.00')
+        self.assertNotIn('price', response.context['form'].fields)
+
+        self.client.post(url, {'flight': self.flight.id, 'seat': self.seat_available.id, 'status': 'PEN', 'price': '1.00'})
+        reservation = Reservation.objects.get(flight=self.flight, seat=self.seat_available)
+        self.assertEqual(reservation.price, Decimal('600.00'))
+
+    @override_settings(PRICING_LOAD_FACTOR_CURVE=[(0.0, '1.00')], PRICING_DEPARTURE_CURVE=[(0, '1.20'), (7, '1.00')])
+    def test_flight_detail_with_seats_shows_fares(self):
+        response = self.client.get(reverse('flight_detail_with_seats', args=[self.flight.pk]))
+        self.assertContains(response, '$600.00')
+
+    def test_reserve_seat_view_get_with_active_reservation_takes_no_hold(self):
+        response = self.client.get(reverse('reserve_seat', args=[self.flight.pk, self.seat_available.pk]))
+        self.assertTemplateUsed(response, 'airline/reservation_error.html')
+        self.assertContains(response, 'This passenger already has a reservation for this flight.')
+        self.assertFalse(FlightSeat.objects.filter(flight=self.flight, status='HLD').exists())
+
+    def test_reserve_seat_view_get_holds_seat(self):
+        self._cancel_setup_reservation()
+        response = self.client.get(reverse('reserve_seat', args=[self.flight.pk, self.seat_available.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(response.context['hold_expires_at'])
+        entry = FlightSeat.objects.get(flight=self.flight, seat=self.seat_available)
+        self.assertEqual(entry.status, 'HLD')
+        self.assertEqual(entry.hold_passenger, self.passenger)
+
+        other_user = User.objects.create_user(username='other', email='other@example.com', password='testpassword')
+        other_client = Client()
+        other_client.force_login(other_user)
+        response = other_client.get(reverse('reserve_seat', args=[self.flight.pk, self.seat_available.pk]))
+        self.assertTemplateUsed(response, 'airline/reservation_error.html')
+
     def test_reserve_seat_view_post_success(self):
         # Create a new flight and seat for this test to avoid unique_together constraint violation
         new_flight = Flight.objects.create(
@@ -435,8 +574,7 @@ class ReservationViewsTest(TestCase):
         }, follow=True)
         self.assertEqual(response.status_code, 200)
         self.assertTrue(Reservation.objects.filter(flight=new_flight, seat=new_seat, status='PEN').exists())
-        new_seat.refresh_from_db()
-        self.assertEqual(new_seat.status, 'Reserved')
+        self.assertEqual(FlightSeat.objects.get(flight=new_flight, seat=new_seat).status, 'RES')
         self.assertRedirects(response, reverse('reservation_detail', args=[Reservation.objects.get(flight=new_flight, seat=new_seat).pk]))
 
     def test_reserve_seat_view_post_already_reserved(self):
@@ -464,29 +602,57 @@ class ReservationViewsTest(TestCase):
         self.assertContains(response, self.reservation.reservation_code)
         self.assertContains(response, self.reservation.passenger.first_name)
 
+    def _seat_reserved_inventory_status(self):
+        return FlightSeat.objects.get(flight=self.flight, seat=self.seat_reserved).status
+
     def test_reservation_update_status_view(self):
+        SeatInventoryService().create_inventory(self.flight)
         # Test updating to PAID
         response = self.client.get(reverse('reservation_update_status', args=[self.reservation.pk, 'PAID']), follow=True)
         self.assertEqual(response.status_code, 200)
         self.reservation.refresh_from_db()
         self.assertEqual(self.reservation.status, 'PAID')
-        self.seat_reserved.refresh_from_db()
-        self.assertEqual(self.seat_reserved.status, 'Reserved') # Should remain Reserved
+        self.assertEqual(self._seat_reserved_inventory_status(), 'SLD')
 
         # Test updating to CANCELLED
         response = self.client.get(reverse('reservation_update_status', args=[self.reservation.pk, 'CAN']), follow=True)
         self.assertEqual(response.status_code, 200)
         self.reservation.refresh_from_db()
         self.assertEqual(self.reservation.status, 'CAN')
-        self.seat_reserved.refresh_from_db()
-        self.assertEqual(self.seat_reserved.status, 'Available') # Should become Available
+        self.assertEqual(self._seat_reserved_inventory_status(), 'AVL') # Should become Available
 
     def test_generate_ticket_view_success(self):
-        response = self.client.get(reverse('generate_ticket', args=[self.reservation.pk]))
-        self.assertEqual(response.status_code, 200)
-        self.assertEqual(response['Content-Type'], 'application/pdf')
+        with tempfile.TemporaryDirectory() as root, override_settings(TICKET_PDF_WORKERS=0, TICKET_PDF_ROOT=root):
+            response = self.client.get(reverse('generate_ticket', args=[self.reservation.pk]))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Content-Type'], 'application/pdf')
+            self.assertIn('attachment', response['Content-Disposition'])
+            response.close()
         self.assertTrue(Ticket.objects.filter(reservation=self.reservation).exists())
 
+    @patch('airline.services.get_executor')
+    def test_generate_ticket_view_pending_while_rendering(self, mock_get_executor):
+        url = reverse('generate_ticket', args=[self.reservation.pk])
+        with tempfile.TemporaryDirectory() as root, override_settings(TICKET_PDF_WORKERS=2, TICKET_PDF_ROOT=root):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 202)
+            self.assertTemplateUsed(response, 'airline/ticket_pending.html')
+            self.assertIn('Retry-After', response)
+            # Polling again while the render is in flight does not enqueue it twice.
+            self.assertEqual(self.client.get(url).status_code, 202)
+        mock_get_executor.return_value.submit.assert_called_once()
+
+    def test_generate_ticket_view_uses_sendfile_header(self):
+        with tempfile.TemporaryDirectory() as root, override_settings(
+            TICKET_PDF_WORKERS=0, TICKET_PDF_ROOT=root,
+            TICKET_PDF_SENDFILE_HEADER='X-Accel-Redirect', TICKET_PDF_SENDFILE_PREFIX='/protected/tickets/',
+        ):
+            response = self.client.get(reverse('generate_ticket', args=[self.reservation.pk]))
+        ticket = Ticket.objects.get(reservation=self.reservation)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected/tickets/ticket_{ticket.barcode}_{ticket.status}.pdf')
+        self.assertEqual(response.content, b'')
+
     def test_generate_ticket_view_unconfirmed_reservation(self):
         self.reservation.status = 'PEN'
         self.reservation.save()
@@ -0,0 +1,303 @@
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+
+# Seconds a client is told to wait (Retry-After) while a PDF is being rendered.
+TICKET_PDF_RETRY_AFTER = 2
+
+_executor = None
+
+
+def get_executor():
+    """
+    Retorna el pool de procesos compartido para renderizar PDFs (se crea al primer uso).
+
+    Retorna:
+        ProcessPoolExecutor: Pool con TICKET_PDF_WORKERS procesos.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.TICKET_PDF_WORKERS)
+    return _executor
+
+
+# Stylesheet of the ticket template, parsed once per process by TicketRenderer.
+TICKET_STYLESHEET = os.path.join(os.path.dirname(__file__), 'static', 'css', 'ticket.css')
+
+_renderer = None
+
+
+class TicketRenderer:
+    """
+    Convierte a PDF el HTML de los tickets con estado compartido entre renderizados.
+
+    La hoja de estilos del ticket se analiza una sola vez, con una única
+    FontConfiguration, y los recursos que el HTML referencie (y las imágenes
+    ya decodificadas) se descargan una vez y se guardan en memoria. Se usa un
+    renderizador por proceso (get_renderer), de modo que cada proceso del pool
+    paga ese costo una vez.
+
+    Atributos:
+        font_config (FontConfiguration): Configuración de fuentes compartida.
+        stylesheet (CSS): Hoja de estilos del ticket ya analizada.
+    """
+
+    def __init__(self, stylesheet=TICKET_STYLESHEET):
+        """
+        Analiza la hoja de estilos y prepara la configuración de fuentes.
+
+        Parámetros:
+            stylesheet (str): Ruta de la hoja de estilos del ticket.
+        """
+        from weasyprint import CSS
+        from weasyprint.text.fonts import FontConfiguration
+
+        self.font_config = FontConfiguration()
+        self.stylesheet = CSS(filename=stylesheet, font_config=self.font_config)
+        self._fetched = {}
+        self._image_cache = {}
+
+    def url_fetcher(self, url, **kwargs):
+        """
+        Descarga un recurso referenciado por el HTML, una sola vez por URL.
+        """
+        from weasyprint import default_url_fetcher
+
+        if url not in self._fetched:
+            result = default_url_fetcher(url, **kwargs)
+            if 'file_obj' in result:
+                result = {**result, 'string': result.pop('file_obj').read()}
+            self._fetched[url] = result
+        return dict(self._fetched[url])
+
+    def render(self, html_string):
+        """
+        Maqueta el HTML de un ticket.
+
+        Retorna:
+            Document: Documento de WeasyPrint con las páginas del ticket.
+        """
+        from weasyprint import HTML
+
+        return HTML(string=html_string, url_fetcher=self.url_fetcher).render(
+            stylesheets=[self.stylesheet], font_config=self.font_config, cache=self._image_cache,
+        )
+
+    def render_pdf(self, html_string):
+        """
+        Convierte el HTML de un ticket a PDF.
+
+        Retorna:
+            bytes: Contenido del PDF.
+        """
+        return self.render(html_string).write_pdf()
+
+    def render_bundle(self, html_strings):
+        """
+        Une los tickets en un único PDF, con las páginas de cada uno en orden.
+
+        Retorna:
+            bytes: Contenido del PDF combinado.
+        """
+        documents = [self.render(html_string) for html_string in html_strings]
+        pages = [page for document in documents for page in document.pages]
+        return documents[0].copy(pages).write_pdf()
+
+
+def get_renderer():
+    """
+    Retorna el renderizador de tickets del proceso (se crea al primer uso).
+
+    Retorna:
+        TicketRenderer: Renderizador compartido por todos los tickets del proceso.
+    """
+    global _renderer
+    if _renderer is None:
+        _renderer = TicketRenderer()
+    return _renderer
+
+
+def _write_atomic(path, content):
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as handle:
+        handle.write(content)
+    os.replace(tmp_path, path)
+
+
+def write_ticket_pdf(html_string, path, lock_path):
+    """
+    Convierte el HTML de un ticket a PDF y lo escribe de forma atómica.
+
+    Se ejecuta en un proceso del pool, por lo que solo recibe datos simples y
+    no accede a la base de datos. Al terminar elimina las versiones anteriores
+    del mismo ticket y libera el bloqueo de renderizado.
+
+    Parámetros:
+        html_string (str): HTML del ticket ya renderizado.
+        path (str): Ruta final del PDF.
+        lock_path (str): Ruta del archivo de bloqueo a eliminar al terminar.
+
+    Retorna:
+        str: Ruta del PDF escrito.
+    """
+    try:
+        _write_atomic(path, get_renderer().render_pdf(html_string))
+        prefix = path.rsplit('_', 1)[0]
+        for stale in glob.glob(f'{glob.escape(prefix)}_*.pdf'):
+            if stale != path:
+                os.remove(stale)
+        return path
+    finally:
+        if os.path.exists(lock_path):
+            os.remove(lock_path)
+
+
+def write_ticket_pdfs(jobs):
+    """
+    Escribe los PDFs de varios tickets en una sola tarea del pool.
+
+    Si un ticket falla, los bloqueos de los tickets que no llegaron a
+    escribirse también se liberan antes de propagar el error.
+
+    Parámetros:
+        jobs (list): Tuplas (html_string, path, lock_path) como las de write_ticket_pdf.
+
+    Retorna:
+        list: Rutas de los PDFs escritos, en el orden de `jobs`.
+    """
+    try:
+        return [write_ticket_pdf(*job) for job in jobs]
+    finally:
+        for _, _, lock_path in jobs:
+            if os.path.exists(lock_path):
+                os.remove(lock_path)
+
+
+def write_ticket_bundle(html_strings, path):
+    """
+    Combina los tickets de un vuelo en un único PDF de tarjetas de embarque.
+
+    Se ejecuta en un proceso del pool. Cada ticket se maqueta por separado y
+    las páginas resultantes se unen en un solo documento.
+
+    Parámetros:
+        html_strings (list): HTML de cada ticket ya renderizado.
+        path (str): Ruta final del PDF combinado.
+
+    Retorna:
+        str: Ruta del PDF escrito.
+    """
+    _write_atomic(path, get_renderer().render_bundle(html_strings))
+    return path
+
+
+class TicketPdfStorage:
+    """
+    Almacenamiento en disco de los PDFs de tickets.
+
+    Cada PDF se guarda una vez por combinación de código de barras y estado del
+    ticket, de modo que un cambio de estado (por ejemplo, una cancelación)
+    genera un documento nuevo.
+
+    Atributos:
+        root (str): Directorio donde se guardan los PDFs (por defecto TICKET_PDF_ROOT).
+        lock_timeout (int): Segundos tras los que un bloqueo de renderizado se considera
+            abandonado (por defecto TICKET_PDF_LOCK_TIMEOUT).
+    """
+
+    def __init__(self, root=None, lock_timeout=None):
+        self._root = root
+        self._lock_timeout = lock_timeout
+
+    @property
+    def root(self):
+        return str(self._root or settings.TICKET_PDF_ROOT)
+
+    @property
+    def lock_timeout(self):
+        return self._lock_timeout if self._lock_timeout is not None else settings.TICKET_PDF_LOCK_TIMEOUT
+
+    def filename(self, ticket):
+        return f'ticket_{ticket.barcode}_{ticket.status}.pdf'
+
+    def path(self, ticket):
+        return os.path.join(self.root, self.filename(ticket))
+
+    def lock_path(self, ticket):
+        return f'{self.path(ticket)}.lock'
+
+    def bundle_path(self, flight):
+        return os.path.join(self.root, f'flight_{flight.pk}_boarding_passes.pdf')
+
+    def is_ready(self, ticket):
+        return os.path.exists(self.path(ticket))
+
+    def acquire_lock(self, ticket):
+        """
+        Marca el PDF de un ticket como en renderizado.
+
+        El bloqueo es un archivo creado con O_EXCL, por lo que funciona también
+        entre varios procesos del servidor. Un bloqueo más antiguo que
+        `lock_timeout` se reemplaza.
+
+        Parámetros:
+            ticket (Ticket): Instancia del ticket.
+
+        Retorna:
+            bool: True si el llamador debe encargar el renderizado.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        lock_path = self.lock_path(ticket)
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) < self.lock_timeout:
+                    return False
+            except FileNotFoundError:
+                pass
+            os.replace(self._touch_tmp(lock_path), lock_path)
+            return True
+        os.close(fd)
+        return True
+
+    def release_lock(self, ticket):
+        try:
+            os.remove(self.lock_path(ticket))
+        except FileNotFoundError:
+            pass
+
+    def _touch_tmp(self, lock_path):
+        tmp_path = f'{lock_path}.{os.getpid()}'
+        open(tmp_path, 'w').close()
+        return tmp_path
+
+
+def ticket_pdf_response(ticket, path):
+    """
+    Construye la respuesta de descarga de un PDF de ticket ya generado.
+
+    Si TICKET_PDF_SENDFILE_HEADER está configurado (por ejemplo
+    'X-Accel-Redirect' o 'X-Sendfile'), delega el envío del archivo al
+    servidor web; si no, lo transmite con FileResponse.
+
+    Parámetros:
+        ticket (Ticket): Instancia del ticket.
+        path (str): Ruta del PDF en disco.
+
+    Retorna:
+        HttpResponse: Respuesta con el PDF como adjunto.
+    """
+    filename = f'ticket_{ticket.barcode}.pdf'
+    header = settings.TICKET_PDF_SENDFILE_HEADER
+    if header:
+        response = HttpResponse(content_type='application/pdf')
+        prefix = settings.TICKET_PDF_SENDFILE_PREFIX
+        response[header] = f"{prefix.rstrip('/')}/{os.path.basename(path)}" if prefix else path
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=filename, content_type='application/pdf')
@@ -43,6 +43,8 @@ urlpatterns = [
     path('reservations/<int:reservation_pk>/generate_ticket/', views.generate_ticket, name='generate_ticket'),
     path('tickets/<int:pk>/', views.ticket_detail, name='ticket_detail'),
     path('flights/<int:flight_pk>/passengers/', views.passenger_list_by_flight, name='passenger_list_by_flight'),
+    path('flights/<int:flight_pk>/passengers/export/', views.export_flight_manifest, name='export_flight_manifest'),
+    path('flights/manifests/export/', views.export_manifests, name='export_manifests'),
 
     # Airplane URLs
     path('airplanes/', crud_views.airplane_list, name='airplane_list'),
@@ -2,19 +2,18 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth.decorators import login_required
-from .forms import CustomUserCreationForm, ReservationForm
+from django.http import HttpResponseBadRequest
+from .forms import CustomUserCreationForm, ManifestExportForm, ReservationForm
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth.decorators import login_required
 
 from .models import Flight, Passenger, FlightHistory, Seat, Reservation, Ticket
-from django.http import HttpResponse
-from django.template.loader import render_to_string
-from weasyprint import HTML
 
 # Import CRUD views
 from .crud_views import (
+    search_flights,
     flight_list, flight_create, flight_update, flight_delete,
     passenger_list, passenger_create, passenger_update, passenger_delete,
     airplane_list, airplane_create, airplane_update, airplane_delete,
@@ -23,8 +22,12 @@ from .crud_views import (
     seat_layout_position_list, seat_layout_position_create, seat_layout_position_update, seat_layout_position_delete
 )
 
+from .exceptions import ReservationConflictError
+from .manifest import MANIFEST_FORMATS, manifest_response
+
 # Import services
 from .services import PassengerService, ReservationService, TicketService, FlightService
+from .ticket_pdf import TICKET_PDF_RETRY_AFTER, ticket_pdf_response
 
 # Initialize services
 passenger_service = PassengerService()
@@ -34,7 +37,7 @@ flight_service = FlightService()
 
 def home(request):
     """
-    Vista principal que muestra la lista de vuelos disponibles.
+    Vista principal que muestra la lista de vuelos disponibles, con buscador.
 
     Parámetros:
         request (HttpRequest): Objeto de solicitud HTTP.
@@ -42,8 +45,7 @@ def home(request):
     Retorna:
         HttpResponse: Respuesta renderizada con la plantilla home.html y la lista de vuelos.
     """
-    flights = Flight.objects.all()
-    return render(request, 'airline/home.html', {'flights': flights})
+    return render(request, 'airline/home.html', search_flights(request))
 
 def register(request):
     """
@@ -71,17 +73,24 @@ def passenger_flight_history(request, pk):
     """
     Vista que muestra el historial de vuelos de un pasajero específico.
 
-    Requiere autenticación del usuario.
+    Requiere autenticación del usuario. El historial se pagina por keyset con
+    el parámetro `cursor` (FLIGHT_HISTORY_PAGE_SIZE entradas por página).
 
     Parámetros:
         request (HttpRequest): Objeto de solicitud HTTP.
         pk (int): Clave primaria del pasajero.
 
     Retorna:
-        HttpResponse: Respuesta renderizada con el historial de vuelos del pasajero.
+        HttpResponse: Respuesta renderizada con una página del historial de vuelos del pasajero.
     """
-    passenger, flight_history = passenger_service.get_passenger_flight_history(pk)
-    return render(request, 'airline/passenger_flight_history.html', {'passenger': passenger, 'flight_history': flight_history})
+    cursor = request.GET.get('cursor')
+    passenger, flight_history, next_cursor = passenger_service.get_passenger_flight_history_page(pk, cursor)
+    return render(request, 'airline/passenger_flight_history.html', {
+        'passenger': passenger,
+        'flight_history': flight_history,
+        'next_cursor': next_cursor,
+        'is_first_page': not cursor,
+    })
 
 @login_required
 def flight_detail_with_seats(request, pk):
@@ -90,26 +99,37 @@ def flight_detail_with_seats(request, pk):
 
     Requiere autenticación del usuario.
 
+    El mapa se sirve desde la caché de instantáneas y la respuesta lleva un ETag
+    por versión de inventario, de modo que los clientes que consultan
+    periódicamente reciben 304 mientras no cambien las reservas. El ETag incluye
+    el usuario y la sesión, porque la página muestra datos del usuario y el token CSRF.
+
     Parámetros:
         request (HttpRequest): Objeto de solicitud HTTP.
         pk (int): Clave primaria del vuelo.
 
     Retorna:
-        HttpResponse: Respuesta renderizada con los detalles del vuelo y asientos organizados por fila.
+        HttpResponse: Respuesta renderizada con los detalles del vuelo y asientos organizados por fila, o 304.
     """
-    flight, seats_by_row = reservation_service.get_flight_details_with_seats(pk)
-    return render(request, 'airline/flight_detail_with_seats.html', {
-        'flight': flight,
-        'seats_by_row': seats_by_row,
-    })
+    flight = flight_service.get_flight(pk)
+    return reservation_service.seat_map_cache.conditional_response(
+        request, flight,
+        lambda: render(request, 'airline/flight_detail_with_seats.html', {
+            'flight': flight,
+            'seats_by_row': reservation_service.get_priced_seat_map(flight),
+        }),
+        # The page embeds the username and a CSRF token; login cycles the session key.
+        vary=(request.user.pk, request.session.session_key),
+    )
 
 @login_required
 def reserve_seat(request, flight_pk, seat_pk):
     """
     Vista para reservar un asiento específico en un vuelo.
 
-    Verifica disponibilidad del asiento y maneja la creación de reservas.
-    Requiere autenticación del usuario.
+    Verifica disponibilidad del asiento y maneja la creación de reservas. Al abrir
+    el formulario (GET) el asiento queda retenido para el pasajero durante
+    SEAT_HOLD_TTL_SECONDS. Requiere autenticación del usuario.
 
     Parámetros:
         request (HttpRequest): Objeto de solicitud HTTP.
@@ -120,36 +140,37 @@ def reserve_seat(request, flight_pk, seat_pk):
         HttpResponse: Respuesta renderizada con el formulario de reserva o error si el asiento no está disponible.
     """
     flight = get_object_or_404(Flight, pk=flight_pk)
-    seat = get_object_or_404(Seat, pk=seat_pk)
+    seat = get_object_or_404(Seat, pk=seat_pk, airplane_id=flight.airplane_id)
+    passenger = passenger_service.get_or_create_passenger_for_user(request.user)
 
-    if _check_seat_availability(flight, seat):
+    if _check_seat_availability(flight, seat, passenger):
         return render(request, 'airline/reservation_error.html', {'message': 'This seat is already reserved for this flight.'})
 
-    passenger = passenger_service.get_or_create_passenger_for_user(request.user)
-
     if request.method == 'POST':
         return _handle_post_request(request, flight, seat, passenger)
     else:
         return _handle_get_request(request, flight, seat, passenger)
 
-def _check_seat_availability(flight, seat):
+def _check_seat_availability(flight, seat, passenger=None):
     """
     Función auxiliar para verificar si un asiento está disponible en un vuelo.
 
     Parámetros:
         flight (Flight): Instancia del vuelo.
         seat (Seat): Instancia del asiento.
+        passenger (Passenger, optional): Pasajero para el que su propia retención cuenta como disponible.
 
     Retorna:
-        bool: True si el asiento ya está reservado, False si está disponible.
+        bool: True si el asiento ya está reservado o retenido por otro pasajero, False si está disponible.
     """
-    return reservation_service.reservation_repo.filter_by_flight_seat_status(flight, seat, ['PEN', 'CON', 'PAID']).exists()
+    return not reservation_service.inventory_service.is_seat_available(flight, seat, passenger)
 
 def _handle_post_request(request, flight, seat, passenger):
     """
     Función auxiliar para manejar solicitudes POST en la reserva de asientos.
 
-    Procesa el formulario de reserva y crea la reserva si es válido.
+    Procesa el formulario de reserva y crea la reserva si es válido, con la
+    tarifa actual del asiento calculada en el servidor.
 
     Parámetros:
         request (HttpRequest): Objeto de solicitud HTTP.
@@ -158,11 +179,15 @@ def _handle_post_request(request, flight, seat, passenger):
         passenger (Passenger): Instancia del pasajero.
 
     Retorna:
-        HttpResponse: Redirección a los detalles de la reserva o renderizado del formulario con errores.
+        HttpResponse: Redirección a los detalles de la reserva, renderizado del formulario con errores
+        o página de error (409) si el asiento se tomó mientras tanto.
     """
-    form = ReservationForm(request.POST, initial={'flight': flight})
+    form = ReservationForm(request.POST, initial={'flight': flight, 'passenger': passenger})
     if form.is_valid():
-        reservation = reservation_service.create_reservation(flight.pk, passenger.pk, seat.pk, form.cleaned_data['price'])
+        try:
+            reservation = reservation_service.create_reservation(flight, passenger, seat)
+        except ReservationConflictError as e:
+            return render(request, 'airline/reservation_error.html', {'message': e.message}, status=409)
         return redirect('reservation_detail', pk=reservation.pk)
     else:
         print(form.errors)
@@ -171,6 +196,7 @@ def _handle_post_request(request, flight, seat, passenger):
             'flight': flight,
             'seat': seat,
             'passenger': passenger,
+            'price': reservation_service.pricing_service.quote(flight, seat),
             'action': 'Reserve'
         })
 
@@ -178,7 +204,8 @@ def _handle_get_request(request, flight, seat, passenger):
     """
     Función auxiliar para manejar solicitudes GET en la reserva de asientos.
 
-    Muestra el formulario de reserva con datos iniciales.
+    Retiene el asiento para el pasajero (liberando sus otras retenciones en el
+    vuelo) y muestra el formulario de reserva con datos iniciales.
 
     Parámetros:
         request (HttpRequest): Objeto de solicitud HTTP.
@@ -187,14 +214,23 @@ def _handle_get_request(request, flight, seat, passenger):
         passenger (Passenger): Instancia del pasajero.
 
     Retorna:
-        HttpResponse: Respuesta renderizada con el formulario de reserva.
+        HttpResponse: Respuesta renderizada con el formulario de reserva, o página de error
+        si otro pasajero tomó el asiento entretanto o el pasajero ya tiene una reserva en el vuelo.
     """
+    try:
+        hold_expires_at = reservation_service.inventory_service.hold_seat(flight, seat, passenger)
+    except ReservationConflictError as e:
+        return render(request, 'airline/reservation_error.html', {'message': e.message})
+    if hold_expires_at is None:
+        return render(request, 'airline/reservation_error.html', {'message': 'This seat is already reserved for this flight.'})
     form = ReservationForm(initial={'flight': flight, 'seat': seat, 'passenger': passenger, 'status': 'PEN'})
     return render(request, 'airline/reserve_seat.html', {
         'form': form,
         'flight': flight,
         'seat': seat,
         'passenger': passenger,
+        'price': reservation_service.pricing_service.quote(flight, seat),
+        'hold_expires_at': hold_expires_at,
         'action': 'Reserve'
     })
 
@@ -265,35 +301,20 @@ def generate_ticket(request, reservation_pk):
         reservation_pk (int): Clave primaria de la reserva.
 
     Retorna:
-        HttpResponse: Archivo PDF del ticket o página de error si no es elegible.
+        HttpResponse: Archivo PDF del ticket, página de espera (202) mientras el PDF
+        se genera, o página de error si no es elegible.
     """
     reservation = get_object_or_404(Reservation, pk=reservation_pk)
     if reservation.status not in ['CON', 'PAID']:
         return render(request, 'airline/reservation_error.html', {'message': 'Ticket can only be generated for confirmed or paid reservations.'})
 
     ticket = ticket_service.issue_ticket(reservation_pk)
-    return _generate_ticket_pdf(ticket, reservation)
-
-def _generate_ticket_pdf(ticket, reservation):
-    """
-    Función auxiliar para generar un archivo PDF del ticket.
-
-    Utiliza WeasyPrint para convertir HTML a PDF.
-
-    Parámetros:
-        ticket (Ticket): Instancia del ticket.
-        reservation (Reservation): Instancia de la reserva asociada.
-
-    Retorna:
-        HttpResponse: Respuesta HTTP con el archivo PDF adjunto.
-    """
-    html_string = render_to_string('airline/ticket_template.html', {'ticket': ticket, 'reservation': reservation})
-    html = HTML(string=html_string)
-    pdf = html.write_pdf()
-
-    response = HttpResponse(pdf, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="ticket_{ticket.barcode}.pdf"'
-    return response
+    path = ticket_service.get_ticket_pdf(ticket)
+    if path is None:
+        response = render(request, 'airline/ticket_pending.html', {'ticket': ticket}, status=202)
+        response['Retry-After'] = str(TICKET_PDF_RETRY_AFTER)
+        return response
+    return ticket_pdf_response(ticket, path)
 
 @login_required
 def ticket_detail(request, pk):
@@ -332,3 +353,54 @@ def passenger_list_by_flight(request, flight_pk):
         'passengers': reservations,
     }
     return render(request, 'airline/passenger_list_by_flight.html', context)
+
+@login_required
+def export_flight_manifest(request, flight_pk):
+    """
+    Vista que descarga el manifiesto de pasajeros de un vuelo.
+
+    El formato se elige con `format` (csv, excel o ndjson; csv por defecto) y
+    el archivo se transmite fila a fila. Requiere autenticación del usuario.
+
+    Parámetros:
+        request (HttpRequest): Objeto de solicitud HTTP.
+        flight_pk (int): Clave primaria del vuelo.
+
+    Retorna:
+        HttpResponse: Manifiesto como adjunto, o 400 si el formato no es válido.
+    """
+    export_format = request.GET.get('format') or 'csv'
+    if export_format not in MANIFEST_FORMATS:
+        return HttpResponseBadRequest(f'Unsupported manifest format: {export_format}.')
+    flight, reservations = reservation_service.get_flight_manifest(flight_pk)
+    return manifest_response(
+        reservations, export_format, f'manifest_flight_{flight.pk}', chunk_size=reservation_service.manifest_chunk_size,
+    )
+
+@login_required
+def export_manifests(request):
+    """
+    Vista que descarga los manifiestos de todos los vuelos que salen en una ventana de días.
+
+    Sin parámetros muestra el formulario; con `date_from`, `date_to` y `format`
+    válidos transmite un único archivo con los pasajeros de todos los vuelos.
+    Requiere autenticación del usuario.
+
+    Parámetros:
+        request (HttpRequest): Objeto de solicitud HTTP.
+
+    Retorna:
+        HttpResponse: Manifiesto como adjunto, o el formulario (400 si no es válido).
+    """
+    form = ManifestExportForm(request.GET or None)
+    if not form.is_bound:
+        return render(request, 'airline/manifest_export.html', {'form': form})
+    if not form.is_valid():
+        return render(request, 'airline/manifest_export.html', {'form': form}, status=400)
+    date_from, date_to = form.cleaned_data['date_from'], form.cleaned_data['date_to']
+    return manifest_response(
+        reservation_service.get_departures_manifest(date_from, date_to),
+        form.cleaned_data['format'],
+        f'manifest_{date_from.isoformat()}_{date_to.isoformat()}',
+        chunk_size=reservation_service.manifest_chunk_size,
+    )
@@ -87,6 +87,69 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Local-memory by default; point CACHE_BACKEND/CACHE_LOCATION at a shared
+# backend (e.g. Redis or Memcached) when running several workers.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'airline-default'),
+    }
+}
+
+# Seat map snapshots (airline.seat_map_cache.SeatMapCache)
+SEAT_MAP_CACHE_ALIAS = os.environ.get('SEAT_MAP_CACHE_ALIAS', 'default')
+SEAT_MAP_CACHE_TIMEOUT = int(os.environ.get('SEAT_MAP_CACHE_TIMEOUT', '300'))
+
+# Per-process seat grids by airplane (airline.seat_grid.SeatGridCache).
+# Seat, layout position and seat type changes invalidate them in the process
+# that makes the change; the timeout bounds changes made elsewhere.
+SEAT_GRID_CACHE_SIZE = int(os.environ.get('SEAT_GRID_CACHE_SIZE', '256'))
+SEAT_GRID_CACHE_TIMEOUT = int(os.environ.get('SEAT_GRID_CACHE_TIMEOUT', '300'))
+
+# User -> passenger identity cache (airline.passenger_identity.PassengerIdentityCache).
+# Passenger saves and deletes invalidate it; the timeout bounds other changes.
+PASSENGER_IDENTITY_CACHE_ALIAS = os.environ.get('PASSENGER_IDENTITY_CACHE_ALIAS', 'default')
+PASSENGER_IDENTITY_CACHE_TIMEOUT = int(os.environ.get('PASSENGER_IDENTITY_CACHE_TIMEOUT', '300'))
+
+# Seat holds taken while a customer fills in the reservation form.
+# Expired holds are released by `manage.py release_expired_holds`.
+SEAT_HOLD_TTL_SECONDS = int(os.environ.get('SEAT_HOLD_TTL_SECONDS', '600'))
+
+# FlightHistory sync from completed reservations (`manage.py sync_flight_history`).
+# Each run re-checks flights departed up to LOOKBACK_HOURS before the last mark,
+# for reservations paid or boarded after departure.
+FLIGHT_HISTORY_SYNC_BATCH_SIZE = int(os.environ.get('FLIGHT_HISTORY_SYNC_BATCH_SIZE', '500'))
+FLIGHT_HISTORY_SYNC_LOOKBACK_HOURS = int(os.environ.get('FLIGHT_HISTORY_SYNC_LOOKBACK_HOURS', '24'))
+# Entries per page of a passenger's flight history page (keyset pagination).
+FLIGHT_HISTORY_PAGE_SIZE = int(os.environ.get('FLIGHT_HISTORY_PAGE_SIZE', '50'))
+
+# Passenger manifest exports (CSV, Excel-compatible CSV, NDJSON) are streamed;
+# reservations are read from the database in chunks of this size.
+MANIFEST_EXPORT_CHUNK_SIZE = int(os.environ.get('MANIFEST_EXPORT_CHUNK_SIZE', '2000'))
+
+# Dynamic pricing (airline.services.PricingService): fare = base price x seat type
+# multiplier x load factor step x days-to-departure step. Each curve is a list of
+# (threshold, multiplier) pairs; the highest threshold not above the value applies.
+PRICING_LOAD_FACTOR_CURVE = [(0.0, '1.00'), (0.5, '1.10'), (0.7, '1.25'), (0.85, '1.45'), (0.95, '1.70')]
+PRICING_DEPARTURE_CURVE = [(0, '1.60'), (2, '1.40'), (7, '1.20'), (14, '1.10'), (30, '1.00')]
+
+
+# Ticket PDFs are rendered once per barcode and status and stored on disk.
+# TICKET_PDF_WORKERS=0 renders inline (no process pool); bulk issues send
+# TICKET_PDF_BATCH_SIZE tickets per pool task. When a front-end
+# server serves TICKET_PDF_ROOT, set TICKET_PDF_SENDFILE_HEADER (e.g.
+# 'X-Accel-Redirect') and TICKET_PDF_SENDFILE_PREFIX (its internal location).
+TICKET_PDF_ROOT = os.environ.get('TICKET_PDF_ROOT', str(BASE_DIR / 'media' / 'tickets'))
+TICKET_PDF_WORKERS = int(os.environ.get('TICKET_PDF_WORKERS', '2'))
+TICKET_PDF_BATCH_SIZE = int(os.environ.get('TICKET_PDF_BATCH_SIZE', '20'))
+TICKET_PDF_LOCK_TIMEOUT = int(os.environ.get('TICKET_PDF_LOCK_TIMEOUT', '60'))
+TICKET_PDF_SENDFILE_HEADER = os.environ.get('TICKET_PDF_SENDFILE_HEADER', '')
+TICKET_PDF_SENDFILE_PREFIX = os.environ.get('TICKET_PDF_SENDFILE_PREFIX', '')
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -172,8 +235,17 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # Keyset (cursor) pagination on every list endpoint; see airline.pagination.
+    'DEFAULT_PAGINATION_CLASS': 'airline.pagination.KeysetPagination',
+    'PAGE_SIZE': int(os.environ.get('API_PAGE_SIZE', '50')),
 }
 
+# Upper bound for the ?page_size= query parameter of API listings.
+API_MAX_PAGE_SIZE = int(os.environ.get('API_MAX_PAGE_SIZE', '500'))
+
+# Maximum number of flights listed by the web search (home and flight list).
+FLIGHT_SEARCH_WEB_LIMIT = int(os.environ.get('FLIGHT_SEARCH_WEB_LIMIT', '200'))
+
 # Test settings
 TEST_RUNNER = 'django.test.runner.DiscoverRunner'
 TEST_DISCOVER_TOP_LEVEL = BASE_DIR / 'airline'